@@ -6,17 +6,23 @@ Build your roller coaster using pre-defined building blocks!
 import streamlit as st
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from scipy.interpolate import splprep, splev
-from scipy import stats
 import sys
 import os
 
 # Import utilities
-from utils.accelerometer_transform import track_to_accelerometer_data
-from utils.lgbm_predictor import predict_score_lgb, compute_lightgbm_features
-from utils.track_library import ensure_library, pick_random_entry, load_entry, add_entry
+from utils.arc_length_track import ArcLengthTrack
+from utils.track_geometry import TrackGeometry
+from utils.lgbm_predictor import compute_lightgbm_features, predict_score_lgb, predict_scores_from_features
+from utils.array_store import ARRAY_STORE
+from utils.profiling import DEFAULT_LOG_PATH, StageTimer
+from utils.resource_cache import cache_stats
+from utils.scoring import (
+    check_gforce_safety,
+    compute_airtime_metrics,
+    calculate_ride_features,
+    estimate_track_metadata,
+)
+from utils.track_assembly import assemble_track, DEFAULT_TRACK_SEQUENCE
 
 
 def _is_local_debug_mode():
@@ -40,9 +46,6 @@ from utils.track_blocks import (
     brake_run_profile,
 )
 
-# Set page layout and main header
-st.set_page_config(page_title="Roller Coaster Builder", page_icon="🎢", layout="wide")
-st.title("🎢 Roller Coaster Builder")
 
 # ============================================================================
 # BUILDING BLOCK DEFINITIONS
@@ -74,676 +77,6 @@ BLOCK_LIBRARY = {
         "flat_section": TrackBlock("Flat Section", "Straight section", "➡️", flat_section_profile),
     }
 
-# Always start with a complete starter track on first load
-if 'initialized' not in st.session_state:
-    st.session_state.track_sequence = [
-        {
-            'type': 'launch',
-            'block': BLOCK_LIBRARY['launch'],
-            'params': {'length': 60, 'speed_boost': 30}  # Longer launch, higher speed for more energy
-        },
-        {
-            'type': 'lift_hill',
-            'block': BLOCK_LIBRARY['lift_hill'],
-            'params': {'length': 120, 'height': 120}  # Much higher lift hill for more potential energy
-        },
-        {
-            'type': 'drop',
-            'block': BLOCK_LIBRARY['drop'],
-            'params': {'height': 120, 'steepness': 1.0}  # Higher drop = more speed = higher G-forces
-        },
-        {
-            'type': 'loop',
-            'block': BLOCK_LIBRARY['loop'],
-            'params': {'diameter': 35}  # Larger loop for higher G-forces
-        },
-        {
-            'type': 'flat_section',
-            'block': BLOCK_LIBRARY['flat_section'],
-            'params': {'length': 40}  # Flat section between loop and airtime hill
-        },
-        {
-            'type': 'airtime_hill',
-            'block': BLOCK_LIBRARY['airtime_hill'],
-            'params': {'length': 80, 'height': 25}  # Larger airtime hill
-        },
-        {
-            'type': 'flat_section',
-            'block': BLOCK_LIBRARY['flat_section'],
-            'params': {'length': 60}  # Flat section (replaced second drop)
-        },
-        {
-            'type': 'loop',
-            'block': BLOCK_LIBRARY['loop'],
-            'params': {'diameter': 30}  # Second loop
-        },
-        {
-            'type': 'flat_section',
-            'block': BLOCK_LIBRARY['flat_section'],
-            'params': {'length': 40}  # Flat section between loop and airtime hill
-        },
-        {
-            'type': 'airtime_hill',
-            'block': BLOCK_LIBRARY['airtime_hill'],
-            'params': {'length': 70, 'height': 20}  # Second airtime hill
-        },
-        {
-            'type': 'flat_section',
-            'block': BLOCK_LIBRARY['flat_section'],
-            'params': {'length': 50}  # Transition section
-        },
-        {
-            'type': 'flat_section',
-            'block': BLOCK_LIBRARY['flat_section'],
-            'params': {'length': 50}  # Flat section (replaced third drop)
-        },
-        {
-            'type': 'airtime_hill',
-            'block': BLOCK_LIBRARY['airtime_hill'],
-            'params': {'length': 60, 'height': 18}  # Third airtime hill
-        },
-        {
-            'type': 'flat_section',
-            'block': BLOCK_LIBRARY['flat_section'],
-            'params': {'length': 40}  # Transition
-        },
-        {
-            'type': 'brake_run',
-            'block': BLOCK_LIBRARY['brake_run'],
-            'params': {'length': 50}  # Longer brake run
-        }
-    ]
-    st.session_state.initialized = True
-
-# The rest of the Builder UI continues below (unchanged code)...
-
-# ============================================================================
-# SIDEBAR: BUILDING BLOCK PALETTE
-# ============================================================================
-
-with st.sidebar:
-    st.header("🧱 Building Blocks")
-    
-    # Show success message from random generation if it exists
-    if 'random_gen_success' in st.session_state and st.session_state.random_gen_success:
-        st.success(st.session_state.random_gen_success)
-        # Clear the message after showing it
-        st.session_state.random_gen_success = None
-    
-    # Quick Start section at the top
-    st.subheader("🎲 Quick Start")
-    
-    col_rand1_top, col_rand2_top = st.columns(2)
-    
-
-    
-    with col_rand1_top:
-        if st.button("🎲 Random Template", key=f"btn_random_template_quickstart", use_container_width=True, help="Generate a random coaster with 5-10 blocks"):
-            import random
-            
-            try:
-                # Random number of blocks (targeting ~500m)
-                num_blocks = random.randint(6, 10)
-                
-                # Always start with launch, then lift hill followed by a vertical drop and a flat section
-                new_sequence = [
-                {
-                    'type': 'launch',
-                    'block': BLOCK_LIBRARY['launch'],
-                    'params': {
-                        'length': random.randint(30, 50),
-                        'speed_boost': random.randint(20, 28)
-                    }
-                },
-                {
-                    'type': 'lift_hill',
-                    'block': BLOCK_LIBRARY['lift_hill'],
-                    'params': {
-                        'length': random.randint(50, 80),
-                        'height': random.randint(40, 70)
-                    }
-                },
-                {
-                    'type': 'drop',
-                    'block': BLOCK_LIBRARY['drop'],
-                    'params': {
-                        'height': random.randint(40, 70),
-                        'steepness': random.uniform(0.8, 1.0)
-                    }
-                },
-                {
-                    'type': 'flat_section',
-                    'block': BLOCK_LIBRARY['flat_section'],
-                    'params': {'length': random.randint(20, 40)}
-                }
-                ]
-                
-                # Available blocks (after initial drop + flat)
-                # Exclude banked_turn and spiral to avoid lateral forces in random designs
-                available_blocks = ['drop', 'loop', 'airtime_hill', 'bunny_hop', 'launch']
-
-                # Record the initial drop height to cap later drops to <= 1/3
-                first_drop_height = next((b['params']['height'] for b in new_sequence if b['type'] == 'drop'), None)
-                
-                for i in range(num_blocks - 4):  # -4 because we added launch + lift + drop + flat
-                    block_type = random.choice(available_blocks)
-                    # Enforce: at least one flat section in every 3 blocks
-                    # Check last two blocks (after the initial lift+drop+flat)
-                    recent_types = [b['type'] for b in new_sequence[-2:]] if len(new_sequence) >= 2 else []
-                    # If this would make three consecutive without a flat, force a flat_section
-                    if (i % 3 == 2) and ('flat_section' not in recent_types):
-                        block_type = 'flat_section'
-                    
-                    # Initialize params to None to catch any unhandled block types
-                    params = None
-                    
-                    if block_type == 'drop':
-                        # Cap height to at most 1/3 of the original first drop
-                        if first_drop_height is not None:
-                            max_drop = max(10, int(first_drop_height / 3))
-                            params = {
-                                'height': random.randint(10, max_drop),
-                                'steepness': random.uniform(0.7, 0.9)
-                            }
-                        else:
-                            params = {
-                                'height': random.randint(25, 50),
-                                'steepness': random.uniform(0.7, 0.9)
-                            }
-                    elif block_type == 'loop':
-                        params = {'diameter': random.randint(20, 35)}
-                    elif block_type == 'airtime_hill':
-                        params = {
-                            'length': random.randint(30, 60),
-                            'height': random.randint(10, 20)
-                        }
-                    elif block_type == 'spiral':
-                        params = {
-                            'diameter': random.randint(20, 30),
-                            'turns': random.uniform(1.0, 2.0)
-                        }
-                    elif block_type == 'bunny_hop':
-                        params = {
-                            'length': random.randint(15, 30),
-                            'height': random.randint(5, 12)
-                        }
-                    elif block_type == 'banked_turn':
-                        params = {
-                            'radius': random.randint(20, 35),
-                            'angle': random.randint(60, 120)
-                        }
-                    elif block_type == 'launch':
-                        params = {
-                            'length': random.randint(30, 50),
-                            'speed_boost': random.randint(20, 28)
-                        }
-                    elif block_type == 'flat_section':
-                        params = {
-                            'length': random.randint(20, 40)
-                        }
-                    elif block_type == 'brake_run':
-                        params = {
-                            'length': random.randint(25, 40)
-                        }
-                    else:
-                        # Fallback for any unhandled block types
-                        st.error(f"Unknown block type in random generation: {block_type}")
-                        params = {'length': 30}  # Default params
-                    
-                    # Only append if params were successfully set
-                    if params is not None:
-                        new_sequence.append({
-                            'type': block_type,
-                            'block': BLOCK_LIBRARY[block_type],
-                            'params': params
-                        })
-                    else:
-                        st.error(f"Failed to generate params for block type: {block_type}")
-                
-                # Always end with a brake run
-                new_sequence.append({
-                    'type': 'brake_run',
-                    'block': BLOCK_LIBRARY['brake_run'],
-                    'params': {'length': random.randint(25, 40)}
-                })
-                
-                st.session_state.track_sequence = new_sequence
-                # Clear cached metrics to force recomputation on rerun
-                st.session_state.predicted_rating = None
-                st.session_state.accel_df = None
-                st.session_state.airtime_metrics = None
-                st.session_state.track_generated = False
-                # Enforce end level equals start for random generation
-                st.session_state.force_end_level = True
-                st.session_state.start_level = 0.0
-                # Disable 3D for random designs (2D tracks should have no lateral forces)
-                st.session_state.random_3d = False
-                # Store success message in session state to show after rerun
-                st.session_state.random_gen_success = f"🎲 Generated random coaster with {num_blocks} blocks!"
-                st.rerun()
-            except Exception as e:
-                st.error(f"❌ Error generating random coaster: {str(e)}")
-                import traceback
-                st.exception(e)
-    
-    with col_rand2_top:
-        if st.button("🔄 \n Reset to Default", key=f"btn_reset_default_quickstart", use_container_width=True, help="Reset to the starter template"):
-            st.session_state.track_sequence = [
-                {
-                    'type': 'launch',
-                    'block': BLOCK_LIBRARY['launch'],
-                    'params': {'length': 60, 'speed_boost': 30}
-                },
-                {
-                    'type': 'lift_hill',
-                    'block': BLOCK_LIBRARY['lift_hill'],
-                    'params': {'length': 120, 'height': 120}
-                },
-                {
-                    'type': 'drop',
-                    'block': BLOCK_LIBRARY['drop'],
-                    'params': {'height': 120, 'steepness': 1.0}
-                },
-                {
-                    'type': 'loop',
-                    'block': BLOCK_LIBRARY['loop'],
-                    'params': {'diameter': 35}
-                },
-                {
-                    'type': 'flat_section',
-                    'block': BLOCK_LIBRARY['flat_section'],
-                    'params': {'length': 40}
-                },
-                {
-                    'type': 'airtime_hill',
-                    'block': BLOCK_LIBRARY['airtime_hill'],
-                    'params': {'length': 80, 'height': 25}
-                },
-                {
-                    'type': 'flat_section',
-                    'block': BLOCK_LIBRARY['flat_section'],
-                    'params': {'length': 60}
-                },
-                {
-                    'type': 'loop',
-                    'block': BLOCK_LIBRARY['loop'],
-                    'params': {'diameter': 30}
-                },
-                {
-                    'type': 'flat_section',
-                    'block': BLOCK_LIBRARY['flat_section'],
-                    'params': {'length': 40}
-                },
-                {
-                    'type': 'airtime_hill',
-                    'block': BLOCK_LIBRARY['airtime_hill'],
-                    'params': {'length': 70, 'height': 20}
-                },
-                {
-                    'type': 'flat_section',
-                    'block': BLOCK_LIBRARY['flat_section'],
-                    'params': {'length': 50}
-                },
-                {
-                    'type': 'flat_section',
-                    'block': BLOCK_LIBRARY['flat_section'],
-                    'params': {'length': 50}
-                },
-                {
-                    'type': 'airtime_hill',
-                    'block': BLOCK_LIBRARY['airtime_hill'],
-                    'params': {'length': 60, 'height': 18}
-                },
-                {
-                    'type': 'brake_run',
-                    'block': BLOCK_LIBRARY['brake_run'],
-                    'params': {'length': 50}
-                }
-            ]
-            st.session_state.track_generated = False
-            st.session_state.force_end_level = False
-            st.success("🔄 Reset to default template!")
-            st.rerun()
-
-    # Precomputed safe library (hidden)
-    # st.subheader("📚 Precomputed Safe Library")
-    # Hidden per request. Library UI and loading disabled.
-    
-    st.divider()
-    
-    # Save current design to precomputed library (hidden per request)
-    # st.subheader("💾 Save Design")
-    # new_lib_name = st.text_input("Entry name", value="my_design")
-    # if st.button("📚 Add Design to Library", use_container_width=True, help="Save current track with physics to the library"):
-    #     if st.session_state.get('track_generated'):
-    #         track_df = pd.DataFrame({
-    #             'x': st.session_state.track_x,
-    #             'y': st.session_state.track_y,
-    #             'z': np.array(st.session_state.get('track_z', np.zeros_like(st.session_state.track_x)))
-    #         })
-    #         elements = st.session_state.get('track_sequence', [])
-    #         meta = add_entry(new_lib_name, elements, track_df)
-    #         if meta:
-    #             st.success(f"Saved to library as '{new_lib_name}'")
-    #         else:
-    #             st.error("Failed to save to library")
-    #     else:
-    #         st.warning("Generate a track first, then save.")
-
-    st.markdown("""
-    <div style="background-color: #e3f2fd; padding: 0.8rem; border-radius: 0.3rem; margin-bottom: 1rem; color: #1a1a1a;">
-    <b style="color: #0d47a1;">Instructions:</b><br>
-    <span style="color: #1a1a1a;">
-    1. Select a block below<br>
-    2. Adjust its parameters<br>
-    3. Click "Add to Track"<br>
-    4. Build your complete ride!<br>
-    5. AI rating updates automatically
-    </span>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Physics engine selection (hidden, default to Advanced)
-    # st.divider()
-    # st.subheader("⚙️ Physics Engine")
-    # physics_mode = st.radio(
-    #     "G-Force Calculation Method",
-    #     options=["Advanced (Realistic)", "Simple (Geometric)"],
-    #     index=0,
-    #     key="physics_mode_selector",
-    #     help="Both use pure energy conservation from track geometry. Advanced: Full 3D physics with detailed curvature. Simple: Frenet-Serret frame calculation. Use Launch blocks to add initial speed!"
-    # )
-    # Store in session state - default to Advanced
-    if 'physics_mode' not in st.session_state:
-        st.session_state.physics_mode = "Advanced (Realistic)"
-    physics_mode = st.session_state.physics_mode  # Use stored value (default: Advanced)
-    
-    # Physics Parameters Section (hidden by default, accessible via expander)
-    st.divider()
-    with st.expander("⚙️ Physics Parameters", expanded=False):
-        # Initialize physics parameters in session state if not present
-        if 'physics_mass' not in st.session_state:
-            st.session_state.physics_mass = 500.0
-        if 'physics_A' not in st.session_state:
-            st.session_state.physics_A = 2.0
-        if 'physics_Cd' not in st.session_state:
-            st.session_state.physics_Cd = 0.1
-        if 'physics_mu' not in st.session_state:
-            st.session_state.physics_mu = 0.001
-        if 'physics_rho' not in st.session_state:
-            st.session_state.physics_rho = 1.2
-        
-        # Store previous values to detect changes
-        prev_mass = st.session_state.physics_mass
-        prev_A = st.session_state.physics_A
-        prev_Cd = st.session_state.physics_Cd
-        prev_mu = st.session_state.physics_mu
-        prev_rho = st.session_state.physics_rho
-        
-        # Mass (kg)
-        st.session_state.physics_mass = st.number_input(
-            "Mass (kg)",
-            min_value=10.0,
-            max_value=10000.0,
-            value=st.session_state.physics_mass,
-            step=50.0,
-            help="Cart mass. Lower = more acceleration, more sensitive"
-        )
-        
-        # Frontal Area (m²)
-        st.session_state.physics_A = st.number_input(
-            "Frontal Area (m²)",
-            min_value=0.5,
-            max_value=10.0,
-            value=st.session_state.physics_A,
-            step=0.1,
-            help="Cross-sectional area. Smaller = less drag"
-        )
-        
-        # Drag Coefficient
-        st.session_state.physics_Cd = st.number_input(
-            "Drag Coefficient",
-            min_value=0.01,
-            max_value=2.0,
-            value=st.session_state.physics_Cd,
-            step=0.01,
-            help="Aerodynamic drag coefficient. Lower = less air resistance"
-        )
-        
-        # Friction Coefficient
-        st.session_state.physics_mu = st.number_input(
-            "Friction Coefficient",
-            min_value=0.0,
-            max_value=0.1,
-            value=st.session_state.physics_mu,
-            step=0.0001,
-            format="%.4f",
-            help="Rolling friction. Lower = smoother rails, less energy loss"
-        )
-        
-        # Air Density (kg/m³)
-        st.session_state.physics_rho = st.number_input(
-            "Air Density (kg/m³)",
-            min_value=0.5,
-            max_value=2.0,
-            value=st.session_state.physics_rho,
-            step=0.1,
-            help="Air density. Lower = less air resistance"
-        )
-        
-        # Detect if any parameter changed and clear cached data to force recalculation
-        if (prev_mass != st.session_state.physics_mass or
-            prev_A != st.session_state.physics_A or
-            prev_Cd != st.session_state.physics_Cd or
-            prev_mu != st.session_state.physics_mu or
-            prev_rho != st.session_state.physics_rho):
-            # Clear cached acceleration data to force recalculation
-            if 'accel_df' in st.session_state:
-                del st.session_state['accel_df']
-            if 'predicted_rating' in st.session_state:
-                del st.session_state['predicted_rating']
-            if 'airtime_metrics' in st.session_state:
-                del st.session_state['airtime_metrics']
-            st.session_state.track_generated = False
-        
-        st.caption("💡 Adjust these parameters to fine-tune the physics simulation")
-    
-    st.divider()
-    
-    # Block selection
-    selected_block_key = st.selectbox(
-        "Choose Block Type",
-        options=list(BLOCK_LIBRARY.keys()),
-        format_func=lambda x: f"{BLOCK_LIBRARY[x].icon} {BLOCK_LIBRARY[x].name}"
-    )
-    # RFDB analysis moved to multipage app under pages/02_RFDB_Data.py
-    
-    selected_block = BLOCK_LIBRARY[selected_block_key]
-    
-    st.markdown(f"**{selected_block.icon} {selected_block.name}**")
-    st.caption(selected_block.description)
-    
-    st.divider()
-    
-    # Block-specific parameters
-    st.subheader("⚙️ Parameters")
-    
-    params = {}
-    
-    if selected_block_key == "lift_hill":
-        params['length'] = st.slider("Length (m)", 20, 100, 50, 5)
-        params['height'] = st.slider("Height (m)", 20, 80, 40, 5)
-        
-    elif selected_block_key == "drop":
-        params['height'] = st.slider("Drop Height (m)", 20, 90, 40, 5)
-        params['steepness'] = st.slider("Steepness (max 30°)", 0.5, 1.0, 0.8, 0.05)
-        st.caption("💡 Steepness limited to 30° for realism")
-        
-    elif selected_block_key == "loop":
-        params['diameter'] = st.slider("Loop Diameter (m)", 15, 45, 30, 5)
-        
-    elif selected_block_key == "airtime_hill":
-        params['length'] = st.slider("Hill Length (m)", 20, 60, 40, 5)
-        params['height'] = st.slider("Hill Height (m)", 5, 25, 15, 2)
-        
-    elif selected_block_key == "spiral":
-        params['diameter'] = st.slider("Spiral Diameter (m)", 15, 40, 25, 5)
-        params['turns'] = st.slider("Number of Turns", 0.5, 3.0, 1.5, 0.5)
-        
-    elif selected_block_key == "bunny_hop":
-        params['length'] = st.slider("Hop Length (m)", 10, 30, 20, 5)
-        params['height'] = st.slider("Hop Height (m)", 3, 15, 8, 1)
-        
-    elif selected_block_key == "banked_turn":
-        params['radius'] = st.slider("Turn Radius (m)", 15, 50, 30, 5)
-        params['angle'] = st.slider("Turn Angle (°)", 30, 180, 90, 15)
-        
-    elif selected_block_key == "launch":
-        params['length'] = st.slider("Launch Length (m)", 20, 80, 40, 5)
-        params['speed_boost'] = st.slider("Speed Boost (m/s)", 10, 40, 20, 5)
-        st.caption(f"💡 Target speed: {params['speed_boost']:.1f} m/s")
-        st.info("🚀 **TIP:** Start your track with a Launch block! Without initial speed, the train won't have energy to climb. Launch provides the kinetic energy needed for hills and loops.")
-        
-    elif selected_block_key == "flat_section":
-        params['length'] = st.slider("Section Length (m)", 10, 50, 30, 5)
-    
-    elif selected_block_key == "brake_run":
-        params['length'] = st.slider("Brake Length (m)", 20, 50, 30, 5)
-        st.info("🛑 **TIP:** End your track with a Brake Run for a safe, comfortable stop. This provides the final deceleration zone.")
-    
-    # Add block button
-    if st.button("➕ Add to Track", type="primary", use_container_width=True):
-        # Get current height for drop validation
-        if selected_block_key == "drop" and len(st.session_state.track_sequence) > 0:
-            # Calculate current height from existing track
-            all_x, all_y, all_z = [], [], []
-            current_x_offset, current_y_offset, current_z_offset = 0, 0, 0
-            for block_info in st.session_state.track_sequence:
-                x, y, z = block_info['block'].generate_profile(**block_info['params'])
-                all_x.extend(x + current_x_offset)
-                all_y.extend(y + current_y_offset)
-                all_z.extend(z + current_z_offset)
-                current_x_offset = all_x[-1]
-                current_y_offset = all_y[-1]
-                current_z_offset = all_z[-1]
-            
-            params['current_height'] = current_y_offset
-            
-            if current_y_offset < 5:
-                st.error(f"⚠️ Not enough altitude! Current height: {current_y_offset:.1f}m. Add a lift hill first.")
-                st.stop()
-        
-        st.session_state.track_sequence.append({
-            'type': selected_block_key,
-            'block': selected_block,
-            'params': params.copy()
-        })
-        st.session_state.track_generated = False
-        # Clear cached physics so plots recompute after adding a block
-        st.session_state.pop('accel_df', None)
-        st.session_state.pop('airtime_metrics', None)
-        st.session_state.pop('ride_features', None)
-        st.success(f"✅ Added {selected_block.name}")
-        st.rerun()
-    
-    st.divider()
-    
-    # Track sequence management
-    st.subheader("📋 Current Track Sequence")
-    
-    if len(st.session_state.track_sequence) == 0:
-        st.info("No blocks added yet. Start building!")
-    else:
-        for idx, block_info in enumerate(st.session_state.track_sequence):
-            with st.expander(f"{idx+1}. {block_info['block'].icon} {block_info['block'].name}", expanded=False):
-                # Show parameters
-                st.caption("**Edit Parameters:**")
-                edited_params = block_info['params'].copy()
-                btype = block_info.get('type')
-                # Render appropriate controls per block type
-                if btype == 'lift_hill':
-                    edited_params['length'] = st.slider("Length (m)", 20, 100, int(edited_params.get('length', 50)), 5, key=f"edit_len_{idx}")
-                    edited_params['height'] = st.slider("Height (m)", 20, 80, int(edited_params.get('height', 40)), 5, key=f"edit_h_{idx}")
-                elif btype == 'drop':
-                    edited_params['height'] = st.slider("Drop Height (m)", 20, 90, int(edited_params.get('height', 40)), 5, key=f"edit_dh_{idx}")
-                    edited_params['steepness'] = st.slider("Steepness (max 30°)", 0.5, 1.0, float(edited_params.get('steepness', 0.8)), 0.05, key=f"edit_ds_{idx}")
-                elif btype == 'loop':
-                    edited_params['diameter'] = st.slider("Loop Diameter (m)", 15, 45, int(edited_params.get('diameter', 30)), 5, key=f"edit_ld_{idx}")
-                elif btype == 'airtime_hill':
-                    edited_params['length'] = st.slider("Hill Length (m)", 20, 60, int(edited_params.get('length', 40)), 5, key=f"edit_ahl_{idx}")
-                    edited_params['height'] = st.slider("Hill Height (m)", 5, 25, int(edited_params.get('height', 15)), 1, key=f"edit_ahh_{idx}")
-                elif btype == 'spiral':
-                    edited_params['diameter'] = st.slider("Spiral Diameter (m)", 15, 40, int(edited_params.get('diameter', 25)), 5, key=f"edit_spd_{idx}")
-                    edited_params['turns'] = st.slider("Number of Turns", 0.5, 3.0, float(edited_params.get('turns', 1.5)), 0.5, key=f"edit_spt_{idx}")
-                elif btype == 'bunny_hop':
-                    edited_params['length'] = st.slider("Hop Length (m)", 10, 30, int(edited_params.get('length', 20)), 5, key=f"edit_bhl_{idx}")
-                    edited_params['height'] = st.slider("Hop Height (m)", 3, 15, int(edited_params.get('height', 8)), 1, key=f"edit_bhh_{idx}")
-                elif btype == 'banked_turn':
-                    edited_params['radius'] = st.slider("Turn Radius (m)", 15, 50, int(edited_params.get('radius', 30)), 5, key=f"edit_btr_{idx}")
-                    edited_params['angle'] = st.slider("Turn Angle (°)", 30, 180, int(edited_params.get('angle', 90)), 15, key=f"edit_bta_{idx}")
-                elif btype == 'launch':
-                    edited_params['length'] = st.slider("Launch Length (m)", 20, 80, int(edited_params.get('length', 40)), 5, key=f"edit_ll_{idx}")
-                    edited_params['speed_boost'] = st.slider("Speed Boost (m/s)", 10, 40, int(edited_params.get('speed_boost', 20)), 5, key=f"edit_lsb_{idx}")
-                    st.caption(f"Target speed: {edited_params['speed_boost']:.1f} m/s")
-                elif btype == 'flat_section':
-                    edited_params['length'] = st.slider("Section Length (m)", 10, 50, int(edited_params.get('length', 30)), 5, key=f"edit_fsl_{idx}")
-                elif btype == 'brake_run':
-                    edited_params['length'] = st.slider("Brake Length (m)", 20, 50, int(edited_params.get('length', 30)), 5, key=f"edit_brl_{idx}")
-                else:
-                    # Fallback generic editors
-                    for param_name, param_value in edited_params.items():
-                        if param_name == 'current_height':
-                            continue
-                        if isinstance(param_value, (int, float)):
-                            edited_params[param_name] = st.number_input(param_name, value=float(param_value), key=f"edit_gen_{param_name}_{idx}")
-                        else:
-                            edited_params[param_name] = st.text_input(param_name, value=str(param_value), key=f"edit_gen_txt_{param_name}_{idx}")
-
-                if st.button("💾 Save Changes", key=f"save_{idx}", use_container_width=True):
-                    st.session_state.track_sequence[idx]['params'] = edited_params
-                    st.session_state.track_generated = False
-                    st.success("Saved block changes")
-                    st.rerun()
-                
-                col_del, col_up, col_down = st.columns(3)
-                with col_del:
-                    if st.button("🗑️ Remove", key=f"del_{idx}", use_container_width=True):
-                        st.session_state.track_sequence.pop(idx)
-                        st.session_state.track_generated = False
-                        # Clear cached physics so plots recompute
-                        st.session_state.pop('accel_df', None)
-                        st.session_state.pop('airtime_metrics', None)
-                        st.session_state.pop('ride_features', None)
-                        st.rerun()
-                with col_up:
-                    if idx > 0 and st.button("⬆️ Move Up", key=f"up_{idx}", use_container_width=True):
-                        st.session_state.track_sequence[idx], st.session_state.track_sequence[idx-1] = \
-                            st.session_state.track_sequence[idx-1], st.session_state.track_sequence[idx]
-                        st.session_state.track_generated = False
-                        st.rerun()
-                with col_down:
-                    if idx < len(st.session_state.track_sequence) - 1 and st.button("⬇️ Move Down", key=f"down_{idx}", use_container_width=True):
-                        st.session_state.track_sequence[idx], st.session_state.track_sequence[idx+1] = \
-                            st.session_state.track_sequence[idx+1], st.session_state.track_sequence[idx]
-                        st.session_state.track_generated = False
-                        st.rerun()
-        
-        st.divider()
-        
-        # Clear all button
-        if st.button("🗑️ Clear All Blocks", use_container_width=True):
-            st.session_state.track_sequence = []
-            st.session_state.track_generated = False
-            # Clear cached physics so plots recompute
-            st.session_state.pop('accel_df', None)
-            st.session_state.pop('airtime_metrics', None)
-            st.session_state.pop('ride_features', None)
-            st.rerun()
-
-# ============================================================================
-# MAIN AREA: TRACK VISUALIZATION AND RATING
-# ============================================================================
-
 def check_lateral_smoothness(x, z, max_angle_deg=20):
     """
     Check for sharp lateral transitions (z-coordinate changes).
@@ -834,6 +167,7 @@ def smooth_track_profile(x, y, smoothness_factor=0.5):
     if len(x) < 4:
         return x, y
     
+    from scipy.interpolate import splprep, splev
     try:
         # Use spline interpolation with light smoothing
         # s parameter is key: lower = preserves shape better
@@ -861,6 +195,9 @@ def smooth_joints(x, y, block_boundaries, window_size=5):
     """
     Apply moving average smoothing at block joints to eliminate spikes.
     
+    Only the samples within half a window of a joint are replaced; their
+    moving averages come from one cumulative-sum pass over the track.
+    
     Args:
         x, y: Track coordinates
         block_boundaries: List of indices where blocks join
@@ -869,8 +206,11 @@ def smooth_joints(x, y, block_boundaries, window_size=5):
     Returns:
         x_smooth, y_smooth: Smoothed coordinates
     """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
     x_smooth = x.copy()
     y_smooth = y.copy()
+    n = len(x)
     
     # Ensure window_size is odd
     if window_size % 2 == 0:
@@ -878,47 +218,57 @@ def smooth_joints(x, y, block_boundaries, window_size=5):
     
     half_window = window_size // 2
     
-    # Apply smoothing around each joint
-    for joint_idx in block_boundaries:
-        # Define smoothing region around the joint
-        start_idx = max(0, joint_idx - half_window)
-        end_idx = min(len(x), joint_idx + half_window + 1)
-        
-        if end_idx - start_idx < 3:
-            continue  # Skip if region too small
-        
-        # Apply moving average
-        for i in range(start_idx, end_idx):
-            # Define local window
-            local_start = max(0, i - half_window)
-            local_end = min(len(x), i + half_window + 1)
-            
-            # Compute moving average
-            x_smooth[i] = np.mean(x[local_start:local_end])
-            y_smooth[i] = np.mean(y[local_start:local_end])
+    # Joint neighbourhoods (skipping regions with fewer than 3 samples)
+    joints = np.asarray(block_boundaries, dtype=int).reshape(-1)
+    starts = np.maximum(joints - half_window, 0)
+    ends = np.minimum(joints + half_window + 1, n)
+    valid = ends - starts >= 3
+    if n == 0 or not valid.any():
+        return x_smooth, y_smooth
+    offsets = np.arange(window_size)
+    idx = (starts[valid, None] + offsets[None, :])
+    idx = np.unique(idx[idx < ends[valid, None]])
+    
+    # Moving average of every selected sample from prefix sums (window truncated at the ends)
+    lo = np.maximum(idx - half_window, 0)
+    hi = np.minimum(idx + half_window + 1, n)
+    count = hi - lo
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    x_smooth[idx] = (cx[hi] - cx[lo]) / count
+    y_smooth[idx] = (cy[hi] - cy[lo]) / count
     
     return x_smooth, y_smooth
 
-def detect_curvature_spikes(x, y, threshold=2.0):
+def detect_curvature_spikes(x, y, threshold=2.0, curvature=None, geometry=None):
     """
     Detect spikes in curvature (potential problem areas).
     
     Args:
         x, y: Track coordinates
         threshold: Curvature change threshold (default 2.0)
+        curvature: Per-point curvature (1/m) already computed by the physics step
+                   (`accel_df.attrs['curvature']`)
+        geometry: TrackGeometry of the track, used when `curvature` is not given;
+                  curvature is recomputed from x, y if neither matches the track
     
     Returns:
         spike_indices: Indices where curvature spikes occur
     """
-    # Calculate first and second derivatives
-    dx = np.gradient(x)
-    dy = np.gradient(y)
-    ddx = np.gradient(dx)
-    ddy = np.gradient(dy)
-    
-    # Calculate curvature
-    ds = np.sqrt(dx**2 + dy**2)
-    curvature = np.abs(ddx * dy - dx * ddy) / (ds**3 + 1e-6)
+    if (curvature is None or len(curvature) != len(x)) and geometry is not None and len(geometry) == len(x):
+        curvature = geometry.curvature
+    if curvature is None or len(curvature) != len(x):
+        # Calculate first and second derivatives
+        dx = np.gradient(x)
+        dy = np.gradient(y)
+        ddx = np.gradient(dx)
+        ddy = np.gradient(dy)
+        
+        # Calculate curvature
+        ds = np.sqrt(dx**2 + dy**2)
+        curvature = np.abs(ddx * dy - dx * ddy) / (ds**3 + 1e-6)
+    else:
+        curvature = np.asarray(curvature, dtype=float)
     
     # Detect sudden changes in curvature
     curvature_change = np.abs(np.gradient(curvature))
@@ -934,239 +284,62 @@ def detect_curvature_spikes(x, y, threshold=2.0):
     
     return spike_indices, curvature
 
-def generate_track_from_blocks():
-    """Generate complete track from block sequence with improved C1 joint blending.
-    Ensures continuity of position and first derivative in both x and y.
-    """
+def _put_session_array(name, values):
+    """Keep an array in the shared ARRAY_STORE; session_state only holds its handle (None stays None)."""
+    st.session_state[name] = None if values is None else ARRAY_STORE.put(values)
 
-    def endpoint_tangent(x_arr, y_arr, at_start=False):
-        # Compute tangent vector using local finite difference
-        if at_start:
-            i0, i1 = 0, min(1, len(x_arr)-1)
-        else:
-            i1 = len(x_arr)-1
-            i0 = max(0, i1-1)
-        tx = x_arr[i1] - x_arr[i0]
-        ty = y_arr[i1] - y_arr[i0]
-        return tx, ty
-
-    def hermite_blend(P0, P1, T0, T1, steps=24):
-        """Hermite blend supporting 2D or 3D points."""
-        t = np.linspace(0.0, 1.0, steps)
-        h00 = 2*t**3 - 3*t**2 + 1
-        h10 = t**3 - 2*t**2 + t
-        h01 = -2*t**3 + 3*t**2
-        h11 = t**3 - t**2
-        
-        # Support 2D or 3D
-        if len(P0) == 2:
-            dx = h00*P0[0] + h10*T0[0] + h01*P1[0] + h11*T1[0]
-            dy = h00*P0[1] + h10*T0[1] + h01*P1[1] + h11*T1[1]
-            return dx, dy
-        else:  # 3D
-            dx = h00*P0[0] + h10*T0[0] + h01*P1[0] + h11*T1[0]
-            dy = h00*P0[1] + h10*T0[1] + h01*P1[1] + h11*T1[1]
-            dz = h00*P0[2] + h10*T0[2] + h01*P1[2] + h11*T1[2]
-            return dx, dy, dz
-
-    def blend_joint(prev_x, prev_y, next_x_rel, next_y_rel, steps=24):
-        """2D blend for x,y coordinates (preserves original logic)."""
-        # Absolute endpoints
-        x0, y0 = prev_x[-1], prev_y[-1]
-        x1, y1 = x0 + next_x_rel[0], y0 + next_y_rel[0]
-        # Tangents at endpoints (absolute for prev, relative mapped for next)
-        t0x, t0y = endpoint_tangent(prev_x, prev_y, at_start=False)
-        n_tx, n_ty = endpoint_tangent(next_x_rel, next_y_rel, at_start=True)
-        # Normalize and scale tangents to local segment length for stability
-        seg_len = max(np.hypot(x1 - x0, y1 - y0), 1e-6)
-        def scaled(tvx, tvy):
-            n = max(np.hypot(tvx, tvy), 1e-6)
-            s = seg_len * 0.5  # scale factor controls elbow size
-            return (tvx / n * s, tvy / n * s)
-        T0 = scaled(t0x, t0y)
-        T1 = scaled(n_tx, n_ty)
-
-        # Heuristic: try flipping the vertical orientation of the next tangent
-        # and pick the blend with lower max curvature to avoid downward elbows.
-        bx1, by1 = hermite_blend((x0, y0), (x1, y1), T0, T1, steps=steps)
-        T1_flip = (T1[0], -T1[1])
-        bx2, by2 = hermite_blend((x0, y0), (x1, y1), T0, T1_flip, steps=steps)
-
-        def max_curv(xa, ya):
-            dx = np.gradient(xa)
-            dy = np.gradient(ya)
-            ddx = np.gradient(dx)
-            ddy = np.gradient(dy)
-            ds = np.sqrt(dx**2 + dy**2) + 1e-9
-            k = np.abs(ddx * dy - dx * ddy) / (ds**3)
-            return float(np.nanmax(k))
-
-        if max_curv(bx2, by2) < max_curv(bx1, by1):
-            return bx2, by2
-        return bx1, by1
-
-    def blend_z_coordinate(prev_z, next_z_rel, blend_length, z_tangent_prev=None, z_tangent_next=None):
-        """Smooth z-coordinate blending using Hermite interpolation.
-        
-        Args:
-            prev_z: Previous z-coordinates array
-            next_z_rel: Next z-coordinates (relative)
-            blend_length: Number of points in blend segment
-            z_tangent_prev: Optional tangent at end of previous segment
-            z_tangent_next: Optional tangent at start of next segment
-        """
-        z0 = prev_z[-1] if len(prev_z) > 0 else 0.0
-        z1 = z0 + next_z_rel[0]
-        
-        # Compute tangents if not provided
-        if z_tangent_prev is None:
-            if len(prev_z) >= 2:
-                z_tangent_prev = prev_z[-1] - prev_z[-2]
-            else:
-                z_tangent_prev = 0.0
-                
-        if z_tangent_next is None:
-            if len(next_z_rel) >= 2:
-                z_tangent_next = next_z_rel[1] - next_z_rel[0]
-            else:
-                z_tangent_next = 0.0
-        
-        # Use 1D Hermite interpolation for z
-        t = np.linspace(0.0, 1.0, blend_length)
-        h00 = 2*t**3 - 3*t**2 + 1
-        h10 = t**3 - 2*t**2 + t
-        h01 = -2*t**3 + 3*t**2
-        h11 = t**3 - t**2
-        
-        z_blend = h00*z0 + h10*z_tangent_prev + h01*z1 + h11*z_tangent_next
-        return z_blend
-
-    all_x = []
-    all_y = []
-    all_z = []
-    current_x_offset = 0.0
-    current_y_offset = 0.0
-    current_z_offset = 0.0
-    joints_count = 0
-
-    for idx, block_info in enumerate(st.session_state.track_sequence):
-        x_rel, y_rel, z_rel = block_info['block'].generate_profile(**block_info['params'])
-
-        if idx == 0:
-            # First block: add a short introductory blend from origin to avoid downward elbow
-            x0, y0 = 0.0, 0.0
-            x1, y1 = x_rel[0], y_rel[0]
-            # Tangent at start and a gentle initial horizontal tangent
-            n_tx, n_ty = endpoint_tangent(x_rel, y_rel, at_start=True)
-            seg_len = max(np.hypot(x1 - x0, y1 - y0), 1e-6)
-            init_scale = seg_len * 0.5
-            T0 = (init_scale, 0.0)
-            def scaled(vx, vy):
-                n = max(np.hypot(vx, vy), 1e-6)
-                return (vx / n * init_scale, vy / n * init_scale)
-            T1 = scaled(n_tx, n_ty)
-            bx1, by1 = hermite_blend((x0, y0), (x1, y1), T0, T1, steps=24)
-            T1_flip = (T1[0], -T1[1])
-            bx2, by2 = hermite_blend((x0, y0), (x1, y1), T0, T1_flip, steps=24)
-            def max_curv(xa, ya):
-                dx = np.gradient(xa)
-                dy = np.gradient(ya)
-                ddx = np.gradient(dx)
-                ddy = np.gradient(dy)
-                ds = np.sqrt(dx**2 + dy**2) + 1e-9
-                k = np.abs(ddx * dy - dx * ddy) / (ds**3)
-                return float(np.nanmax(k))
-            bx, by = (bx2, by2) if max_curv(bx2, by2) < max_curv(bx1, by1) else (bx1, by1)
-            # Append blend (skip origin to avoid duplicate)
-            all_x.extend(bx[1:].tolist())
-            all_y.extend(by[1:].tolist())
-            # Add z-coordinates for the initial blend (start at 0, end at first block's z[0])
-            z_blend_init = np.linspace(0.0, z_rel[0], len(bx))
-            all_z.extend(z_blend_init[1:].tolist())
-            # Append rest of first block relative to last blend point
-            x_abs = x_rel + all_x[-1]
-            y_abs = y_rel + all_y[-1]
-            z_abs = z_rel + all_z[-1]
-            all_x.extend(x_abs.tolist())
-            all_y.extend(y_abs.tolist())
-            all_z.extend(z_abs.tolist())
-            current_x_offset = all_x[-1]
-            current_y_offset = all_y[-1]
-            current_z_offset = all_z[-1]
-            joints_count += 1
-            continue
-
-        # Before appending next block, insert a blend segment to match slopes
-        x_blend, y_blend = blend_joint(np.array(all_x), np.array(all_y), np.array(x_rel), np.array(y_rel), steps=32)
-
-        # Append blend (avoid duplicating endpoint)
-        all_x.extend(x_blend[1:].tolist())
-        all_y.extend(y_blend[1:].tolist())
-        
-        # For z, use smooth Hermite interpolation instead of linear
-        z_blend = blend_z_coordinate(np.array(all_z), z_rel, blend_length=len(x_blend))
-        all_z.extend(z_blend[1:].tolist())
-        joints_count += 1
-
-        # Now append the next block offset from last absolute point
-        x_abs = x_rel + all_x[-1]
-        y_abs = y_rel + all_y[-1]
-        z_abs = z_rel + all_z[-1]
-        all_x.extend(x_abs.tolist())
-        all_y.extend(y_abs.tolist())
-        all_z.extend(z_abs.tolist())
-
-        current_x_offset = all_x[-1]
-        current_y_offset = all_y[-1]
-        current_z_offset = all_z[-1]
-
-    all_x = np.array(all_x)
-    all_y = np.array(all_y)
-    all_z = np.array(all_z)
+
+def _session_array(name, default=None):
+    """Array stored by _put_session_array (read-only), or default if unset or evicted."""
+    handle = st.session_state.get(name)
+    if handle is None:
+        return default
+    try:
+        return ARRAY_STORE.get(handle)
+    except KeyError:
+        return default
+
+
+def _put_session_frame(name, df):
+    """DataFrame counterpart of _put_session_array (columns and array attrs go to the store)."""
+    st.session_state[name] = None if df is None else ARRAY_STORE.put_frame(df)
+
+
+def _session_frame(name):
+    """DataFrame stored by _put_session_frame (a writable copy), or None if unset or evicted."""
+    handle = st.session_state.get(name)
+    if handle is None:
+        return None
+    try:
+        return ARRAY_STORE.get_frame(handle)
+    except KeyError:
+        return None
+
+
+def generate_track_from_blocks(timer=None):
+    """Generate complete track from the session's block sequence with C1 joint blending.
+    Geometry is assembled by utils.track_assembly.assemble_track.
+    Returns x, y, z and the block index of every point.
+    """
+    if timer is None:
+        timer = StageTimer(enabled=False)
+    all_x, all_y, all_z, block_index = assemble_track(
+        st.session_state.track_sequence,
+        force_end_level=bool(st.session_state.get('force_end_level')),
+        start_level=float(st.session_state.get('start_level', 0.0)),
+        return_block_index=True,
+        timer=timer,
+    )
+    _put_session_array('track_block_index', block_index)
 
     # Hide blended joints message
     st.session_state.joint_smoothing_applied = None
     st.session_state.smoothness_warning = None
-    _, final_curvature = detect_curvature_spikes(all_x, all_y)
-    st.session_state.track_curvature = final_curvature
-    # If requested, enforce ending level equals starting level (y-coordinate)
-    if st.session_state.get('force_end_level'):
-        y_target = float(st.session_state.get('start_level', 0.0))
-        y_end = float(all_y[-1])
-        if abs(y_end - y_target) > 1e-3:
-            # Create a gentle leveling segment
-            x0, y0, z0 = all_x[-1], all_y[-1], all_z[-1]
-            x1 = x0 + 40.0
-            y1 = y_target
-            z1 = 0.0  # Return to center laterally
-            
-            # Tangents: continue current direction, land horizontally
-            t0x, t0y = endpoint_tangent(all_x, all_y, at_start=False)
-            seg_len = max(np.hypot(x1 - x0, y1 - y0), 1e-6)
-            scale = seg_len * 0.5
-            def sc(vx, vy):
-                n = max(np.hypot(vx, vy), 1e-6)
-                return (vx / n * scale, vy / n * scale)
-            T0 = sc(t0x, t0y)
-            T1 = (scale, 0.0)
-            bx, by = hermite_blend((x0, y0), (x1, y1), T0, T1, steps=48)
-            
-            # Smoothly blend z back to center using Hermite interpolation
-            z_tangent_prev = all_z[-1] - all_z[-2] if len(all_z) >= 2 else 0.0
-            z_tangent_next = 0.0  # Land flat laterally
-            t = np.linspace(0.0, 1.0, len(bx))
-            h00 = 2*t**3 - 3*t**2 + 1
-            h10 = t**3 - 2*t**2 + t
-            h01 = -2*t**3 + 3*t**2
-            h11 = t**3 - t**2
-            bz = h00*z0 + h10*z_tangent_prev + h01*z1 + h11*z_tangent_next
-            
-            all_x = np.concatenate([all_x, bx[1:]])
-            all_y = np.concatenate([all_y, by[1:]])
-            all_z = np.concatenate([all_z, bz[1:]])
-    return all_x, all_y, all_z
+    # Curvature is filled in from the physics step (see detect_curvature_spikes)
+    st.session_state.track_curvature = None
+    return all_x, all_y, all_z, block_index
 
-def simple_gforce_analysis(x, y, z=None, dt=0.02):
+def simple_gforce_analysis(x, y, z=None, dt=0.02, geometry=None):
     """Simple geometric g-force calculation - direct call to compute_rider_accelerations"""
     
     # Just use the working compute_rider_accelerations from accelerometer_transform
@@ -1180,7 +353,7 @@ def simple_gforce_analysis(x, y, z=None, dt=0.02):
     })
     
     # Call the working function
-    result_df = compute_rider_accelerations(track_df)
+    result_df = compute_rider_accelerations(track_df, geometry=geometry)
     
     # Return in the expected format
     return result_df[['Time', 'Lateral', 'Vertical', 'Longitudinal']]
@@ -1195,270 +368,535 @@ def simple_gforce_analysis(x, y, z=None, dt=0.02):
         'Longitudinal': a_longitudinal
     })
 
-def check_gforce_safety(accel_df):
-    """
-    Check if g-forces are within safe human tolerance limits.
+
+# ============================================================================
+# PAGE
+# ============================================================================
+
+def _init_session():
+    # Always start with a complete starter track on first load
+    if 'initialized' not in st.session_state:
+        st.session_state.track_sequence = [
+            {'type': entry['type'], 'block': BLOCK_LIBRARY[entry['type']], 'params': dict(entry['params'])}
+            for entry in DEFAULT_TRACK_SEQUENCE
+        ]
+        st.session_state.initialized = True
+
+
+# ============================================================================
+# SIDEBAR: BUILDING BLOCK PALETTE
+# ============================================================================
+
+def _render_sidebar():
+    with st.sidebar:
+        st.header("🧱 Building Blocks")
     
-    Human G-force tolerances:
-    - Positive (downward): 5g dangerous, 9g+ fatal
-    - Negative (upward): -2g to -3g dangerous
-    - Lateral: ±2g uncomfortable, ±5g dangerous
+        # Show success message from random generation if it exists
+        if 'random_gen_success' in st.session_state and st.session_state.random_gen_success:
+            st.success(st.session_state.random_gen_success)
+            # Clear the message after showing it
+            st.session_state.random_gen_success = None
+    
+        # Quick Start section at the top
+        st.subheader("🎲 Quick Start")
+    
+        col_rand1_top, col_rand2_top = st.columns(2)
     
-    Returns:
-        dict with safety analysis
-    """
-    max_vertical = accel_df['Vertical'].max()
-    min_vertical = accel_df['Vertical'].min()
-    max_lateral = accel_df['Lateral'].abs().max()
-    max_longitudinal = accel_df['Longitudinal'].abs().max()
-    
-    warnings = []
-    dangers = []
-    
-    # Vertical G-forces (positive)
-    if max_vertical > 5.0:
-        dangers.append(f"🚨 DANGEROUS: {max_vertical:.1f}g positive vertical (>5g can cause blackout)")
-    elif max_vertical > 4.0:
-        warnings.append(f"⚠️ HIGH: {max_vertical:.1f}g positive vertical (uncomfortable, >4g)")
-    elif max_vertical > 3.0:
-        warnings.append(f"⚠️ Intense: {max_vertical:.1f}g positive vertical (>3g)")
-    
-    # Vertical G-forces (negative/airtime)
-    if min_vertical < -3.0:
-        dangers.append(f"🚨 DANGEROUS: {min_vertical:.1f}g negative vertical (< -3g unsafe)")
-    elif min_vertical < -2.0:
-        warnings.append(f"⚠️ HIGH: {min_vertical:.1f}g negative airtime (< -2g)")
-    
-    # Lateral G-forces
-    if max_lateral > 5.0:
-        dangers.append(f"🚨 DANGEROUS: {max_lateral:.1f}g lateral (>5g can cause injury)")
-    elif max_lateral > 2.0:
-        warnings.append(f"⚠️ Uncomfortable: {max_lateral:.1f}g lateral (>2g)")
-    
-    # Longitudinal G-forces
-    if max_longitudinal > 3.0:
-        warnings.append(f"⚠️ Intense: {max_longitudinal:.1f}g longitudinal (>3g)")
-    
-    # Overall safety rating
-    if len(dangers) > 0:
-        safety_level = "DANGEROUS"
-        safety_emoji = "🚨"
-        safety_color = "error"
-    elif len(warnings) > 0:
-        safety_level = "Intense/Uncomfortable"
-        safety_emoji = "⚠️"
-        safety_color = "warning"
-    else:
-        safety_level = "Safe"
-        safety_emoji = "✅"
-        safety_color = "success"
-    
-    # Calculate safety score (0-5 stars) with continuous penalties
-    # Start with 5 stars and deduct for safety violations
-    # More continuous and stronger penalties than before
-    safety_score = 5.0
-    
-    # Continuous penalty for vertical g-forces (positive)
-    # Penalty increases smoothly from 2g onwards - INCREASED for more differentiation
-    if max_vertical > 2.0:
-        # Gradual penalty: 0 at 2g, increases more steeply for better differentiation
-        vertical_penalty = 0.0
-        if max_vertical > 5.0:
-            # Critical: -3.0 base (was -2.5), then -0.6 per g above 5g (was -0.5)
-            vertical_penalty = -3.0 - 0.6 * (max_vertical - 5.0)
-        elif max_vertical > 4.0:
-            # High: -2.0 base (was -1.5), then -0.5 per g above 4g (was -0.33)
-            vertical_penalty = -2.0 - 0.5 * (max_vertical - 4.0)
-        elif max_vertical > 3.0:
-            # Moderate: -0.8 base (was -0.5), then -0.5 per g above 3g (was -0.33)
-            vertical_penalty = -0.8 - 0.5 * (max_vertical - 3.0)
-        elif max_vertical > 2.0:
-            # Low: -0.15 per g above 2g (was -0.1)
-            vertical_penalty = -0.15 * (max_vertical - 2.0)
-        safety_score += vertical_penalty
-    
-    # Continuous penalty for negative g-forces (airtime)
-    # Penalty increases smoothly from -1g onwards - INCREASED for more differentiation
-    if min_vertical < -1.0:
-        vertical_neg_penalty = 0.0
-        if min_vertical < -3.0:
-            # Critical: -3.0 base (was -2.5), then -0.6 per g below -3g (was -0.5)
-            vertical_neg_penalty = -3.0 - 0.6 * abs(min_vertical + 3.0)
-        elif min_vertical < -2.0:
-            # High: -2.0 base (was -1.5), then -0.6 per g below -2g (was -0.5)
-            vertical_neg_penalty = -2.0 - 0.6 * abs(min_vertical + 2.0)
-        elif min_vertical < -1.5:
-            # Moderate: -0.7 base (was -0.5), then -0.4 per g below -1.5g (was -0.33)
-            vertical_neg_penalty = -0.7 - 0.4 * abs(min_vertical + 1.5)
-        elif min_vertical < -1.0:
-            # Low: -0.25 per g below -1g (was -0.2)
-            vertical_neg_penalty = -0.25 * abs(min_vertical + 1.0)
-        safety_score += vertical_neg_penalty
-    
-    # Continuous penalty for lateral g-forces
-    # Penalty increases smoothly from 1g onwards - INCREASED for more differentiation
-    if max_lateral > 1.0:
-        lateral_penalty = 0.0
-        if max_lateral > 5.0:
-            # Critical: -3.0 base (was -2.5), then -0.5 per g above 5g (was -0.4)
-            lateral_penalty = -3.0 - 0.5 * (max_lateral - 5.0)
-        elif max_lateral > 3.0:
-            # High: -1.5 base (was -1.2), then -0.5 per g above 3g (was -0.43)
-            lateral_penalty = -1.5 - 0.5 * (max_lateral - 3.0)
-        elif max_lateral > 2.0:
-            # Moderate: -0.7 base (was -0.5), then -0.4 per g above 2g (was -0.35)
-            lateral_penalty = -0.7 - 0.4 * (max_lateral - 2.0)
-        elif max_lateral > 1.5:
-            # Low: -0.3 base (was -0.2), then -0.7 per g above 1.5g (was -0.6)
-            lateral_penalty = -0.3 - 0.7 * (max_lateral - 1.5)
-        elif max_lateral > 1.0:
-            # Very low: -0.15 per g above 1g (was -0.1)
-            lateral_penalty = -0.15 * (max_lateral - 1.0)
-        safety_score += lateral_penalty
-    
-    # Continuous penalty for longitudinal g-forces
-    # Penalty increases smoothly from 2g onwards - INCREASED for more differentiation
-    if max_longitudinal > 2.0:
-        longitudinal_penalty = 0.0
-        if max_longitudinal > 4.0:
-            # High: -1.3 base (was -1.0), then -0.3 per g above 4g (was -0.25)
-            longitudinal_penalty = -1.3 - 0.3 * (max_longitudinal - 4.0)
-        elif max_longitudinal > 3.0:
-            # Moderate: -0.7 base (was -0.5), then -0.6 per g above 3g (was -0.5)
-            longitudinal_penalty = -0.7 - 0.6 * (max_longitudinal - 3.0)
-        elif max_longitudinal > 2.5:
-            # Low: -0.3 base (was -0.2), then -0.7 per g above 2.5g (was -0.6)
-            longitudinal_penalty = -0.3 - 0.7 * (max_longitudinal - 2.5)
-        elif max_longitudinal > 2.0:
-            # Very low: -0.15 per g above 2g (was -0.1)
-            longitudinal_penalty = -0.15 * (max_longitudinal - 2.0)
-        safety_score += longitudinal_penalty
-    
-    # Clamp to 0-5 range
-    safety_score = max(0.0, min(5.0, safety_score))
-    
-    return {
-        'level': safety_level,
-        'emoji': safety_emoji,
-        'color': safety_color,
-        'warnings': warnings,
-        'dangers': dangers,
-        'max_vertical': max_vertical,
-        'min_vertical': min_vertical,
-        'max_lateral': max_lateral,
-        'max_longitudinal': max_longitudinal,
-        'safety_score': safety_score  # 0-5 stars
-    }
 
-def compute_airtime_metrics(accel_df):
-    """Compute airtime metrics from vertical g data.
-    Updated airtime definitions (by vertical g in g-units):
-    - Floater Airtime: -0.25g <= Vertical <= 0.25g
-    - Flojector Airtime: -0.75g <= Vertical < -0.25g
-    - Ejector Airtime: Vertical <= -0.75g
-    - Total Airtime: all periods below 0g
+    
+        with col_rand1_top:
+            if st.button("🎲 Random Template", key=f"btn_random_template_quickstart", use_container_width=True, help="Generate a random coaster with 5-10 blocks"):
+                try:
+                    # Random template rules (launch, lift, drop, flat, ..., brake) live in utils.design_sweep
+                    from utils.design_sweep import RANDOM_TEMPLATE_RANGES, random_block_sequence
+                    new_sequence = [
+                        {'type': b['type'], 'block': BLOCK_LIBRARY[b['type']], 'params': b['params']}
+                        for b in random_block_sequence(ranges=RANDOM_TEMPLATE_RANGES)
+                    ]
+                    num_blocks = len(new_sequence) - 1  # brake run not counted
+                
+                    st.session_state.track_sequence = new_sequence
+                    # Clear cached metrics to force recomputation on rerun
+                    st.session_state.predicted_rating = None
+                    st.session_state.accel_df = None
+                    st.session_state.airtime_metrics = None
+                    st.session_state.track_generated = False
+                    # Enforce end level equals start for random generation
+                    st.session_state.force_end_level = True
+                    st.session_state.start_level = 0.0
+                    # Disable 3D for random designs (2D tracks should have no lateral forces)
+                    st.session_state.random_3d = False
+                    # Store success message in session state to show after rerun
+                    st.session_state.random_gen_success = f"🎲 Generated random coaster with {num_blocks} blocks!"
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Error generating random coaster: {str(e)}")
+                    import traceback
+                    st.exception(e)
+    
+        with col_rand2_top:
+            if st.button("🔄 \n Reset to Default", key=f"btn_reset_default_quickstart", use_container_width=True, help="Reset to the starter template"):
+                st.session_state.track_sequence = [
+                    {
+                        'type': 'launch',
+                        'block': BLOCK_LIBRARY['launch'],
+                        'params': {'length': 60, 'speed_boost': 30}
+                    },
+                    {
+                        'type': 'lift_hill',
+                        'block': BLOCK_LIBRARY['lift_hill'],
+                        'params': {'length': 120, 'height': 120}
+                    },
+                    {
+                        'type': 'drop',
+                        'block': BLOCK_LIBRARY['drop'],
+                        'params': {'height': 120, 'steepness': 1.0}
+                    },
+                    {
+                        'type': 'loop',
+                        'block': BLOCK_LIBRARY['loop'],
+                        'params': {'diameter': 35}
+                    },
+                    {
+                        'type': 'flat_section',
+                        'block': BLOCK_LIBRARY['flat_section'],
+                        'params': {'length': 40}
+                    },
+                    {
+                        'type': 'airtime_hill',
+                        'block': BLOCK_LIBRARY['airtime_hill'],
+                        'params': {'length': 80, 'height': 25}
+                    },
+                    {
+                        'type': 'flat_section',
+                        'block': BLOCK_LIBRARY['flat_section'],
+                        'params': {'length': 60}
+                    },
+                    {
+                        'type': 'loop',
+                        'block': BLOCK_LIBRARY['loop'],
+                        'params': {'diameter': 30}
+                    },
+                    {
+                        'type': 'flat_section',
+                        'block': BLOCK_LIBRARY['flat_section'],
+                        'params': {'length': 40}
+                    },
+                    {
+                        'type': 'airtime_hill',
+                        'block': BLOCK_LIBRARY['airtime_hill'],
+                        'params': {'length': 70, 'height': 20}
+                    },
+                    {
+                        'type': 'flat_section',
+                        'block': BLOCK_LIBRARY['flat_section'],
+                        'params': {'length': 50}
+                    },
+                    {
+                        'type': 'flat_section',
+                        'block': BLOCK_LIBRARY['flat_section'],
+                        'params': {'length': 50}
+                    },
+                    {
+                        'type': 'airtime_hill',
+                        'block': BLOCK_LIBRARY['airtime_hill'],
+                        'params': {'length': 60, 'height': 18}
+                    },
+                    {
+                        'type': 'brake_run',
+                        'block': BLOCK_LIBRARY['brake_run'],
+                        'params': {'length': 50}
+                    }
+                ]
+                st.session_state.track_generated = False
+                st.session_state.force_end_level = False
+                st.success("🔄 Reset to default template!")
+                st.rerun()
 
-    Returns seconds for each category and total airtime.
-    Uses time spacing from 'Time' column.
-    """
-    if accel_df is None or 'Vertical' not in accel_df or 'Time' not in accel_df:
-        return {'floater': 0.0, 'flojector': 0.0, 'ejector': 0.0, 'total_airtime': 0.0}
+        # Precomputed safe library (hidden)
+        # st.subheader("📚 Precomputed Safe Library")
+        # Hidden per request. Library UI and loading disabled.
+    
+        st.divider()
+    
+        # Save current design to precomputed library (hidden per request)
+        # st.subheader("💾 Save Design")
+        # new_lib_name = st.text_input("Entry name", value="my_design")
+        # if st.button("📚 Add Design to Library", use_container_width=True, help="Save current track with physics to the library"):
+        #     if st.session_state.get('track_generated'):
+        #         track_df = pd.DataFrame({
+        #             'x': st.session_state.track_x,
+        #             'y': st.session_state.track_y,
+        #             'z': np.array(st.session_state.get('track_z', np.zeros_like(st.session_state.track_x)))
+        #         })
+        #         elements = st.session_state.get('track_sequence', [])
+        #         meta = add_entry(new_lib_name, elements, track_df)
+        #         if meta:
+        #             st.success(f"Saved to library as '{new_lib_name}'")
+        #         else:
+        #             st.error("Failed to save to library")
+        #     else:
+        #         st.warning("Generate a track first, then save.")
 
-    t = accel_df['Time'].to_numpy()
-    g = accel_df['Vertical'].to_numpy()
-    if len(t) < 2:
-        dt = 0.1
-    else:
-        dt = float(np.median(np.diff(t)))
-
-    # Updated airtime definitions
-    floater_mask = (g >= -0.25) & (g <= 0.25)
-    flojector_mask = (g >= -0.75) & (g < -0.25)
-    ejector_mask = (g <= -0.75)
-
-    floater_time = float(floater_mask.sum() * dt)
-    flojector_time = float(flojector_mask.sum() * dt)
-    ejector_time = float(ejector_mask.sum() * dt)
-    # Total airtime: all periods below 0g (not the sum of categories, since floater includes positive values)
-    total_airtime_mask = (g < 0.0)
-    total_airtime = float(total_airtime_mask.sum() * dt)
-
-    return {
-        'floater': floater_time,
-        'flojector': flojector_time,
-        'ejector': ejector_time,
-        'total_airtime': total_airtime,
-        # Additional metrics for feature calculation
-        'floater_proportion': float(floater_mask.sum() / len(g)) if len(g) > 0 else 0.0,
-        'flojector_proportion': float(flojector_mask.sum() / len(g)) if len(g) > 0 else 0.0,
-        'total_length_seconds': float(len(g) * dt),
-    }
+        st.markdown("""
+    <div style="background-color: #e3f2fd; padding: 0.8rem; border-radius: 0.3rem; margin-bottom: 1rem; color: #1a1a1a;">
+    <b style="color: #0d47a1;">Instructions:</b><br>
+    <span style="color: #1a1a1a;">
+    1. Select a block below<br>
+    2. Adjust its parameters<br>
+    3. Click "Add to Track"<br>
+    4. Build your complete ride!<br>
+    5. AI rating updates automatically
+    </span>
+    </div>
+    """, unsafe_allow_html=True)
+    
+        # Physics engine selection (hidden, default to Advanced)
+        # st.divider()
+        # st.subheader("⚙️ Physics Engine")
+        # physics_mode = st.radio(
+        #     "G-Force Calculation Method",
+        #     options=["Advanced (Realistic)", "Simple (Geometric)"],
+        #     index=0,
+        #     key="physics_mode_selector",
+        #     help="Both use pure energy conservation from track geometry. Advanced: Full 3D physics with detailed curvature. Simple: Frenet-Serret frame calculation. Use Launch blocks to add initial speed!"
+        # )
+        # Store in session state - default to Advanced
+        if 'physics_mode' not in st.session_state:
+            st.session_state.physics_mode = "Advanced (Realistic)"
+        physics_mode = st.session_state.physics_mode  # Use stored value (default: Advanced)
+    
+        # Physics Parameters Section (hidden by default, accessible via expander)
+        st.divider()
+        with st.expander("⚙️ Physics Parameters", expanded=False):
+            # Initialize physics parameters in session state if not present
+            if 'physics_mass' not in st.session_state:
+                st.session_state.physics_mass = 500.0
+            if 'physics_A' not in st.session_state:
+                st.session_state.physics_A = 2.0
+            if 'physics_Cd' not in st.session_state:
+                st.session_state.physics_Cd = 0.1
+            if 'physics_mu' not in st.session_state:
+                st.session_state.physics_mu = 0.001
+            if 'physics_rho' not in st.session_state:
+                st.session_state.physics_rho = 1.2
+            if 'adaptive_resample' not in st.session_state:
+                st.session_state.adaptive_resample = False
+            if 'resample_tolerance' not in st.session_state:
+                st.session_state.resample_tolerance = 0.05
+        
+            # Store previous values to detect changes
+            prev_mass = st.session_state.physics_mass
+            prev_A = st.session_state.physics_A
+            prev_Cd = st.session_state.physics_Cd
+            prev_mu = st.session_state.physics_mu
+            prev_rho = st.session_state.physics_rho
+        
+            # Mass (kg)
+            st.session_state.physics_mass = st.number_input(
+                "Mass (kg)",
+                min_value=10.0,
+                max_value=10000.0,
+                value=st.session_state.physics_mass,
+                step=50.0,
+                help="Cart mass. Lower = more acceleration, more sensitive"
+            )
+        
+            # Frontal Area (m²)
+            st.session_state.physics_A = st.number_input(
+                "Frontal Area (m²)",
+                min_value=0.5,
+                max_value=10.0,
+                value=st.session_state.physics_A,
+                step=0.1,
+                help="Cross-sectional area. Smaller = less drag"
+            )
+        
+            # Drag Coefficient
+            st.session_state.physics_Cd = st.number_input(
+                "Drag Coefficient",
+                min_value=0.01,
+                max_value=2.0,
+                value=st.session_state.physics_Cd,
+                step=0.01,
+                help="Aerodynamic drag coefficient. Lower = less air resistance"
+            )
+        
+            # Friction Coefficient
+            st.session_state.physics_mu = st.number_input(
+                "Friction Coefficient",
+                min_value=0.0,
+                max_value=0.1,
+                value=st.session_state.physics_mu,
+                step=0.0001,
+                format="%.4f",
+                help="Rolling friction. Lower = smoother rails, less energy loss"
+            )
+        
+            # Air Density (kg/m³)
+            st.session_state.physics_rho = st.number_input(
+                "Air Density (kg/m³)",
+                min_value=0.5,
+                max_value=2.0,
+                value=st.session_state.physics_rho,
+                step=0.1,
+                help="Air density. Lower = less air resistance"
+            )
+        
+            # Adaptive arc-length resampling of the drawn track (physics and rating keep
+            # the full-resolution track, whose samples are 50 Hz time steps)
+            st.session_state.adaptive_resample = st.checkbox(
+                "Adaptive resampling",
+                value=st.session_state.adaptive_resample,
+                help="Draw the track resampled by arc length: dense in curves, sparse on straights. "
+                     "Faster plots; physics and rating always use the full-resolution track."
+            )
+            if st.session_state.adaptive_resample:
+                st.session_state.resample_tolerance = st.number_input(
+                    "Resampling tolerance (m)",
+                    min_value=0.005,
+                    max_value=1.0,
+                    value=st.session_state.resample_tolerance,
+                    step=0.01,
+                    format="%.3f",
+                    help="Max distance between the resampled and the full-resolution track"
+                )
+                info = st.session_state.get('resample_info')
+                if info:
+                    st.caption(f"{info['n_original']} → {info['n_points']} points "
+                               f"(max deviation {info['max_deviation']:.3f} m)")
+        
+            # Detect if any parameter changed and clear cached data to force recalculation
+            if (prev_mass != st.session_state.physics_mass or
+                prev_A != st.session_state.physics_A or
+                prev_Cd != st.session_state.physics_Cd or
+                prev_mu != st.session_state.physics_mu or
+                prev_rho != st.session_state.physics_rho):
+                # Clear cached acceleration data to force recalculation
+                if 'accel_df' in st.session_state:
+                    del st.session_state['accel_df']
+                if 'predicted_rating' in st.session_state:
+                    del st.session_state['predicted_rating']
+                if 'airtime_metrics' in st.session_state:
+                    del st.session_state['airtime_metrics']
+                st.session_state.track_generated = False
+        
+            st.caption("💡 Adjust these parameters to fine-tune the physics simulation")
+    
+        st.divider()
+    
+        # Block selection
+        selected_block_key = st.selectbox(
+            "Choose Block Type",
+            options=list(BLOCK_LIBRARY.keys()),
+            format_func=lambda x: f"{BLOCK_LIBRARY[x].icon} {BLOCK_LIBRARY[x].name}"
+        )
+        # RFDB analysis moved to multipage app under pages/02_RFDB_Data.py
+    
+        selected_block = BLOCK_LIBRARY[selected_block_key]
+    
+        st.markdown(f"**{selected_block.icon} {selected_block.name}**")
+        st.caption(selected_block.description)
+    
+        st.divider()
+    
+        # Block-specific parameters
+        st.subheader("⚙️ Parameters")
+    
+        params = {}
+    
+        if selected_block_key == "lift_hill":
+            params['length'] = st.slider("Length (m)", 20, 100, 50, 5)
+            params['height'] = st.slider("Height (m)", 20, 80, 40, 5)
+        
+        elif selected_block_key == "drop":
+            params['height'] = st.slider("Drop Height (m)", 20, 90, 40, 5)
+            params['steepness'] = st.slider("Steepness (max 30°)", 0.5, 1.0, 0.8, 0.05)
+            st.caption("💡 Steepness limited to 30° for realism")
+        
+        elif selected_block_key == "loop":
+            params['diameter'] = st.slider("Loop Diameter (m)", 15, 45, 30, 5)
+        
+        elif selected_block_key == "airtime_hill":
+            params['length'] = st.slider("Hill Length (m)", 20, 60, 40, 5)
+            params['height'] = st.slider("Hill Height (m)", 5, 25, 15, 2)
+        
+        elif selected_block_key == "spiral":
+            params['diameter'] = st.slider("Spiral Diameter (m)", 15, 40, 25, 5)
+            params['turns'] = st.slider("Number of Turns", 0.5, 3.0, 1.5, 0.5)
+        
+        elif selected_block_key == "bunny_hop":
+            params['length'] = st.slider("Hop Length (m)", 10, 30, 20, 5)
+            params['height'] = st.slider("Hop Height (m)", 3, 15, 8, 1)
+        
+        elif selected_block_key == "banked_turn":
+            params['radius'] = st.slider("Turn Radius (m)", 15, 50, 30, 5)
+            params['angle'] = st.slider("Turn Angle (°)", 30, 180, 90, 15)
+        
+        elif selected_block_key == "launch":
+            params['length'] = st.slider("Launch Length (m)", 20, 80, 40, 5)
+            params['speed_boost'] = st.slider("Speed Boost (m/s)", 10, 40, 20, 5)
+            st.caption(f"💡 Target speed: {params['speed_boost']:.1f} m/s")
+            st.info("🚀 **TIP:** Start your track with a Launch block! Without initial speed, the train won't have energy to climb. Launch provides the kinetic energy needed for hills and loops.")
+        
+        elif selected_block_key == "flat_section":
+            params['length'] = st.slider("Section Length (m)", 10, 50, 30, 5)
+    
+        elif selected_block_key == "brake_run":
+            params['length'] = st.slider("Brake Length (m)", 20, 50, 30, 5)
+            st.info("🛑 **TIP:** End your track with a Brake Run for a safe, comfortable stop. This provides the final deceleration zone.")
+    
+        # Add block button
+        if st.button("➕ Add to Track", type="primary", use_container_width=True):
+            # Get current height for drop validation
+            if selected_block_key == "drop" and len(st.session_state.track_sequence) > 0:
+                # Calculate current height from existing track
+                all_x, all_y, all_z = [], [], []
+                current_x_offset, current_y_offset, current_z_offset = 0, 0, 0
+                for block_info in st.session_state.track_sequence:
+                    x, y, z = block_info['block'].generate_profile(**block_info['params'])
+                    all_x.extend(x + current_x_offset)
+                    all_y.extend(y + current_y_offset)
+                    all_z.extend(z + current_z_offset)
+                    current_x_offset = all_x[-1]
+                    current_y_offset = all_y[-1]
+                    current_z_offset = all_z[-1]
+            
+                params['current_height'] = current_y_offset
+            
+                if current_y_offset < 5:
+                    st.error(f"⚠️ Not enough altitude! Current height: {current_y_offset:.1f}m. Add a lift hill first.")
+                    st.stop()
+        
+            st.session_state.track_sequence.append({
+                'type': selected_block_key,
+                'block': selected_block,
+                'params': params.copy()
+            })
+            st.session_state.track_generated = False
+            # Clear cached physics so plots recompute after adding a block
+            st.session_state.pop('accel_df', None)
+            st.session_state.pop('airtime_metrics', None)
+            st.session_state.pop('ride_features', None)
+            st.success(f"✅ Added {selected_block.name}")
+            st.rerun()
+    
+        st.divider()
+    
+        # Track sequence management
+        st.subheader("📋 Current Track Sequence")
+    
+        if len(st.session_state.track_sequence) == 0:
+            st.info("No blocks added yet. Start building!")
+        else:
+            for idx, block_info in enumerate(st.session_state.track_sequence):
+                with st.expander(f"{idx+1}. {block_info['block'].icon} {block_info['block'].name}", expanded=False):
+                    # Show parameters
+                    st.caption("**Edit Parameters:**")
+                    edited_params = block_info['params'].copy()
+                    btype = block_info.get('type')
+                    # Render appropriate controls per block type
+                    if btype == 'lift_hill':
+                        edited_params['length'] = st.slider("Length (m)", 20, 100, int(edited_params.get('length', 50)), 5, key=f"edit_len_{idx}")
+                        edited_params['height'] = st.slider("Height (m)", 20, 80, int(edited_params.get('height', 40)), 5, key=f"edit_h_{idx}")
+                    elif btype == 'drop':
+                        edited_params['height'] = st.slider("Drop Height (m)", 20, 90, int(edited_params.get('height', 40)), 5, key=f"edit_dh_{idx}")
+                        edited_params['steepness'] = st.slider("Steepness (max 30°)", 0.5, 1.0, float(edited_params.get('steepness', 0.8)), 0.05, key=f"edit_ds_{idx}")
+                    elif btype == 'loop':
+                        edited_params['diameter'] = st.slider("Loop Diameter (m)", 15, 45, int(edited_params.get('diameter', 30)), 5, key=f"edit_ld_{idx}")
+                    elif btype == 'airtime_hill':
+                        edited_params['length'] = st.slider("Hill Length (m)", 20, 60, int(edited_params.get('length', 40)), 5, key=f"edit_ahl_{idx}")
+                        edited_params['height'] = st.slider("Hill Height (m)", 5, 25, int(edited_params.get('height', 15)), 1, key=f"edit_ahh_{idx}")
+                    elif btype == 'spiral':
+                        edited_params['diameter'] = st.slider("Spiral Diameter (m)", 15, 40, int(edited_params.get('diameter', 25)), 5, key=f"edit_spd_{idx}")
+                        edited_params['turns'] = st.slider("Number of Turns", 0.5, 3.0, float(edited_params.get('turns', 1.5)), 0.5, key=f"edit_spt_{idx}")
+                    elif btype == 'bunny_hop':
+                        edited_params['length'] = st.slider("Hop Length (m)", 10, 30, int(edited_params.get('length', 20)), 5, key=f"edit_bhl_{idx}")
+                        edited_params['height'] = st.slider("Hop Height (m)", 3, 15, int(edited_params.get('height', 8)), 1, key=f"edit_bhh_{idx}")
+                    elif btype == 'banked_turn':
+                        edited_params['radius'] = st.slider("Turn Radius (m)", 15, 50, int(edited_params.get('radius', 30)), 5, key=f"edit_btr_{idx}")
+                        edited_params['angle'] = st.slider("Turn Angle (°)", 30, 180, int(edited_params.get('angle', 90)), 15, key=f"edit_bta_{idx}")
+                    elif btype == 'launch':
+                        edited_params['length'] = st.slider("Launch Length (m)", 20, 80, int(edited_params.get('length', 40)), 5, key=f"edit_ll_{idx}")
+                        edited_params['speed_boost'] = st.slider("Speed Boost (m/s)", 10, 40, int(edited_params.get('speed_boost', 20)), 5, key=f"edit_lsb_{idx}")
+                        st.caption(f"Target speed: {edited_params['speed_boost']:.1f} m/s")
+                    elif btype == 'flat_section':
+                        edited_params['length'] = st.slider("Section Length (m)", 10, 50, int(edited_params.get('length', 30)), 5, key=f"edit_fsl_{idx}")
+                    elif btype == 'brake_run':
+                        edited_params['length'] = st.slider("Brake Length (m)", 20, 50, int(edited_params.get('length', 30)), 5, key=f"edit_brl_{idx}")
+                    else:
+                        # Fallback generic editors
+                        for param_name, param_value in edited_params.items():
+                            if param_name == 'current_height':
+                                continue
+                            if isinstance(param_value, (int, float)):
+                                edited_params[param_name] = st.number_input(param_name, value=float(param_value), key=f"edit_gen_{param_name}_{idx}")
+                            else:
+                                edited_params[param_name] = st.text_input(param_name, value=str(param_value), key=f"edit_gen_txt_{param_name}_{idx}")
 
-def calculate_ride_features(accel_df):
-    """Calculate features consistent with the LightGBM extreme model."""
-    if accel_df is None or len(accel_df) == 0:
-        return {}
-    if not all(col in accel_df.columns for col in ['Vertical', 'Lateral', 'Longitudinal']):
-        return {}
-
-    feature_vector, feature_map = compute_lightgbm_features(accel_df, return_dict=True)
-
-    # Backward-compatible keys for the advanced panel
-    alias = {
-        'num_positive_g_peaks': "Num Positive G (>3.0g)",
-        'max_negative_vertical_g': "Max Negative Vertical G",
-        'max_positive_vertical_g': "Max Positive Vertical G",
-        'max_lateral_g': "Max Lateral G",
-        'max_longitudinal_g': "Max Longitudinal G",
-        'vertical_variance': "Vertical Variance",
-        'lateral_variance': "Lateral Variance",
-        'vertical_jerk': "Vertical Jerk",
-        'avg_total_g': "Avg Total G",
-        'airtime_gforce_interaction': "Airtime×G-Force Interaction",
-        'g_force_range': "G-Force Range",
-        'lateral_jerk': "Lateral Jerk",
-        'g_force_skewness': "G-Force Skewness",
-        'intensity_pacing': "Intensity Pacing",
-        'force_transitions': "Force Transitions",
-        'peak_density': "Peak Density",
-        'rhythm_score': "Rhythm Score",
-        'lateral_vibration': "Lateral Vibration",
-        'vertical_vibration': "Vertical Vibration",
-        'longitudinal_vibration': "Longitudinal Vibration",
-    }
+                    if st.button("💾 Save Changes", key=f"save_{idx}", use_container_width=True):
+                        st.session_state.track_sequence[idx]['params'] = edited_params
+                        st.session_state.track_generated = False
+                        st.success("Saved block changes")
+                        st.rerun()
+                
+                    col_del, col_up, col_down = st.columns(3)
+                    with col_del:
+                        if st.button("🗑️ Remove", key=f"del_{idx}", use_container_width=True):
+                            st.session_state.track_sequence.pop(idx)
+                            st.session_state.track_generated = False
+                            # Clear cached physics so plots recompute
+                            st.session_state.pop('accel_df', None)
+                            st.session_state.pop('airtime_metrics', None)
+                            st.session_state.pop('ride_features', None)
+                            st.rerun()
+                    with col_up:
+                        if idx > 0 and st.button("⬆️ Move Up", key=f"up_{idx}", use_container_width=True):
+                            st.session_state.track_sequence[idx], st.session_state.track_sequence[idx-1] = \
+                                st.session_state.track_sequence[idx-1], st.session_state.track_sequence[idx]
+                            st.session_state.track_generated = False
+                            st.rerun()
+                    with col_down:
+                        if idx < len(st.session_state.track_sequence) - 1 and st.button("⬇️ Move Down", key=f"down_{idx}", use_container_width=True):
+                            st.session_state.track_sequence[idx], st.session_state.track_sequence[idx+1] = \
+                                st.session_state.track_sequence[idx+1], st.session_state.track_sequence[idx]
+                            st.session_state.track_generated = False
+                            st.rerun()
+        
+            st.divider()
+        
+            # Clear all button
+            if st.button("🗑️ Clear All Blocks", use_container_width=True):
+                st.session_state.track_sequence = []
+                st.session_state.track_generated = False
+                # Clear cached physics so plots recompute
+                st.session_state.pop('accel_df', None)
+                st.session_state.pop('airtime_metrics', None)
+                st.session_state.pop('ride_features', None)
+                st.rerun()
 
-    ride_features = {k: float(feature_map.get(v, 0.0)) for k, v in alias.items()}
-    # Include airtime + metadata pieces for completeness
-    ride_features.update({
-        'total_length_log_sec': float(feature_map.get("Total Length (log-sec)", 0.0)),
-        'floater_airtime_pct': float(feature_map.get("Floater Airtime %", 0.0)),
-        'flojector_airtime_pct': float(feature_map.get("Flojector Airtime %", 0.0)),
-        'height_m': float(feature_map.get("Height (m)", 0.0)),
-        'speed_kmh': float(feature_map.get("Speed (km/h)", 0.0)),
-        'track_length_m': float(feature_map.get("Track Length (m)", 0.0)),
-        'feature_vector': feature_vector,
-    })
 
-    return ride_features
+# ============================================================================
+# MAIN AREA: TRACK VISUALIZATION AND RATING
+# ============================================================================
 
-# Auto-generate preview when blocks are added
-if len(st.session_state.track_sequence) > 0:
-    st.session_state.track_x, st.session_state.track_y, st.session_state.track_z = generate_track_from_blocks()
+def _update_track(timer):
+    """Assemble the track from the block sequence (auto-generated preview).
+
+    Returns the new (x, y, z); callers use these rather than reading them back
+    from the shared store, which may already have evicted them.
+    """
+    x, y, z, block_index = generate_track_from_blocks(timer)
     st.session_state.track_generated = True
     
-    # Calculate block boundaries for visualization
-    block_boundaries = [0]
-    cumulative_x = 0
-    for block_info in st.session_state.track_sequence:
-        x_block, y_block, z_block = block_info['block'].generate_profile(**block_info['params'])
-        cumulative_x += x_block[-1]  # Add length of this block
-        block_boundaries.append(cumulative_x)
-    st.session_state.block_boundaries = block_boundaries
+    # Block boundaries for visualization: x of the first point of every block, then the end
+    track = ArcLengthTrack.from_track(x, y, block_index=block_index)
+    block_starts = track.position(track.block_starts)[:, 0]
+    st.session_state.block_boundaries = [float(start) for start in block_starts] + [float(x[-1])]
     st.session_state.block_names = [block_info['block'].name for block_info in st.session_state.track_sequence]
     st.session_state.block_icons = [block_info['block'].icon for block_info in st.session_state.track_sequence]
     # If random 3D is enabled, synthesize a gentle lateral profile (z) while keeping 2D plots unfolded
     if st.session_state.get('random_3d'):
-        x = np.array(st.session_state.track_x)
         n = len(x)
         # Create low-amplitude lateral variations using a few harmonics
         t = np.linspace(0, 1, n)
@@ -1473,13 +911,52 @@ if len(st.session_state.track_sequence) > 0:
         kernel = np.ones(win) / win
         z = np.convolve(z, kernel, mode='same')
         z *= 0.5  # meters
-        st.session_state.track_z = z.tolist()
-    
+    for name, values in zip(('track_x', 'track_y', 'track_z'), (x, y, z)):
+        _put_session_array(name, values)
+
+    _update_plot_track(timer, x, y, z)
+
     # Always get AI rating automatically
     st.session_state.get_ai_rating = True
+    return x, y, z
+
+
+def _update_plot_track(timer, x, y, z):
+    """Resampled copy of the track for the profile plot and 3D view (adaptive resampling).
+
+    Physics and rating always use the full-resolution track: they treat every
+    sample as a fixed 50 Hz step, so rating a resampled track would rate a
+    ride of a different duration.
+    """
+    st.session_state.resample_info = None
+    for name in ('plot_track_x', 'plot_track_y', 'plot_track_z'):
+        st.session_state[name] = None
+    if not st.session_state.get('adaptive_resample'):
+        return
+    from utils.track_resample import resample_track
+    with timer.stage('resampling', points=len(x)):
+        resampled = resample_track(x, y, z, tolerance=float(st.session_state.get('resample_tolerance', 0.05)))
+    for axis in ('x', 'y', 'z'):
+        _put_session_array(f'plot_track_{axis}', resampled[axis])
+    st.session_state.resample_info = {
+        'n_original': resampled['n_original'],
+        'n_points': len(resampled['x']),
+        'max_deviation': resampled['max_deviation'],
+    }
+
+
+def _plot_track(x, y, z):
+    """(x, y, z) to draw: the resampled track if adaptive resampling is on (and still stored), else the given one."""
+    plot_xyz = [_session_array(f'plot_track_{axis}') for axis in ('x', 'y', 'z')]
+    if any(values is None for values in plot_xyz):
+        return x, y, z
+    return tuple(plot_xyz)
+
+
+def _render_track(timer):
+    """Rating, analysis panels and plots of the current track."""
+    import plotly.graph_objects as go
 
-# Create layout with multiple plots
-if st.session_state.track_generated:
     # Create subplots layout
     st.subheader("🎢 Your Roller Coaster Design")
     
@@ -1488,82 +965,103 @@ if st.session_state.track_generated:
     
     # AI rating runs automatically (button removed)
 
+    # Track of this rerun, read from the store once; assembled again if it was evicted
+    track_x, track_y, track_z = (_session_array(name) for name in ('track_x', 'track_y', 'track_z'))
+    if track_x is None or track_y is None or track_z is None:
+        track_x, track_y, track_z = _update_track(timer)
+
+    # G-force data of this rerun, shared by all plots below (read from the store at most once)
+    plot_df = None
     try:
         # Convert to 3D track format for the AI model
         track_df = pd.DataFrame({
-            'x': st.session_state.track_x,
-            'y': st.session_state.track_y,
-            'z': st.session_state.get('track_z', np.zeros_like(st.session_state.track_x))
+            'x': track_x,
+            'y': track_y,
+            'z': track_z
         })
         
+        # Smoothed points, tangents and curvature are computed (lazily) once per
+        # rerun and shared by the physics model and the smoothness check
+        track_geometry = TrackGeometry.from_track(track_df['x'], track_df['y'], track_df['z'])
+        
         # Get accelerometer data based on physics mode
         physics_mode = st.session_state.get('physics_mode', 'Advanced (Realistic)')
+        physics_params = {
+            'mass': st.session_state.get('physics_mass', 500.0),
+            'rho': st.session_state.get('physics_rho', 1.2),
+            'Cd': st.session_state.get('physics_Cd', 0.1),
+            'A': st.session_state.get('physics_A', 2.0),
+            'mu': st.session_state.get('physics_mu', 0.001),
+        }
         
+        timer.start('physics', points=len(track_df))
         if physics_mode == "Simple (Geometric)":
             # Use simple geometric calculation
             accel_df = simple_gforce_analysis(
-                st.session_state.track_x,
-                st.session_state.track_y,
-                st.session_state.get('track_z', np.zeros_like(st.session_state.track_x))
+                track_x,
+                track_y,
+                track_z,
+                geometry=track_geometry
             )
         else:
             # Use advanced physics with full 3D acceleration computation
-            accel_df = st.session_state.get('accel_df')
+            accel_df = _session_frame('accel_df')
             if accel_df is None or len(accel_df) < 10:
-                accel_df = track_to_accelerometer_data(
+                # Keeps the last track's physics and re-simulates only from the
+                # block boundary upstream of the first edited point
+                if 'incremental_physics' not in st.session_state:
+                    from utils.incremental_physics import IncrementalPhysics
+                    # Its track and channel buffers live in the shared store, not in the session
+                    st.session_state.incremental_physics = IncrementalPhysics(store=ARRAY_STORE)
+                block_index = _session_array('track_block_index')
+                if block_index is not None and len(block_index) != len(track_df):
+                    block_index = None
+                accel_df = st.session_state.incremental_physics.accelerometer_data(
                     track_df,
-                    mass=st.session_state.get('physics_mass', 500.0),
-                    rho=st.session_state.get('physics_rho', 1.2),
-                    Cd=st.session_state.get('physics_Cd', 0.1),
-                    A=st.session_state.get('physics_A', 2.0),
-                    mu=st.session_state.get('physics_mu', 0.001)
+                    **physics_params,
+                    geometry=track_geometry,
+                    block_index=block_index
                 )
+        timer.stop('physics')
         
         if accel_df is not None and len(accel_df) > 10:
             # Store for g-force plot
-            st.session_state.accel_df = accel_df
+            plot_df = accel_df
+            _put_session_frame('accel_df', accel_df)
+            # Reuse the physics curvature for the smoothness check instead of recomputing it
+            _, track_curvature = detect_curvature_spikes(
+                track_x,
+                track_y,
+                curvature=accel_df.attrs.get('curvature'),
+                geometry=track_geometry,
+            )
+            _put_session_array('track_curvature', track_curvature)
             
             # Check safety FIRST before showing rating
             safety = check_gforce_safety(accel_df)
             # Compute airtime metrics and store
-            airtime = compute_airtime_metrics(accel_df)
+            with timer.stage('airtime', points=len(accel_df)):
+                airtime = compute_airtime_metrics(accel_df)
             st.session_state.airtime_metrics = airtime
             
             # Calculate comprehensive ride features
-            ride_features = calculate_ride_features(accel_df)
+            with timer.stage('ride features', points=len(accel_df)):
+                ride_features = calculate_ride_features(accel_df)
             st.session_state.ride_features = ride_features
             
             # Compute metadata from track geometry for better predictions
-            x_track = np.array(st.session_state.track_x)
-            y_track = np.array(st.session_state.track_y)
-            z_track = np.array(st.session_state.get('track_z', np.zeros_like(x_track)))
-            
-            # Track length: 3D arc length
-            dx = np.diff(x_track, prepend=x_track[0])
-            dy = np.diff(y_track, prepend=y_track[0])
-            dz = np.diff(z_track, prepend=z_track[0])
-            track_length_m = float(np.sum(np.sqrt(dx**2 + dy**2 + dz**2)))
-            
-            # Max height
-            height_m = float(np.max(y_track))
-            
-            # Max speed: estimate from energy conservation (v = sqrt(2*g*h))
-            # Use max height drop as proxy for max speed
-            max_height_drop = float(np.max(y_track) - np.min(y_track))
-            g = 9.81
-            energy_efficiency = 0.95  # Match accelerometer_transform
-            max_speed_ms = np.sqrt(2 * g * max_height_drop * energy_efficiency)
-            speed_kmh = float(max_speed_ms * 3.6)  # Convert to km/h
-            
-            metadata = {
-                'height_m': height_m,
-                'speed_kmh': speed_kmh,
-                'track_length_m': track_length_m
-            }
+            metadata = estimate_track_metadata(
+                track_x,
+                track_y,
+                track_z
+            )
             
             # Predict rating automatically
             with st.spinner('🤖 AI analyzing your design...'):
-                predicted_rating = predict_score_lgb(accel_df, metadata=metadata)
+                with timer.stage('lightgbm features', points=len(accel_df)):
+                    features = compute_lightgbm_features(accel_df, metadata=metadata)
+                with timer.stage('lightgbm predict'):
+                    predicted_rating = float(predict_scores_from_features(features)[0])
                 st.session_state.predicted_rating = predicted_rating
             
             # Compact rating display with scores and airtime in one row
@@ -1644,6 +1142,31 @@ if st.session_state.track_generated:
                     
                     st.caption("⚠️ This is a simplified explanation. The actual AI model uses complex sequential patterns in acceleration data.")
             
+            # Front vs back row: the advanced physics pass read at every seat position
+            if physics_mode != "Simple (Geometric)":
+                with st.expander("🚃 Best / Worst Seat", expanded=False):
+                    from utils.train_model import (DEFAULT_CAR_SPACING, DEFAULT_CARS, best_and_worst_seat,
+                                                   train_accelerometer_data)
+                    col_cars, col_spacing = st.columns(2)
+                    with col_cars:
+                        n_cars = st.number_input("Cars", min_value=2, max_value=12, value=DEFAULT_CARS, key='train_cars')
+                    with col_spacing:
+                        car_spacing = st.number_input("Car spacing (m)", min_value=1.0, max_value=4.0,
+                                                      value=DEFAULT_CAR_SPACING, step=0.1, key='train_car_spacing')
+                    if st.checkbox("Rate best and worst seat", key='rate_train_seats'):
+                        seat_dfs = train_accelerometer_data(track_df, n_cars=int(n_cars), car_spacing=float(car_spacing),
+                                                            **physics_params, geometry=track_geometry)
+                        best_seat, worst_seat = best_and_worst_seat(seat_dfs)
+                        col_best, col_worst = st.columns(2)
+                        for col, label, seat in ((col_best, "Best seat", best_seat), (col_worst, "Worst seat", worst_seat)):
+                            seat_rating = predict_score_lgb(seat_dfs[seat], metadata=metadata)
+                            seat_airtime = compute_airtime_metrics(seat_dfs[seat])['total_airtime']
+                            with col:
+                                st.metric(f"{label}: row {seat + 1}",
+                                          f"⭐ {seat_rating:.2f}" if seat_rating is not None else "n/a",
+                                          help=f"{seat_airtime:.1f}s total airtime (row 1 = front)")
+                        st.caption("Seats are ranked by airtime; only the best and worst are rated.")
+            
             # Safety score explanation
             with st.expander("🛡️ Safety Score Breakdown", expanded=False):
                 max_vertical = safety['max_vertical']
@@ -1716,6 +1239,42 @@ if st.session_state.track_generated:
                 else:
                     st.caption("🚨 Dangerous")
             
+            # Clearance between sections of track (loops, spirals, random 3D profiles)
+            from utils.track_clearance import DEFAULT_ENVELOPE, DEFAULT_MAX_RANGE, check_track_clearance
+            # Loops are drawn in one vertical plane, so each loop's exit crosses its entry
+            # (and consecutive loops overlap): with the block of every point, those are not reported
+            clearance_blocks = _session_array('track_block_index')
+            if clearance_blocks is not None and len(clearance_blocks) != len(track_df):
+                clearance_blocks = None
+            clearance = check_track_clearance(
+                track_x,
+                track_y,
+                track_z,
+                block_index=clearance_blocks,
+                block_types=[b['type'] for b in st.session_state.track_sequence],
+            )
+            st.session_state.track_clearance = clearance
+            min_clearance = clearance['min_clearance']
+            clearance_label = f"{min_clearance:.1f} m" if np.isfinite(min_clearance) else f"> {DEFAULT_MAX_RANGE:.0f} m"
+            with st.expander(f"📏 Track Clearance (min {clearance_label})", expanded=False):
+                for message in clearance['dangers'] + clearance['warnings']:
+                    st.caption(message)
+                if not clearance['dangers'] and not clearance['warnings']:
+                    st.caption(f"✅ No two sections of track closer than {DEFAULT_ENVELOPE:.0f} m")
+                if np.isfinite(min_clearance):
+                    timer.start('plot: clearance', points=len(clearance['clearance']))
+                    fig_clearance = go.Figure(go.Scatter(
+                        x=clearance['arc_length'],
+                        y=np.where(np.isfinite(clearance['clearance']), clearance['clearance'], np.nan),
+                        mode='lines', line=dict(color='#1f77b4', width=2), showlegend=False
+                    ))
+                    fig_clearance.add_hrect(y0=0, y1=DEFAULT_ENVELOPE, fillcolor="red", opacity=0.15)
+                    fig_clearance.update_layout(height=200, margin=dict(l=20, r=20, t=10, b=20),
+                                                xaxis_title="Distance (m)", yaxis_title="Clearance (m)",
+                                                yaxis_range=[0, DEFAULT_MAX_RANGE])
+                    st.plotly_chart(fig_clearance, use_container_width=True)
+                    timer.stop('plot: clearance')
+            
             # Submit to Leaderboard Section
             with st.expander("🏆 Submit to Leaderboard", expanded=False):
                 with st.form("submit_form"):
@@ -1741,9 +1300,9 @@ if st.session_state.track_generated:
                             
                             # Prepare geometry data
                             geometry = {
-                                'x': st.session_state.track_x,
-                                'y': st.session_state.track_y,
-                                'z': st.session_state.get('track_z', np.zeros_like(st.session_state.track_x))
+                                'x': track_x,
+                                'y': track_y,
+                                'z': track_z
                             }
                             
                             # Save to local storage
@@ -1766,29 +1325,34 @@ if st.session_state.track_generated:
         else:
             st.error("Track too short for AI analysis")
             # Fallback to simple g-force analysis
-            st.session_state.accel_df = simple_gforce_analysis(
-                st.session_state.track_x, 
-                st.session_state.track_y,
-                st.session_state.get('track_z', np.zeros_like(st.session_state.track_x))
+            plot_df = simple_gforce_analysis(
+                track_x, 
+                track_y,
+                track_z
             )
+            _put_session_frame('accel_df', plot_df)
             
     except Exception as e:
         st.error(f"AI Error: {str(e)}")
         st.caption("Using simple physics model instead...")
         # Fallback to simple g-force analysis
-        st.session_state.accel_df = simple_gforce_analysis(
-            st.session_state.track_x, 
-            st.session_state.track_y,
-            st.session_state.get('track_z', np.zeros_like(st.session_state.track_x))
+        plot_df = simple_gforce_analysis(
+            track_x, 
+            track_y,
+            track_z
         )
+        _put_session_frame('accel_df', plot_df)
     
     # Ensure we always have g-force data for the plots
-    if not hasattr(st.session_state, 'accel_df'):
-        st.session_state.accel_df = simple_gforce_analysis(
-            st.session_state.track_x, 
-            st.session_state.track_y,
-            st.session_state.get('track_z', np.zeros_like(st.session_state.track_x))
+    if plot_df is None:
+        plot_df = _session_frame('accel_df')
+    if plot_df is None:
+        plot_df = simple_gforce_analysis(
+            track_x, 
+            track_y,
+            track_z
         )
+        _put_session_frame('accel_df', plot_df)
     
     st.divider()
     
@@ -1797,11 +1361,13 @@ if st.session_state.track_generated:
     
     with col1:
         st.markdown("**Track Profile (Side View)**")
+        profile_x, profile_y, _ = _plot_track(track_x, track_y, track_z)
+        timer.start('plot: profile', points=len(profile_x))
         fig_profile = go.Figure()
         
         fig_profile.add_trace(go.Scatter(
-            x=st.session_state.track_x,
-            y=st.session_state.track_y,
+            x=profile_x,
+            y=profile_y,
             mode='lines',
             line=dict(color='rgb(255, 75, 75)', width=4),
             name='Track',
@@ -1811,15 +1377,15 @@ if st.session_state.track_generated:
         # Ground line
         fig_profile.add_shape(
             type="line",
-            x0=0, x1=max(st.session_state.track_x),
+            x0=0, x1=max(profile_x),
             y0=0, y1=0,
             line=dict(color="green", width=2, dash="dash")
         )
         
         # Add block boundaries as vertical lines
         if hasattr(st.session_state, 'block_boundaries') and hasattr(st.session_state, 'block_icons'):
-            y_max = max(st.session_state.track_y)
-            y_min = min(st.session_state.track_y)
+            y_max = max(profile_y)
+            y_min = min(profile_y)
             for i, boundary in enumerate(st.session_state.block_boundaries[1:-1], start=1):  # Skip first and last
                 fig_profile.add_shape(
                     type="line",
@@ -1859,15 +1425,17 @@ if st.session_state.track_generated:
         )
         
         st.plotly_chart(fig_profile, use_container_width=True)
+        timer.stop('plot: profile')
         # Airtime Timeline directly below main plot
-        if 'accel_df' in st.session_state:
-            accel_df_tl = st.session_state.accel_df.copy()
+        if plot_df is not None:
+            accel_df_tl = plot_df
+            timer.start('plot: airtime timeline', points=len(accel_df_tl))
             t = accel_df_tl['Time'].values
             g = accel_df_tl['Vertical'].values
             
             # Convert time to distance along track to match the profile plot above
             # Use track x-coordinates which represent distance along the track
-            x_track = st.session_state.track_x
+            x_track = track_x
             # Interpolate to match acceleration dataframe length
             if len(x_track) != len(t):
                 distance = np.linspace(0, x_track[-1], len(t))
@@ -1906,7 +1474,6 @@ if st.session_state.track_generated:
             flj_int = mask_to_intervals(flj_mask, distance)
             ej_int = mask_to_intervals(ej_mask, distance)
 
-            import plotly.graph_objects as go
             fig_tl = go.Figure()
             if len(distance):
                 fig_tl.add_trace(go.Scatter(x=[distance[0], distance[-1]], y=[3,3], mode='lines', line=dict(color='#e0e0e0', width=1), showlegend=False))
@@ -1939,14 +1506,15 @@ if st.session_state.track_generated:
                 xaxis_title='Distance (m)'
             )
             st.plotly_chart(fig_tl, use_container_width=True)
+            timer.stop('plot: airtime timeline')
     
     with col2:
         st.markdown("**Track Statistics**")
         
         # Calculate stats
-        x = st.session_state.track_x
-        y = st.session_state.track_y
-        z = st.session_state.get('track_z', np.zeros_like(x))
+        x = track_x
+        y = track_y
+        z = track_z
         
         total_length = np.sum(np.sqrt(np.diff(x)**2 + np.diff(y)**2))
         max_height = np.max(y)
@@ -2128,24 +1696,17 @@ if st.session_state.track_generated:
     # Row 2: G-Force Analysis
     st.markdown("**G-Force Analysis**")
     
-    if 'accel_df' in st.session_state:
-        accel_df = st.session_state.accel_df
+    if plot_df is not None:
+        accel_df = plot_df
+        timer.start('plot: g-forces', points=len(accel_df))
         
         # Build distance axis to plot G-forces over track distance (arc length), not time
-        if (
-            'track_x' in st.session_state and
-            'track_y' in st.session_state and
-            'track_z' in st.session_state and
-            len(st.session_state.track_x) > 1
-        ):
-            x_track = np.array(st.session_state.track_x, dtype=float)
-            y_track = np.array(st.session_state.track_y, dtype=float)
-            z_track = np.array(st.session_state.track_z, dtype=float)
-            # Compute cumulative distance along the 3D track
-            dx = np.diff(x_track, prepend=x_track[0])
-            dy = np.diff(y_track, prepend=y_track[0])
-            dz = np.diff(z_track, prepend=z_track[0])
-            distance_raw = np.cumsum(np.sqrt(dx**2 + dy**2 + dz**2))
+        if len(track_x) > 1:
+            x_track = np.array(track_x, dtype=float)
+            y_track = np.array(track_y, dtype=float)
+            z_track = np.array(track_z, dtype=float)
+            # Cumulative distance along the 3D track
+            distance_raw = ArcLengthTrack.from_track(x_track, y_track, z_track).arc_length
             # Interpolate to match acceleration dataframe length if needed
             if len(distance_raw) != len(accel_df):
                 distance_axis = np.linspace(0, distance_raw[-1], len(accel_df))
@@ -2156,6 +1717,7 @@ if st.session_state.track_generated:
             distance_axis = np.linspace(0, len(accel_df), len(accel_df))
         
         # Create subplots for each G-force
+        from plotly.subplots import make_subplots
         fig_g = make_subplots(
             rows=3, cols=1,
             subplot_titles=("Vertical G-Forces", "Lateral G-Forces", "Longitudinal G-Forces"),
@@ -2253,27 +1815,29 @@ if st.session_state.track_generated:
         )
         
         st.plotly_chart(fig_g, use_container_width=True)
+        timer.stop('plot: g-forces')
     
     # Egg Plot Visualization (comfort envelopes)
-    if 'accel_df' in st.session_state:
-        accel_df = st.session_state.accel_df
+    if plot_df is not None:
+        accel_df = plot_df
         st.divider()
     # Bottom: On-demand 3D view (resource heavy)
     st.divider()
     st.subheader("🧭 On-Demand 3D View")
-    import plotly.graph_objects as go
     downsample = st.slider("Preview resolution", 200, 2000, 1200, 100,
                             help="Fewer points = faster rendering")
-    if st.button("🎥 Generate 3D View", help="Render a 3D preview of the current track") and 'track_x' in st.session_state:
-        x = np.array(st.session_state.track_x)
+    if st.button("🎥 Generate 3D View", help="Render a 3D preview of the current track"):
+        plot_x, plot_y, plot_z = _plot_track(track_x, track_y, track_z)
+        x = np.array(plot_x)
         # Map vertical profile to Z axis for correct orientation
-        z = np.array(st.session_state.track_y)
+        z = np.array(plot_y)
         # Lateral Y axis: use provided track_z if any, else zeros
-        y = np.array(st.session_state.get('track_z', np.zeros_like(x)))
+        y = np.array(plot_z)
         n = len(x)
         if n > downsample:
             idx = np.linspace(0, n-1, downsample).astype(int)
             x, y, z = x[idx], y[idx], z[idx]
+        timer.start('plot: 3d', points=len(x))
         fig3d = go.Figure(data=[
             go.Scatter3d(x=x, y=y, z=z,
                          mode='lines', line=dict(width=6, color='#1f77b4'),
@@ -2288,8 +1852,10 @@ if st.session_state.track_generated:
             height=600, margin=dict(l=0, r=0, t=30, b=0)
         )
         st.plotly_chart(fig3d, use_container_width=True)
+        timer.stop('plot: 3d')
+
 
-else:
+def _render_welcome():
     # Welcome screen
     st.info("👈 Add building blocks from the sidebar to start building your roller coaster!")
     
@@ -2307,11 +1873,60 @@ else:
             </div>
             """, unsafe_allow_html=True)
 
-# Footer
-st.divider()
-st.markdown("""
+
+def _render_stage_timings(timer):
+    """Debug panel: where the time of this rerun went."""
+    if timer.records:
+        with st.expander(f"⏱️ Stage Timings ({timer.total * 1000:.0f} ms)", expanded=False):
+            st.dataframe(timer.to_frame(), hide_index=True, use_container_width=True)
+            loads = cache_stats()
+            if loads:
+                st.caption("File loads this process (loads / calls): " + ", ".join(
+                    f"{name} {counts['loads']} / {counts['calls']}" for name, counts in loads.items()))
+            store = ARRAY_STORE.stats()
+            st.caption(f"Shared array store: {store['arrays']} arrays, {store['bytes'] / 1e6:.1f} MB "
+                       f"({store['shared']} of {store['puts']} puts already stored, {store['evictions']} evicted)")
+            if st.checkbox(f"Append every rerun to {DEFAULT_LOG_PATH}", key='log_stage_timings'):
+                timer.append_jsonl(DEFAULT_LOG_PATH,
+                                         blocks=len(st.session_state.track_sequence),
+                                         points=len(_session_array('track_x', default=())))
+
+
+def _render_footer():
+    st.divider()
+    st.markdown("""
 <div style="text-align: center; color: gray; font-size: 0.9rem;">
     🎢 Powered by LightGBM Extreme Features model (26 engineered features)<br>
     Using accelerometer data from RideForcesDB and ratings from Captain Coaster
 </div>
 """, unsafe_allow_html=True)
+
+
+def render(page_config: bool = True):
+    """
+    Run the builder UI (one Streamlit rerun).
+
+    Args:
+        page_config: Call st.set_page_config (False when a page that already set it embeds the builder)
+    """
+    if page_config:
+        st.set_page_config(page_title="Roller Coaster Builder", page_icon="🎢", layout="wide")
+    st.title("🎢 Roller Coaster Builder")
+
+    # Per-stage timings of this rerun (local debug mode only, see the panel at the bottom)
+    timer = StageTimer(enabled=_is_local_debug_mode())
+
+    _init_session()
+    _render_sidebar()
+    if len(st.session_state.track_sequence) > 0:
+        _update_track(timer)
+    if st.session_state.track_generated:
+        _render_track(timer)
+    else:
+        _render_welcome()
+    _render_stage_timings(timer)
+    _render_footer()
+
+
+if __name__ == "__main__":
+    render()
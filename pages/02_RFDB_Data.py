@@ -5,6 +5,7 @@ import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from utils.cloud_data_loader import load_rfdb_csv, list_rfdb_parks, list_rfdb_coasters, list_rfdb_csvs
+from utils.resource_cache import read_csv_cached
 
 st.set_page_config(page_title="RFDB Data Analysis", page_icon="📊", layout="wide")
 
@@ -36,7 +37,7 @@ if not os.path.exists(mapping_path):
     mapping_path = os.path.abspath(os.path.join(_script_dir, '..', 'ratings_data', 'rating_to_rfdb_mapping_enhanced.csv'))
 if os.path.exists(mapping_path):
     try:
-        cc_df = pd.read_csv(mapping_path)
+        cc_df = read_csv_cached(mapping_path)
         # Prefer explicit columns: ratings_coaster and ratings_park
         coaster_col = 'ratings_coaster' if 'ratings_coaster' in cc_df.columns else ('coaster_name' if 'coaster_name' in cc_df.columns else None)
         park_col = 'ratings_park' if 'ratings_park' in cc_df.columns else ('park_name' if 'park_name' in cc_df.columns else None)
@@ -218,7 +219,7 @@ if park and coaster and csv_name:
                 if not os.path.exists(mapping_path):
                     mapping_path = os.path.abspath(os.path.join(_script_dir, '..', 'ratings_data', 'rating_to_rfdb_mapping_enhanced.csv'))
                 try:
-                    mapping_df = pd.read_csv(mapping_path)
+                    mapping_df = read_csv_cached(mapping_path)
                     if 'coaster_name' in mapping_df.columns and 'average_rating' in mapping_df.columns:
                         cc_total = len(mapping_df)
                         # naive match by coaster folder name
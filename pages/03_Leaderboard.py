@@ -3,7 +3,8 @@ import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
-from utils.submission_manager import load_submissions, load_submission_geometry
+from utils.submission_manager import load_submission_geometry
+from utils.rfdb_scores import load_leaderboard
 
 
 def calculate_pareto_front(submissions):
@@ -47,9 +48,9 @@ st.set_page_config(page_title="Leaderboard", page_icon="🏆", layout="wide")
 st.title("🏆 Rollercoaster Leaderboard")
 st.caption("Ranked by combined score (Fun Rating + Safety Score)")
 
-# Load submissions from S3
+# Load user submissions and the precomputed RFDB score table, joined in memory
 with st.spinner("Loading leaderboard..."):
-    submissions = load_submissions()
+    submissions = load_leaderboard()
 
 if not submissions:
     st.info("No submissions yet. Be the first to submit your rollercoaster design!")
@@ -0,0 +1,84 @@
+"""
+Baseline handling shared by the timing scripts (benchmark_pipeline.py, import_time_report.py).
+
+A run produces a report {'environment': ..., 'repeat': ..., 'results': {key: {'min_ms', ...}}}.
+`add_baseline_arguments` adds the common --baseline/--save-baseline/--threshold/--output
+options, and `finish` writes the report, saves it as the new baseline or compares it
+against the stored one, exiting with status 1 on a regression. Baselines depend on the
+machine, so they live in benchmarks/ (not tracked).
+"""
+
+import json
+import os
+import platform
+import sys
+
+DEFAULT_THRESHOLD = 0.25  # fail if an entry is more than 25% slower than its baseline
+
+
+def environment(**extra) -> dict:
+    """Python version, platform and CPU count, plus any script-specific entries."""
+    return {
+        'python': platform.python_version(),
+        **extra,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def add_baseline_arguments(parser, default_baseline: str, default_threshold: float = DEFAULT_THRESHOLD):
+    parser.add_argument('--baseline', default=default_baseline, help="Baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=default_threshold,
+                        help="Allowed slowdown vs. baseline as a fraction (0.25 = 25%%)")
+    parser.add_argument('--output', default=None, help="Also write the results to this JSON file")
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float, label: str) -> list:
+    """
+    Entries whose fastest run is slower than baseline * (1 + threshold) by more than min_delta_ms.
+
+    Prints one row per entry; `label` names the entries in the table header ('stage', 'module').
+    """
+    regressions = []
+    print(f"\n{label + ' (fastest run, ms)':<48} {'baseline':>10} {'now':>10} {'change':>8}")
+    for key, timing in results.items():
+        if key not in baseline:
+            print(f"  {key:<46} {'-':>10} {timing['min_ms']:>10.2f}      new")
+            continue
+        before, now = baseline[key]['min_ms'], timing['min_ms']
+        change = now / before - 1.0 if before > 0 else 0.0
+        regressed = change > threshold and now - before > min_delta_ms
+        flag = '  REGRESSION' if regressed else ''
+        print(f"  {key:<46} {before:>10.2f} {now:>10.2f} {change:>+7.0%}{flag}")
+        if regressed:
+            regressions.append((key, before, now))
+    return regressions
+
+
+def finish(report: dict, args, min_delta_ms: float, label: str):
+    """Write --output, then save the baseline or compare against it (sys.exit(1) on regressions)."""
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first to enable regression checks")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('environment') != report['environment']:
+        print("\nNote: baseline was recorded in a different environment:", baseline.get('environment'))
+    regressions = compare(report['results'], baseline['results'], args.threshold, min_delta_ms, label)
+    if regressions:
+        print(f"\n{len(regressions)} {label}(s) more than {args.threshold:.0%} slower than the baseline")
+        sys.exit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
@@ -14,7 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.cloud_data_loader import load_rfdb_csv, list_rfdb_csvs
 from utils.submission_manager import add_submission_to_leaderboard, load_submissions
-from app_builder import check_gforce_safety
+from utils.scoring import check_gforce_safety
 from utils.lgbm_predictor import predict_score_lgb
 
 
@@ -0,0 +1,127 @@
+"""
+Benchmark the geometry -> physics -> features -> rating pipeline.
+
+Tracks of fixed point counts are assembled from the block generators
+(DEFAULT_TRACK_SEQUENCE repeated until long enough, then cut to size). On
+each track every stage is timed: compute_acc_profile for each integrator /
+curvature method, compute_rider_accelerations,
+track_to_accelerometer_data, compute_lightgbm_features and predict_score_lgb.
+Each stage runs once untimed (Numba compilation, caches), then --repeat
+times. The median and the fastest run are reported. Regression checks use
+the fastest run because it is least affected by other load on the machine.
+
+Results can be saved as a baseline JSON and later runs compared against it.
+The script exits with status 1 if any stage is more than --threshold slower
+than its baseline. Baselines depend on the machine, so they are kept out of
+git (benchmarks/ is ignored).
+
+Usage:
+    python scripts/benchmark_pipeline.py --save-baseline          # record benchmarks/baseline.json
+    python scripts/benchmark_pipeline.py                          # compare against it
+    python scripts/benchmark_pipeline.py --sizes 1000 5000 --repeat 3 --threshold 0.5
+    python scripts/benchmark_pipeline.py --only acc_profile --output run.json
+"""
+
+import argparse
+import math
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _baseline import add_baseline_arguments, environment, finish
+from utils.acceleration import NUMBA_AVAILABLE, compute_acc_profile
+from utils.accelerometer_transform import compute_rider_accelerations, track_to_accelerometer_data
+from utils.lgbm_predictor import compute_lightgbm_features, predict_score_lgb
+from utils.track_assembly import DEFAULT_TRACK_SEQUENCE, assemble_track
+
+DEFAULT_SIZES = (1000, 5000, 20000, 100000)
+DEFAULT_BASELINE = 'benchmarks/baseline.json'
+MIN_DELTA_MS = 1.0  # slowdowns smaller than this are timer noise, never regressions
+
+# compute_acc_profile variants: name -> keyword arguments
+ACC_PROFILE_METHODS = {
+    'verlet/circumcenter': {'use_velocity_verlet': True, 'curvature_method': 'circumcenter'},
+    'verlet/finite_diff': {'use_velocity_verlet': True, 'curvature_method': 'finite_diff'},
+    'euler/circumcenter': {'use_velocity_verlet': False, 'curvature_method': 'circumcenter'},
+    'euler/finite_diff': {'use_velocity_verlet': False, 'curvature_method': 'finite_diff'},
+    'energy/circumcenter': {'use_energy_conservation': True, 'curvature_method': 'circumcenter'},
+}
+
+
+def build_track(n_points: int) -> pd.DataFrame:
+    """Track of exactly n_points points (builder coordinates, y vertical)."""
+    x, y, z = assemble_track(DEFAULT_TRACK_SEQUENCE)
+    repeats = math.ceil(n_points / len(x))
+    if repeats > 1:
+        x, y, z = assemble_track(DEFAULT_TRACK_SEQUENCE * repeats)
+    return pd.DataFrame({'x': x[:n_points], 'y': y[:n_points], 'z': z[:n_points]})
+
+
+def pipeline_stages(track_df: pd.DataFrame):
+    """(name, callable) for every benchmarked stage on one track."""
+    points = np.column_stack([track_df['x'].values, track_df['z'].values, track_df['y'].values])
+    accel_df = track_to_accelerometer_data(track_df)
+    stages = [
+        (f'acc_profile[{name}]', lambda kwargs=kwargs: compute_acc_profile(points, v0=3.0, **kwargs))
+        for name, kwargs in ACC_PROFILE_METHODS.items()
+    ]
+    stages += [
+        ('rider_accelerations', lambda: compute_rider_accelerations(track_df)),
+        ('track_to_accelerometer_data', lambda: track_to_accelerometer_data(track_df)),
+        ('lightgbm_features', lambda: compute_lightgbm_features(accel_df)),
+        ('predict_score_lgb', lambda: predict_score_lgb(accel_df)),
+    ]
+    return stages
+
+
+def time_call(func, repeat: int) -> dict:
+    """Median and min wall-clock milliseconds of func() over `repeat` runs after one warm-up run."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return {'median_ms': statistics.median(times), 'min_ms': min(times)}
+
+
+def run_benchmarks(sizes, repeat: int, only=None) -> dict:
+    results = {}
+    for n_points in sizes:
+        track_df = build_track(n_points)
+        print(f"\n{n_points} points ({len(track_df)} built)")
+        for name, func in pipeline_stages(track_df):
+            if only and not any(pattern in name for pattern in only):
+                continue
+            timing = time_call(func, repeat)
+            key = f"{name}@{n_points}"
+            results[key] = timing
+            print(f"  {name:<36} {timing['median_ms']:>10.2f} ms  (min {timing['min_ms']:.2f})")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the track -> physics -> features -> rating pipeline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="Track point counts")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per stage (after one warm-up run)")
+    parser.add_argument('--only', nargs='+', default=None, help="Only run stages whose name contains one of these")
+    add_baseline_arguments(parser, DEFAULT_BASELINE)
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be >= 1")
+
+    results = run_benchmarks(args.sizes, args.repeat, args.only)
+    report = {'environment': environment(numpy=np.__version__, numba=NUMBA_AVAILABLE),
+              'repeat': args.repeat, 'results': results}
+    finish(report, args, MIN_DELTA_MS, 'stage')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Score every RFDB recording in bulk and write the precomputed leaderboard table.
+
+Each recording is loaded once for its g-force extrema and LightGBM features;
+safety scores are then computed in one vectorized pass and fun ratings in a
+single booster call. The
+result is written to `submissions/rfdb_scores.npz` (see utils/rfdb_scores.py),
+which the leaderboard page loads instead of the RFDB entries in leaderboard.json.
+
+Usage:
+    python scripts/build_rfdb_score_table.py                 # score all recordings
+    python scripts/build_rfdb_score_table.py --limit 500     # random sample of 500
+    python scripts/build_rfdb_score_table.py --from-leaderboard
+        # no CSV access: convert the RFDB entries already in leaderboard.json
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.rfdb_scores import (
+    build_score_table,
+    estimate_rfdb_metadata,
+    list_rfdb_recordings,
+    load_rfdb_recording,
+    resolve_accel_frame,
+    save_score_table,
+)
+from utils.submission_manager import load_submissions
+from utils.lgbm_predictor import compute_lightgbm_features, predict_scores_from_features
+from utils.scoring import check_gforce_safety_batch
+
+
+def score_recordings(recordings, use_cloud=True):
+    """Score recordings; returns table rows (fun and safety scored in one batch each)."""
+    # One (row, features, extrema) tuple per recording, appended only once all three
+    # are computed, so a failing recording cannot shift the scores of the next ones
+    scored = []
+    errors = 0
+
+    for idx, (park, coaster, csv_file, submission_id) in enumerate(recordings, 1):
+        print(f"[{idx}/{len(recordings)}] {coaster} ({park}) - {csv_file}")
+        try:
+            df = load_rfdb_recording(park, coaster, csv_file, use_cloud=use_cloud)
+            if df is None:
+                print("    [ERROR] Could not load CSV file")
+                errors += 1
+                continue
+
+            accel_df, has_time = resolve_accel_frame(df)
+            if accel_df is None:
+                print("    [ERROR] Could not resolve required columns")
+                errors += 1
+                continue
+
+            metadata = estimate_rfdb_metadata(accel_df, has_time)
+            extrema = (
+                accel_df['Vertical'].max(),
+                accel_df['Vertical'].min(),
+                accel_df['Lateral'].abs().max(),
+                accel_df['Longitudinal'].abs().max(),
+            )
+            features = compute_lightgbm_features(accel_df, metadata=metadata)
+            row = {
+                'submission_id': submission_id,
+                'park': park,
+                'coaster': coaster,
+                'csv_file': csv_file,
+                'estimated_height_m': metadata['height_m'],
+                'estimated_speed_kmh': metadata['speed_kmh'],
+                'estimated_track_length_m': metadata['track_length_m'],
+            }
+            scored.append((row, features, extrema))
+        except Exception as e:
+            print(f"    [ERROR] {e}")
+            errors += 1
+
+    rows = [row for row, _, _ in scored]
+    if scored:
+        scores = predict_scores_from_features(np.vstack([features for _, features, _ in scored]))
+        safety_scores = check_gforce_safety_batch(
+            *np.array([extrema for _, _, extrema in scored], dtype=np.float64).T)
+        for row, score, safety_score in zip(rows, scores, safety_scores):
+            row['score'] = float(score)
+            row['safety_score'] = float(safety_score)
+
+    print(f"Scored {len(rows)} recordings ({errors} errors)")
+    return rows
+
+
+def rows_from_leaderboard():
+    """Table rows from the RFDB entries already stored in leaderboard.json."""
+    rows = []
+    for sub in load_submissions():
+        if sub.get('source') != 'RFDB':
+            continue
+        rows.append({
+            'submission_id': sub['submission_id'],
+            'park': sub.get('park', ''),
+            'coaster': sub.get('coaster', ''),
+            'csv_file': sub.get('csv_file', ''),
+            'score': sub['score'],
+            'safety_score': sub['safety_score'],
+            'estimated_height_m': sub.get('estimated_height_m', np.nan),
+            'estimated_speed_kmh': sub.get('estimated_speed_kmh', np.nan),
+            'estimated_track_length_m': sub.get('estimated_track_length_m', np.nan),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed RFDB score table")
+    parser.add_argument('--limit', type=int, default=None, help="Randomly sample at most this many recordings")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for --limit sampling")
+    parser.add_argument('--local-only', action='store_true', help="Only read recordings from rfdb_csvs/")
+    parser.add_argument('--from-leaderboard', action='store_true',
+                        help="Convert RFDB entries from leaderboard.json instead of rescoring CSVs")
+    parser.add_argument('--output', default=None, help="Output path (default: submissions/rfdb_scores.npz)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.from_leaderboard:
+        rows = rows_from_leaderboard()
+        print(f"Converted {len(rows)} RFDB entries from leaderboard.json")
+    else:
+        recordings = list_rfdb_recordings(use_cloud=not args.local_only)
+        print(f"Found {len(recordings)} RFDB recordings")
+        if args.limit is not None and len(recordings) > args.limit:
+            recordings = random.Random(args.seed).sample(recordings, args.limit)
+            print(f"Randomly selected {args.limit} recordings")
+        rows = score_recordings(recordings, use_cloud=not args.local_only)
+
+    if not rows:
+        print("Nothing to write.")
+        return
+
+    table = build_score_table(rows)
+    path = save_score_table(table, args.output)
+    print(f"Wrote {len(rows)} rows to {path} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
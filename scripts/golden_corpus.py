@@ -0,0 +1,270 @@
+"""
+Golden-output corpus: snapshot pipeline outputs and check a change against them.
+
+`build` runs the physics and feature stages on a fixed set of inputs and
+writes one compressed .npz per case to data/golden/. The inputs are:
+- the builder's default starter track (DEFAULT_TRACK_SEQUENCE)
+- every track of the precomputed library (data/tracks/)
+- a random sample of RFDB recordings (features and rating only; skipped if
+  no recordings are reachable)
+
+Each file holds the case's inputs, its outputs and the time every stage took.
+The stages are compute_acc_profile with the builder's physics,
+track_to_accelerometer_data, compute_rider_accelerations,
+compute_lightgbm_features and the rating.
+
+`compare` re-runs the same stages on the stored inputs. It reports the
+largest drift per output channel against its tolerance, and the speedup of
+each stage against the times stored at build time. It exits with status 1
+if any channel is out of tolerance. To check an optimization, build the
+corpus on the commit before it, then compare on the commit with it (same
+machine).
+
+Usage:
+    python scripts/golden_corpus.py build --rfdb-sample 20 --seed 0
+    python scripts/golden_corpus.py compare
+    python scripts/golden_corpus.py compare --tolerance-scale 10   # e.g. for a float32 change
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.acceleration import compute_acc_profile
+from utils.accelerometer_transform import (
+    SAMPLE_DT,
+    STATION_SPEED,
+    compute_rider_accelerations,
+    track_to_accelerometer_data,
+)
+from utils.lgbm_predictor import compute_lightgbm_features, predict_scores_from_features
+from utils.scoring import DEFAULT_PHYSICS, estimate_track_metadata
+from utils.track_assembly import DEFAULT_TRACK_SEQUENCE, assemble_track
+from utils.track_library import LIB_DIR, META_FILE
+
+DEFAULT_DIR = 'data/golden'
+ACC_PROFILE_CHANNELS = ('v', 'a_tan', 'f_long_g', 'f_lat_g', 'f_vert_g', 'curvature')
+ACCEL_COLUMNS = ('Vertical', 'Lateral', 'Longitudinal')
+
+# Output key -> (atol, rtol): |new - golden| <= atol + rtol * |golden|
+TOLERANCES = {
+    'acc_profile.v': (1e-6, 0.0),
+    'acc_profile.a_tan': (1e-6, 0.0),
+    'acc_profile.f_long_g': (1e-6, 0.0),
+    'acc_profile.f_lat_g': (1e-6, 0.0),
+    'acc_profile.f_vert_g': (1e-6, 0.0),
+    'acc_profile.curvature': (1e-9, 1e-6),
+    'accel.Vertical': (1e-6, 0.0),
+    'accel.Lateral': (1e-6, 0.0),
+    'accel.Longitudinal': (1e-6, 0.0),
+    'rider.Vertical': (1e-6, 0.0),
+    'rider.Lateral': (1e-6, 0.0),
+    'rider.Longitudinal': (1e-6, 0.0),
+    'features': (1e-5, 1e-5),  # float32 feature vector
+    'rating': (1e-4, 0.0),
+}
+
+
+def _timed(func, repeat: int):
+    """func() and its fastest wall-clock time (s) over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def evaluate_track(x, y, z, repeat: int = 1):
+    """Outputs and stage times of a designed track (builder coordinates, y vertical)."""
+    track_df = pd.DataFrame({'x': x, 'y': y, 'z': z})
+    points = np.column_stack([x, z, y])
+    outputs, times = {}, {}
+
+    profile, times['acc_profile'] = _timed(lambda: compute_acc_profile(
+        points, dt=SAMPLE_DT, v0=STATION_SPEED, use_energy_conservation=True,
+        channels=ACC_PROFILE_CHANNELS, **DEFAULT_PHYSICS), repeat)
+    outputs.update({f'acc_profile.{name}': profile[name] for name in ACC_PROFILE_CHANNELS})
+
+    accel_df, times['accel'] = _timed(lambda: track_to_accelerometer_data(track_df, **DEFAULT_PHYSICS), repeat)
+    outputs.update({f'accel.{col}': accel_df[col].to_numpy() for col in ACCEL_COLUMNS})
+
+    rider_df, times['rider'] = _timed(lambda: compute_rider_accelerations(track_df), repeat)
+    outputs.update({f'rider.{col}': rider_df[col].to_numpy() for col in ACCEL_COLUMNS})
+
+    metadata = estimate_track_metadata(x, y, z)
+    _rate(accel_df, metadata, outputs, times, repeat)
+    return outputs, times
+
+
+def evaluate_recording(accel_df: pd.DataFrame, has_time: bool, repeat: int = 1):
+    """Outputs and stage times of a recorded ride (features and rating only)."""
+    from utils.rfdb_scores import estimate_rfdb_metadata
+
+    outputs, times = {}, {}
+    _rate(accel_df, estimate_rfdb_metadata(accel_df, has_time=has_time), outputs, times, repeat)
+    return outputs, times
+
+
+def _rate(accel_df, metadata, outputs, times, repeat):
+    features, times['features'] = _timed(lambda: compute_lightgbm_features(accel_df, metadata=metadata), repeat)
+    ratings, times['rating'] = _timed(lambda: predict_scores_from_features(features), repeat)
+    outputs['features'] = features
+    outputs['rating'] = np.asarray(ratings, dtype=np.float64)
+
+
+def starter_cases():
+    x, y, z = assemble_track(DEFAULT_TRACK_SEQUENCE)
+    yield 'starter__default_track', {'x': x, 'y': y, 'z': z}
+
+
+def library_cases():
+    """Library tracks from data/tracks/ (read-only; the library is not rebuilt here)."""
+    if META_FILE.exists():
+        with open(META_FILE, 'r', encoding='utf-8') as f:
+            paths = [Path(entry['geometry_npz']) for entry in json.load(f)]
+    else:
+        paths = sorted(LIB_DIR.glob('*_geometry.npz'))
+    for path in paths:
+        if not path.exists():
+            continue
+        points = np.load(path)['points']  # builder coordinates (x, y vertical, z)
+        name = path.name[:-len('_geometry.npz')]
+        yield f'library__{name}', {'x': points[:, 0], 'y': points[:, 1], 'z': points[:, 2]}
+
+
+def rfdb_cases(sample: int, seed, use_cloud: bool):
+    """A random sample of RFDB recordings; nothing if none are reachable."""
+    from utils.rfdb_scores import list_rfdb_recordings, load_rfdb_recording, resolve_accel_frame
+
+    try:
+        recordings = list_rfdb_recordings(use_cloud=use_cloud)
+    except Exception as e:
+        print(f"RFDB recordings unavailable ({e}), skipping")
+        return
+    if not recordings:
+        print("No RFDB recordings found, skipping")
+        return
+    for park, coaster, csv_file, submission_id in random.Random(seed).sample(recordings, min(sample, len(recordings))):
+        df = load_rfdb_recording(park, coaster, csv_file, use_cloud=use_cloud)
+        accel_df, has_time = resolve_accel_frame(df) if df is not None else (None, False)
+        if accel_df is None:
+            print(f"  skipping {park}/{coaster}/{csv_file} (could not load)")
+            continue
+        inputs = {col: accel_df[col].to_numpy(dtype=float) for col in ('Time',) + ACCEL_COLUMNS}
+        inputs['has_time'] = np.array(has_time)
+        yield submission_id, inputs  # rfdb_<park>_<coaster>_<file>
+
+
+def evaluate(inputs: dict, repeat: int = 1):
+    if 'x' in inputs:
+        return evaluate_track(inputs['x'], inputs['y'], inputs['z'], repeat=repeat)
+    accel_df = pd.DataFrame({col: inputs[col] for col in ('Time',) + ACCEL_COLUMNS})
+    return evaluate_recording(accel_df, bool(inputs['has_time']), repeat=repeat)
+
+
+def build(args):
+    out_dir = Path(args.dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cases = list(starter_cases()) + list(library_cases())
+    if args.rfdb_sample > 0:
+        cases += list(rfdb_cases(args.rfdb_sample, args.seed, use_cloud=not args.local_only))
+    evaluate(cases[0][1])  # warm-up (Numba compilation, booster load) outside the timings
+    for name, inputs in cases:
+        outputs, times = evaluate(inputs, repeat=args.repeat)
+        arrays = {f'input.{k}': v for k, v in inputs.items()}
+        arrays.update(outputs)
+        arrays.update({f'time.{stage}': np.float64(t) for stage, t in times.items()})
+        np.savez_compressed(out_dir / f'{name}.npz', **arrays)
+        print(f"  {name}: {len(outputs)} outputs, {sum(times.values()) * 1000:.1f} ms")
+    print(f"Wrote {len(cases)} golden cases to {out_dir}")
+
+
+def compare(args):
+    paths = sorted(Path(args.dir).glob('*.npz'))
+    if not paths:
+        print(f"No golden cases in {args.dir}; run `build` first")
+        sys.exit(2)
+
+    drift = {}  # output key -> (max abs diff, worst case, within tolerance)
+    time_before, time_now = {}, {}
+    failures = []
+    warmed_up = False
+    for path in paths:
+        golden = np.load(path)
+        inputs = {k[len('input.'):]: golden[k] for k in golden.files if k.startswith('input.')}
+        if not warmed_up:
+            evaluate(inputs)
+            warmed_up = True
+        outputs, times = evaluate(inputs, repeat=args.repeat)
+        for stage, t in times.items():
+            time_before[stage] = time_before.get(stage, 0.0) + float(golden[f'time.{stage}'])
+            time_now[stage] = time_now.get(stage, 0.0) + t
+        for key, new in outputs.items():
+            old = golden[key]
+            if old.shape != new.shape:
+                failures.append(f"{path.stem}: {key} shape {old.shape} -> {new.shape}")
+                worst, ok = float('inf'), False
+            else:
+                atol, rtol = (tol * args.tolerance_scale for tol in TOLERANCES[key])
+                diff = np.abs(new.astype(np.float64) - old.astype(np.float64))
+                ok = bool(np.all((diff <= atol + rtol * np.abs(old)) | (np.isnan(new) & np.isnan(old))))
+                worst = float(np.nanmax(diff)) if diff.size else 0.0
+                if not ok:
+                    failures.append(f"{path.stem}: {key} drifted by {worst:.3g} (atol {atol:g}, rtol {rtol:g})")
+            worst_so_far, worst_case, all_ok = drift.get(key, (-1.0, '', True))
+            if worst > worst_so_far:
+                worst_so_far, worst_case = worst, path.stem
+            drift[key] = (worst_so_far, worst_case, all_ok and ok)
+
+    print(f"\n{'output':<24} {'max drift':>12} {'atol':>8}  status  (worst case)")
+    for key in sorted(drift):
+        worst, case, ok = drift[key]
+        print(f"  {key:<22} {worst:>12.3g} {TOLERANCES[key][0] * args.tolerance_scale:>8g}  "
+              f"{'ok' if ok else 'FAIL':<6}  {case}")
+
+    print(f"\n{'stage':<14} {'golden ms':>10} {'now ms':>10} {'speedup':>8}")
+    for stage in time_now:
+        before, now = time_before[stage] * 1000.0, time_now[stage] * 1000.0
+        print(f"  {stage:<12} {before:>10.1f} {now:>10.1f} {before / now if now > 0 else float('inf'):>7.2f}x")
+
+    if failures:
+        print(f"\n{len(failures)} output(s) out of tolerance:")
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nAll outputs of {len(paths)} cases within tolerance")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden-output corpus for the physics and feature pipeline")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help="Snapshot the current outputs")
+    p_build.add_argument('--rfdb-sample', type=int, default=20, help="Number of RFDB recordings (0 = none)")
+    p_build.add_argument('--seed', type=int, default=0, help="Random seed for the RFDB sample")
+    p_build.add_argument('--local-only', action='store_true', help="Only read recordings from rfdb_csvs/")
+    p_compare = sub.add_parser('compare', help="Check the current code against the snapshots")
+    p_compare.add_argument('--tolerance-scale', type=float, default=1.0, help="Multiply every tolerance by this")
+    for p in (p_build, p_compare):
+        p.add_argument('--dir', default=DEFAULT_DIR, help="Corpus directory")
+        p.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (fastest is kept)")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be >= 1")
+    if args.command == 'build':
+        build(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
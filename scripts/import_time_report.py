@@ -0,0 +1,119 @@
+"""
+Report the cold-start import time of the app modules.
+
+Every Streamlit server process pays for the imports of app_builder before the
+first page renders (streamlit, pandas, scipy, numba, plotly, ...). This script
+imports each module in a fresh interpreter with `python -X importtime`, runs
+that --repeat times and reports the fastest total, the heaviest direct imports
+of the module and the modules with the largest self time.
+
+Like scripts/benchmark_pipeline.py (both use scripts/_baseline.py), results
+can be saved as a baseline (benchmarks/import_time.json, not tracked) and
+later runs compared against it; the script exits with status 1 if a module imports more than --threshold
+slower than its baseline.
+
+Usage:
+    python scripts/import_time_report.py --save-baseline
+    python scripts/import_time_report.py                      # compare against the baseline
+    python scripts/import_time_report.py --modules app_builder utils.scoring --top 20
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from _baseline import add_baseline_arguments, environment, finish
+
+ROOT = Path(__file__).parent.parent
+
+DEFAULT_MODULES = ('app_builder', 'utils.scoring', 'utils.lgbm_predictor')
+DEFAULT_BASELINE = 'benchmarks/import_time.json'
+MIN_DELTA_MS = 50.0  # slowdowns smaller than this are disk cache / scheduler noise
+
+
+def import_times(module: str) -> list:
+    """
+    Import `module` in a fresh interpreter and parse its -X importtime output.
+
+    Returns:
+        List of (name, depth, self_ms, cumulative_ms), in the order Python
+        reports them (children before their parent; depth 0 is a top-level import)
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # Nesting is shown as two spaces per level after the leading space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us) / 1000.0, int(cumulative_us) / 1000.0))
+    return entries
+
+
+def module_report(module: str, repeat: int) -> dict:
+    """Total import time of `module` over `repeat` fresh interpreters plus the breakdown of the fastest run."""
+    runs = [import_times(module) for _ in range(repeat)]
+    totals = [sum(entry[2] for entry in entries) for entries in runs]
+    fastest = runs[totals.index(min(totals))]
+    target = next((entry for entry in fastest if entry[0] == module and entry[1] == 0), None)
+    # Direct imports of the module are the depth-1 entries reported before it
+    direct = []
+    if target is not None:
+        end = fastest.index(target)
+        start = end
+        while start > 0 and fastest[start - 1][1] > 0:
+            start -= 1
+        direct = [entry for entry in fastest[start:end] if entry[1] == 1]
+    return {
+        'min_ms': min(totals),
+        'median_ms': statistics.median(totals),
+        'direct': sorted(direct, key=lambda entry: -entry[3]),
+        'self': sorted(fastest, key=lambda entry: -entry[2]),
+    }
+
+
+def print_report(module: str, report: dict, top: int):
+    print(f"\n{module}: {report['min_ms']:.0f} ms (median {report['median_ms']:.0f} ms, "
+          f"interpreter start-up imports included)")
+    if report['direct']:
+        print("  heaviest direct imports (cumulative ms):")
+        for name, _, _, cumulative in report['direct'][:top]:
+            print(f"    {name:<48} {cumulative:>9.1f}")
+    print("  largest self time (ms):")
+    for name, _, self_ms, _ in report['self'][:top]:
+        print(f"    {name:<48} {self_ms:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time of the app modules")
+    parser.add_argument('--modules', nargs='+', default=list(DEFAULT_MODULES), help="Modules to import")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per module (fastest is reported)")
+    parser.add_argument('--top', type=int, default=10, help="Rows in the per-module breakdown")
+    add_baseline_arguments(parser, DEFAULT_BASELINE)
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be >= 1")
+
+    results = {}
+    for module in args.modules:
+        report = module_report(module, args.repeat)
+        print_report(module, report, args.top)
+        results[module] = {
+            'min_ms': report['min_ms'],
+            'median_ms': report['median_ms'],
+            'direct_ms': {name: cumulative for name, _, _, cumulative in report['direct']},
+        }
+    report = {'environment': environment(), 'repeat': args.repeat, 'results': results}
+    finish(report, args, MIN_DELTA_MS, 'module')
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.cloud_data_loader import list_rfdb_parks, list_rfdb_coasters, list_rfdb_csvs, load_rfdb_csv
 from utils.submission_manager import add_submission_to_leaderboard, update_submission_in_leaderboard, load_submissions
-from app_builder import check_gforce_safety, compute_airtime_metrics
+from utils.scoring import check_gforce_safety, compute_airtime_metrics
 from utils.lgbm_predictor import predict_score_lgb
 
 
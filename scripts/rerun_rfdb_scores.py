@@ -15,7 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.cloud_data_loader import load_rfdb_csv
 from utils.submission_manager import load_submissions, update_submission_in_leaderboard, load_submission_geometry
-from app_builder import check_gforce_safety
+from utils.scoring import check_gforce_safety, estimate_track_metadata
 from utils.lgbm_predictor import predict_score_lgb
 from utils.accelerometer_transform import track_to_accelerometer_data
 
@@ -235,31 +235,11 @@ def rerun_all_scores():
                 safety_score = safety['safety_score']
                 
                 # Compute metadata from track geometry
-                x_track = np.array(geometry.get('x', []))
-                y_track = np.array(geometry.get('y', []))
-                z_track = np.array(geometry.get('z', []))
-                
-                # Track length: 3D arc length
-                dx = np.diff(x_track, prepend=x_track[0] if len(x_track) > 0 else 0)
-                dy = np.diff(y_track, prepend=y_track[0] if len(y_track) > 0 else 0)
-                dz = np.diff(z_track, prepend=z_track[0] if len(z_track) > 0 else 0)
-                track_length_m = float(np.sum(np.sqrt(dx**2 + dy**2 + dz**2)))
-                
-                # Max height
-                height_m = float(np.max(y_track)) if len(y_track) > 0 else 0.0
-                
-                # Max speed: estimate from energy conservation
-                max_height_drop = float(np.max(y_track) - np.min(y_track)) if len(y_track) > 0 else 0.0
-                g = 9.81
-                energy_efficiency = 0.95
-                max_speed_ms = np.sqrt(2 * g * max_height_drop * energy_efficiency) if max_height_drop > 0 else 0.0
-                speed_kmh = float(max_speed_ms * 3.6)
-                
-                metadata = {
-                    'height_m': height_m,
-                    'speed_kmh': speed_kmh,
-                    'track_length_m': track_length_m
-                }
+                metadata = estimate_track_metadata(
+                    geometry.get('x', []),
+                    geometry.get('y', []),
+                    geometry.get('z') or None
+                )
                 
                 # Recalculate fun rating with LightGBM (with metadata)
                 fun_rating = predict_score_lgb(accel_df, metadata=metadata)
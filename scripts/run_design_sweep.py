@@ -0,0 +1,112 @@
+"""
+Sweep random block-library designs and report the best ones.
+
+Each candidate is built with the builder's Random Template rules, scored
+(geometry -> physics -> features -> rating/safety) on a process pool, and the
+top-k designs by the chosen objective are printed and optionally saved as JSON
+(the `blocks` format accepted by the scoring service).
+
+Usage:
+    python scripts/run_design_sweep.py --designs 2000 --workers 8 --seed 42
+    python scripts/run_design_sweep.py --designs 500 --objective fun --top-k 5 --output best.json
+    python scripts/run_design_sweep.py --designs 10000 --surrogate --surrogate-cache surrogate.npz
+        # kNN pre-filter: only ~25% of candidates go through physics + LightGBM
+    python scripts/run_design_sweep.py --designs 500 --ranges ranges.json
+        # ranges.json overrides slider ranges: {"loop": {"diameter": [25, 45, 5]}}
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.design_sweep import OBJECTIVES, merge_ranges, run_sweep
+from utils.surrogate import SurrogateFilter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel design-space sweep over the block library")
+    parser.add_argument('--designs', type=int, default=1000, help="Number of random designs to generate")
+    parser.add_argument('--objective', choices=sorted(OBJECTIVES), default='combined',
+                        help="Ranking objective (combined = fun rating + safety score)")
+    parser.add_argument('--top-k', type=int, default=10, help="Number of best designs to keep")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=8, help="Designs per worker task")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for the design generator")
+    parser.add_argument('--output', default=None, help="Write the top designs to this JSON file")
+    parser.add_argument('--ranges', default=None,
+                        help="JSON file of parameter ranges {block_type: {param: [min, max, step]}} "
+                             "overriding the builder slider ranges")
+    parser.add_argument('--surrogate', action='store_true', help="Pre-filter candidates with the kNN surrogate")
+    parser.add_argument('--keep-fraction', type=float, default=0.25,
+                        help="Share of candidates the surrogate passes to full evaluation")
+    parser.add_argument('--surrogate-cache', default=None,
+                        help="Load/save surrogate training pairs from/to this .npz file")
+    args = parser.parse_args()
+    if args.top_k < 1:
+        parser.error("--top-k must be >= 1")
+    overrides = None
+    if args.ranges:
+        with open(args.ranges) as f:
+            overrides = json.load(f)
+    try:
+        ranges = merge_ranges(overrides)
+    except ValueError as e:
+        parser.error(str(e))
+
+    surrogate = None
+    if args.surrogate:
+        surrogate = SurrogateFilter(objective=args.objective, keep_fraction=args.keep_fraction,
+                                    path=args.surrogate_cache, seed=args.seed)
+        print(f"Surrogate pre-filter on ({len(surrogate)} cached training pairs)")
+
+    progress_every = max(1, args.designs // 20)
+    counter = {'done': 0}
+
+    def report(result):
+        counter['done'] += 1
+        if counter['done'] % progress_every == 0:
+            print(f"  {counter['done']} designs evaluated")
+
+    sweep = run_sweep(args.designs, objective=args.objective, top_k=args.top_k, workers=args.workers,
+                      seed=args.seed, chunk_size=args.chunk_size, callback=report, surrogate=surrogate,
+                      ranges=ranges)
+
+    print(f"\nEvaluated {sweep['evaluated']} designs ({sweep['errors']} errors) in "
+          f"{sweep['elapsed_s']:.1f}s - {sweep['designs_per_min']:.0f} designs/min")
+    if surrogate is not None:
+        m = sweep['surrogate']
+        print(f"Surrogate: screened {sweep['screened']}, discarded {m['discarded']}, "
+              f"hit rate {m['hit_rate']:.2f} (random {m['baseline_hit_rate']:.2f}), "
+              f"audit miss rate {m['audit_miss_rate']:.2f}, "
+              f"MAE fun {m['mae_fun']:.3f} / safety {m['mae_safety']:.3f}")
+        if args.surrogate_cache:
+            surrogate.save()
+            print(f"Saved {len(surrogate)} surrogate training pairs to {args.surrogate_cache}")
+    print(f"\nTop {len(sweep['top'])} by {args.objective}:")
+    for rank, result in enumerate(sweep['top'], 1):
+        blocks = ' -> '.join(b['type'] for b in result['sequence'])
+        print(f"{rank:>3}. objective={result['objective']:.3f}  fun={result['fun_rating']:.2f}  "
+              f"safety={result['safety']['score']:.2f}  ({result['safety']['level']})")
+        print(f"     {blocks}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump([
+                {
+                    'objective': r['objective'],
+                    'fun_rating': r['fun_rating'],
+                    'safety_score': r['safety']['score'],
+                    'blocks': r['sequence'],
+                    'force_end_level': True,
+                }
+                for r in sweep['top']
+            ], f, indent=2)
+        print(f"\nSaved top designs to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""ArrayStore shares identical content and evicts the least recently used arrays."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.array_store import ArrayStore
+
+N = 1000  # float64 elements, 8000 bytes per array
+
+
+def _array(value):
+    return np.full(N, float(value))
+
+
+def test_identical_content_is_stored_once():
+    store = ArrayStore()
+    first = store.put(_array(1))
+    second = store.put(_array(1))
+    assert first == second
+    assert store.get(first) is store.get(second)
+    stats = store.stats()
+    assert (stats['arrays'], stats['bytes'], stats['puts'], stats['shared']) == (1, 8 * N, 2, 1)
+
+
+def test_stored_arrays_are_read_only_copies():
+    store = ArrayStore()
+    source = _array(1)
+    handle = store.put(source)
+    source[0] = 5.0
+    stored = store.get(handle)
+    assert stored[0] == 1.0
+    with pytest.raises(ValueError):
+        stored[0] = 2.0
+
+
+def test_evicts_least_recently_used():
+    store = ArrayStore(max_bytes=2 * 8 * N)
+    a, b = store.put(_array(1)), store.put(_array(2))
+    store.get(a)  # b is now the least recently used
+    c = store.put(_array(3))
+    assert a in store and c in store and b not in store
+    with pytest.raises(KeyError):
+        store.get(b)
+    assert store.stats()['evictions'] == 1
+    assert store.stats()['misses'] == 1
+    assert store.nbytes == 2 * 8 * N
+
+
+def test_shared_put_refreshes_the_handle_of_every_session():
+    store = ArrayStore(max_bytes=2 * 8 * N)
+    session_a = store.put(_array(1))
+    store.put(_array(2))
+    # A second session putting the same content keeps the one shared copy alive
+    session_b = store.put(_array(1))
+    store.put(_array(3))
+    assert session_a == session_b
+    np.testing.assert_array_equal(store.get(session_a), _array(1))
+
+
+def test_array_larger_than_the_store_is_kept_until_the_next_put():
+    store = ArrayStore(max_bytes=8 * N // 2)
+    big = store.put(_array(1))
+    assert big in store
+    store.put(_array(2))
+    assert big not in store
+
+
+def test_frame_round_trip_and_eviction():
+    store = ArrayStore(max_bytes=3 * 8 * N)
+    df = pd.DataFrame({'Vertical': _array(1), 'Lateral': _array(2)})
+    df.attrs['curvature'] = _array(3)
+    df.attrs['source'] = 'advanced'
+    handle = store.put_frame(df)
+    assert len(handle) == N
+
+    restored = store.get_frame(handle)
+    pd.testing.assert_frame_equal(restored, df)
+    assert restored.attrs['source'] == 'advanced'
+    np.testing.assert_array_equal(restored.attrs['curvature'], _array(3))
+    restored.loc[0, 'Vertical'] = 9.0  # a writable copy, the store is unchanged
+    assert store.get_frame(handle).loc[0, 'Vertical'] == 1.0
+
+    store.put(_array(4))  # evicts the oldest column
+    with pytest.raises(KeyError):
+        store.get_frame(handle)
+
+
+def test_object_arrays_are_rejected():
+    with pytest.raises(TypeError):
+        ArrayStore().put(np.array(['a', None], dtype=object))
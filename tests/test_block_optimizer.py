@@ -0,0 +1,38 @@
+"""Decoded optimizer parameters land on the builder's slider grid."""
+
+import numpy as np
+
+from utils.block_optimizer import parameter_space, vector_to_sequence
+from utils.design_sweep import PARAM_RANGES
+from utils.track_assembly import DEFAULT_TRACK_SEQUENCE
+
+
+def _on_grid(value, lo, step):
+    k = (value - lo) / step
+    return abs(k - round(k)) < 1e-6
+
+
+def test_decoded_values_are_slider_values():
+    space = parameter_space(DEFAULT_TRACK_SEQUENCE)
+    rng = np.random.default_rng(0)
+    for u in rng.random((50, len(space))):
+        decoded = vector_to_sequence(u, DEFAULT_TRACK_SEQUENCE, space)
+        for dim in space:
+            block = decoded[dim['block']]
+            value = block['params'][dim['param']]
+            lo, hi, step = PARAM_RANGES[block['type']][dim['param']]
+            assert lo <= value <= hi
+            assert _on_grid(value, lo, step), (block['type'], dim['param'], value)
+            assert isinstance(value, int) == dim['integer']
+
+
+def test_bounds_without_step_keep_the_slider_grid():
+    sequence = [{'type': 'drop', 'params': {'height': 40, 'steepness': 0.8}}]
+    space = parameter_space(sequence, bounds={'drop': {'height': (32, 48), 'steepness': (0.62, 0.9, 0.02)}})
+    heights = {vector_to_sequence(np.array([u, 0.5]), sequence, space)[0]['params']['height']
+               for u in np.linspace(0.0, 1.0, 41)}
+    # Slider grid of drop height is 20, 25, ..., 90; only 35, 40 and 45 lie within (32, 48)
+    assert heights == {35, 40, 45}
+    # A step given with the bounds defines its own grid
+    steepness = vector_to_sequence(np.array([0.5, 0.31]), sequence, space)[0]['params']['steepness']
+    assert steepness == 0.7
@@ -0,0 +1,57 @@
+"""score_recordings keeps fun and safety scores aligned with their recordings."""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def score_script(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    spec = importlib.util.spec_from_file_location('build_rfdb_score_table',
+                                                  ROOT / 'scripts' / 'build_rfdb_score_table.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _recording(peak_vertical):
+    t = np.linspace(0.0, 60.0, 3000)
+    return pd.DataFrame({
+        'Time': t,
+        'Vertical': 1.0 + (peak_vertical - 1.0) * np.sin(t / 3.0) ** 2,
+        'Lateral': 0.3 * np.sin(t),
+        'Longitudinal': 0.2 * np.cos(t),
+    })
+
+
+def test_failed_feature_extraction_does_not_shift_safety_scores(score_script, monkeypatch):
+    peaks = {'mild': 2.0, 'broken': 3.5, 'intense': 6.5}
+    recordings = [('park', name, f'{name}.csv', f'rfdb_{name}') for name in peaks]
+    monkeypatch.setattr(score_script, 'load_rfdb_recording',
+                        lambda park, coaster, csv_file, use_cloud=True: _recording(peaks[coaster]))
+
+    real_features = score_script.compute_lightgbm_features
+
+    def features(accel_df, metadata=None):
+        if accel_df['Vertical'].max() == pytest.approx(peaks['broken']):
+            raise ValueError("feature extraction failed")
+        return real_features(accel_df, metadata=metadata)
+
+    monkeypatch.setattr(score_script, 'compute_lightgbm_features', features)
+
+    rows = score_script.score_recordings(recordings, use_cloud=False)
+
+    assert [row['coaster'] for row in rows] == ['mild', 'intense']
+    for row in rows:
+        df = _recording(peaks[row['coaster']])
+        expected = score_script.check_gforce_safety_batch(
+            np.array([df['Vertical'].max()]), np.array([df['Vertical'].min()]),
+            np.array([df['Lateral'].abs().max()]), np.array([df['Longitudinal'].abs().max()]))[0]
+        assert row['safety_score'] == pytest.approx(float(expected))
+    assert rows[0]['safety_score'] != pytest.approx(rows[1]['safety_score'])
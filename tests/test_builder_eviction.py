@@ -0,0 +1,37 @@
+"""The builder recomputes what the shared array store evicted instead of failing."""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('streamlit')
+from streamlit.testing.v1 import AppTest
+
+from utils.array_store import ARRAY_STORE
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def tiny_store():
+    # Above max_bytes only the most recently stored array is kept
+    max_bytes = ARRAY_STORE.max_bytes
+    ARRAY_STORE.clear()
+    ARRAY_STORE.max_bytes = 1
+    yield ARRAY_STORE
+    ARRAY_STORE.max_bytes = max_bytes
+    ARRAY_STORE.clear()
+
+
+@pytest.mark.parametrize('session', [{}, {'adaptive_resample': True}, {'random_3d': True}])
+def test_builder_renders_with_an_evicting_store(monkeypatch, tiny_store, session):
+    monkeypatch.syspath_prepend(str(ROOT))
+    at = AppTest.from_file(str(ROOT / 'pages' / '01_Builder.py'), default_timeout=300)
+    for key, value in session.items():
+        at.session_state[key] = value
+    at.run()
+    at.run()
+    assert not at.exception
+    assert not [e.value for e in at.error]
+    assert any('⭐' in md.value for md in at.markdown)
+    assert tiny_store.stats()['evictions'] > 0
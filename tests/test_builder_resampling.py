@@ -0,0 +1,35 @@
+"""Adaptive resampling only thins the drawn track; the builder's rating is unchanged."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('streamlit')
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).parent.parent
+
+
+def _rating(at):
+    ratings = [re.search(r'⭐ ([\d.]+)', md.value) for md in at.markdown]
+    ratings = [float(match.group(1)) for match in ratings if match]
+    assert ratings, "no rating shown"
+    return ratings[0]
+
+
+def _run_builder(adaptive_resample):
+    at = AppTest.from_file(str(ROOT / 'pages' / '01_Builder.py'), default_timeout=300)
+    at.session_state['adaptive_resample'] = adaptive_resample
+    at.run()
+    assert not at.exception
+    return at
+
+
+def test_resampling_keeps_the_starter_track_rating(monkeypatch):
+    monkeypatch.syspath_prepend(str(ROOT))
+    full = _run_builder(False)
+    resampled = _run_builder(True)
+    info = resampled.session_state['resample_info']
+    assert info['n_points'] < info['n_original']
+    assert _rating(resampled) == _rating(full)
@@ -0,0 +1,39 @@
+"""Random designs follow the configured parameter ranges."""
+
+import random
+
+import pytest
+
+from utils.design_sweep import PARAM_RANGES, merge_ranges, random_block_sequence, run_sweep
+
+
+def test_random_designs_stay_on_the_range_grid():
+    ranges = merge_ranges({'loop': {'diameter': (30, 40, 5)}, 'drop': {'steepness': (0.6, 0.8, 0.1)}})
+    rng = random.Random(0)
+    for _ in range(200):
+        for block in random_block_sequence(rng, ranges=ranges):
+            for param, value in block['params'].items():
+                lo, hi, step = ranges[block['type']][param]
+                assert lo <= value <= hi
+                assert (value - lo) / step == pytest.approx(round((value - lo) / step))
+
+
+def test_later_drops_stay_within_a_third_of_the_first():
+    rng = random.Random(1)
+    for _ in range(200):
+        sequence = random_block_sequence(rng)
+        first = sequence[2]['params']['height']
+        later = [b['params']['height'] for b in sequence[3:] if b['type'] == 'drop']
+        assert all(h <= max(PARAM_RANGES['drop']['height'][0], first / 3) for h in later)
+
+
+@pytest.mark.parametrize('overrides', [{'monorail': {'length': (1, 2, 1)}}, {'loop': {'diameter': (40, 20, 5)}},
+                                       {'loop': {'diameter': (20, 40, 0)}}])
+def test_merge_ranges_rejects_bad_overrides(overrides):
+    with pytest.raises(ValueError):
+        merge_ranges(overrides)
+
+
+def test_run_sweep_rejects_empty_top_k():
+    with pytest.raises(ValueError, match="top_k"):
+        run_sweep(1, top_k=0, workers=1)
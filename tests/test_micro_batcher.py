@@ -0,0 +1,76 @@
+"""MicroBatcher keeps serving after predictor errors and cancelled futures."""
+
+import numpy as np
+import pytest
+
+from utils.micro_batcher import MicroBatcher
+
+N_FEATURES = 4
+
+
+@pytest.fixture
+def make_batcher():
+    batchers = []
+
+    def make(predict_batch, **kwargs):
+        batcher = MicroBatcher(predict_batch, **kwargs)
+        batchers.append(batcher)
+        return batcher
+
+    yield make
+    for batcher in batchers:
+        batcher.close()
+
+
+def _features(value=0.0):
+    return np.full(N_FEATURES, value)
+
+
+def test_ratings_follow_their_features(make_batcher):
+    batcher = make_batcher(lambda X: X[:, 0] * 2.0, max_batch_size=4, max_latency_ms=20)
+    futures = [batcher.submit(_features(i)) for i in range(6)]
+    assert [f.result(timeout=5) for f in futures] == [2.0 * i for i in range(6)]
+
+
+def test_short_predictor_result_fails_the_batch_only(make_batcher):
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return np.ones(len(X) - 1) if len(calls) == 1 else np.full(len(X), 3.0)
+
+    batcher = make_batcher(predict, max_batch_size=3, max_latency_ms=50)
+    futures = [batcher.submit(_features()) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(ValueError, match="ratings for a batch of"):
+            future.result(timeout=5)
+    assert batcher.predict(_features(), timeout=5) == 3.0
+    assert batcher.metrics()['errors'] == 1
+
+
+def test_predictor_exception_reaches_every_caller(make_batcher):
+    def predict(X):
+        raise RuntimeError("booster failed")
+
+    batcher = make_batcher(predict, max_batch_size=2, max_latency_ms=50)
+    futures = [batcher.submit(_features()) for _ in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="booster failed"):
+            future.result(timeout=5)
+
+
+def test_cancelled_future_does_not_stop_the_batcher(make_batcher):
+    batcher = make_batcher(lambda X: X[:, 0], max_batch_size=8, max_latency_ms=200)
+    cancelled = batcher.submit(_features(1.0))
+    live = batcher.submit(_features(2.0))
+    assert cancelled.cancel()
+    assert live.result(timeout=5) == 2.0
+    assert batcher.predict(_features(5.0), timeout=5) == 5.0
+    assert batcher._thread.is_alive()
+
+
+def test_submit_after_close_raises(make_batcher):
+    batcher = make_batcher(lambda X: X[:, 0])
+    batcher.close()
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit(_features())
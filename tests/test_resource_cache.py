@@ -0,0 +1,80 @@
+"""file_cached loads once per file version and reloads after the file changes."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from utils.resource_cache import cache_stats, file_cached, read_csv_cached
+
+
+def _bump_mtime(path, seconds=10):
+    # Same-size rewrites within the filesystem's timestamp resolution would look unchanged
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_reloads_after_file_change(tmp_path):
+    path = tmp_path / 'model.txt'
+    path.write_text('v1')
+    name = f'test loader {tmp_path.name}'
+
+    @file_cached(name)
+    def load(p):
+        return {'content': open(p).read()}
+
+    first = load(str(path))
+    assert load(str(path)) is first
+    assert cache_stats()[name] == {'calls': 2, 'loads': 1}
+
+    path.write_text('v2')
+    _bump_mtime(path)
+    assert load(str(path))['content'] == 'v2'
+    assert cache_stats()[name] == {'calls': 3, 'loads': 2}
+
+    load.cache_clear()
+    load(str(path))
+    assert cache_stats()[name]['loads'] == 3
+
+
+def test_watch_paths_and_missing_files(tmp_path):
+    index = tmp_path / 'index.json'
+    name = f'test watch {tmp_path.name}'
+
+    @file_cached(name, watch=lambda directory: [os.path.join(directory, 'index.json')])
+    def load(directory):
+        return os.path.exists(os.path.join(directory, 'index.json'))
+
+    assert load(str(tmp_path)) is False
+    assert load(str(tmp_path)) is False
+    index.write_text('{}')  # creating the watched file counts as a change
+    assert load(str(tmp_path)) is True
+    assert cache_stats()[name]['loads'] == 2
+
+
+def test_errors_are_not_cached(tmp_path):
+    path = tmp_path / 'table.csv'
+    name = f'test errors {tmp_path.name}'
+
+    @file_cached(name)
+    def load(p):
+        return open(p).read()
+
+    with pytest.raises(FileNotFoundError):
+        load(str(path))
+    path.write_text('ok')
+    assert load(str(path)) == 'ok'
+    assert cache_stats()[name]['loads'] == 2
+
+
+def test_read_csv_cached_returns_copies(tmp_path):
+    path = tmp_path / 'ratings.csv'
+    pd.DataFrame({'rating': [3.5, 4.0]}).to_csv(path, index=False)
+
+    table = read_csv_cached(str(path))
+    table.loc[0, 'rating'] = 1.0  # callers may modify their copy
+    assert read_csv_cached(str(path)).loc[0, 'rating'] == 3.5
+
+    pd.DataFrame({'rating': [4.5, 5.0]}).to_csv(path, index=False)
+    _bump_mtime(path)
+    assert read_csv_cached(str(path))['rating'].tolist() == [4.5, 5.0]
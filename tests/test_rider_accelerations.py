@@ -0,0 +1,40 @@
+"""The simple (geometric) model reads curvature and normals from the shared TrackGeometry."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.accelerometer_transform import compute_rider_accelerations
+from utils.track_geometry import TrackGeometry
+
+RADIUS = 20.0
+
+
+def _valley():
+    """Half circle of RADIUS below its end points, sampled every ~0.5 m."""
+    theta = np.linspace(np.pi, 2 * np.pi, int(np.pi * RADIUS / 0.5))
+    x = RADIUS * np.cos(theta)
+    y = RADIUS * np.sin(theta)
+    return pd.DataFrame({'x': x, 'y': y, 'z': np.zeros_like(x)})
+
+
+def test_valley_bottom_matches_circular_motion():
+    track_df = _valley()
+    result = compute_rider_accelerations(track_df)
+    bottom = len(track_df) // 2
+    # v² = 2 g R * 0.95 (energy efficiency of the speed model), so 1 + v²/(g R) = 2.9 g
+    assert result['Vertical'].iloc[bottom] == pytest.approx(1.0 + 2 * 0.95, rel=0.02)
+    assert abs(result['Longitudinal'].iloc[bottom]) < 0.05
+    assert np.abs(result['Lateral']).max() < 1e-9
+
+
+def test_uses_the_given_geometry():
+    track_df = _valley()
+    geometry = TrackGeometry.from_track(track_df['x'], track_df['y'], track_df['z'])
+    result = compute_rider_accelerations(track_df, geometry=geometry)
+    # The circumcircles were computed on (and are now cached by) the shared instance
+    assert '_circumcircles' in geometry.__dict__
+    pd.testing.assert_frame_equal(result, compute_rider_accelerations(track_df))
+
+    with pytest.raises(ValueError, match="does not match"):
+        compute_rider_accelerations(track_df.iloc[1:], geometry=geometry)
@@ -0,0 +1,62 @@
+"""Scoring service error paths: bad requests get a 400 with a valid JSON body."""
+
+import http.client
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from utils.scoring import score_track
+from utils.scoring_service import make_server
+
+
+@pytest.fixture
+def server():
+    server = make_server(port=0, workers=1, warm=False)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.service.shutdown()
+
+
+def _post(server, body: str):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=30)
+    conn.request('POST', '/score', body=body, headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    status, data = response.status, response.read()
+    conn.close()
+    return status, json.loads(data, parse_constant=lambda name: pytest.fail(f"invalid JSON constant {name}"))
+
+
+def _track(n=50):
+    x = np.linspace(0.0, 100.0, n)
+    return x, 20.0 - 0.1 * x, np.zeros(n)
+
+
+@pytest.mark.parametrize('bad', [np.nan, np.inf, -np.inf])
+def test_score_track_rejects_non_finite_coordinates(bad):
+    x, y, z = _track()
+    y[10] = bad
+    with pytest.raises(ValueError, match="finite"):
+        score_track(x, y, z)
+
+
+def test_score_track_rejects_non_finite_physics():
+    with pytest.raises(ValueError, match="finite"):
+        score_track(*_track(), physics={'mass': float('nan')})
+
+
+@pytest.mark.parametrize('body, message', [
+    ('{"geometry": {"x": [%s], "y": [%s]}}' % (', '.join(['1'] * 20), ', '.join(['NaN'] * 20)), 'finite'),
+    ('{"blocks": []}', 'non-empty'),
+    ('{"physics": {"gravity": 1}, "blocks": [{"type": "loop"}]}', 'unknown physics'),
+    ('{"nothing": 1}', "either 'geometry' or 'blocks'"),
+    ('not json', 'JSONDecodeError'),
+])
+def test_bad_requests_get_400(server, body, message):
+    status, data = _post(server, body)
+    assert status == 400
+    assert message in data['error']
@@ -0,0 +1,81 @@
+"""SurrogateFilter encodings and trust metrics."""
+
+import copy
+
+import numpy as np
+import pytest
+
+from utils.surrogate import SurrogateFilter, encode_block_params, encode_sequence
+
+SEQUENCE = [
+    {'type': 'lift_hill', 'params': {'length': 50, 'height': 40}},
+    {'type': 'airtime_hill', 'params': {'length': 40, 'height': 20}},
+    {'type': 'airtime_hill', 'params': {'length': 40, 'height': 10}},
+    {'type': 'brake_run', 'params': {'length': 30}},
+]
+
+
+def _with_heights(first, second):
+    sequence = copy.deepcopy(SEQUENCE)
+    sequence[1]['params']['height'] = first
+    sequence[2]['params']['height'] = second
+    return sequence
+
+
+def test_fixed_layout_encoding_separates_repeated_block_types():
+    a, b = _with_heights(20, 10), _with_heights(10, 20)
+    # The per-type summary cannot tell which hill is the tall one
+    assert np.array_equal(encode_sequence(a), encode_sequence(b))
+    assert not np.array_equal(encode_block_params(a), encode_block_params(b))
+
+
+def test_fixed_layout_surrogate_predicts_per_block(tmp_path):
+    surrogate = SurrogateFilter(objective='fun', k=1, sequence=SEQUENCE)
+    surrogate.add(_with_heights(20, 10), 4.0, 5.0)
+    surrogate.add(_with_heights(10, 20), 2.0, 5.0)
+    assert surrogate.predict([_with_heights(19, 11)])[0, 0] == pytest.approx(4.0)
+
+    path = surrogate.save(str(tmp_path / 'surrogate.npz'))
+    assert len(SurrogateFilter(sequence=SEQUENCE, path=path)) == 2
+    with pytest.raises(ValueError, match="different encoding"):
+        SurrogateFilter(path=path)
+
+
+def test_fixed_layout_rejects_other_layouts():
+    surrogate = SurrogateFilter(sequence=SEQUENCE)
+    with pytest.raises(ValueError, match="fixed block layout"):
+        surrogate.add(SEQUENCE[:3], 3.0, 5.0)
+
+
+def _trained_surrogate(**kwargs):
+    surrogate = SurrogateFilter(objective='fun', k=1, keep_fraction=0.5, min_samples=2, seed=0,
+                                sequence=SEQUENCE, **kwargs)
+    surrogate.add(_with_heights(20, 10), 2.0, 5.0)
+    surrogate.add(_with_heights(24, 12), 4.0, 5.0)
+    for height in range(5, 25, 2):
+        # Rejected before rating: trained on with the floor rating
+        surrogate.add(_with_heights(height, height), 1.0, 1.0, rated=False)
+    return surrogate
+
+
+def test_threshold_ignores_unrated_designs():
+    surrogate = _trained_surrogate()
+    candidates = [_with_heights(20, 11), _with_heights(6, 6)]
+    keep, predictions, _ = surrogate.screen(candidates)
+    assert surrogate._threshold == pytest.approx(3.0)  # median of the rated 2.0 and 4.0
+    surrogate.update(candidates[keep[0]], 2.5, 5.0, prediction=predictions[keep[0]])
+    metrics = surrogate.metrics()
+    assert metrics['hit_rate'] == 0.0
+    assert metrics['mae_fun'] == pytest.approx(0.5)
+
+
+def test_audit_miss_rate_counts_returned_audits_only():
+    surrogate = _trained_surrogate(audit_fraction=1.0)
+    candidates = [_with_heights(20, 11), _with_heights(24, 13), _with_heights(6, 6), _with_heights(8, 8)]
+    keep, predictions, audit = surrogate.screen(candidates)
+    audited = np.flatnonzero(audit)
+    assert len(audited) == 2
+    # One audit comes back good, the other errored and is never fed back
+    surrogate.update(candidates[audited[0]], 4.5, 5.0, prediction=predictions[audited[0]], audit=True)
+    assert surrogate.metrics()['audit_miss_rate'] == 1.0
+    assert surrogate.metrics()['audited'] == 2
@@ -0,0 +1,44 @@
+"""Clearance checks report crossings between sections, not the planar loops' own."""
+
+import numpy as np
+import pytest
+
+from utils.track_assembly import DEFAULT_TRACK_SEQUENCE, assemble_track
+from utils.track_clearance import check_track_clearance
+
+
+def _crossing_track():
+    """Three straight blocks in a horizontal plane; the third one crosses the first at (25, 0)."""
+    corners = [((0, 0), (50, 0)), ((50, 0), (50, 25)), ((50, 25), (25, 25)), ((25, 25), (25, -25))]
+    blocks = [0, 1, 1, 2]
+    x, z, block_index = [], [], []
+    for (start, end), block in zip(corners, blocks):
+        t = np.linspace(0.0, 1.0, 60, endpoint=False)
+        x.extend(start[0] + t * (end[0] - start[0]))
+        z.extend(start[1] + t * (end[1] - start[1]))
+        block_index.extend([block] * len(t))
+    x, z = np.array(x), np.array(z)
+    return x, np.full_like(x, 10.0), z, np.array(block_index)
+
+
+def test_starter_track_loops_are_not_intersections():
+    x, y, z, block_index = assemble_track(DEFAULT_TRACK_SEQUENCE, return_block_index=True)
+    # Without block information the planar loops cross themselves
+    assert check_track_clearance(x, y, z)['intersects']
+    result = check_track_clearance(x, y, z, block_index=block_index,
+                                   block_types=[b['type'] for b in DEFAULT_TRACK_SEQUENCE])
+    assert not result['intersects']
+    assert not result['dangers']
+
+
+@pytest.mark.parametrize('block_types, intersects', [
+    (['flat_section', 'banked_turn', 'flat_section'], True),
+    (['loop', 'banked_turn', 'flat_section'], True),
+    (['loop', 'banked_turn', 'loop'], False),
+])
+def test_only_crossings_between_loops_are_skipped(block_types, intersects):
+    x, y, z, block_index = _crossing_track()
+    result = check_track_clearance(x, y, z, block_index=block_index, block_types=block_types)
+    assert result['intersects'] is intersects
+    if intersects:
+        assert result['closest'][0] == pytest.approx(25.0, abs=1.0)
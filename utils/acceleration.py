@@ -1,10 +1,23 @@
+import threading
+
 import numpy as np
-from typing import Dict, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 
 # Gravity (global Z-up convention)
 G_VEC = np.array([0.0, 0.0, -9.81], dtype=float)
 G_NORM = float(np.linalg.norm(G_VEC))
 
+# Output channels of compute_acc_profile, and the default set of its compact mode
+ACC_PROFILE_CHANNELS = (
+    'e_tan', 'v', 'v_3d', 'a_tan', 'a_eq', 'a_tot', 'f_spec',
+    'long', 'lat', 'vert', 'f_long', 'f_lat', 'f_vert',
+    'f_long_g', 'f_lat_g', 'f_vert_g', 'curvature', 'v_int', 'a_int', 'v_est',
+)
+COMPACT_CHANNELS = ('f_long_g', 'f_lat_g', 'f_vert_g')
+
+# Per-thread scratch buffers of the compact mode (see _scratch)
+_workspace = threading.local()
+
 # Optional Numba acceleration
 try:
     from numba import njit
@@ -13,6 +26,60 @@ except Exception:
     NUMBA_AVAILABLE = False
 
 
+if NUMBA_AVAILABLE:
+    # Speed integrators are compiled once per process (module level) so repeated
+    # calls, e.g. from the scoring service or design sweeps, reuse warm kernels.
+    # nogil lets concurrent worker threads integrate in parallel.
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _integrate_speed_verlet(g_par_mag_arr, normal_mag_arr, launch_acc_arr, v0_val, dt_val, k_drag_val, mu_val,
+                               a0_val):
+        N = g_par_mag_arr.shape[0]
+        v_out = np.zeros(N, dtype=np.float64)
+        a_out = np.zeros(N, dtype=np.float64)
+        v_out[0] = v0_val
+        a_out[0] = a0_val
+        a_prev = a0_val
+        for i in range(1, N):
+            # Compute forces: gravity, friction, drag, launch
+            friction_acc_mag = mu_val * normal_mag_arr[i]
+            drag_acc_mag = k_drag_val * v_out[i-1] * v_out[i-1]
+            sign_motion = 1.0 if v_out[i-1] >= 0.0 else -1.0
+            # Add launch acceleration if in launch section
+            a_gravity = g_par_mag_arr[i]
+            a_launch = launch_acc_arr[i]
+            a_new = a_gravity + a_launch - sign_motion * (friction_acc_mag + drag_acc_mag)
+            
+            # Velocity-Verlet: half-step velocity update
+            v_half = v_out[i-1] + 0.5 * a_prev * dt_val
+            v_out[i] = v_half + 0.5 * a_new * dt_val
+            if v_out[i] < 0.0 and abs(v_out[i]) < 1e-9:
+                v_out[i] = 0.0
+            
+            a_out[i] = a_new
+            a_prev = a_new
+        return v_out, a_out
+
+    @njit(cache=True, fastmath=True, nogil=True)
+    def _integrate_speed_euler(g_par_mag_arr, normal_mag_arr, launch_acc_arr, v0_val, dt_val, k_drag_val, mu_val):
+        N = g_par_mag_arr.shape[0]
+        v_out = np.zeros(N, dtype=np.float64)
+        a_out = np.zeros(N, dtype=np.float64)
+        v_out[0] = v0_val
+        a_out[0] = 0.0
+        for i in range(1, N):
+            friction_acc_mag = mu_val * normal_mag_arr[i]
+            drag_acc_mag = k_drag_val * v_out[i-1] * v_out[i-1]
+            sign_motion = 1.0 if v_out[i-1] >= 0.0 else -1.0
+            # Add launch acceleration if in launch section
+            a_gravity = g_par_mag_arr[i]
+            a_launch = launch_acc_arr[i]
+            a_out[i] = a_gravity + a_launch - sign_motion * (friction_acc_mag + drag_acc_mag)
+            v_out[i] = v_out[i-1] + a_out[i] * dt_val
+            if v_out[i] < 0.0 and abs(v_out[i]) < 1e-9:
+                v_out[i] = 0.0
+        return v_out, a_out
+
+
 def _safe_norm(v: np.ndarray, eps: float = 1e-9) -> Tuple[float, np.ndarray]:
     n = float(np.linalg.norm(v))
     if n < eps:
@@ -154,6 +221,126 @@ def _curvature_radius_vectorized(points: np.ndarray) -> np.ndarray:
     return R
 
 
+def _smooth_speed(v_estimate: np.ndarray, v0: float) -> np.ndarray:
+    """Lightly smoothed physics speed (the `v` output of compute_acc_profile)."""
+    # Use v_estimate as the source of truth for speed
+    # v_estimate is calculated from physics (energy conservation + launch acceleration)
+    # This ensures realistic speeds that don't require infinite energy
+    v = v_estimate.copy()
+    
+    # Apply light smoothing to speed to match track visualization smoothness
+    # This removes sharp edges that come from energy conservation formula (sqrt amplifies small height changes)
+    # Use a small sigma to preserve physics while matching visual smoothness
+    from scipy.ndimage import gaussian_filter1d
+    v_smooth = gaussian_filter1d(v, sigma=1.0, mode='nearest')
+    # Preserve initial and final values to maintain physics constraints
+    v_smooth[0] = v0
+    # Blend: use smoothed version but ensure it doesn't violate energy conservation too much
+    # Only smooth if the difference is small (preserve large changes from physics)
+    v_diff = np.abs(v_smooth - v)
+    v = np.where(v_diff < 0.5, v_smooth, v)  # Use smoothed if difference < 0.5 m/s, else keep original
+    v[0] = v0
+    return v
+
+
+def _velocity_vectors(points_smooth: np.ndarray, e_tan: np.ndarray, v: np.ndarray,
+                      dt: float, v0: float) -> np.ndarray:
+    """3D velocity (the `v_3d` output): direction from position differences, magnitude `v`."""
+    # Position differences (not a cumsum, so no accumulated error); the first
+    # point uses the forward difference
+    dp = np.empty_like(points_smooth)
+    dp[1:] = points_smooth[1:] - points_smooth[:-1]
+    dp[0] = dp[1]
+    ds = np.linalg.norm(dp, axis=1)
+    
+    # Direction of travel times the physics speed. Dividing dp by a per-segment
+    # time step first (ds / v_estimate) would only be normalized away again; for
+    # coincident points (|dp / dt| <= 1e-9) the tiny displacement is kept as is
+    still = ds <= 1e-9 * dt
+    v_3d = dp / np.where(still, dt, ds)[:, None] * v[:, None]
+    
+    # Initial velocity points along the tangent
+    v_3d[0] = v0 * e_tan[0]
+    return v_3d
+
+
+def _scratch(name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """Float32 scratch buffer reused across compact-mode calls on this thread (grown on demand)."""
+    buffers = _workspace.__dict__.setdefault('buffers', {})
+    size = int(np.prod(shape))
+    buf = buffers.get(name)
+    if buf is None or buf.size < size:
+        buf = buffers[name] = np.empty(size, dtype=np.float32)
+    return buf[:size].reshape(shape)
+
+
+def _compact_profile(channels: Sequence[str], e_tan: np.ndarray, n_hat: np.ndarray, valid: np.ndarray,
+                     a_cent_mag: np.ndarray, v_estimate: np.ndarray, points_smooth: np.ndarray,
+                     curvature: np.ndarray, dt: float, v0: float,
+                     v_int: np.ndarray, a_int: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Requested compute_acc_profile outputs, computed in float32.
+
+    Geometry, speed integration and dv/dt stay float64 (they accumulate or
+    cancel); only the per-sample vector algebra and the outputs are float32.
+    The (N,3) temporaries live in per-thread scratch buffers, the returned
+    arrays are freshly allocated.
+    """
+    n = e_tan.shape[0]
+    f32 = np.float32
+    g = f32(G_NORM)
+    dv_dt = np.gradient(v_estimate, dt)
+
+    e = _scratch('e_tan', (n, 3))
+    e[:] = e_tan
+    a_eq_valid = (a_cent_mag[:, None] * n_hat[valid]).astype(f32)
+    # a_tot = a_tan * e_tan + a_eq, with a_eq = -a_cent * n_hat
+    a = _scratch('a_tot', (n, 3))
+    np.multiply(dv_dt[:, None], e, out=a, casting='same_kind')
+    a[valid] -= a_eq_valid
+    ax, ay, az = a[:, 0], a[:, 1], a[:, 2]
+    ex, ey, ez = e[:, 0], e[:, 1], e[:, 2]
+
+    def a_eq():
+        out = np.zeros((n, 3), dtype=f32)
+        out[valid] = -a_eq_valid
+        return out
+
+    def lateral():
+        # Projection on cross(ez, e_tan) / |...| = (-e_y, e_x, 0) / hypot(e_x, e_y); gravity has no share
+        lat_n = np.hypot(ex, ey)
+        lat_n[lat_n < 1e-9] = 1.0
+        return (ay * ex - ax * ey) / lat_n
+
+    def f_long():
+        return ax * ex + ay * ey + (az + g) * ez
+
+    builders = {
+        'e_tan': lambda: e.copy(),
+        'v': lambda: _smooth_speed(v_estimate, v0).astype(f32),
+        'v_3d': lambda: _velocity_vectors(points_smooth, e_tan, _smooth_speed(v_estimate, v0),
+                                          dt, v0).astype(f32),
+        'a_tan': lambda: dv_dt.astype(f32),
+        'a_eq': a_eq,
+        'a_tot': lambda: a.copy(),
+        'f_spec': lambda: a - G_VEC.astype(f32),
+        'long': lambda: ax * ex + ay * ey + az * ez,
+        'lat': lateral,
+        'vert': lambda: az.copy(),
+        'f_long': f_long,
+        'f_lat': lateral,
+        'f_vert': lambda: az + g,
+        'f_long_g': lambda: f_long() / g,
+        'f_lat_g': lambda: lateral() / g,
+        'f_vert_g': lambda: (az + g) / g,
+        'curvature': lambda: curvature.astype(f32),
+        'v_int': lambda: v_int.astype(f32),
+        'a_int': lambda: a_int.astype(f32),
+        'v_est': lambda: v_estimate.astype(f32),
+    }
+    return {name: builders[name]() for name in channels}
+
+
 def compute_acc_profile(points: np.ndarray,
                         dt: float = 0.02,
                         mass: float = 6000.0,
@@ -165,7 +352,12 @@ def compute_acc_profile(points: np.ndarray,
                         use_energy_conservation: bool = False,
                         use_velocity_verlet: bool = True,
                         curvature_method: str = 'circumcenter',
-                        launch_sections: list = None) -> Dict[str, np.ndarray]:
+                        launch_sections: list = None,
+                        geometry=None,
+                        channels: Optional[Sequence[str]] = None,
+                        compact: bool = False,
+                        a0: float = 0.0,
+                        energy_ref: Optional[Tuple[float, float]] = None) -> Dict[str, np.ndarray]:
     """
     Compute per-sample inertial acceleration and accelerometer specific-force from 3D track points.
 
@@ -178,6 +370,19 @@ def compute_acc_profile(points: np.ndarray,
     - use_velocity_verlet: if True, use Velocity-Verlet integration (more accurate, default)
                           if False, use semi-implicit Euler (legacy)
     - curvature_method: 'circumcenter' (geometric, more accurate) or 'finite_diff' (faster, default legacy)
+    - geometry: optional utils.track_geometry.TrackGeometry of `points` (sigma 2) whose
+                smoothed points, arc length, tangents and circumcircles are reused
+    - channels: names of the outputs to return (see ACC_PROFILE_CHANNELS); all if None
+    - compact: float32 mode for batch evaluation. Geometry and speed integration stay
+               float64; the vector algebra runs in float32 in reused per-thread scratch
+               buffers and only `channels` (default COMPACT_CHANNELS) are returned, as
+               float32. Versus float64 on random block-library designs the g channels
+               differ by < 2e-6 g and ratings by < 1e-5 stars.
+    - a0: tangential acceleration at the first sample (the Velocity-Verlet a_prev).
+          Together with v0 this is the integrator state, so a run on points[k:] with
+          v0=v_int[k], a0=a_int[k] continues a run on points (see utils.incremental_physics)
+    - energy_ref: (speed, height) the energy-conservation estimate starts from;
+                  default (v0, height of the first smoothed point)
 
     Outputs (dict of arrays length N):
     - e_tan: unit tangent vectors
@@ -189,24 +394,32 @@ def compute_acc_profile(points: np.ndarray,
     - long/lat/vert: projections of a_tot in local axes
     - f_long/f_lat/f_vert: projections of specific force
     - f_long_g/f_lat_g/f_vert_g: projections normalized by g
+    - curvature: 1/R of the smoothed track (1/m), 0 where straight
+    - v_int/a_int: integrated speed and acceleration before the energy blend (integrator state)
+    - v_est: speed the accelerations are computed from (v before its light smoothing)
     """
     if points.ndim != 2 or points.shape[1] != 3 or points.shape[0] < 3:
         raise ValueError("points must be an Nx3 array with N>=3")
+    if channels is None and compact:
+        channels = COMPACT_CHANNELS
+    if channels is not None:
+        unknown = sorted(set(channels) - set(ACC_PROFILE_CHANNELS))
+        if unknown:
+            raise ValueError(f"Unknown channels {unknown}. Available: {list(ACC_PROFILE_CHANNELS)}")
 
     n = points.shape[0]
     
     # Apply Gaussian smoothing to reduce discretization noise
     # This is critical for curvature calculations on point clouds
-    from scipy.ndimage import gaussian_filter1d
-    points_smooth = points.copy()
-    sigma = 2.0  # Moderate smoothing - balances noise reduction with peak preservation
-    for i in range(3):
-        points_smooth[:, i] = gaussian_filter1d(points[:, i], sigma=sigma, mode='nearest')
-    
-    # Import gaussian_filter1d for later use in speed smoothing
-    # (already imported above, but keeping for clarity)
-    
-    e_tan = _tangents(points_smooth)
+    # (moderate sigma=2 - balances noise reduction with peak preservation)
+    from utils.track_geometry import TrackGeometry
+    if geometry is None:
+        geometry = TrackGeometry(points, sigma=2.0)
+    elif len(geometry) != n:
+        raise ValueError("geometry does not match points")
+    points_smooth = geometry.smoothed
+    
+    e_tan = geometry.tangents
 
     # Vectorized gravity parallel magnitude per sample
     g_par_mag = e_tan @ G_VEC
@@ -233,29 +446,26 @@ def compute_acc_profile(points: np.ndarray,
     
     # Calculate cumulative distance for launch section detection (use smoothed points for consistency)
     # This ensures launch sections are detected based on the same geometry used for velocity calculation
-    ds_cumulative = np.zeros(n)
-    for i in range(1, n):
-        ds_cumulative[i] = ds_cumulative[i-1] + np.linalg.norm(points_smooth[i] - points_smooth[i-1])
+    ds_cumulative = geometry.arc_length
     
     # Determine which points are in launch sections
     in_launch = np.zeros(n, dtype=bool)
     launch_acceleration = np.zeros(n, dtype=float)  # Additional acceleration from launch
     
     if launch_sections is not None and len(launch_sections) > 0:
+        from utils.arc_length_track import ArcLengthTrack
+        track = ArcLengthTrack(points_smooth, arc_length=ds_cumulative)
         for launch_start_x, launch_end_x, target_speed in launch_sections:
-            # Find indices in launch section
-            in_launch_section = (ds_cumulative >= launch_start_x) & (ds_cumulative <= launch_end_x)
-            in_launch = in_launch | in_launch_section
+            # Points in the launch section (binary search on the arc length)
+            launch_indices = track.span(launch_start_x, launch_end_x)
+            in_launch[launch_indices] = True
             
-            if in_launch_section.any():
-                launch_indices = np.where(in_launch_section)[0]
-                if len(launch_indices) > 0:
-                    launch_length = launch_end_x - launch_start_x
-                    if launch_length > 0:
-                        # Calculate constant acceleration needed: a = (v_target² - v0²) / (2*d)
-                        # This will be applied as a force during integration
-                        a_launch_mag = (target_speed**2 - v0**2) / (2 * launch_length)
-                        launch_acceleration[launch_indices] = a_launch_mag
+            launch_length = launch_end_x - launch_start_x
+            if launch_length > 0:
+                # Calculate constant acceleration needed: a = (v_target² - v0²) / (2*d)
+                # This will be applied as a force during integration
+                a_launch_mag = (target_speed**2 - v0**2) / (2 * launch_length)
+                launch_acceleration[launch_indices] = a_launch_mag
     
     # Initialize velocity and acceleration arrays
     v_estimate = np.zeros(n, dtype=np.float64)
@@ -271,52 +481,25 @@ def compute_acc_profile(points: np.ndarray,
         # This is a hybrid approach that ensures realistic physics
         # Use smoothed points for height to match velocity calculation
         h = points_smooth[:, 2]  # Z-coordinate is vertical (use smoothed for consistency)
-        h_initial = h[0]
+        v_ref, h_initial = (v0, h[0]) if energy_ref is None else energy_ref
         energy_efficiency = 0.95  # 95% efficiency
         
         # Calculate energy-based speed estimate
-        v_energy = np.sqrt(np.maximum(0, v0**2 + 2 * G_NORM * (h_initial - h) * energy_efficiency))
+        v_energy = np.sqrt(np.maximum(0, v_ref**2 + 2 * G_NORM * (h_initial - h) * energy_efficiency))
         
         # Still integrate forces to get realistic acceleration profile
         # But use energy conservation to guide/validate the result
         if use_velocity_verlet:
             if NUMBA_AVAILABLE:
-                @njit(cache=True, fastmath=True)
-                def _integrate_with_launch_verlet(g_par_mag_arr, normal_mag_arr, launch_acc_arr, v0_val, dt_val, k_drag_val, mu_val):
-                    N = g_par_mag_arr.shape[0]
-                    v_out = np.zeros(N, dtype=np.float64)
-                    a_out = np.zeros(N, dtype=np.float64)
-                    v_out[0] = v0_val
-                    a_out[0] = 0.0
-                    a_prev = 0.0
-                    for i in range(1, N):
-                        # Compute forces: gravity, friction, drag, launch
-                        friction_acc_mag = mu_val * normal_mag_arr[i]
-                        drag_acc_mag = k_drag_val * v_out[i-1] * v_out[i-1]
-                        sign_motion = 1.0 if v_out[i-1] >= 0.0 else -1.0
-                        # Add launch acceleration if in launch section
-                        a_gravity = g_par_mag_arr[i]
-                        a_launch = launch_acc_arr[i]  # Additional acceleration from launch
-                        a_new = a_gravity + a_launch - sign_motion * (friction_acc_mag + drag_acc_mag)
-                        
-                        # Velocity-Verlet integration
-                        v_half = v_out[i-1] + 0.5 * a_prev * dt_val
-                        v_out[i] = v_half + 0.5 * a_new * dt_val
-                        if v_out[i] < 0.0 and abs(v_out[i]) < 1e-9:
-                            v_out[i] = 0.0
-                        
-                        a_out[i] = a_new
-                        a_prev = a_new
-                    return v_out, a_out
-                
-                v_estimate, a_tan = _integrate_with_launch_verlet(
+                v_estimate, a_tan = _integrate_speed_verlet(
                     g_par_mag.astype(np.float64), 
                     normal_mag.astype(np.float64),
                     launch_acceleration.astype(np.float64),
-                    float(v0), float(dt), k_drag, float(mu)
+                    float(v0), float(dt), k_drag, float(mu), float(a0)
                 )
             else:
-                a_prev = 0.0
+                a_tan[0] = a0
+                a_prev = float(a0)
                 for i in range(1, n):
                     friction_acc_mag = mu * normal_mag[i]
                     drag_acc_mag = k_drag * v_estimate[i-1]**2
@@ -337,6 +520,7 @@ def compute_acc_profile(points: np.ndarray,
         
         # Use energy conservation as a guide (blend with integrated result)
         # This ensures we don't violate energy conservation while still having realistic acceleration
+        v_int = v_estimate
         v_estimate = np.maximum(v_estimate, v_energy * 0.9)  # Allow some loss, but respect energy
     else:
         # Full physics integration: Forces → Acceleration → Velocity
@@ -345,42 +529,15 @@ def compute_acc_profile(points: np.ndarray,
             # v_half = v[i-1] + 0.5 * a[i-1] * dt
             # v[i] = v_half + 0.5 * a[i] * dt
             if NUMBA_AVAILABLE:
-                @njit(cache=True, fastmath=True)
-                def _integrate_speed_verlet(g_par_mag_arr, normal_mag_arr, launch_acc_arr, v0_val, dt_val, k_drag_val, mu_val):
-                    N = g_par_mag_arr.shape[0]
-                    v_out = np.zeros(N, dtype=np.float64)
-                    a_out = np.zeros(N, dtype=np.float64)
-                    v_out[0] = v0_val
-                    a_out[0] = 0.0
-                    a_prev = 0.0
-                    for i in range(1, N):
-                        # Compute forces: gravity, friction, drag, launch
-                        friction_acc_mag = mu_val * normal_mag_arr[i]
-                        drag_acc_mag = k_drag_val * v_out[i-1] * v_out[i-1]
-                        sign_motion = 1.0 if v_out[i-1] >= 0.0 else -1.0
-                        # Add launch acceleration if in launch section
-                        a_gravity = g_par_mag_arr[i]
-                        a_launch = launch_acc_arr[i]
-                        a_new = a_gravity + a_launch - sign_motion * (friction_acc_mag + drag_acc_mag)
-                        
-                        # Velocity-Verlet: half-step velocity update
-                        v_half = v_out[i-1] + 0.5 * a_prev * dt_val
-                        v_out[i] = v_half + 0.5 * a_new * dt_val
-                        if v_out[i] < 0.0 and abs(v_out[i]) < 1e-9:
-                            v_out[i] = 0.0
-                        
-                        a_out[i] = a_new
-                        a_prev = a_new
-                    return v_out, a_out
-
                 v_estimate, a_tan = _integrate_speed_verlet(
                     g_par_mag.astype(np.float64), 
                     normal_mag.astype(np.float64),
                     launch_acceleration.astype(np.float64),
-                    float(v0), float(dt), k_drag, float(mu)
+                    float(v0), float(dt), k_drag, float(mu), float(a0)
                 )
             else:
-                a_prev = 0.0
+                a_tan[0] = a0
+                a_prev = float(a0)
                 for i in range(1, n):
                     friction_acc_mag = mu * normal_mag[i]
                     drag_acc_mag = k_drag * v_estimate[i-1]**2
@@ -401,26 +558,6 @@ def compute_acc_profile(points: np.ndarray,
         else:
             # Legacy semi-implicit Euler (1st order, less accurate)
             if NUMBA_AVAILABLE:
-                @njit(cache=True, fastmath=True)
-                def _integrate_speed_euler(g_par_mag_arr, normal_mag_arr, launch_acc_arr, v0_val, dt_val, k_drag_val, mu_val):
-                    N = g_par_mag_arr.shape[0]
-                    v_out = np.zeros(N, dtype=np.float64)
-                    a_out = np.zeros(N, dtype=np.float64)
-                    v_out[0] = v0_val
-                    a_out[0] = 0.0
-                    for i in range(1, N):
-                        friction_acc_mag = mu_val * normal_mag_arr[i]
-                        drag_acc_mag = k_drag_val * v_out[i-1] * v_out[i-1]
-                        sign_motion = 1.0 if v_out[i-1] >= 0.0 else -1.0
-                        # Add launch acceleration if in launch section
-                        a_gravity = g_par_mag_arr[i]
-                        a_launch = launch_acc_arr[i]
-                        a_out[i] = a_gravity + a_launch - sign_motion * (friction_acc_mag + drag_acc_mag)
-                        v_out[i] = v_out[i-1] + a_out[i] * dt_val
-                        if v_out[i] < 0.0 and abs(v_out[i]) < 1e-9:
-                            v_out[i] = 0.0
-                    return v_out, a_out
-
                 v_estimate, a_tan = _integrate_speed_euler(
                     g_par_mag.astype(np.float64), 
                     normal_mag.astype(np.float64),
@@ -439,6 +576,7 @@ def compute_acc_profile(points: np.ndarray,
                     v_estimate[i] = v_estimate[i-1] + a_tan[i] * dt
                     if v_estimate[i] < 0 and abs(v_estimate[i]) < 1e-9:
                         v_estimate[i] = 0.0
+        v_int = v_estimate
 
     # Curvature-based centripetal acceleration
     # Define ez (vertical unit vector) for use in both methods
@@ -447,31 +585,12 @@ def compute_acc_profile(points: np.ndarray,
     # Choose curvature calculation method
     if curvature_method == 'circumcenter':
         # Geometric method (like Roller.py): more accurate for discrete points
-        R, centers = _curvature_radius_circumcenter(points_smooth)
-        # Use geometric normal direction: vector from point to circumcenter
+        R = geometry.radius
+        # Use geometric normal direction: vector from circumcenter to point
+        # (R >= 5 m keeps it well away from zero length)
         n_hat = np.zeros_like(e_tan)
-        valid = np.isfinite(R) & (R >= 5.0) & np.all(np.isfinite(centers), axis=1)
-        for i in np.where(valid)[0]:
-            R_vec = points_smooth[i] - centers[i]
-            R_norm = np.linalg.norm(R_vec)
-            if R_norm > 1e-9:
-                n_hat[i] = R_vec / R_norm
-            else:
-                # Fallback: use derivative of tangent
-                if i > 0 and i < n-1:
-                    d_el = e_tan[i+1] - e_tan[i-1]
-                    d_norm = np.linalg.norm(d_el)
-                    if d_norm > 1e-9:
-                        n_hat[i] = d_el / d_norm
-                    else:
-                        # Final fallback: horizontal normal
-                        lat = np.cross(ez, e_tan[i])
-                        lat_norm = np.linalg.norm(lat)
-                        n_hat[i] = lat / (lat_norm if lat_norm > 1e-9 else 1.0)
-                else:
-                    lat = np.cross(ez, e_tan[i])
-                    lat_norm = np.linalg.norm(lat)
-                    n_hat[i] = lat / (lat_norm if lat_norm > 1e-9 else 1.0)
+        valid = np.isfinite(R) & (R >= 5.0) & np.all(np.isfinite(geometry.centers), axis=1)
+        n_hat[valid] = -geometry.normals[valid]
     else:
         # Legacy finite difference method
         R = _curvature_radius_vectorized(points_smooth)
@@ -491,7 +610,6 @@ def compute_acc_profile(points: np.ndarray,
         n_hat[use_lat] = lat_hat[use_lat]
     
     # Compute centripetal acceleration
-    a_eq = np.zeros((n, 3), dtype=float)
     # Use minimum radius of 5m to prevent numerical explosion
     if curvature_method == 'circumcenter':
         valid = np.isfinite(R) & (R >= 5.0) & (np.linalg.norm(n_hat, axis=1) > 1e-9)
@@ -501,6 +619,13 @@ def compute_acc_profile(points: np.ndarray,
     # Most intense modern coasters max at 5-6g
     # Use v_estimate for centripetal calculation (will be refined below)
     a_cent_mag = np.clip(v_estimate[valid]**2 / R[valid], 0.0, 60.0)
+    # 1/m, 0 where straight
+    curvature = (geometry.curvature if curvature_method == 'circumcenter'
+                 else np.where(np.isfinite(R) & (R > 0), 1.0 / np.where(R > 0, R, 1.0), 0.0))
+    if compact:
+        return _compact_profile(channels, e_tan, n_hat, valid, a_cent_mag, v_estimate,
+                                points_smooth, curvature, dt, v0, v_int, a_tan)
+    a_eq = np.zeros((n, 3), dtype=float)
     a_eq[valid] = -(a_cent_mag[:, None] * n_hat[valid])
 
     # Total inertial acceleration and specific force
@@ -530,80 +655,9 @@ def compute_acc_profile(points: np.ndarray,
     # This gives the acceleration relative to free-fall (what an accelerometer measures)
     f_spec = a_tot - G_VEC
 
-    # Calculate 3D velocity from position differences (finite differences)
-    # This avoids accumulation errors - we take differences, not cumulative sum
-    # Use finite differences on positions: v = dp/dt
-    v_3d = np.zeros((n, 3), dtype=float)
-    
-    # Calculate position differences (displacements) between consecutive points
-    # This is the "difference" - we're NOT using cumsum, we're taking differences
-    dp = np.zeros((n, 3), dtype=float)
-    dp[1:] = points_smooth[1:] - points_smooth[:-1]
-    # For first point, use forward difference
-    dp[0] = dp[1] if n > 1 else np.array([0.0, 0.0, 0.0])
-    
-    # Calculate distance traveled between points
-    ds = np.linalg.norm(dp, axis=1)
-    
-    # Calculate velocity from position differences
-    # Use v_estimate to determine realistic time steps, then calculate v = dp/dt
-    # This ensures velocity is physically realistic and doesn't require infinite energy
-    dt_actual = np.zeros(n, dtype=float)
-    dt_actual[0] = dt  # Initial time step
-    
-    # Calculate time steps using v_estimate (which includes launch acceleration if applicable)
-    for i in range(1, n):
-        if ds[i] > 1e-6:  # Only if there's meaningful distance
-            # Use estimated speed to determine time step
-            # v_estimate already includes launch acceleration, so this gives realistic dt
-            v_est = v_estimate[i] if i < len(v_estimate) else (v_estimate[i-1] if i > 0 else v0)
-            v_est = max(v_est, 0.1)  # Minimum to avoid division by zero
-            dt_actual[i] = ds[i] / v_est
-            # Cap maximum time step to prevent unrealistic jumps
-            dt_actual[i] = min(dt_actual[i], 2.0)  # Max 2 seconds per segment
-        else:
-            dt_actual[i] = dt  # Default time step
-    
-    # Calculate velocity as finite difference: v = dp / dt
-    # This gives velocity from position changes using realistic time steps
-    dt_safe = np.where(dt_actual > 1e-9, dt_actual, dt)
-    v_3d = dp / dt_safe[:, None]
-    
-    # For first point, set initial velocity in tangent direction
-    v_3d[0] = v0 * e_tan[0]
-    
-    # Calculate speed as Euclidean magnitude of 3D velocity vector
-    v = np.linalg.norm(v_3d, axis=1)
-    v = np.maximum(v, 0.0)
-    
-    # Use v_estimate as the source of truth for speed
-    # v_estimate is calculated from physics (energy conservation + launch acceleration)
-    # This ensures realistic speeds that don't require infinite energy
-    # The velocity from position differences (v_3d) gives us direction, but speed comes from physics
-    v = v_estimate.copy()  # Use physics-based speed estimate (includes proper launch acceleration)
-    
-    # Apply light smoothing to speed to match track visualization smoothness
-    # This removes sharp edges that come from energy conservation formula (sqrt amplifies small height changes)
-    # Use a small sigma to preserve physics while matching visual smoothness
-    from scipy.ndimage import gaussian_filter1d
-    v_smooth = gaussian_filter1d(v, sigma=1.0, mode='nearest')
-    # Preserve initial and final values to maintain physics constraints
-    v_smooth[0] = v0
-    # Blend: use smoothed version but ensure it doesn't violate energy conservation too much
-    # Only smooth if the difference is small (preserve large changes from physics)
-    v_diff = np.abs(v_smooth - v)
-    v = np.where(v_diff < 0.5, v_smooth, v)  # Use smoothed if difference < 0.5 m/s, else keep original
-    
-    # Recalculate v_3d to have the correct magnitude (from smoothed v) while preserving direction
-    # This ensures speed matches physics while direction comes from track geometry
-    v_3d_norm = np.linalg.norm(v_3d, axis=1)
-    v_3d_norm = np.where(v_3d_norm > 1e-9, v_3d_norm, 1.0)
-    scale = v / v_3d_norm
-    v_3d = v_3d * scale[:, None]
-    
-    # Ensure v_3d[0] matches initial velocity
-    v_3d[0] = v0 * e_tan[0]
-    v[0] = v0
+    v = _smooth_speed(v_estimate, v0)
+    # v_3d only carries the direction of travel on top of v; skip it unless asked for
+    v_3d = _velocity_vectors(points_smooth, e_tan, v, dt, v0) if channels is None or 'v_3d' in channels else None
 
     # Local axes: longitudinal = tangent; vertical = global Z; lateral = cross(ez, tangent)
     long = np.zeros(n, dtype=float)
@@ -625,7 +679,7 @@ def compute_acc_profile(points: np.ndarray,
     f_lat[:]  = np.einsum('ij,ij->i', f_spec, lat_vec)
     f_vert[:] = f_spec[:, 2]
 
-    return {
+    profile = {
         'e_tan': e_tan,
         'v': v,  # Speed as Euclidean magnitude of 3D velocity
         'v_3d': v_3d,  # 3D velocity vector (x, y, z components)
@@ -642,4 +696,11 @@ def compute_acc_profile(points: np.ndarray,
         'f_long_g': f_long / G_NORM,
         'f_lat_g': f_lat / G_NORM,
         'f_vert_g': f_vert / G_NORM,
+        'curvature': curvature,
+        'v_int': v_int,
+        'a_int': a_tan,  # Integrated (force-model) acceleration, not the speed derivative above
+        'v_est': v_estimate,
     }
+    if channels is not None:
+        profile = {name: profile[name] for name in channels}
+    return profile
@@ -15,31 +15,42 @@ The transformation accounts for:
 import numpy as np
 import pandas as pd
 from utils.acceleration import compute_acc_profile
+from utils.track_geometry import TrackGeometry
 
+SAMPLE_DT = 0.02  # s; track points are read as 50 Hz samples
+STATION_SPEED = 3.0  # m/s; speed leaving the station (~ walking pace)
 
-def compute_track_derivatives(track_df):
+
+def _track_geometry(track_df, geometry=None):
+    """Shared TrackGeometry of a builder track DataFrame (built if not given)."""
+    if geometry is None:
+        x = track_df['x'].values
+        geometry = TrackGeometry.from_track(x, track_df['y'].values,
+                                            track_df.get('z', pd.Series(np.zeros_like(x))).values)
+    elif len(geometry) != len(track_df):
+        raise ValueError("geometry does not match track_df")
+    return geometry
+
+
+def compute_track_derivatives(track_df, geometry=None):
     """
     Compute velocity, acceleration, and curvature from track coordinates.
     
     Args:
         track_df: DataFrame with columns ['x', 'y'] (and optionally 'z')
+        geometry: Optional TrackGeometry of the track (arc length and tangents are reused)
         
     Returns:
         DataFrame with added columns for derivatives and motion parameters
     """
     df = track_df.copy()
+    geometry = _track_geometry(track_df, geometry)
     
     # Get coordinates
-    x = df['x'].values
     y = df['y'].values
-    z = df.get('z', pd.Series(np.zeros_like(x))).values
     
-    # Compute arc length (approximate)
-    dx = np.diff(x, prepend=x[0])
-    dy = np.diff(y, prepend=y[0])
-    dz = np.diff(z, prepend=z[0])
-    ds = np.sqrt(dx**2 + dy**2 + dz**2)
-    s = np.cumsum(ds)
+    # Arc length of the unsmoothed points
+    s = geometry.raw_arc_length
     
     # Compute velocity using pure energy conservation
     # Speed is determined by height changes and initial energy
@@ -58,25 +69,12 @@ def compute_track_derivatives(track_df):
     # Add small minimum velocity to avoid division by zero
     v = np.maximum(v, 0.1)
     
-    # Compute tangent vector (direction of motion)
-    # Smooth derivatives to avoid numerical noise
-    from scipy.ndimage import gaussian_filter1d
-    
-    dx_smooth = gaussian_filter1d(x, sigma=2, mode='nearest')
-    dy_smooth = gaussian_filter1d(y, sigma=2, mode='nearest')
-    dz_smooth = gaussian_filter1d(z, sigma=2, mode='nearest')
-    
-    dx_ds = np.gradient(dx_smooth)
-    dy_ds = np.gradient(dy_smooth)
-    dz_ds = np.gradient(dz_smooth)
-    
-    # Normalize tangent vector
-    tangent_mag = np.sqrt(dx_ds**2 + dy_ds**2 + dz_ds**2)
-    tangent_mag = np.maximum(tangent_mag, 1e-10)
-    
-    tangent_x = dx_ds / tangent_mag
-    tangent_y = dy_ds / tangent_mag
-    tangent_z = dz_ds / tangent_mag
+    # Compute tangent vector (direction of motion) from the smoothed points
+    # (sigma=2) to avoid numerical noise; geometry is Z-up, so y and z swap back
+    tangents = geometry.tangents
+    tangent_x = tangents[:, 0]
+    tangent_y = tangents[:, 2]
+    tangent_z = tangents[:, 1]
     
     # Store results
     df['arc_length'] = s
@@ -88,7 +86,7 @@ def compute_track_derivatives(track_df):
     return df
 
 
-def compute_rider_accelerations(track_df):
+def compute_rider_accelerations(track_df, geometry=None):
     """
     Compute accelerations in the rider's reference frame.
     
@@ -97,151 +95,47 @@ def compute_rider_accelerations(track_df):
     - Lateral: Left/right (perpendicular to track, horizontal)
     - Vertical: Up/down (perpendicular to track, includes gravity)
     
+    Tangents, curvature and normals come from the shared TrackGeometry, the
+    same ones compute_acc_profile uses; only the speed model differs.
+    
     Args:
         track_df: DataFrame with x, y coordinates and derivatives
+        geometry: Optional TrackGeometry of the track, shared with other consumers
         
     Returns:
         DataFrame with columns ['Lateral', 'Vertical', 'Longitudinal']
     """
-    df = compute_track_derivatives(track_df)
+    geometry = _track_geometry(track_df, geometry)
+    df = compute_track_derivatives(track_df, geometry=geometry)
     
     # Get track parameters
-    x = df['x'].values
-    y = df['y'].values
-    z = df.get('z', pd.Series(np.zeros_like(x))).values
     v = df['velocity'].values
     
-    tangent_x = df['tangent_x'].values
-    tangent_y = df['tangent_y'].values
-    tangent_z = df['tangent_z'].values
-    
     g = 9.81
     
     # Compute tangential acceleration (rate of speed change)
     dv_ds = np.gradient(v)
     a_tangential = dv_ds * v  # dv/dt = dv/ds * ds/dt = dv/ds * v
     
-    # Compute curvature and centripetal acceleration
-    # Curvature κ = |dT/ds| where T is the unit tangent
-    # Apply smoothing to reduce noise spikes at block joints
-    from scipy.ndimage import gaussian_filter1d
+    # Centripetal acceleration from the circumcircle radius of the smoothed
+    # track, directed along the principal normal (zero on straights). Same
+    # guards as compute_acc_profile: radii under 5 m are treated as numerical
+    # noise and the magnitude is capped at ~6g (60 m/s²)
+    R = geometry.radius
+    valid = np.isfinite(R) & (R >= 5.0)
+    a_centripetal = np.where(valid, np.clip(v**2 / np.where(valid, R, 1.0), 0.0, 60.0), 0.0)
     
-    tangent_x_smooth = gaussian_filter1d(tangent_x, sigma=1.5, mode='nearest')
-    tangent_y_smooth = gaussian_filter1d(tangent_y, sigma=1.5, mode='nearest')
-    tangent_z_smooth = gaussian_filter1d(tangent_z, sigma=1.5, mode='nearest')
-    
-    dt_x = np.gradient(tangent_x_smooth)
-    dt_y = np.gradient(tangent_y_smooth)
-    dt_z = np.gradient(tangent_z_smooth)
-    
-    curvature = np.sqrt(dt_x**2 + dt_y**2 + dt_z**2)
-    curvature = np.maximum(curvature, 1e-10)
-    
-    # Smooth the curvature itself to eliminate remaining spikes
-    curvature = gaussian_filter1d(curvature, sigma=1.0, mode='nearest')
-    
-    # Centripetal acceleration magnitude
-    a_centripetal = v**2 * curvature
-    
-    # Normal vector (points toward center of curvature)
-    # N = dT/ds / |dT/ds|
-    normal_x = dt_x / curvature
-    normal_y = dt_y / curvature
-    normal_z = dt_z / curvature
-    
-    # Smooth normal vectors to reduce discontinuities
-    normal_x = gaussian_filter1d(normal_x, sigma=1.0, mode='nearest')
-    normal_y = gaussian_filter1d(normal_y, sigma=1.0, mode='nearest')
-    normal_z = gaussian_filter1d(normal_z, sigma=1.0, mode='nearest')
-    
-    # Re-normalize after smoothing
-    normal_mag = np.sqrt(normal_x**2 + normal_y**2 + normal_z**2)
-    normal_mag = np.maximum(normal_mag, 1e-10)
-    normal_x /= normal_mag
-    normal_y /= normal_mag
-    normal_z /= normal_mag
-    
-    # Binormal vector (perpendicular to both tangent and normal)
-    # B = T × N (use smoothed tangents)
-    binormal_x = tangent_y_smooth * normal_z - tangent_z_smooth * normal_y
-    binormal_y = tangent_z_smooth * normal_x - tangent_x_smooth * normal_z
-    binormal_z = tangent_x_smooth * normal_y - tangent_y_smooth * normal_x
-    
-    # Normalize binormal
-    binormal_mag = np.sqrt(binormal_x**2 + binormal_y**2 + binormal_z**2)
-    binormal_mag = np.maximum(binormal_mag, 1e-10)
-    
-    binormal_x /= binormal_mag
-    binormal_y /= binormal_mag
-    binormal_z /= binormal_mag
-    
-    # Transform to Z-up coordinate system (matching app_builder and compute_acc_profile)
-    # Original coordinates: x=forward, y=vertical, z=lateral
-    # Z-up coordinates: x=forward, y=lateral, z=vertical
-    # Transformation: (x, y, z) -> (x, z, y)
-    
-    # Transform tangent vectors to Z-up
-    tangent_x_up = tangent_x  # Forward stays same
-    tangent_y_up = tangent_z  # Lateral (old z) becomes y
-    tangent_z_up = tangent_y  # Vertical (old y) becomes z
-    
-    # Transform normal vectors to Z-up
-    normal_x_up = normal_x
-    normal_y_up = normal_z
-    normal_z_up = normal_y
-    
-    # Transform binormal vectors to Z-up
-    # Original: binormal = [bx, by, bz] where by is lateral (Y in original = lateral)
-    # Z-up: we want binormal to point in Y direction (lateral in Z-up)
-    # Transformation: (x, y, z) -> (x, z, y)
-    # So: binormal_up = [bx, bz, by]
-    # But wait - in original coords, for 2D track:
-    #   - binormal points in Y direction (lateral) = [0, by, 0]
-    #   - After transform: [0, 0, by] which is Z direction (wrong!)
-    # We need binormal to point in Y direction (lateral) in Z-up coords
-    # So: binormal_up = [bx, by, bz] where by (original lateral) becomes Y (Z-up lateral)
-    # Actually, the correct transformation is:
-    #   Original binormal [bx, by, bz] -> Z-up [bx, bz, by]
-    #   But for 2D track, binormal = [0, by, 0], so we get [0, 0, by] which is wrong
-    # The issue is that binormal in original coords points in Y (lateral)
-    # In Z-up coords, lateral is Y, so binormal should be [0, by, 0] in Z-up
-    # So we need: binormal_up = [bx, by, bz] (no swap, because by is already lateral)
-    # Wait, let me think again...
-    # Original: (x, y, z) = (forward, vertical, lateral)
-    # Z-up: (x, y, z) = (forward, lateral, vertical)
-    # Binormal in original: points in Y direction (which is vertical in original, but lateral in Z-up? No!)
-    # Actually, in original coords, Y is vertical, Z is lateral
-    # Binormal = T × N, where T and N are in XZ plane (forward-vertical plane)
-    # So binormal points in Y direction (perpendicular to XZ plane)
-    # But Y in original is vertical, not lateral!
-    # For a 2D track in XZ plane, binormal should point in the direction perpendicular to the plane
-    # In original coords, that's Y (vertical direction)
-    # But we want lateral, which is Z in original coords
-    # So the binormal calculation is wrong for 2D tracks!
-    # Actually, for a 2D track in the XZ plane:
-    #   - T = [tx, ty, tz] but ty=0 (no vertical component in original? No, ty is vertical!)
-    #   - For track in XZ plane: T = [tx, 0, tz] where tx is forward, tz is... wait
-    # Let me reconsider: track is in XY plane (forward-vertical), so Z is lateral
-    # T = [tx, ty, 0] where tx is forward, ty is vertical
-    # N is also in XY plane
-    # Binormal = T × N = [0, 0, something] which points in Z direction (lateral) - correct!
-    # After transform to Z-up: (x, y, z) -> (x, z, y)
-    # Binormal [0, 0, bz] -> [0, bz, 0] which is Y direction (lateral) in Z-up - correct!
-    # So the transformation should be: [bx, by, bz] -> [bx, bz, by]
-    binormal_x_up = binormal_x
-    binormal_y_up = binormal_z  # Original Z (lateral) becomes Y (lateral in Z-up)
-    binormal_z_up = binormal_y  # Original Y (vertical) becomes Z (vertical in Z-up)
+    # Tangent and normal vectors, already in Z-up coordinates
+    # (x=forward, y=lateral, z=vertical, matching compute_acc_profile)
+    tangent = geometry.tangents
+    normal = geometry.normals
     
     # Gravity vector in Z-up coordinate system (Z-down convention, matching compute_acc_profile)
     gravity = np.array([0, 0, -g])
     
     # Total acceleration in world frame (Z-up coordinates)
     # a_total = a_tangential * T + a_centripetal * N
-    a_world = np.stack([
-        a_tangential * tangent_x_up + a_centripetal * normal_x_up,
-        a_tangential * tangent_y_up + a_centripetal * normal_y_up,
-        a_tangential * tangent_z_up + a_centripetal * normal_z_up
-    ], axis=1)
+    a_world = a_tangential[:, None] * tangent + a_centripetal[:, None] * normal
 
     # Subtract gravity vector to get specific force (what the rider feels)
     # This matches the advanced model convention (Z-up, Z-down gravity)
@@ -250,14 +144,11 @@ def compute_rider_accelerations(track_df):
     # Project specific force onto rider axes (in Z-up coordinates)
     # Use same lateral axis calculation as advanced model: cross(ez, tangent)
     # This ensures consistency and correct handling of 2D tracks
-    tangent = np.stack([tangent_x_up, tangent_y_up, tangent_z_up], axis=1)
     ez = np.array([0.0, 0.0, 1.0])  # Z-up unit vector
     lat_vec = np.cross(ez, tangent)  # Lateral axis (same as advanced model)
     lat_norm = np.linalg.norm(lat_vec, axis=1, keepdims=True)
     lat_vec = lat_vec / np.where(lat_norm < 1e-9, 1.0, lat_norm)
     
-    normal = np.stack([normal_x_up, normal_y_up, normal_z_up], axis=1)
-
     a_longitudinal = np.einsum('ij,ij->i', a_spec, tangent)
     a_lateral = np.einsum('ij,ij->i', a_spec, lat_vec)  # Use cross(ez, tangent) like advanced model
     # Vertical is the Z component of specific force (Z-up convention, matching compute_acc_profile)
@@ -287,7 +178,49 @@ def compute_rider_accelerations(track_df):
     return result_df
 
 
-def track_to_accelerometer_data(track_df, mass=1200.0, rho=1.0, Cd=0.08, A=2.5, mu=0.001):
+def accelerometer_frame(acc_result):
+    """
+    Wearable-style accelerometer DataFrame from compute_acc_profile outputs.
+
+    Args:
+        acc_result: dict with 'f_lat_g', 'f_vert_g', 'f_long_g' and 'curvature'
+
+    Returns:
+        DataFrame with columns ['Time', 'Lateral', 'Vertical', 'Longitudinal'],
+        track curvature in attrs['curvature']
+    """
+    # Extract specific force in g-units (what accelerometer measures)
+    # acceleration.py returns f_long_g, f_lat_g, f_vert_g
+    n = len(acc_result['f_vert_g'])
+    
+    # Clip extreme values to prevent physics simulation artifacts
+    # Set to ±10g to allow visibility of intense forces while filtering numerical spikes
+    lateral = np.clip(acc_result['f_lat_g'], -10.0, 10.0)
+    vertical = np.clip(acc_result['f_vert_g'], -10.0, 10.0)
+    longitudinal = np.clip(acc_result['f_long_g'], -10.0, 10.0)
+    
+    # Apply moderate Gaussian smoothing to reduce numerical oscillations
+    # Balances smoothness with peak force preservation for realistic coaster feel
+    from scipy.ndimage import gaussian_filter1d
+    sigma_smooth = 2.0  # Moderate smoothing (~100ms window at 50Hz)
+    # Similar to real accelerometer response time
+    lateral = gaussian_filter1d(lateral, sigma=sigma_smooth, mode='nearest')
+    vertical = gaussian_filter1d(vertical, sigma=sigma_smooth, mode='nearest')
+    longitudinal = gaussian_filter1d(longitudinal, sigma=sigma_smooth, mode='nearest')
+    
+    accel_df = pd.DataFrame({
+        'Time': np.linspace(0, n * SAMPLE_DT, n),
+        'Lateral': lateral,          # Side-to-side
+        'Vertical': vertical,        # Up-down (includes gravity effect)
+        'Longitudinal': longitudinal # Forward-backward
+    })
+    # Per-point track curvature (1/m) for consumers that would otherwise recompute it
+    accel_df.attrs['curvature'] = acc_result['curvature']
+    return accel_df
+
+
+def track_to_accelerometer_data(track_df, mass=1200.0, rho=1.0, Cd=0.08, A=2.5, mu=0.001, geometry=None,
+                                compact=False):
     """
     Convert track coordinates to accelerometer readings for LightGBM model.
     
@@ -297,12 +230,18 @@ def track_to_accelerometer_data(track_df, mass=1200.0, rho=1.0, Cd=0.08, A=2.5,
     
     Args:
         track_df: DataFrame with columns ['x', 'y'] from build_modular_track()
+        geometry: Optional TrackGeometry of the track (see utils.track_geometry);
+                  built here if omitted
+        compact: Run the physics in its float32 compact mode and return float32
+                 channels (for batch sweeps; see compute_acc_profile)
         
     Returns:
         DataFrame with columns ['Time', 'Lateral', 'Vertical', 'Longitudinal']
         matching the format of real wearable accelerometer data
     """
     try:
+        geometry = _track_geometry(track_df, geometry)
+
         # Prepare 3D points array for acceleration.py (expects Nx3 numpy array)
         x = track_df['x'].values
         y = track_df['y'].values
@@ -311,62 +250,39 @@ def track_to_accelerometer_data(track_df, mass=1200.0, rho=1.0, Cd=0.08, A=2.5,
         # Stack into Nx3 array with z-up convention (acceleration.py uses z as vertical)
         # Our coordinates: x=forward, y=vertical, z=lateral
         # acceleration.py expects: x=forward, y=lateral, z=vertical
-        # So we map: (x, y, z) -> (x, z, y)
-        points = np.column_stack([x, z, y])  # (forward, lateral, vertical)
+        # So we map: (x, y, z) -> (x, z, y) (TrackGeometry.points uses the same layout)
+        points = geometry.points  # (forward, lateral, vertical)
         
         # Initial speed: let energy conservation handle it naturally
         # Start at near-zero speed (3 m/s ~ walking pace at station)
         # Energy will build from lift hill height automatically
-        v0 = 3.0  # m/s (station/lift start speed)
+        v0 = STATION_SPEED  # m/s (station/lift start speed)
         
         # Compute acceleration profile using realistic physics
         # Use provided physics parameters (or defaults)
         acc_result = compute_acc_profile(
             points,
-            dt=0.02,           # 50Hz sampling
+            dt=SAMPLE_DT,      # 50Hz sampling
             mass=mass,         # Train mass (kg) - parameterized
             rho=rho,           # Air density (kg/m³) - parameterized
             Cd=Cd,             # Drag coefficient - parameterized
             A=A,               # Frontal area (m²) - parameterized
             mu=mu,             # Rolling friction - parameterized
             v0=v0,             # Initial speed (m/s) - calculated above
-            use_energy_conservation=True  # Use energy-based speeds for reliability
+            use_energy_conservation=True,  # Use energy-based speeds for reliability
+            geometry=geometry,  # Smoothed points, tangents and curvature computed once
+            channels=('f_lat_g', 'f_vert_g', 'f_long_g', 'curvature') if compact else None,
+            compact=compact
         )
         
-        # Extract specific force in g-units (what accelerometer measures)
-        # acceleration.py returns f_long_g, f_lat_g, f_vert_g
-        n = len(x)
-        
-        # Clip extreme values to prevent physics simulation artifacts
-        # Set to ±10g to allow visibility of intense forces while filtering numerical spikes
-        lateral = np.clip(acc_result['f_lat_g'], -10.0, 10.0)
-        vertical = np.clip(acc_result['f_vert_g'], -10.0, 10.0)
-        longitudinal = np.clip(acc_result['f_long_g'], -10.0, 10.0)
-        
-        # Apply moderate Gaussian smoothing to reduce numerical oscillations
-        # Balances smoothness with peak force preservation for realistic coaster feel
-        from scipy.ndimage import gaussian_filter1d
-        sigma_smooth = 2.0  # Moderate smoothing (~100ms window at 50Hz)
-        # Similar to real accelerometer response time
-        lateral = gaussian_filter1d(lateral, sigma=sigma_smooth, mode='nearest')
-        vertical = gaussian_filter1d(vertical, sigma=sigma_smooth, mode='nearest')
-        longitudinal = gaussian_filter1d(longitudinal, sigma=sigma_smooth, mode='nearest')
-        
-        accel_df = pd.DataFrame({
-            'Time': np.linspace(0, n * 0.02, n),
-            'Lateral': lateral,          # Side-to-side
-            'Vertical': vertical,        # Up-down (includes gravity effect)
-            'Longitudinal': longitudinal # Forward-backward
-        })
-        
-        return accel_df
+        return accelerometer_frame(acc_result)
     
     except Exception as e:
         print(f"Warning: Realistic physics failed ({e}), falling back to energy conservation...")
         
         # Fallback to the original energy conservation method
         try:
-            accel_df = compute_rider_accelerations(track_df)
+            accel_df = compute_rider_accelerations(track_df, geometry=geometry)
             accel_df = accel_df[['Time', 'Lateral', 'Vertical', 'Longitudinal']]
             return accel_df
         except Exception as e2:
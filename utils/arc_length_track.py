@@ -0,0 +1,114 @@
+"""
+Track polyline parameterized by arc length.
+
+"Where is the train at distance s" comes up in several places: launch
+sections in `compute_acc_profile`, block boundary markers in the builder
+plots and the segment lookup of the ride simulator (`utils.roller_sim`).
+`ArcLengthTrack` keeps the cumulative arc length of the points and answers
+these queries for arrays of distances with one `np.searchsorted` each
+(O(log n) per query) instead of scanning the track.
+"""
+
+from functools import cached_property
+from typing import Optional
+
+import numpy as np
+
+from utils.acceleration import _tangents
+
+
+class ArcLengthTrack:
+    """
+    Piecewise-linear track indexed by arc length.
+
+    Args:
+        points: Nx3 track points (any axis convention), ordered along the track
+        block_index: Optional block of every point (assemble_track(return_block_index=True))
+        arc_length: Optional precomputed cumulative arc length of `points`
+                    (e.g. TrackGeometry.arc_length); computed if omitted
+
+    Attributes:
+        arc_length: Cumulative arc length of the points (m, starts at 0)
+        length: Total length (m)
+
+    Queries take a scalar or an array of distances s (clipped to [0, length])
+    and return one result per distance.
+    """
+
+    def __init__(self, points: np.ndarray, block_index=None, arc_length: Optional[np.ndarray] = None):
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != 3 or points.shape[0] < 2:
+            raise ValueError("points must be an Nx3 array with N>=2")
+        if arc_length is not None and len(arc_length) != len(points):
+            raise ValueError("arc_length must have one entry per point")
+        if block_index is not None:
+            block_index = np.asarray(block_index)
+            if len(block_index) != len(points):
+                raise ValueError("block_index must have one entry per point")
+        self.points = points
+        self.block_index = block_index
+        if arc_length is None:
+            arc_length = np.concatenate(([0.0], np.cumsum(self.segment_lengths)))
+        self.arc_length = np.asarray(arc_length, dtype=float)
+
+    @classmethod
+    def from_track(cls, x, y, z=None, block_index=None) -> 'ArcLengthTrack':
+        """Build from builder coordinates (x, y vertical, z lateral; z defaults to 0)."""
+        x = np.asarray(x, dtype=float)
+        z = np.zeros_like(x) if z is None else np.asarray(z, dtype=float)
+        return cls(np.column_stack([x, np.asarray(y, dtype=float), z]), block_index=block_index)
+
+    def __len__(self) -> int:
+        return self.points.shape[0]
+
+    @property
+    def length(self) -> float:
+        return float(self.arc_length[-1])
+
+    @cached_property
+    def segment_lengths(self) -> np.ndarray:
+        return np.linalg.norm(np.diff(self.points, axis=0), axis=1)
+
+    @cached_property
+    def directions(self) -> np.ndarray:
+        """Unit direction of every segment; zero-length segments use the point tangent."""
+        seg = np.diff(self.points, axis=0)
+        degenerate = self.segment_lengths < 1e-9
+        directions = seg / np.where(degenerate, 1.0, self.segment_lengths)[:, None]
+        directions[degenerate] = _tangents(self.points)[1:][degenerate]
+        return directions
+
+    def segment(self, s):
+        """Index of the segment containing distance s (the last one starting at or before s)."""
+        k = np.searchsorted(self.arc_length, s, side='right') - 1
+        return np.clip(k, 0, len(self) - 2)
+
+    def position(self, s) -> np.ndarray:
+        """Point at distance s along the track."""
+        s = np.clip(s, 0.0, self.length)
+        k = self.segment(s)
+        return self.points[k] + (s - self.arc_length[k])[..., None] * self.directions[k]
+
+    def tangent(self, s) -> np.ndarray:
+        """Unit direction of travel at distance s."""
+        return self.directions[self.segment(np.clip(s, 0.0, self.length))]
+
+    def block_at(self, s):
+        """Block (see block_index) the track belongs to at distance s."""
+        if self.block_index is None:
+            raise ValueError("track has no block_index")
+        return self.block_index[self.segment(np.clip(s, 0.0, self.length))]
+
+    def span(self, s_start: float, s_end: float) -> slice:
+        """Points with s_start <= arc length <= s_end, as a slice."""
+        start = int(np.searchsorted(self.arc_length, s_start, side='left'))
+        stop = int(np.searchsorted(self.arc_length, s_end, side='right'))
+        return slice(start, max(start, stop))
+
+    @property
+    def block_starts(self) -> np.ndarray:
+        """Distance at which every block begins, in track order."""
+        if self.block_index is None:
+            raise ValueError("track has no block_index")
+        first = np.concatenate(([True], np.diff(self.block_index) != 0))
+        return self.arc_length[first]
@@ -0,0 +1,163 @@
+"""
+Server-side store for the large arrays of a builder session.
+
+Streamlit keeps `st.session_state` in server memory for every open browser
+tab. The builder used to put the full track (x/y/z), the accelerometer
+DataFrame and the curvature there, so memory grew with every concurrent user,
+even when many of them had loaded the same template.
+
+`ArrayStore` keeps NumPy buffers keyed by a hash of their content (dtype,
+shape and bytes), and session_state only holds the small handles returned by
+`put`. Identical arrays are stored once, whichever session put them, and the
+least recently used buffers are evicted once the store exceeds `max_bytes`.
+A handle whose buffer was evicted reads back as missing (KeyError); callers
+recompute, as they would after a cleared session.
+
+Stored arrays are read-only; copy them before modifying in place.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ArrayHandle:
+    """Reference to one stored array (content hash plus shape and dtype)."""
+    key: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+    def __len__(self) -> int:
+        return self.shape[0] if self.shape else 0
+
+
+@dataclass(frozen=True)
+class FrameHandle:
+    """Reference to a stored DataFrame: one array per column, plus array-valued attrs."""
+    columns: Tuple[Tuple[str, ArrayHandle], ...]
+    index: Optional[ArrayHandle]  # None for the default RangeIndex
+    attrs: Tuple[Tuple[str, object], ...]  # ndarray values are stored as ArrayHandle
+
+    def __len__(self) -> int:
+        return len(self.columns[0][1]) if self.columns else 0
+
+
+def content_key(array: np.ndarray) -> str:
+    """Hash of an array's dtype, shape and bytes."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(array.dtype.str.encode())
+    h.update(str(array.shape).encode())
+    h.update(np.ascontiguousarray(array).view(np.uint8).reshape(-1).data)
+    return h.hexdigest()
+
+
+class ArrayStore:
+    """
+    Thread-safe content-addressed LRU store of NumPy arrays.
+
+    Args:
+        max_bytes: Evict least recently used arrays above this total size
+
+    Usage:
+        handle = store.put(x)          # small, hashable, safe for session_state
+        x = store.get(handle)          # read-only array (KeyError once evicted)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._arrays: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._counts = {'puts': 0, 'shared': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def put(self, array) -> ArrayHandle:
+        """Store an array (or anything np.asarray accepts) and return its handle."""
+        array = np.asarray(array)
+        if array.dtype == object:
+            raise TypeError("ArrayStore only holds numeric arrays, not object arrays")
+        key = content_key(array)
+        with self._lock:
+            self._counts['puts'] += 1
+            if key in self._arrays:
+                self._counts['shared'] += 1
+                self._arrays.move_to_end(key)
+            else:
+                stored = np.array(array, copy=True)
+                stored.flags.writeable = False
+                self._arrays[key] = stored
+                self._bytes += stored.nbytes
+                self._evict(keep=key)
+        return ArrayHandle(key, tuple(array.shape), array.dtype.str)
+
+    def get(self, handle: ArrayHandle) -> np.ndarray:
+        """The stored (read-only) array; KeyError if it has been evicted."""
+        with self._lock:
+            array = self._arrays.get(handle.key)
+            if array is None:
+                self._counts['misses'] += 1
+                raise KeyError(f"array {handle.key} is no longer in the store")
+            self._counts['hits'] += 1
+            self._arrays.move_to_end(handle.key)
+            return array
+
+    def __contains__(self, handle) -> bool:
+        with self._lock:
+            return getattr(handle, 'key', None) in self._arrays
+
+    def _evict(self, keep: str):
+        while self._bytes > self.max_bytes and len(self._arrays) > 1:
+            key, array = next(iter(self._arrays.items()))
+            if key == keep:
+                break
+            del self._arrays[key]
+            self._bytes -= array.nbytes
+            self._counts['evictions'] += 1
+
+    def put_frame(self, df: pd.DataFrame) -> FrameHandle:
+        """Store every column (and ndarray attrs) of a numeric DataFrame."""
+        columns = tuple((name, self.put(df[name].to_numpy())) for name in df.columns)
+        default_index = isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+        index = None if default_index else self.put(df.index.to_numpy())
+        attrs = tuple((name, self.put(value) if isinstance(value, np.ndarray) else value)
+                      for name, value in df.attrs.items())
+        return FrameHandle(columns, index, attrs)
+
+    def get_frame(self, handle: FrameHandle) -> pd.DataFrame:
+        """Rebuild a stored DataFrame (a writable copy); KeyError if any part was evicted."""
+        data = {name: self.get(column) for name, column in handle.columns}
+        index = self.get(handle.index) if handle.index is not None else None
+        df = pd.DataFrame(data, index=index, columns=[name for name, _ in handle.columns], copy=True)
+        for name, value in handle.attrs:
+            df.attrs[name] = self.get(value).copy() if isinstance(value, ArrayHandle) else value
+        return df
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of all stored arrays."""
+        return self._bytes
+
+    def stats(self) -> Dict[str, int]:
+        """Arrays and bytes held, plus put/get counters (`shared`: puts of content already stored)."""
+        with self._lock:
+            return {'arrays': len(self._arrays), 'bytes': self._bytes, **self._counts}
+
+    def clear(self):
+        with self._lock:
+            self._arrays.clear()
+            self._bytes = 0
+
+
+# One store per server process, shared by all sessions
+ARRAY_STORE = ArrayStore()
@@ -0,0 +1,386 @@
+"""
+Gradient-free tuning of block parameters (CMA-ES).
+
+A fixed block sequence is treated as a vector of its numeric parameters
+(heights, diameters, lengths, speed_boost, ...) within the builder slider
+ranges. Each generation is evaluated as a batch: geometry and physics run on
+a process pool, candidates that fail `check_gforce_safety` are rejected before
+the LightGBM stage, and the survivors are rated in a single booster call.
+
+Example:
+    from utils.block_optimizer import optimize_block_params
+    from utils.track_assembly import DEFAULT_TRACK_SEQUENCE
+    result = optimize_block_params(DEFAULT_TRACK_SEQUENCE, generations=20, workers=4)
+    result['best']['sequence'], result['pareto']
+"""
+
+import copy
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.design_sweep import COMPACT_PHYSICS, PARAM_RANGES
+from utils.lgbm_predictor import compute_lightgbm_features, predict_scores_from_features
+from utils.scoring import DEFAULT_PHYSICS, check_gforce_safety, estimate_track_metadata
+from utils.track_assembly import assemble_track
+
+# Fitness offset of rejected (unsafe) candidates: always below any safe design,
+# but still ordered by safety score so the search is pulled back toward safety.
+REJECTED_FITNESS_OFFSET = -10.0
+# Fun rating fed to the surrogate for candidates rejected before the LightGBM
+# stage (the rating scale's floor), so it learns where the unsafe designs are
+REJECTED_FUN_RATING = 1.0
+
+
+def parameter_space(sequence: Sequence[Dict],
+                    bounds: Optional[Dict[str, Dict[str, Sequence[float]]]] = None) -> List[Dict]:
+    """
+    Tunable parameters of a block sequence.
+
+    Args:
+        sequence: Block sequence ({'type', 'params'} dicts)
+        bounds: Per-type overrides of PARAM_RANGES, {block_type: {param: (lo, hi) or (lo, hi, step)}}
+
+    Returns:
+        One dict per dimension: block index, param name, lo, hi, integer flag,
+        start value and the slider grid (origin, step) decoded values snap to
+        (step None for parameters without a slider)
+    """
+    space = []
+    for idx, block in enumerate(sequence):
+        sliders = PARAM_RANGES.get(block['type'], {})
+        ranges = dict(sliders)
+        ranges.update((bounds or {}).get(block['type'], {}))
+        for name, spec in ranges.items():
+            lo, hi = float(spec[0]), float(spec[1])
+            # The builder's sliders start at their minimum; an override without a
+            # step narrows the range but keeps the slider's grid
+            if len(spec) > 2:
+                origin, step = lo, float(spec[2])
+            elif name in sliders:
+                origin, step = float(sliders[name][0]), float(sliders[name][2])
+            else:
+                origin, step = lo, None
+            start = float(np.clip(block['params'].get(name, (lo + hi) / 2.0), lo, hi))
+            space.append({
+                'block': idx,
+                'param': name,
+                'lo': lo,
+                'hi': hi,
+                'integer': all(float(v).is_integer() for v in spec) and (step is None or step.is_integer()),
+                'start': start,
+                'origin': origin,
+                'step': step,
+            })
+    return space
+
+
+def _snap(param: float, dim: Dict) -> float:
+    """Nearest point of the dimension's slider grid within [lo, hi] (unchanged without a grid)."""
+    step = dim.get('step')
+    if not step:
+        return param
+    origin = dim['origin']
+    k_min = int(np.ceil((dim['lo'] - origin) / step - 1e-9))
+    k_max = int(np.floor((dim['hi'] - origin) / step + 1e-9))
+    if k_min > k_max:
+        return param
+    k = min(max(int(round((param - origin) / step)), k_min), k_max)
+    return round(origin + k * step, 6)
+
+
+def vector_to_sequence(u: np.ndarray, sequence: Sequence[Dict], space: List[Dict]) -> List[Dict]:
+    """
+    Map a normalized vector (each entry in [0, 1]) back onto a copy of the sequence.
+
+    Values snap to the builder's slider grid, so every decoded design can be
+    rebuilt in the UI.
+    """
+    new_sequence = [{'type': b['type'], 'params': copy.deepcopy(b['params'])} for b in sequence]
+    for value, dim in zip(np.clip(u, 0.0, 1.0), space):
+        param = _snap(dim['lo'] + float(value) * (dim['hi'] - dim['lo']), dim)
+        new_sequence[dim['block']]['params'][dim['param']] = int(round(param)) if dim['integer'] else param
+    return new_sequence
+
+
+def simulate_candidate(sequence: Sequence[Dict], physics: Optional[Dict[str, float]] = None,
+                       force_end_level: bool = False, min_safety: float = 3.0) -> Dict:
+    """
+    Geometry + physics + safety gate for one candidate (no LightGBM call).
+
+    Returns:
+        dict with 'safety' (score, level, g extremes), 'rejected' and, for
+        candidates passing the gate, the LightGBM 'features' vector
+    """
+    from utils.accelerometer_transform import track_to_accelerometer_data
+
+    try:
+        x, y, z = assemble_track(sequence, force_end_level=force_end_level)
+        params = dict(DEFAULT_PHYSICS)
+        params.update(physics or {})
+        accel_df = track_to_accelerometer_data(pd.DataFrame({'x': x, 'y': y, 'z': z}),
+                                               compact=COMPACT_PHYSICS, **params)
+        if accel_df is None or len(accel_df) <= 10:
+            raise ValueError("physics simulation produced no usable samples")
+        safety = check_gforce_safety(accel_df)
+    except Exception as e:
+        return {'error': f'{type(e).__name__}: {e}', 'rejected': True}
+
+    result = {
+        'safety': {
+            'score': float(safety['safety_score']),
+            'level': safety['level'],
+            'max_vertical': float(safety['max_vertical']),
+            'min_vertical': float(safety['min_vertical']),
+            'max_lateral': float(safety['max_lateral']),
+            'max_longitudinal': float(safety['max_longitudinal']),
+        },
+        'rejected': bool(safety['dangers']) or safety['safety_score'] < min_safety,
+    }
+    if not result['rejected']:
+        result['features'] = compute_lightgbm_features(accel_df, metadata=estimate_track_metadata(x, y, z))
+    return result
+
+
+def _simulate_batch(sequences, physics, force_end_level, min_safety):
+    return [simulate_candidate(seq, physics, force_end_level, min_safety) for seq in sequences]
+
+
+def pareto_front(candidates: List[Dict]) -> List[Dict]:
+    """Non-dominated candidates on (fun_rating, safety score), both maximized; sorted by fun."""
+    points = sorted(candidates, key=lambda c: (-c['fun_rating'], -c['safety']['score']))
+    front = []
+    best_safety = -np.inf
+    for cand in points:
+        if cand['safety']['score'] > best_safety:
+            front.append(cand)
+            best_safety = cand['safety']['score']
+    return front
+
+
+class CMAES:
+    """
+    Minimal (mu/mu_w, lambda) CMA-ES maximizing a fitness over [0, 1]^n.
+
+    Args:
+        x0: Initial mean (normalized)
+        sigma0: Initial step size
+        popsize: Candidates per generation (default 4 + 3 ln n)
+        seed: RNG seed
+    """
+
+    def __init__(self, x0: np.ndarray, sigma0: float = 0.2, popsize: Optional[int] = None,
+                 seed: Optional[int] = None):
+        n = len(x0)
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.mean = np.asarray(x0, dtype=float).copy()
+        self.sigma = float(sigma0)
+        self.popsize = popsize or 4 + int(3 * np.log(n))
+        self.mu = self.popsize // 2
+
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, np.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n * n))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.C = np.eye(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.generation = 0
+
+    def ask(self) -> np.ndarray:
+        """Sample one generation, clipped to the unit box; shape (popsize, n)."""
+        z = self.rng.standard_normal((self.popsize, self.n))
+        return np.clip(self.mean + self.sigma * (z * self.D) @ self.B.T, 0.0, 1.0)
+
+    def tell(self, candidates: np.ndarray, fitness: np.ndarray):
+        """Update the distribution from evaluated candidates (higher fitness is better)."""
+        order = np.argsort(-np.asarray(fitness))[:self.mu]
+        old_mean = self.mean
+        self.mean = self.weights @ candidates[order]
+
+        y = (candidates[order] - old_mean) / self.sigma
+        y_w = (self.mean - old_mean) / self.sigma
+        inv_sqrt_c = self.B @ np.diag(1 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + np.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt_c @ y_w
+        self.generation += 1
+        hsig = (np.linalg.norm(self.ps) / np.sqrt(1 - (1 - self.cs) ** (2 * self.generation))
+                < (1.4 + 2 / (self.n + 1)) * self.chi_n)
+        self.pc = (1 - self.cc) * self.pc + hsig * np.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+        rank_mu = (self.weights[:, None] * y).T @ y
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * rank_mu)
+        self.sigma *= np.exp((self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chi_n - 1))
+
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+        eigvals, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigvals, 1e-20))
+
+
+def optimize_block_params(sequence: Sequence[Dict], generations: int = 15,
+                          popsize: Optional[int] = None, sigma0: float = 0.2,
+                          min_safety: float = 3.0, target_rating: Optional[float] = None,
+                          workers: int = 1, seed: Optional[int] = None,
+                          physics: Optional[Dict[str, float]] = None,
+                          force_end_level: bool = False,
+                          bounds: Optional[Dict[str, Dict[str, Sequence[float]]]] = None,
+                          surrogate=None, callback=None) -> Dict:
+    """
+    Tune the numeric parameters of a fixed block sequence with CMA-ES.
+
+    Args:
+        sequence: Block sequence to tune (block types and order stay fixed)
+        generations: CMA-ES generations
+        popsize: Candidates per generation (default 4 + 3 ln n)
+        sigma0: Initial step size in normalized parameter space
+        min_safety: Candidates with a lower safety score (or any danger) are
+                    rejected before the LightGBM stage
+        target_rating: Aim for this fun rating instead of maximizing it
+        workers: Processes for the geometry/physics stage (1 = in-process)
+        seed: RNG seed
+        physics: Overrides for the physics defaults
+        force_end_level: Level the end of the track with its start
+        bounds: Per-type overrides of the parameter ranges
+        surrogate: Optional `utils.surrogate.SurrogateFilter` built for this
+                   sequence (`SurrogateFilter(sequence=sequence)`); candidates it ranks
+                   low get its predicted fitness (capped at the worst evaluated
+                   candidate of the generation) instead of a full evaluation
+        callback: Called with (generation, stats dict) after each generation
+
+    Returns:
+        dict with 'best' (highest-fitness safe candidate), 'pareto' (fun vs
+        safety front over all safe candidates), 'history', 'evaluated',
+        'rejected', 'errors', 'surrogate_skipped' and 'elapsed_s' (plus the
+        surrogate's metrics when one is used)
+    """
+    space = parameter_space(sequence, bounds)
+    if not space:
+        raise ValueError("sequence has no tunable parameters")
+    if surrogate is not None and surrogate.block_types != tuple(b['type'] for b in sequence):
+        raise ValueError("surrogate must encode this block sequence: use SurrogateFilter(sequence=sequence)")
+    lo = np.array([d['lo'] for d in space])
+    hi = np.array([d['hi'] for d in space])
+    x0 = (np.array([d['start'] for d in space]) - lo) / np.where(hi > lo, hi - lo, 1.0)
+    es = CMAES(x0, sigma0=sigma0, popsize=popsize, seed=seed)
+
+    def fitness_of(fun_rating, safety_score):
+        if target_rating is None:
+            return fun_rating
+        return -abs(fun_rating - target_rating)
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    safe = []
+    history = []
+    counts = {'evaluated': 0, 'rejected': 0, 'errors': 0, 'surrogate_skipped': 0}
+    t0 = time.perf_counter()
+    try:
+        for generation in range(generations):
+            candidates = es.ask()
+            sequences = [vector_to_sequence(u, sequence, space) for u in candidates]
+
+            # Surrogate pre-screening: candidates it ranks low keep their predicted fitness
+            predictions, audit = None, np.zeros(len(sequences), dtype=bool)
+            evaluate_idx = list(range(len(sequences)))
+            if surrogate is not None:
+                keep, predictions, audit = surrogate.screen(sequences)
+                evaluate_idx = [int(i) for i in keep]
+
+            batch = [sequences[i] for i in evaluate_idx]
+            if pool is None:
+                evaluated = _simulate_batch(batch, physics, force_end_level, min_safety)
+            else:
+                chunks = [c for c in np.array_split(np.arange(len(batch)), workers) if len(c)]
+                futures = [pool.submit(_simulate_batch, [batch[i] for i in chunk], physics,
+                                       force_end_level, min_safety) for chunk in chunks]
+                evaluated = [r for future in futures for r in future.result()]
+            results = dict(zip(evaluate_idx, evaluated))
+
+            # One booster call for every candidate that passed the safety gate
+            passed = [i for i, r in results.items() if not r['rejected']]
+            if passed:
+                ratings = predict_scores_from_features(np.vstack([results[i]['features'] for i in passed]))
+                for i, rating in zip(passed, ratings):
+                    results[i]['fun_rating'] = float(rating)
+
+            fitness = np.empty(len(sequences))
+            skipped = []
+            for i, seq in enumerate(sequences):
+                r = results.get(i)
+                if r is None:
+                    counts['surrogate_skipped'] += 1
+                    skipped.append(i)
+                    fun_pred, safety_pred = predictions[i]
+                    if safety_pred < min_safety:
+                        fitness[i] = REJECTED_FITNESS_OFFSET + safety_pred
+                    else:
+                        fitness[i] = fitness_of(fun_pred, safety_pred)
+                    continue
+                counts['evaluated'] += 1
+                if 'error' in r:
+                    counts['errors'] += 1
+                    fitness[i] = 2 * REJECTED_FITNESS_OFFSET
+                elif r['rejected']:
+                    counts['rejected'] += 1
+                    fitness[i] = REJECTED_FITNESS_OFFSET + r['safety']['score']
+                    # Never rated, but its safety score is known: train the surrogate with the rating floor
+                    if surrogate is not None:
+                        surrogate.update(seq, REJECTED_FUN_RATING, r['safety']['score'],
+                                         prediction=None if predictions is None else predictions[i],
+                                         audit=bool(audit[i]), rated=False)
+                else:
+                    fitness[i] = fitness_of(r['fun_rating'], r['safety']['score'])
+                    safe.append({
+                        'sequence': seq,
+                        'fun_rating': r['fun_rating'],
+                        'safety': r['safety'],
+                        'fitness': float(fitness[i]),
+                        'generation': generation,
+                    })
+                    if surrogate is not None:
+                        surrogate.update(seq, r['fun_rating'], r['safety']['score'],
+                                         prediction=None if predictions is None else predictions[i],
+                                         audit=bool(audit[i]))
+            # A skipped candidate never ranks above the worst one that was actually evaluated,
+            # so surrogate optimism cannot steer the search
+            simulated = [i for i, r in results.items() if 'error' not in r]
+            if skipped and simulated:
+                fitness[skipped] = np.minimum(fitness[skipped], fitness[simulated].min())
+            es.tell(candidates, fitness)
+
+            stats = {
+                'best_fitness': float(fitness.max()),
+                'mean_fitness': float(fitness.mean()),
+                'rejected': int(sum(r['rejected'] for r in results.values())),
+                'sigma': float(es.sigma),
+            }
+            history.append(stats)
+            if callback is not None:
+                callback(generation, stats)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    result = {
+        'best': max(safe, key=lambda c: c['fitness']) if safe else None,
+        'pareto': pareto_front(safe),
+        'history': history,
+        'elapsed_s': time.perf_counter() - t0,
+        **counts,
+    }
+    if surrogate is not None:
+        result['surrogate'] = surrogate.metrics()
+    return result
@@ -4,11 +4,24 @@ Supports both local development and cloud deployment (S3/GCS).
 """
 
 import os
+import sys
 import pandas as pd
-import streamlit as st
 from io import StringIO
 from typing import Optional
 
+
+def _get_secret(name: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    Read a credential from Streamlit secrets when running inside the app,
+    otherwise from the environment. Streamlit is never imported here so
+    batch scripts can use this module without it.
+    """
+    st = sys.modules.get('streamlit')
+    if st is not None and hasattr(st, 'secrets'):
+        return st.secrets.get(name)
+    return os.getenv(name, default)
+
+
 def load_rfdb_csv(park: str, coaster: str, csv_name: str, use_cloud: bool = True) -> Optional[pd.DataFrame]:
     """
     Load RFDB CSV file from cloud storage or local filesystem.
@@ -42,9 +55,9 @@ def _load_from_s3(park: str, coaster: str, csv_name: str) -> Optional[pd.DataFra
         import boto3
         
         # Get credentials from Streamlit secrets or environment
-        access_key = st.secrets.get('AWS_ACCESS_KEY_ID') if hasattr(st, 'secrets') else os.getenv('AWS_ACCESS_KEY_ID')
-        secret_key = st.secrets.get('AWS_SECRET_ACCESS_KEY') if hasattr(st, 'secrets') else os.getenv('AWS_SECRET_ACCESS_KEY')
-        bucket = st.secrets.get('S3_BUCKET') if hasattr(st, 'secrets') else os.getenv('S3_BUCKET', 'rfdb-data')
+        access_key = _get_secret('AWS_ACCESS_KEY_ID')
+        secret_key = _get_secret('AWS_SECRET_ACCESS_KEY')
+        bucket = _get_secret('S3_BUCKET', 'rfdb-data')
         
         if not access_key or not secret_key:
             return None
@@ -71,7 +84,7 @@ def _load_from_gcs(park: str, coaster: str, csv_name: str) -> Optional[pd.DataFr
         from google.cloud import storage
         
         # Get credentials from Streamlit secrets or environment
-        bucket_name = st.secrets.get('GCS_BUCKET') if hasattr(st, 'secrets') else os.getenv('GCS_BUCKET')
+        bucket_name = _get_secret('GCS_BUCKET')
         if not bucket_name:
             return None
         
@@ -131,9 +144,9 @@ def _list_parks_from_s3() -> list:
     try:
         import boto3
         
-        access_key = st.secrets.get('AWS_ACCESS_KEY_ID') if hasattr(st, 'secrets') else os.getenv('AWS_ACCESS_KEY_ID')
-        secret_key = st.secrets.get('AWS_SECRET_ACCESS_KEY') if hasattr(st, 'secrets') else os.getenv('AWS_SECRET_ACCESS_KEY')
-        bucket = st.secrets.get('S3_BUCKET') if hasattr(st, 'secrets') else os.getenv('S3_BUCKET', 'rfdb-data')
+        access_key = _get_secret('AWS_ACCESS_KEY_ID')
+        secret_key = _get_secret('AWS_SECRET_ACCESS_KEY')
+        bucket = _get_secret('S3_BUCKET', 'rfdb-data')
         
         if not access_key or not secret_key:
             return []
@@ -154,7 +167,7 @@ def _list_parks_from_gcs() -> list:
     try:
         from google.cloud import storage
         
-        bucket_name = st.secrets.get('GCS_BUCKET') if hasattr(st, 'secrets') else os.getenv('GCS_BUCKET')
+        bucket_name = _get_secret('GCS_BUCKET')
         if not bucket_name:
             return []
         
@@ -213,9 +226,9 @@ def _list_coasters_from_s3(park: str) -> list:
     try:
         import boto3
         
-        access_key = st.secrets.get('AWS_ACCESS_KEY_ID') if hasattr(st, 'secrets') else os.getenv('AWS_ACCESS_KEY_ID')
-        secret_key = st.secrets.get('AWS_SECRET_ACCESS_KEY') if hasattr(st, 'secrets') else os.getenv('AWS_SECRET_ACCESS_KEY')
-        bucket = st.secrets.get('S3_BUCKET') if hasattr(st, 'secrets') else os.getenv('S3_BUCKET', 'rfdb-data')
+        access_key = _get_secret('AWS_ACCESS_KEY_ID')
+        secret_key = _get_secret('AWS_SECRET_ACCESS_KEY')
+        bucket = _get_secret('S3_BUCKET', 'rfdb-data')
         
         if not access_key or not secret_key:
             return []
@@ -237,7 +250,7 @@ def _list_coasters_from_gcs(park: str) -> list:
     try:
         from google.cloud import storage
         
-        bucket_name = st.secrets.get('GCS_BUCKET') if hasattr(st, 'secrets') else os.getenv('GCS_BUCKET')
+        bucket_name = _get_secret('GCS_BUCKET')
         if not bucket_name:
             return []
         
@@ -298,9 +311,9 @@ def _list_csvs_from_s3(park: str, coaster: str) -> list:
     try:
         import boto3
         
-        access_key = st.secrets.get('AWS_ACCESS_KEY_ID') if hasattr(st, 'secrets') else os.getenv('AWS_ACCESS_KEY_ID')
-        secret_key = st.secrets.get('AWS_SECRET_ACCESS_KEY') if hasattr(st, 'secrets') else os.getenv('AWS_SECRET_ACCESS_KEY')
-        bucket = st.secrets.get('S3_BUCKET') if hasattr(st, 'secrets') else os.getenv('S3_BUCKET', 'rfdb-data')
+        access_key = _get_secret('AWS_ACCESS_KEY_ID')
+        secret_key = _get_secret('AWS_SECRET_ACCESS_KEY')
+        bucket = _get_secret('S3_BUCKET', 'rfdb-data')
         
         if not access_key or not secret_key:
             return []
@@ -330,7 +343,7 @@ def _list_csvs_from_gcs(park: str, coaster: str) -> list:
     try:
         from google.cloud import storage
         
-        bucket_name = st.secrets.get('GCS_BUCKET') if hasattr(st, 'secrets') else os.getenv('GCS_BUCKET')
+        bucket_name = _get_secret('GCS_BUCKET')
         if not bucket_name:
             return []
         
@@ -0,0 +1,326 @@
+"""
+Design-space sweeps over the block library.
+
+Generates random block sequences (the builder's "🎲 Random Template" rules,
+with parameters drawn from configurable ranges, by default the slider ranges),
+evaluates each one through geometry -> physics -> features -> rating/safety
+on a process pool and streams the results back, keeping the best `top_k`
+designs by a configurable objective.
+
+Example:
+    from utils.design_sweep import run_sweep
+    sweep = run_sweep(2000, objective='combined', top_k=10, workers=8, seed=42)
+    best = sweep['top'][0]
+"""
+
+import heapq
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from utils.scoring import score_track
+from utils.track_assembly import assemble_track
+
+# Batch evaluations run the float32 compact physics mode (see compute_acc_profile:
+# ratings within 1e-5 stars of the float64 pipeline, far fewer temporaries per design)
+COMPACT_PHYSICS = True
+
+# Parameter ranges of each block type: (min, max, step), as in the builder sliders
+PARAM_RANGES = {
+    'lift_hill': {'length': (20, 100, 5), 'height': (20, 80, 5)},
+    'drop': {'height': (20, 90, 5), 'steepness': (0.5, 1.0, 0.05)},
+    'loop': {'diameter': (15, 45, 5)},
+    'airtime_hill': {'length': (20, 60, 5), 'height': (5, 25, 2)},
+    'spiral': {'diameter': (15, 40, 5), 'turns': (0.5, 3.0, 0.5)},
+    'bunny_hop': {'length': (10, 30, 5), 'height': (3, 15, 1)},
+    'banked_turn': {'radius': (15, 50, 5), 'angle': (30, 180, 15)},
+    'launch': {'length': (20, 80, 5), 'speed_boost': (10, 40, 5)},
+    'flat_section': {'length': (10, 50, 5)},
+    'brake_run': {'length': (20, 50, 5)},
+}
+
+# Narrower ranges of the builder's "🎲 Random Template" button (gentle, mostly safe designs)
+RANDOM_TEMPLATE_RANGES = {
+    'lift_hill': {'length': (50, 80, 1), 'height': (40, 70, 1)},
+    'drop': {'height': (15, 70, 1), 'steepness': (0.7, 1.0, 0.05)},
+    'loop': {'diameter': (20, 35, 1)},
+    'airtime_hill': {'length': (30, 60, 1), 'height': (10, 20, 1)},
+    'spiral': {'diameter': (20, 30, 1), 'turns': (1.0, 2.0, 0.25)},
+    'bunny_hop': {'length': (15, 30, 1), 'height': (5, 12, 1)},
+    'banked_turn': {'radius': (20, 35, 1), 'angle': (60, 120, 1)},
+    'launch': {'length': (30, 50, 1), 'speed_boost': (20, 28, 1)},
+    'flat_section': {'length': (20, 40, 1)},
+    'brake_run': {'length': (25, 40, 1)},
+}
+
+# Blocks the random template draws from after the opening launch/lift/drop/flat.
+# banked_turn and spiral are excluded to keep random (2D) designs free of lateral forces.
+RANDOM_TEMPLATE_BLOCKS = ('drop', 'loop', 'airtime_hill', 'bunny_hop', 'launch')
+
+# Objectives maximized by the sweep; a callable objective receives the evaluation dict
+OBJECTIVES = {
+    'fun': lambda result: result['fun_rating'],
+    'safety': lambda result: result['safety']['score'],
+    'combined': lambda result: result['fun_rating'] + result['safety']['score'],
+}
+
+
+def merge_ranges(overrides: Optional[Dict[str, Dict[str, Sequence[float]]]],
+                 base: Dict[str, Dict[str, Tuple[float, float, float]]] = PARAM_RANGES) -> Dict:
+    """
+    Per-parameter overrides of a range table, {block_type: {param: (min, max, step)}}.
+
+    Raises:
+        ValueError: Unknown block type, or a range with min > max or step <= 0
+    """
+    ranges = {block_type: dict(params) for block_type, params in base.items()}
+    for block_type, params in (overrides or {}).items():
+        if block_type not in ranges:
+            raise ValueError(f"Unknown block type in ranges: {block_type}")
+        for param, spec in params.items():
+            lo, hi, step = (float(v) for v in spec)
+            if lo > hi or step <= 0:
+                raise ValueError(f"Invalid range for {block_type}.{param}: {tuple(spec)}")
+            ranges[block_type][param] = tuple(spec)
+    return ranges
+
+
+def _sample_param(rng, spec: Sequence[float], upper: Optional[float] = None):
+    """Uniform draw from the (min, max, step) grid, optionally capped at `upper` (never below min)."""
+    lo, hi, step = spec
+    if upper is not None:
+        hi = max(lo, min(hi, upper))
+    value = lo + step * rng.randint(0, int((hi - lo) / step + 1e-9))
+    if all(float(v).is_integer() for v in spec):
+        return int(round(value))
+    return round(value, 6)
+
+
+def _random_block_params(block_type: str, rng, ranges: Dict, first_drop_height: Optional[float] = None) -> Dict:
+    """Random parameters for one block; drops after the first one stay within 1/3 of its height."""
+    if block_type not in ranges:
+        raise ValueError(f"Unknown block type in random generation: {block_type}")
+    params = {}
+    for param, spec in ranges[block_type].items():
+        upper = None
+        if block_type == 'drop' and param == 'height' and first_drop_height is not None:
+            upper = first_drop_height / 3
+        params[param] = _sample_param(rng, spec, upper)
+    return params
+
+
+def random_block_sequence(rng=None, num_blocks: Optional[int] = None,
+                          available_blocks: Sequence[str] = RANDOM_TEMPLATE_BLOCKS,
+                          ranges: Dict[str, Dict[str, Tuple[float, float, float]]] = PARAM_RANGES) -> List[Dict]:
+    """
+    Random coaster following the builder's Random Template rules.
+
+    Always opens with launch -> lift hill -> drop -> flat section, inserts a
+    flat section at least every third block, caps later drops to 1/3 of the
+    first drop and ends with a brake run.
+
+    Args:
+        rng: `random.Random` instance (defaults to the global `random` module)
+        num_blocks: Blocks before the brake run (default: random 6-10)
+        available_blocks: Block types drawn after the opening section
+        ranges: (min, max, step) of every parameter, per block type; values are
+                drawn uniformly from the step grid (the builder's Random
+                Template button passes RANDOM_TEMPLATE_RANGES)
+
+    Returns:
+        List of {'type': ..., 'params': {...}} dicts (num_blocks + 1 entries)
+    """
+    rng = rng or random
+    if num_blocks is None:
+        num_blocks = rng.randint(6, 10)
+
+    sequence = [{'type': block_type, 'params': _random_block_params(block_type, rng, ranges)}
+                for block_type in ('launch', 'lift_hill', 'drop', 'flat_section')]
+    first_drop_height = sequence[2]['params']['height']
+
+    for i in range(num_blocks - 4):  # -4 because we added launch + lift + drop + flat
+        block_type = rng.choice(list(available_blocks))
+        # Enforce: at least one flat section in every 3 blocks
+        recent_types = [b['type'] for b in sequence[-2:]]
+        if (i % 3 == 2) and ('flat_section' not in recent_types):
+            block_type = 'flat_section'
+        sequence.append({'type': block_type,
+                         'params': _random_block_params(block_type, rng, ranges, first_drop_height)})
+
+    # Always end with a brake run
+    sequence.append({'type': 'brake_run', 'params': _random_block_params('brake_run', rng, ranges)})
+    return sequence
+
+
+def evaluate_sequence(sequence: Sequence[Dict], physics: Optional[Dict[str, float]] = None,
+                      force_end_level: bool = True, start_level: float = 0.0) -> Dict:
+    """
+    Score one block sequence end to end.
+
+    Returns:
+        dict with 'sequence' plus the `score_track` fields, or with 'error'
+        if the design could not be built or simulated
+    """
+    try:
+        x, y, z = assemble_track(sequence, force_end_level=force_end_level, start_level=start_level)
+        result = score_track(x, y, z, physics=physics, compact=COMPACT_PHYSICS)
+    except Exception as e:
+        return {'sequence': list(sequence), 'error': f'{type(e).__name__}: {e}'}
+    result['sequence'] = list(sequence)
+    return result
+
+
+def _evaluate_chunk(sequences: List[List[Dict]], physics: Optional[Dict[str, float]],
+                    force_end_level: bool) -> List[Dict]:
+    """Worker entry point: evaluate several designs per task to amortize IPC."""
+    return [evaluate_sequence(seq, physics=physics, force_end_level=force_end_level) for seq in sequences]
+
+
+def _stream_results(pool: Optional[ProcessPoolExecutor], indexed: List[Tuple[int, List[Dict]]],
+                    physics: Optional[Dict[str, float]], chunk_size: int,
+                    force_end_level: bool) -> Iterator[Dict]:
+    """Evaluate (index, sequence) pairs in chunks, yielding results with 'index' as they complete."""
+    chunks = [indexed[start:start + chunk_size] for start in range(0, len(indexed), chunk_size)]
+    if pool is None:
+        for chunk in chunks:
+            results = _evaluate_chunk([seq for _, seq in chunk], physics, force_end_level)
+            for (index, _), result in zip(chunk, results):
+                result['index'] = index
+                yield result
+        return
+
+    futures = {pool.submit(_evaluate_chunk, [seq for _, seq in chunk], physics, force_end_level): chunk
+               for chunk in chunks}
+    for future in as_completed(futures):
+        for (index, _), result in zip(futures[future], future.result()):
+            result['index'] = index
+            yield result
+
+
+def iter_sweep(n_designs: int, workers: Optional[int] = None, seed: Optional[int] = None,
+               physics: Optional[Dict[str, float]] = None, chunk_size: int = 8,
+               force_end_level: bool = True,
+               sequences: Optional[Sequence[List[Dict]]] = None,
+               surrogate=None,
+               ranges: Dict[str, Dict[str, Tuple[float, float, float]]] = PARAM_RANGES) -> Iterator[Dict]:
+    """
+    Evaluate designs on a process pool, yielding results as they complete.
+
+    Args:
+        n_designs: Number of random designs (ignored when `sequences` is given)
+        workers: Worker processes (default: CPU count); 1 evaluates in-process
+        seed: Seed for the design generator (reproducible candidate set)
+        physics: Overrides for the physics defaults
+        chunk_size: Designs per worker task
+        force_end_level: Level the end of each track with its start (as the random template does)
+        sequences: Explicit candidate sequences instead of random ones
+        surrogate: Optional `utils.surrogate.SurrogateFilter`; candidates are screened
+                   in rounds and only the ones it keeps are fully evaluated
+        ranges: Parameter ranges of the random designs (see random_block_sequence)
+
+    Yields:
+        evaluate_sequence() dicts with an added 'index' (order of generation) and,
+        for screened candidates, the surrogate's prediction under 'surrogate'
+    """
+    if sequences is None:
+        rng = random.Random(seed)
+        sequences = [random_block_sequence(rng, ranges=ranges) for _ in range(n_designs)]
+    sequences = list(sequences)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, int(chunk_size))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    try:
+        if surrogate is None:
+            yield from _stream_results(pool, list(enumerate(sequences)), physics, chunk_size, force_end_level)
+            return
+
+        # Screen in rounds so the surrogate learns from each round's evaluations
+        round_size = max(64, 4 * workers * chunk_size)
+        for start in range(0, len(sequences), round_size):
+            batch = sequences[start:start + round_size]
+            keep, predictions, audit = surrogate.screen(batch)
+            indexed = [(start + i, batch[i]) for i in keep]
+            for result in _stream_results(pool, indexed, physics, chunk_size, force_end_level):
+                i = result['index'] - start
+                prediction = None if predictions is None else predictions[i]
+                if 'error' not in result:
+                    surrogate.update(result['sequence'], result['fun_rating'], result['safety']['score'],
+                                     prediction=prediction, audit=bool(audit[i]))
+                if prediction is not None:
+                    result['surrogate'] = {
+                        'fun_rating': float(prediction[0]),
+                        'safety_score': float(prediction[1]),
+                        'audit': bool(audit[i]),
+                    }
+                yield result
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def run_sweep(n_designs: int, objective: Union[str, Callable[[Dict], float]] = 'combined',
+              top_k: int = 10, workers: Optional[int] = None, seed: Optional[int] = None,
+              physics: Optional[Dict[str, float]] = None, chunk_size: int = 8,
+              callback: Optional[Callable[[Dict], None]] = None,
+              sequences: Optional[Sequence[List[Dict]]] = None,
+              surrogate=None,
+              ranges: Dict[str, Dict[str, Tuple[float, float, float]]] = PARAM_RANGES) -> Dict:
+    """
+    Run a sweep and keep the best `top_k` designs.
+
+    Args:
+        n_designs: Number of random designs to generate
+        objective: 'fun', 'safety', 'combined' or a callable on the evaluation dict (maximized)
+        top_k: Number of designs to keep (>= 1)
+        workers, seed, physics, chunk_size, sequences, surrogate, ranges: See iter_sweep()
+        callback: Called with every result as it streams in (progress, logging)
+
+    Returns:
+        dict with 'top' (best first, each with an 'objective' value), 'evaluated',
+        'errors', 'elapsed_s' and 'designs_per_min'; with a surrogate also
+        'screened' (candidates generated) and 'surrogate' (its hit rate/error stats)
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k must be >= 1, got {top_k}")
+    if isinstance(objective, str):
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}'. Available: {sorted(OBJECTIVES)}")
+        objective_fn = OBJECTIVES[objective]
+    else:
+        objective_fn = objective
+
+    heap = []  # min-heap of (objective, index, result)
+    evaluated = 0
+    errors = 0
+    t0 = time.perf_counter()
+    for result in iter_sweep(n_designs, workers=workers, seed=seed, physics=physics,
+                             chunk_size=chunk_size, sequences=sequences, surrogate=surrogate,
+                             ranges=ranges):
+        evaluated += 1
+        if 'error' in result:
+            errors += 1
+        else:
+            result['objective'] = float(objective_fn(result))
+            entry = (result['objective'], -result['index'], result)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        if callback is not None:
+            callback(result)
+    elapsed = time.perf_counter() - t0
+
+    sweep = {
+        'top': [entry[2] for entry in sorted(heap, key=lambda e: e[:2], reverse=True)],
+        'evaluated': evaluated,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'designs_per_min': 60.0 * evaluated / elapsed if elapsed > 0 else 0.0,
+    }
+    if surrogate is not None:
+        sweep['screened'] = len(sequences) if sequences is not None else n_designs
+        sweep['surrogate'] = surrogate.metrics()
+    return sweep
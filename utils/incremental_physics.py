@@ -0,0 +1,178 @@
+"""
+Resumable advanced physics for the track builder.
+
+In `compute_acc_profile` the speed at a sample depends on the track upstream
+only through the Velocity-Verlet state (v, a_prev) of the previous sample,
+and every other output is local: the smoothed geometry of a sample reaches
+`TrackGeometry.halo` raw points to either side, dv/dt one sample further.
+So after an edit to block k nothing upstream of block k changes.
+
+`IncrementalPhysics` keeps the last track, its unsmoothed g-force channels
+and the integrator state (v_int, a_int) at every block boundary. For the next
+track it finds the first changed point, resumes integration at the last
+checkpoint far enough upstream of it (the smoothing halo before the boundary
+is taken from the unchanged points), and splices the new tail onto the cached
+upstream channels. The output smoothing of `accelerometer_frame` then runs on
+the whole spliced track, so the result matches `track_to_accelerometer_data`
+on the full track (bit for bit in practice; it is the same arithmetic).
+
+With a `utils.array_store.ArrayStore` the cached track and channels are kept
+in the store and the instance only holds their handles (plus the few
+checkpoint floats), so it stays small in a Streamlit session. If the store
+has evicted them, the next call simply runs in full.
+
+Usage:
+    physics = IncrementalPhysics(store=ARRAY_STORE)
+    accel_df = physics.accelerometer_data(track_df, block_index=block_index)
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.acceleration import compute_acc_profile
+from utils.accelerometer_transform import (
+    SAMPLE_DT,
+    STATION_SPEED,
+    _track_geometry,
+    accelerometer_frame,
+    track_to_accelerometer_data,
+)
+
+# Outputs kept per sample; v_int/a_int are read at the block boundaries only
+CHANNELS = ('f_lat_g', 'f_vert_g', 'f_long_g', 'curvature', 'v_int', 'a_int')
+FRAME_CHANNELS = ('f_lat_g', 'f_vert_g', 'f_long_g', 'curvature')
+
+
+class IncrementalPhysics:
+    """
+    Advanced-physics accelerometer data that re-simulates only downstream of an edit.
+
+    One instance holds the state of one track as it is being edited (e.g. per
+    builder session). Changing the physics parameters, editing the first block
+    or calling without a block index runs the whole track.
+
+    Args:
+        store: Optional ArrayStore for the cached track and channels (kept on
+               the instance when None)
+
+    Attributes:
+        last_start: Sample the last call integrated from (0 = full run,
+                    None = track and parameters unchanged, nothing integrated)
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.reset()
+
+    def reset(self):
+        """Drop the cached track; the next call runs in full."""
+        self._params: Optional[Tuple[float, ...]] = None
+        self._points = None  # Nx3 array, or its ArrayHandle with a store
+        self._profile: Dict[str, object] = {}  # channel -> array (or ArrayHandle)
+        self._checkpoints: Dict[int, Tuple[float, float]] = {}
+        self._h0 = 0.0
+        self.last_start: Optional[int] = None
+
+    def _keep(self, array):
+        return array if self.store is None else self.store.put(array)
+
+    def _cached(self) -> Tuple[Optional[np.ndarray], Dict[str, np.ndarray]]:
+        """(points, profile) of the last track; (None, {}) if there is none or the store evicted it."""
+        if self._points is None:
+            return None, {}
+        if self.store is None:
+            return self._points, self._profile
+        try:
+            return (self.store.get(self._points),
+                    {name: self.store.get(handle) for name, handle in self._profile.items()})
+        except KeyError:
+            return None, {}
+
+    def accelerometer_data(self, track_df, mass=1200.0, rho=1.0, Cd=0.08, A=2.5, mu=0.001,
+                           geometry=None, block_index=None) -> pd.DataFrame:
+        """
+        Same result as track_to_accelerometer_data(track_df, mass, rho, Cd, A, mu).
+
+        Args:
+            track_df: DataFrame with columns ['x', 'y'] (and optionally 'z')
+            mass, rho, Cd, A, mu: Physics parameters (see track_to_accelerometer_data)
+            geometry: Optional TrackGeometry of the track
+            block_index: Block of every track point (assemble_track(return_block_index=True));
+                         its boundaries are where integration can resume later
+
+        Returns:
+            DataFrame with columns ['Time', 'Lateral', 'Vertical', 'Longitudinal']
+        """
+        params = (float(mass), float(rho), float(Cd), float(A), float(mu))
+        try:
+            geometry = _track_geometry(track_df, geometry)
+            if block_index is not None and len(block_index) != len(geometry):
+                raise ValueError("block_index must have one entry per track point")
+            profile = self._update(geometry, params, block_index)
+        except Exception as e:
+            print(f"Warning: incremental physics failed ({e}), running the full pipeline...")
+            self.reset()
+            return track_to_accelerometer_data(track_df, mass=mass, rho=rho, Cd=Cd, A=A, mu=mu,
+                                               geometry=geometry)
+        return accelerometer_frame(profile)
+
+    def _update(self, geometry, params, block_index) -> Dict[str, np.ndarray]:
+        """Bring the cache up to date with this track; returns its channels."""
+        points = geometry.points
+        cached_points, cached_profile = self._cached()
+        start = self._resume_point(points, cached_points, params, geometry.halo)
+        if start is None:
+            self.last_start = None
+            return cached_profile
+
+        mass, rho, Cd, A, mu = params
+        if start == 0:
+            v0, a0, checkpoints = STATION_SPEED, 0.0, {}
+            self._h0 = float(geometry.smoothed[0, 2])
+        else:
+            v0, a0 = self._checkpoints[start]
+            checkpoints = {k: state for k, state in self._checkpoints.items() if k <= start}
+            geometry = geometry.tail(start)
+
+        tail = compute_acc_profile(
+            geometry.points, dt=SAMPLE_DT, mass=mass, rho=rho, Cd=Cd, A=A, mu=mu,
+            v0=v0, a0=a0, energy_ref=(STATION_SPEED, self._h0),
+            use_energy_conservation=True, geometry=geometry, channels=CHANNELS,
+        )
+
+        # Integrator state at every block boundary downstream of the restart
+        if block_index is not None:
+            boundaries = np.flatnonzero(np.diff(np.asarray(block_index)) != 0) + 1
+            for k in boundaries[boundaries > start]:
+                checkpoints[int(k)] = (float(tail['v_int'][k - start]), float(tail['a_int'][k - start]))
+
+        # Upstream samples up to and including the restart point are unchanged
+        # (dv/dt at the restart point is one-sided in the tail run, the cached value is not)
+        if start == 0:
+            profile = {name: tail[name] for name in FRAME_CHANNELS}
+        else:
+            profile = {name: np.concatenate((cached_profile[name][:start + 1], tail[name][1:]))
+                       for name in FRAME_CHANNELS}
+        self._params = params
+        self._points = self._keep(points.copy())
+        self._profile = {name: self._keep(values) for name, values in profile.items()}
+        self._checkpoints = checkpoints
+        self.last_start = start
+        return profile
+
+    def _resume_point(self, points, cached_points, params, halo) -> Optional[int]:
+        """Checkpoint to restart from (0 = full run), or None if nothing changed."""
+        if cached_points is None or params != self._params:
+            return 0
+        n_common = min(len(points), len(cached_points))
+        changed = np.flatnonzero(np.any(points[:n_common] != cached_points[:n_common], axis=1))
+        first_change = int(changed[0]) if changed.size else n_common
+        if first_change == len(points) == len(cached_points):
+            return None
+        # Outputs up to first_change - halo - 1 see only unchanged points; one more
+        # sample is needed for the central difference of the speed at the restart
+        latest = min(first_change - halo - 2, len(points) - 3)
+        candidates = [k for k in self._checkpoints if 0 < k <= latest]
+        return max(candidates, default=0)
@@ -9,14 +9,14 @@ Features come directly from rider-frame, gravity-subtracted acceleration
 data (Vertical, Lateral, Longitudinal) plus optional metadata.
 """
 
-from functools import lru_cache
 import os
 from typing import Dict, Tuple
 
-import lightgbm as lgb
 import numpy as np
 import pandas as pd
 
+from utils.resource_cache import file_cached
+
 # Ordered feature names, matching `extreme_model_config.pkl`
 FEATURE_NAMES = [
     # Dynamics (20)
@@ -245,8 +245,12 @@ def compute_lightgbm_features(accel_df: pd.DataFrame, metadata: Dict[str, float]
     return features
 
 
-@lru_cache(maxsize=1)
-def _load_booster(model_path: str) -> lgb.Booster:
+@file_cached('lightgbm booster')
+def _load_booster(model_path: str) -> "lgb.Booster":
+    # lightgbm is imported on first use: it is slow to import and only needed to predict.
+    # Reloaded when the model file changes (e.g. after retraining)
+    import lightgbm as lgb
+
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"LightGBM model not found at {model_path}")
     return lgb.Booster(model_file=model_path)
@@ -267,3 +271,21 @@ def predict_score_lgb(accel_df: pd.DataFrame, metadata: Dict[str, float] = None,
     return float(np.clip(raw_pred, 1.0, 5.0))
 
 
+
+
+def predict_scores_from_features(features: np.ndarray, model_path: str = "models/lightgbm/lgb_extreme_model.txt") -> np.ndarray:
+    """
+    Predict fun ratings for a batch of precomputed feature vectors in one booster call.
+
+    Args:
+        features: Array of shape (n_rides, len(FEATURE_NAMES)) from `compute_lightgbm_features`.
+        model_path: Path to the LightGBM model file.
+
+    Returns:
+        Array of n_rides ratings clipped to 1-5.
+    """
+    features = np.atleast_2d(np.asarray(features, dtype=np.float32))
+    if features.shape[0] == 0:
+        return np.zeros(0, dtype=np.float64)
+    booster = _load_booster(model_path)
+    return np.clip(booster.predict(features), 1.0, 5.0)
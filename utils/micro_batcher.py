@@ -0,0 +1,158 @@
+"""
+Micro-batching in front of the LightGBM booster.
+
+Concurrent callers (scoring service threads, optimizer workers) each hand in
+one feature vector; a background thread collects pending vectors for up to
+`max_latency_ms` or `max_batch_size` items, runs a single booster call and
+fans the ratings back out through futures.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from utils.lgbm_predictor import predict_scores_from_features
+
+
+class MicroBatcher:
+    """Collects feature vectors and predicts them in batches.
+
+    Args:
+        predict_batch: Maps an (n, n_features) array to n ratings. Defaults to the
+                       in-process booster (`predict_scores_from_features`).
+        max_batch_size: Flush as soon as this many vectors are pending (B)
+        max_latency_ms: Flush at most this long after the oldest pending vector arrived (T)
+        model_path: Model file for the default predictor
+    """
+
+    def __init__(self,
+                 predict_batch: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 max_batch_size: int = 32,
+                 max_latency_ms: float = 5.0,
+                 model_path: str = "models/lightgbm/lgb_extreme_model.txt"):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_latency_ms < 0:
+            raise ValueError("max_latency_ms must be >= 0")
+        self.predict_batch = predict_batch or (lambda X: predict_scores_from_features(X, model_path=model_path))
+        self.max_batch_size = int(max_batch_size)
+        self.max_latency_s = float(max_latency_ms) / 1000.0
+
+        self._pending = deque()  # (enqueue_time, features, future)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            'items': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'max_batch_size_seen': 0,
+            'total_wait_s': 0.0,
+            'total_predict_s': 0.0,
+            'errors': 0,
+        }
+        self._thread = threading.Thread(target=self._run, name='lgbm-microbatcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, features: np.ndarray) -> Future:
+        """Queue one feature vector; the future resolves to its rating."""
+        future = Future()
+        vector = np.asarray(features, dtype=np.float32).ravel()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((time.perf_counter(), vector, future))
+            depth = len(self._pending)
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+            self._cond.notify()
+        return future
+
+    def predict(self, features: np.ndarray, timeout: Optional[float] = None) -> float:
+        """Blocking convenience wrapper around submit()."""
+        return float(self.submit(features).result(timeout=timeout))
+
+    def metrics(self) -> Dict[str, float]:
+        """Queue depth and batching statistics."""
+        with self._cond:
+            stats = dict(self._stats)
+            depth = len(self._pending)
+        batches = max(stats['batches'], 1)
+        items = max(stats['items'], 1)
+        return {
+            'queue_depth': depth,
+            'max_queue_depth': stats['max_queue_depth'],
+            'items': stats['items'],
+            'batches': stats['batches'],
+            'mean_batch_size': stats['items'] / batches,
+            'max_batch_size_seen': stats['max_batch_size_seen'],
+            'mean_wait_ms': 1000.0 * stats['total_wait_s'] / items,
+            'mean_predict_ms': 1000.0 * stats['total_predict_s'] / batches,
+            'errors': stats['errors'],
+            'max_batch_size': self.max_batch_size,
+            'max_latency_ms': self.max_latency_s * 1000.0,
+        }
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Flush pending work and stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _take_batch(self):
+        """Wait for a full batch or the latency deadline; returns [] once closed and drained."""
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return []
+            deadline = self._pending[0][0] + self.max_latency_s
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            n = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(n)]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            # Callers may cancel while waiting; from here on their futures can no longer be
+            # cancelled, so set_result/set_exception below cannot raise InvalidStateError
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            t_start = time.perf_counter()
+            # Everything that can fail stays inside the try: an exception escaping this loop
+            # would kill the thread and leave every pending future waiting forever
+            try:
+                ratings = np.asarray(self.predict_batch(np.vstack([item[1] for item in batch]))).reshape(-1)
+                if len(ratings) != len(batch):
+                    raise ValueError(f"predictor returned {len(ratings)} ratings for a batch of {len(batch)}")
+                ratings = [float(r) for r in ratings]
+                error = None
+            except Exception as e:
+                ratings, error = None, e
+            t_end = time.perf_counter()
+
+            for i, (_, _, future) in enumerate(batch):
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(ratings[i])
+
+            with self._cond:
+                self._stats['items'] += len(batch)
+                self._stats['batches'] += 1
+                self._stats['max_batch_size_seen'] = max(self._stats['max_batch_size_seen'], len(batch))
+                self._stats['total_wait_s'] += sum(t_start - item[0] for item in batch)
+                self._stats['total_predict_s'] += t_end - t_start
+                if error is not None:
+                    self._stats['errors'] += 1
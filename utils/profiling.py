@@ -0,0 +1,127 @@
+"""
+Per-stage wall-clock timing for one builder rerun.
+
+A Streamlit rerun runs the whole script: block generation, joint blending,
+physics, airtime, features, the LightGBM prediction and every plotly figure.
+`StageTimer` records how long each of these takes and how many points it
+worked on, so a slow rerun can be traced to its stage. Repeated stages (e.g.
+one block profile per block) are summed into one row with a call count.
+
+Usage:
+    timer = StageTimer()
+    with timer.stage('physics', points=len(track_df)):
+        accel_df = track_to_accelerometer_data(track_df)
+    timer.start('plot: profile', points=len(x))
+    ...
+    timer.stop('plot: profile')
+    timer.append_jsonl('logs/stage_timings.jsonl')
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+DEFAULT_LOG_PATH = 'logs/stage_timings.jsonl'
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock time and point counts per named stage.
+
+    Args:
+        enabled: When False every call is a no-op (nothing is recorded)
+
+    Stages are reported in the order they first ran.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = bool(enabled)
+        self._stages: Dict[str, Dict] = {}
+        self._running: Dict[str, float] = {}
+        self._created = time.time()
+
+    def start(self, name: str, points: Optional[int] = None):
+        """Start timing a stage (finish it with stop(name))."""
+        if not self.enabled:
+            return
+        self._running[name] = time.perf_counter()
+        if points is not None:
+            self.set_points(name, points)
+
+    def stop(self, name: str, points: Optional[int] = None) -> float:
+        """Stop timing a stage; returns the seconds of this run (0 if it was not started)."""
+        if not self.enabled or name not in self._running:
+            return 0.0
+        seconds = time.perf_counter() - self._running.pop(name)
+        self.add(name, seconds, points=points)
+        return seconds
+
+    @contextmanager
+    def stage(self, name: str, points: Optional[int] = None):
+        """Time the enclosed block as one run of stage `name`."""
+        self.start(name, points=points)
+        try:
+            yield
+        finally:
+            self.stop(name)
+
+    def add(self, name: str, seconds: float, points: Optional[int] = None):
+        """Record an externally measured run of a stage."""
+        if not self.enabled:
+            return
+        entry = self._entry(name)
+        entry['seconds'] += float(seconds)
+        entry['calls'] += 1
+        if points is not None:
+            self.set_points(name, points)
+
+    def set_points(self, name: str, points: int):
+        """Attach a point count to a stage (e.g. once the size of its output is known)."""
+        if self.enabled:
+            self._entry(name)['points'] = int(points)
+
+    def _entry(self, name: str) -> Dict:
+        return self._stages.setdefault(name, {'stage': name, 'seconds': 0.0, 'calls': 0, 'points': None})
+
+    @property
+    def records(self) -> List[Dict]:
+        """One dict per stage: stage, seconds, calls, points (None if not given)."""
+        return [dict(entry) for entry in self._stages.values() if entry['calls']]
+
+    @property
+    def total(self) -> float:
+        """Seconds summed over all stages (nested stages count twice)."""
+        return sum(entry['seconds'] for entry in self.records)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Stages as a table with columns stage, ms, calls, points, share (% of total)."""
+        records = self.records
+        total = self.total
+        return pd.DataFrame({
+            'stage': [r['stage'] for r in records],
+            'ms': [round(r['seconds'] * 1000.0, 2) for r in records],
+            'calls': [r['calls'] for r in records],
+            'points': pd.array([r['points'] for r in records], dtype='Int64'),
+            'share': [round(100.0 * r['seconds'] / total, 1) if total > 0 else 0.0 for r in records],
+        }, columns=['stage', 'ms', 'calls', 'points', 'share'])
+
+    def append_jsonl(self, path: str = DEFAULT_LOG_PATH, **extra):
+        """
+        Append this rerun as one JSON line.
+
+        Args:
+            path: Log file (parent directories are created)
+            **extra: Additional fields for the line (e.g. number of blocks)
+        """
+        if not self.enabled:
+            return
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        line = {'timestamp': self._created, 'total_s': self.total, 'stages': self.records, **extra}
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line) + '\n')
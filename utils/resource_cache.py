@@ -0,0 +1,142 @@
+"""
+Process-wide cache for artifacts loaded from files (model, library index, CSV tables).
+
+Reruns of the Streamlit pages and requests to the scoring service load the
+same few files again and again: the LightGBM booster, the track library
+index (data/tracks/library.json) and the rating mapping tables. Loaders
+decorated with `file_cached` run once per file version. The cache key holds
+the modification time and size of the watched files, so editing or replacing
+a file reloads it on the next call, with no restart needed.
+
+Inside a running Streamlit app the results are kept by `st.cache_resource`
+(shared objects such as the booster) or `st.cache_data` (a copy per caller),
+so they follow the app's cache controls. Elsewhere (scripts, the scoring
+service, tests) a plain in-process dict with a lock is used. Streamlit is
+never imported here. Every loader counts its calls and actual loads; see
+`cache_stats()`.
+"""
+
+import copy
+import os
+import sys
+import threading
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+# Versions of each loader kept by the Streamlit caches (old file versions age out)
+STREAMLIT_MAX_ENTRIES = 16
+
+_STATS: Dict[str, Dict[str, int]] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def file_signature(paths: Iterable) -> tuple:
+    """(absolute path, mtime_ns, size) per path; (path, None, None) for missing files."""
+    signature = []
+    for path in paths:
+        path = os.path.abspath(os.fspath(path))
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def _streamlit():
+    """The streamlit module if this process is serving a Streamlit app, else None."""
+    st = sys.modules.get('streamlit')
+    if st is None:
+        return None
+    try:
+        from streamlit import runtime
+        return st if runtime.exists() else None
+    except Exception:
+        return None
+
+
+def _count(name: str, field: str):
+    with _STATS_LOCK:
+        _STATS.setdefault(name, {'calls': 0, 'loads': 0})[field] += 1
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Calls and actual loads per cached loader since the process started."""
+    with _STATS_LOCK:
+        return {name: dict(counts) for name, counts in _STATS.items()}
+
+
+def file_cached(name: Optional[str] = None, kind: str = 'resource', watch: Optional[Callable] = None):
+    """
+    Cache a loader on its arguments and the version of the files it reads.
+
+    Args:
+        name: Name in `cache_stats()` (default: the function name)
+        kind: 'resource' returns the one shared object (models, read-only
+              indexes); 'data' returns a copy to every caller, so it may be
+              modified in place (DataFrames, lists)
+        watch: Called with the loader's arguments, returns the paths whose
+               mtime/size key the cache; default is the first argument
+
+    The wrapped loader gains `cache_clear()`. Exceptions are not cached.
+    """
+    if kind not in ('resource', 'data'):
+        raise ValueError("kind must be 'resource' or 'data'")
+
+    def decorator(func):
+        label = name or func.__name__
+        entries: Dict[tuple, tuple] = {}  # arguments -> (signature, value)
+        lock = threading.Lock()
+        streamlit_loaders = {}
+
+        def _load(signature, args, kwargs):
+            _count(label, 'loads')
+            return func(*args, **dict(kwargs))
+
+        # Streamlit identifies cached functions by module and qualified name
+        _load.__module__ = func.__module__
+        _load.__qualname__ = f"{func.__qualname__}.<file_cached>"
+
+        def _watched(args, kwargs):
+            if watch is not None:
+                return watch(*args, **kwargs)
+            return args[:1]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            _count(label, 'calls')
+            signature = file_signature(_watched(args, kwargs))
+            key = (args, tuple(sorted(kwargs.items())))
+            st = _streamlit()
+            if st is not None:
+                if 'loader' not in streamlit_loaders:
+                    cache = st.cache_resource if kind == 'resource' else st.cache_data
+                    streamlit_loaders['loader'] = cache(show_spinner=False,
+                                                        max_entries=STREAMLIT_MAX_ENTRIES)(_load)
+                return streamlit_loaders['loader'](signature, *key)
+            with lock:
+                cached = entries.get(key)
+                if cached is None or cached[0] != signature:
+                    # Held while loading so concurrent callers do not load the same file twice
+                    cached = (signature, _load(signature, *key))
+                    entries[key] = cached
+            return copy.deepcopy(cached[1]) if kind == 'data' else cached[1]
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+            if 'loader' in streamlit_loaders:
+                streamlit_loaders['loader'].clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+@file_cached('csv tables', kind='data')
+def read_csv_cached(path: str, **kwargs) -> pd.DataFrame:
+    """pd.read_csv(path, **kwargs), re-read only when the file changes (keyword values must be hashable)."""
+    return pd.read_csv(path, **kwargs)
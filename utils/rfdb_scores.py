@@ -0,0 +1,246 @@
+"""
+Precomputed RFDB scoring table.
+
+RideForcesDB recordings are scored in bulk by
+`scripts/build_rfdb_score_table.py` and stored as one compact, typed table
+(`submissions/rfdb_scores.npz`): ids, fun/safety scores, recording metadata,
+estimated height/speed/length and percentile ranks. The leaderboard loads it
+with a single read and joins it with the user submissions in memory instead of
+parsing hundreds of RFDB dicts out of `leaderboard.json`.
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.submission_manager import _get_submissions_dir, load_submissions
+
+SCORE_TABLE_FILENAME = 'rfdb_scores.npz'
+
+# Candidate column names found in RFDB exports (matched case-insensitively)
+TIME_COLUMNS = ['Time', 'time', 't', 'timestamp', 'elapsed', 'seconds', 's']
+VERTICAL_COLUMNS = ['Vertical', 'vertical', 'vert', 'zforce', 'g_vert', 'gvertical', 'gz', 'accel_z', 'az']
+LATERAL_COLUMNS = ['Lateral', 'lateral', 'lat', 'xforce', 'g_lat', 'glateral', 'gx', 'accel_x', 'ax']
+LONGITUDINAL_COLUMNS = ['Longitudinal', 'longitudinal', 'long', 'yforce', 'g_long', 'glongitudinal', 'gy', 'accel_y', 'ay']
+
+# String columns are stored as fixed-width unicode, numeric ones as float32
+STRING_FIELDS = ('submission_id', 'park', 'coaster', 'csv_file')
+FLOAT_FIELDS = (
+    'score', 'safety_score',
+    'estimated_height_m', 'estimated_speed_kmh', 'estimated_track_length_m',
+)
+RANK_FIELDS = ('score_pct', 'safety_pct', 'combined_pct')
+
+
+def _rfdb_root() -> str:
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'rfdb_csvs'))
+
+
+def make_rfdb_submission_id(park: str, coaster: str, csv_file: str) -> str:
+    """Leaderboard id of an RFDB recording (same scheme as the legacy scripts)."""
+    submission_id = f"rfdb_{park}_{coaster}_{csv_file}".replace(' ', '_').replace('/', '_')
+    return submission_id.replace('.csv', '').replace(':', '-')
+
+
+def resolve_accel_frame(df: pd.DataFrame) -> Tuple[Optional[pd.DataFrame], bool]:
+    """
+    Map a raw RFDB CSV onto the Time/Vertical/Lateral/Longitudinal schema.
+
+    Returns:
+        (accel_df, has_time). accel_df is None if a force column is missing.
+    """
+    cols_lower = {c.lower(): c for c in df.columns}
+
+    def resolve_any(candidates):
+        for cand in candidates:
+            if cand.lower() in cols_lower:
+                return cols_lower[cand.lower()]
+        return None
+
+    time_col = resolve_any(TIME_COLUMNS)
+    vert_col = resolve_any(VERTICAL_COLUMNS)
+    lat_col = resolve_any(LATERAL_COLUMNS)
+    long_col = resolve_any(LONGITUDINAL_COLUMNS)
+
+    if not all([vert_col, lat_col, long_col]):
+        return None, False
+
+    accel_df = pd.DataFrame({
+        'Time': df[time_col] if time_col else np.arange(len(df)),
+        'Vertical': df[vert_col],
+        'Lateral': df[lat_col],
+        'Longitudinal': df[long_col],
+    })
+    return accel_df, time_col is not None
+
+
+def estimate_rfdb_metadata(accel_df: pd.DataFrame, has_time: bool = True) -> Dict[str, float]:
+    """
+    Estimate height/speed/track length of a recorded ride from its g-forces.
+
+    Heuristics (the recordings carry no geometry):
+    - speed: avg total g of 1.5g ~ 60 km/h, scaled linearly, clipped to 40-150 km/h
+    - length: duration x estimated speed
+    - height: 1g of vertical range ~ 10 m, clipped to 20-150 m
+    """
+    if has_time and len(accel_df) > 1:
+        duration_s = float(accel_df['Time'].iloc[-1] - accel_df['Time'].iloc[0])
+    else:
+        # Assume ~50Hz sampling if no time column
+        duration_s = float(len(accel_df) * 0.02)
+
+    total_g = np.sqrt(accel_df['Vertical']**2 + accel_df['Lateral']**2 + accel_df['Longitudinal']**2)
+    avg_total_g = float(np.mean(total_g))
+    estimated_speed_kmh = max(40.0, min(150.0, avg_total_g * 40.0))
+    estimated_track_length_m = float(duration_s * (estimated_speed_kmh / 3.6))
+
+    max_vert_g = float(accel_df['Vertical'].max())
+    min_vert_g = float(accel_df['Vertical'].min())
+    estimated_height_m = max(20.0, min(150.0, abs(max_vert_g - min_vert_g) * 10.0))
+
+    return {
+        'height_m': estimated_height_m,
+        'speed_kmh': estimated_speed_kmh,
+        'track_length_m': estimated_track_length_m,
+    }
+
+
+def list_rfdb_recordings(use_cloud: bool = True) -> List[Tuple[str, str, str, str]]:
+    """
+    List every available RFDB recording as (park, coaster, csv_file, submission_id).
+    Cloud listings are tried first, then the local `rfdb_csvs/` tree.
+    """
+    from utils.cloud_data_loader import list_rfdb_parks, list_rfdb_coasters, list_rfdb_csvs
+
+    rfdb_root = _rfdb_root()
+
+    def _local_dirs(path):
+        if not os.path.exists(path):
+            return []
+        return sorted(d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d)))
+
+    parks = list_rfdb_parks(use_cloud=use_cloud) or _local_dirs(rfdb_root)
+
+    recordings = []
+    for park in parks:
+        coasters = list_rfdb_coasters(park, use_cloud=use_cloud) or _local_dirs(os.path.join(rfdb_root, park))
+        for coaster in coasters:
+            csv_files = list_rfdb_csvs(park, coaster, use_cloud=use_cloud)
+            if not csv_files:
+                coaster_path = os.path.join(rfdb_root, park, coaster)
+                if not os.path.exists(coaster_path):
+                    continue
+                csv_files = sorted(f for f in os.listdir(coaster_path) if f.endswith('.csv'))
+            for csv_file in csv_files:
+                recordings.append((park, coaster, csv_file, make_rfdb_submission_id(park, coaster, csv_file)))
+    return recordings
+
+
+def load_rfdb_recording(park: str, coaster: str, csv_file: str, use_cloud: bool = True) -> Optional[pd.DataFrame]:
+    """Load a raw RFDB CSV from cloud storage, falling back to `rfdb_csvs/`."""
+    from utils.cloud_data_loader import load_rfdb_csv
+
+    df = load_rfdb_csv(park, coaster, csv_file, use_cloud=use_cloud)
+    if df is None:
+        csv_path = os.path.join(_rfdb_root(), park, coaster, csv_file)
+        if os.path.exists(csv_path):
+            df = pd.read_csv(csv_path)
+    return df
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """Percentile rank (0-100) of each value within the array; ties share the mean rank."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return np.zeros(0, dtype=np.float32)
+    sorted_vals = np.sort(values)
+    below = np.searchsorted(sorted_vals, values, side='left')
+    at_or_below = np.searchsorted(sorted_vals, values, side='right')
+    return (50.0 * (below + at_or_below) / values.size).astype(np.float32)
+
+
+def build_score_table(rows: Iterable[Dict], built_at: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Pack scored recordings into a column-oriented typed table.
+
+    Args:
+        rows: Dicts with the STRING_FIELDS and FLOAT_FIELDS keys
+        built_at: ISO timestamp stored with the table (defaults to now)
+
+    Returns:
+        Dict of numpy arrays, one per column, plus percentile ranks and `built_at`.
+    """
+    rows = list(rows)
+    table = {}
+    for field in STRING_FIELDS:
+        table[field] = np.array([str(r[field]) for r in rows], dtype=np.str_)
+    for field in FLOAT_FIELDS:
+        table[field] = np.array([float(r[field]) for r in rows], dtype=np.float32)
+
+    table['score_pct'] = percentile_rank(table['score'])
+    table['safety_pct'] = percentile_rank(table['safety_score'])
+    table['combined_pct'] = percentile_rank(table['score'].astype(np.float64) + table['safety_score'])
+    table['built_at'] = np.array(built_at or datetime.now().isoformat())
+    return table
+
+
+def score_table_path() -> str:
+    return os.path.join(_get_submissions_dir(), SCORE_TABLE_FILENAME)
+
+
+def save_score_table(table: Dict[str, np.ndarray], path: Optional[str] = None) -> str:
+    """Write the table as a single compressed .npz (no pickled objects)."""
+    path = path or score_table_path()
+    np.savez_compressed(path, **table)
+    return path
+
+
+def load_score_table(path: Optional[str] = None) -> Optional[Dict[str, np.ndarray]]:
+    """Load the score table in one read, or None if it has not been built."""
+    path = path or score_table_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+    except Exception as e:
+        print(f"Error loading RFDB score table: {e}")
+        return None
+
+
+def table_to_submissions(table: Dict[str, np.ndarray]) -> List[Dict]:
+    """Expand the table into leaderboard-style submission dicts."""
+    built_at = str(table['built_at'])
+    columns = {field: table[field].tolist() for field in STRING_FIELDS + FLOAT_FIELDS + RANK_FIELDS if field in table}
+    submissions = []
+    for i in range(len(columns['submission_id'])):
+        sub = {field: values[i] for field, values in columns.items()}
+        sub['submitter_name'] = f"RFDB: {sub['coaster']} ({sub['park']})"
+        sub['timestamp'] = built_at
+        sub['source'] = 'RFDB'
+        submissions.append(sub)
+    return submissions
+
+
+def load_leaderboard() -> List[Dict]:
+    """
+    Load the full leaderboard: RFDB rows from the score table plus user submissions.
+
+    When the table exists it is authoritative for RFDB entries and any RFDB rows
+    still present in `leaderboard.json` are ignored. Without a table the legacy
+    JSON index is returned unchanged.
+
+    Returns:
+        Submissions sorted by combined score (score + safety_score), descending.
+    """
+    submissions = load_submissions()
+    table = load_score_table()
+    if table is None:
+        return submissions
+
+    merged = [s for s in submissions if s.get('source') != 'RFDB'] + table_to_submissions(table)
+    merged.sort(key=lambda x: (x['score'] + x['safety_score'], x['score'], x['safety_score']), reverse=True)
+    return merged
@@ -0,0 +1,223 @@
+"""
+Event-driven time-domain ride simulator (importable form of physics/Roller.py).
+
+The train's state is its arc-length position s and speed v along the track
+polyline. Each output step of length dt is integrated with Velocity-Verlet in
+as many substeps as needed to move at most `max_ds` meters per substep, the
+current segment comes from a binary search in the cumulative arc length
+(`utils.arc_length_track.ArcLengthTrack`), and
+the run stops as soon as the train leaves the track (end reached, or rolled
+back past the start) or comes to rest instead of after a fixed number of
+steps. A train at rest is held by static friction unless gravity along the
+track overcomes it (|g_par| > mu * normal).
+
+The integration loop is a Numba kernel when Numba is available (plain Python
+otherwise); everything after it is vectorized. Results use the output schema
+of `utils.acceleration.compute_acc_profile`, one sample per dt.
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.acceleration import G_NORM, G_VEC
+from utils.arc_length_track import ArcLengthTrack
+from utils.track_geometry import circumcircles
+
+# Optional Numba acceleration
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except Exception:
+    NUMBA_AVAILABLE = False
+
+DEFAULT_T_MAX = 600.0  # s; upper bound for rides that neither leave the track nor come to rest
+INITIAL_CAPACITY = 4096  # output samples allocated before the first growth
+V_REST = 1e-3  # m/s; below this speed the train is treated as at rest (static friction applies)
+
+# Kernel exit codes
+_RUNNING, _COMPLETED, _ROLLED_BACK, _STOPPED = 0, 1, 2, 3
+STATUS = {_RUNNING: 'timeout', _COMPLETED: 'completed', _ROLLED_BACK: 'rolled_back', _STOPPED: 'stopped'}
+
+
+def _tangential_acc(seg_dir_z, cum_s, s, v, k_drag, mu):
+    # Gravity along the segment minus friction and drag (both oppose the motion)
+    k = np.searchsorted(cum_s, s, side='right') - 1
+    k = min(max(k, 0), cum_s.shape[0] - 2)
+    g_par = -G_NORM * seg_dir_z[k]
+    normal_mag = math.sqrt(max(G_NORM * G_NORM - g_par * g_par, 0.0))
+    if abs(v) < V_REST:
+        # At rest: static friction holds the train unless gravity along the track overcomes it,
+        # then kinetic friction opposes the direction gravity starts it moving in
+        if abs(g_par) <= mu * normal_mag:
+            return 0.0
+        return g_par - math.copysign(mu * normal_mag, g_par)
+    sign_motion = 1.0 if v > 0.0 else -1.0
+    return g_par - sign_motion * (mu * normal_mag + k_drag * v * v)
+
+
+def _integrate_ride(seg_dir_z, cum_s, s, v, a_prev, dt, max_ds, k_drag, mu, out_s, out_v, out_a):
+    """Advance up to len(out_s) output steps; returns (count, s, v, a, status)."""
+    length = cum_s[cum_s.shape[0] - 1]
+    for i in range(out_s.shape[0]):
+        n_sub = max(1, int(math.ceil(abs(v) * dt / max_ds)))
+        h = dt / n_sub
+        status = _RUNNING
+        for _ in range(n_sub):
+            # Velocity-Verlet along the track
+            v_half = v + 0.5 * a_prev * h
+            s = s + v_half * h
+            if s >= length:
+                s = length
+                status = _COMPLETED
+            elif s < 0.0:
+                s = 0.0
+                status = _ROLLED_BACK
+            a_new = _tangential_acc(seg_dir_z, cum_s, s, v_half, k_drag, mu)
+            v_before = v
+            v = v_half + 0.5 * a_new * h
+            # Speed reached (or passed through) zero: the train stops if static friction holds it
+            if status == _RUNNING and (abs(v) < V_REST or (v > 0.0) != (v_before > 0.0)):
+                if _tangential_acc(seg_dir_z, cum_s, s, 0.0, k_drag, mu) == 0.0:
+                    v = 0.0
+                    a_new = 0.0
+                    status = _STOPPED
+            a_prev = a_new
+            if status != _RUNNING:
+                break
+        out_s[i] = s
+        out_v[i] = v
+        out_a[i] = a_prev
+        if status != _RUNNING:
+            return i + 1, s, v, a_prev, status
+    return out_s.shape[0], s, v, a_prev, _RUNNING
+
+
+if NUMBA_AVAILABLE:
+    _tangential_acc = njit(cache=True, fastmath=True, nogil=True)(_tangential_acc)
+    _integrate_ride = njit(cache=True, fastmath=True, nogil=True)(_integrate_ride)
+
+
+def simulate_ride(points: np.ndarray,
+                  dt: float = 0.005,
+                  mass: float = 6000.0,
+                  rho: float = 1.3,
+                  Cd: float = 0.6,
+                  A: float = 4.0,
+                  mu: float = 0.02,
+                  v0: float = 1.0,
+                  t_max: float = DEFAULT_T_MAX,
+                  max_ds: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Simulate a train running along a track polyline.
+
+    Args:
+        points: Nx3 track points in meters, Z-up (x=forward, y=lateral, z=vertical)
+        dt: Output sample step (s); the integrator substeps within it as needed
+        mass, rho, Cd, A, mu: Train mass, air density, drag coefficient, frontal
+                              area and rolling friction
+        v0: Initial speed (m/s)
+        t_max: Stop after this ride time (s) even if the train is still on the track
+        max_ds: Longest distance covered in one integration substep (m); defaults
+                to the median segment length so no track vertex is stepped over
+
+    Returns:
+        dict with the compute_acc_profile outputs (e_tan, v, v_3d, a_tan, a_eq,
+        a_tot, f_spec, long/lat/vert, f_long/f_lat/f_vert, f_*_g, curvature), one
+        entry per dt, plus 't' (s), 's' (arc length, m), 'position' (Nx3),
+        'segment' (index of the track segment), 'radius' (circumcircle radius,
+        inf where straight) and 'status' ('completed', 'rolled_back', 'stopped'
+        (came to rest, held by static friction) or 'timeout')
+    """
+    points = np.asarray(points, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 3 or points.shape[0] < 3:
+        raise ValueError("points must be an Nx3 array with N>=3")
+    if dt <= 0 or t_max <= 0:
+        raise ValueError("dt and t_max must be positive")
+
+    # Segment table: cumulative arc length and unit direction per segment
+    track = ArcLengthTrack(points)
+    cum_s, seg_len, seg_dir = track.arc_length, track.segment_lengths, track.directions
+    degenerate = seg_len < 1e-9
+    if max_ds is None:
+        max_ds = float(np.median(seg_len[~degenerate])) if (~degenerate).any() else 1.0
+    if max_ds <= 0:
+        raise ValueError("max_ds must be positive")
+    seg_dir_z = np.ascontiguousarray(seg_dir[:, 2])
+    k_drag = float(0.5 * rho * Cd * A / mass)
+
+    # Integrate in chunks until the train leaves the track, stops or t_max is reached
+    n_max = int(math.floor(t_max / dt)) + 1
+    s, v = 0.0, float(v0)
+    a = float(_tangential_acc(seg_dir_z, cum_s, s, v, k_drag, float(mu)))
+    chunks_s, chunks_v, chunks_a = [np.array([s])], [np.array([v])], [np.array([a])]
+    n_done, status = 1, _RUNNING
+    capacity = INITIAL_CAPACITY
+    while n_done < n_max and status == _RUNNING:
+        size = min(capacity, n_max - n_done)
+        out_s, out_v, out_a = np.empty(size), np.empty(size), np.empty(size)
+        count, s, v, a, status = _integrate_ride(seg_dir_z, cum_s, s, v, a, float(dt), float(max_ds),
+                                                 k_drag, float(mu), out_s, out_v, out_a)
+        chunks_s.append(out_s[:count])
+        chunks_v.append(out_v[:count])
+        chunks_a.append(out_a[:count])
+        n_done += count
+        capacity *= 2
+    s_arr = np.concatenate(chunks_s)
+    v_arr = np.concatenate(chunks_v)
+    a_arr = np.concatenate(chunks_a)
+    n = len(s_arr)
+
+    # Kinematics along the track
+    k = track.segment(s_arr)
+    e_tan = seg_dir[k]
+    position = track.position(s_arr)
+
+    # Centripetal acceleration from the circle through the segment start and its neighbours
+    R_pts, centers_pts = circumcircles(points)
+    R, centers = R_pts[k], centers_pts[k]
+    to_point = position - centers
+    dist = np.linalg.norm(to_point, axis=1)
+    valid = np.all(np.isfinite(centers), axis=1) & (R > 1e-6) & (dist > 1e-9)
+    a_eq = np.zeros((n, 3))
+    a_eq[valid] = -(v_arr[valid] ** 2 / R[valid])[:, None] * (to_point[valid] / dist[valid, None])
+    radius = np.where(valid, R, np.inf)
+
+    # Total inertial acceleration and specific force, projected on the rider axes
+    # (longitudinal = tangent, vertical = global Z, lateral = cross(ez, tangent))
+    a_tot = a_arr[:, None] * e_tan + a_eq
+    f_spec = a_tot - G_VEC
+    ez = np.array([0.0, 0.0, 1.0])
+    lat_vec = np.cross(ez, e_tan)
+    lat_n = np.linalg.norm(lat_vec, axis=1, keepdims=True)
+    lat_vec = lat_vec / np.where(lat_n < 1e-9, 1.0, lat_n)
+    f_long = np.einsum('ij,ij->i', f_spec, e_tan)
+    f_lat = np.einsum('ij,ij->i', f_spec, lat_vec)
+    f_vert = f_spec[:, 2]
+
+    return {
+        'e_tan': e_tan,
+        'v': v_arr,
+        'v_3d': v_arr[:, None] * e_tan,
+        'a_tan': a_arr,
+        'a_eq': a_eq,
+        'a_tot': a_tot,
+        'f_spec': f_spec,
+        'long': np.einsum('ij,ij->i', a_tot, e_tan),
+        'lat': np.einsum('ij,ij->i', a_tot, lat_vec),
+        'vert': a_tot[:, 2],
+        'f_long': f_long,
+        'f_lat': f_lat,
+        'f_vert': f_vert,
+        'f_long_g': f_long / G_NORM,
+        'f_lat_g': f_lat / G_NORM,
+        'f_vert_g': f_vert / G_NORM,
+        'curvature': np.where(valid, 1.0 / np.where(valid, R, 1.0), 0.0),
+        't': np.arange(n) * dt,
+        's': s_arr,
+        'position': position,
+        'segment': k,
+        'radius': radius,
+        'status': STATUS[status],
+    }
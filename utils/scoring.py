@@ -0,0 +1,374 @@
+"""
+Headless ride scoring: g-force safety, airtime and LightGBM ride features.
+
+Shared by the Streamlit builder and the batch scripts (RFDB processing,
+leaderboard rescoring, design sweeps). Nothing here imports Streamlit or
+plotly, so scripts can score rides without executing the UI.
+"""
+
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.lgbm_predictor import compute_lightgbm_features, predict_scores_from_features
+
+# Builder defaults for the physics parameters (Physics Parameters expander)
+DEFAULT_PHYSICS = {
+    'mass': 500.0,
+    'rho': 1.2,
+    'Cd': 0.1,
+    'A': 2.0,
+    'mu': 0.001,
+}
+
+
+def check_gforce_safety(accel_df):
+    """
+    Check if g-forces are within safe human tolerance limits.
+    
+    Human G-force tolerances:
+    - Positive (downward): 5g dangerous, 9g+ fatal
+    - Negative (upward): -2g to -3g dangerous
+    - Lateral: ±2g uncomfortable, ±5g dangerous
+    
+    Returns:
+        dict with safety analysis
+    """
+    max_vertical = accel_df['Vertical'].max()
+    min_vertical = accel_df['Vertical'].min()
+    max_lateral = accel_df['Lateral'].abs().max()
+    max_longitudinal = accel_df['Longitudinal'].abs().max()
+    
+    warnings = []
+    dangers = []
+    
+    # Vertical G-forces (positive)
+    if max_vertical > 5.0:
+        dangers.append(f"🚨 DANGEROUS: {max_vertical:.1f}g positive vertical (>5g can cause blackout)")
+    elif max_vertical > 4.0:
+        warnings.append(f"⚠️ HIGH: {max_vertical:.1f}g positive vertical (uncomfortable, >4g)")
+    elif max_vertical > 3.0:
+        warnings.append(f"⚠️ Intense: {max_vertical:.1f}g positive vertical (>3g)")
+    
+    # Vertical G-forces (negative/airtime)
+    if min_vertical < -3.0:
+        dangers.append(f"🚨 DANGEROUS: {min_vertical:.1f}g negative vertical (< -3g unsafe)")
+    elif min_vertical < -2.0:
+        warnings.append(f"⚠️ HIGH: {min_vertical:.1f}g negative airtime (< -2g)")
+    
+    # Lateral G-forces
+    if max_lateral > 5.0:
+        dangers.append(f"🚨 DANGEROUS: {max_lateral:.1f}g lateral (>5g can cause injury)")
+    elif max_lateral > 2.0:
+        warnings.append(f"⚠️ Uncomfortable: {max_lateral:.1f}g lateral (>2g)")
+    
+    # Longitudinal G-forces
+    if max_longitudinal > 3.0:
+        warnings.append(f"⚠️ Intense: {max_longitudinal:.1f}g longitudinal (>3g)")
+    
+    # Overall safety rating
+    if len(dangers) > 0:
+        safety_level = "DANGEROUS"
+        safety_emoji = "🚨"
+        safety_color = "error"
+    elif len(warnings) > 0:
+        safety_level = "Intense/Uncomfortable"
+        safety_emoji = "⚠️"
+        safety_color = "warning"
+    else:
+        safety_level = "Safe"
+        safety_emoji = "✅"
+        safety_color = "success"
+    
+    # Calculate safety score (0-5 stars) with continuous penalties
+    safety_score = float(check_gforce_safety_batch(
+        max_vertical, min_vertical, max_lateral, max_longitudinal
+    )[0])
+    
+    return {
+        'level': safety_level,
+        'emoji': safety_emoji,
+        'color': safety_color,
+        'warnings': warnings,
+        'dangers': dangers,
+        'max_vertical': max_vertical,
+        'min_vertical': min_vertical,
+        'max_lateral': max_lateral,
+        'max_longitudinal': max_longitudinal,
+        'safety_score': safety_score  # 0-5 stars
+    }
+
+
+def check_gforce_safety_batch(max_vertical, min_vertical, max_lateral, max_longitudinal):
+    """
+    Safety scores (0-5 stars) for many rides at once from their g-force extrema.
+    
+    Vectorized form of the piecewise penalties used by check_gforce_safety: each
+    axis is evaluated with np.select over the same thresholds, so results are
+    identical to the scalar version.
+    
+    Args:
+        max_vertical: Max positive vertical g per ride
+        min_vertical: Min (most negative) vertical g per ride
+        max_lateral: Max absolute lateral g per ride
+        max_longitudinal: Max absolute longitudinal g per ride
+    
+    Returns:
+        np.ndarray of safety scores, one per ride
+    """
+    v = np.atleast_1d(np.asarray(max_vertical, dtype=np.float64))
+    m = np.atleast_1d(np.asarray(min_vertical, dtype=np.float64))
+    l = np.atleast_1d(np.asarray(max_lateral, dtype=np.float64))
+    L = np.atleast_1d(np.asarray(max_longitudinal, dtype=np.float64))
+    
+    # Start with 5 stars and deduct for safety violations
+    safety_score = np.full(np.broadcast(v, m, l, L).shape, 5.0)
+    
+    # Vertical g-forces (positive): penalty grows from 2g, steeper above 3/4/5g
+    safety_score += np.select(
+        [v > 5.0, v > 4.0, v > 3.0, v > 2.0],
+        [-3.0 - 0.6 * (v - 5.0),
+         -2.0 - 0.5 * (v - 4.0),
+         -0.8 - 0.5 * (v - 3.0),
+         -0.15 * (v - 2.0)],
+        default=0.0,
+    )
+    
+    # Negative g-forces (airtime): penalty grows from -1g
+    safety_score += np.select(
+        [m < -3.0, m < -2.0, m < -1.5, m < -1.0],
+        [-3.0 - 0.6 * np.abs(m + 3.0),
+         -2.0 - 0.6 * np.abs(m + 2.0),
+         -0.7 - 0.4 * np.abs(m + 1.5),
+         -0.25 * np.abs(m + 1.0)],
+        default=0.0,
+    )
+    
+    # Lateral g-forces: penalty grows from 1g
+    safety_score += np.select(
+        [l > 5.0, l > 3.0, l > 2.0, l > 1.5, l > 1.0],
+        [-3.0 - 0.5 * (l - 5.0),
+         -1.5 - 0.5 * (l - 3.0),
+         -0.7 - 0.4 * (l - 2.0),
+         -0.3 - 0.7 * (l - 1.5),
+         -0.15 * (l - 1.0)],
+        default=0.0,
+    )
+    
+    # Longitudinal g-forces: penalty grows from 2g
+    safety_score += np.select(
+        [L > 4.0, L > 3.0, L > 2.5, L > 2.0],
+        [-1.3 - 0.3 * (L - 4.0),
+         -0.7 - 0.6 * (L - 3.0),
+         -0.3 - 0.7 * (L - 2.5),
+         -0.15 * (L - 2.0)],
+        default=0.0,
+    )
+    
+    # Clamp to 0-5 range
+    return np.clip(safety_score, 0.0, 5.0)
+
+
+def compute_airtime_metrics(accel_df):
+    """Compute airtime metrics from vertical g data.
+    Updated airtime definitions (by vertical g in g-units):
+    - Floater Airtime: -0.25g <= Vertical <= 0.25g
+    - Flojector Airtime: -0.75g <= Vertical < -0.25g
+    - Ejector Airtime: Vertical <= -0.75g
+    - Total Airtime: all periods below 0g
+
+    Returns seconds for each category and total airtime.
+    Uses time spacing from 'Time' column.
+    """
+    if accel_df is None or 'Vertical' not in accel_df or 'Time' not in accel_df:
+        return {'floater': 0.0, 'flojector': 0.0, 'ejector': 0.0, 'total_airtime': 0.0}
+
+    t = accel_df['Time'].to_numpy()
+    g = accel_df['Vertical'].to_numpy()
+    if len(t) < 2:
+        dt = 0.1
+    else:
+        dt = float(np.median(np.diff(t)))
+
+    # Updated airtime definitions
+    floater_mask = (g >= -0.25) & (g <= 0.25)
+    flojector_mask = (g >= -0.75) & (g < -0.25)
+    ejector_mask = (g <= -0.75)
+
+    floater_time = float(floater_mask.sum() * dt)
+    flojector_time = float(flojector_mask.sum() * dt)
+    ejector_time = float(ejector_mask.sum() * dt)
+    # Total airtime: all periods below 0g (not the sum of categories, since floater includes positive values)
+    total_airtime_mask = (g < 0.0)
+    total_airtime = float(total_airtime_mask.sum() * dt)
+
+    return {
+        'floater': floater_time,
+        'flojector': flojector_time,
+        'ejector': ejector_time,
+        'total_airtime': total_airtime,
+        # Additional metrics for feature calculation
+        'floater_proportion': float(floater_mask.sum() / len(g)) if len(g) > 0 else 0.0,
+        'flojector_proportion': float(flojector_mask.sum() / len(g)) if len(g) > 0 else 0.0,
+        'total_length_seconds': float(len(g) * dt),
+    }
+
+
+def calculate_ride_features(accel_df):
+    """Calculate features consistent with the LightGBM extreme model."""
+    if accel_df is None or len(accel_df) == 0:
+        return {}
+    if not all(col in accel_df.columns for col in ['Vertical', 'Lateral', 'Longitudinal']):
+        return {}
+
+    feature_vector, feature_map = compute_lightgbm_features(accel_df, return_dict=True)
+
+    # Backward-compatible keys for the advanced panel
+    alias = {
+        'num_positive_g_peaks': "Num Positive G (>3.0g)",
+        'max_negative_vertical_g': "Max Negative Vertical G",
+        'max_positive_vertical_g': "Max Positive Vertical G",
+        'max_lateral_g': "Max Lateral G",
+        'max_longitudinal_g': "Max Longitudinal G",
+        'vertical_variance': "Vertical Variance",
+        'lateral_variance': "Lateral Variance",
+        'vertical_jerk': "Vertical Jerk",
+        'avg_total_g': "Avg Total G",
+        'airtime_gforce_interaction': "Airtime×G-Force Interaction",
+        'g_force_range': "G-Force Range",
+        'lateral_jerk': "Lateral Jerk",
+        'g_force_skewness': "G-Force Skewness",
+        'intensity_pacing': "Intensity Pacing",
+        'force_transitions': "Force Transitions",
+        'peak_density': "Peak Density",
+        'rhythm_score': "Rhythm Score",
+        'lateral_vibration': "Lateral Vibration",
+        'vertical_vibration': "Vertical Vibration",
+        'longitudinal_vibration': "Longitudinal Vibration",
+    }
+
+    ride_features = {k: float(feature_map.get(v, 0.0)) for k, v in alias.items()}
+    # Include airtime + metadata pieces for completeness
+    ride_features.update({
+        'total_length_log_sec': float(feature_map.get("Total Length (log-sec)", 0.0)),
+        'floater_airtime_pct': float(feature_map.get("Floater Airtime %", 0.0)),
+        'flojector_airtime_pct': float(feature_map.get("Flojector Airtime %", 0.0)),
+        'height_m': float(feature_map.get("Height (m)", 0.0)),
+        'speed_kmh': float(feature_map.get("Speed (km/h)", 0.0)),
+        'track_length_m': float(feature_map.get("Track Length (m)", 0.0)),
+        'feature_vector': feature_vector,
+    })
+
+    return ride_features
+
+
+def estimate_track_metadata(x, y, z=None):
+    """
+    Estimate the LightGBM metadata features from designed track geometry.
+    
+    Args:
+        x, y, z: Track coordinates (y vertical); z defaults to a flat track
+    
+    Returns:
+        dict with height_m (max height), speed_kmh (from the largest height drop,
+        v = sqrt(2*g*h) at 95% efficiency) and track_length_m (3D arc length)
+    """
+    x_track = np.asarray(x, dtype=float)
+    y_track = np.asarray(y, dtype=float)
+    z_track = np.zeros_like(x_track) if z is None else np.asarray(z, dtype=float)
+    if len(x_track) == 0:
+        return {'height_m': 0.0, 'speed_kmh': 0.0, 'track_length_m': 0.0}
+    
+    # Track length: 3D arc length
+    dx = np.diff(x_track, prepend=x_track[0])
+    dy = np.diff(y_track, prepend=y_track[0])
+    dz = np.diff(z_track, prepend=z_track[0])
+    track_length_m = float(np.sum(np.sqrt(dx**2 + dy**2 + dz**2)))
+    
+    # Max height
+    height_m = float(np.max(y_track))
+    
+    # Max speed: estimate from energy conservation (v = sqrt(2*g*h))
+    # Use max height drop as proxy for max speed
+    max_height_drop = float(np.max(y_track) - np.min(y_track))
+    g = 9.81
+    energy_efficiency = 0.95  # Match accelerometer_transform
+    max_speed_ms = np.sqrt(2 * g * max_height_drop * energy_efficiency)
+    speed_kmh = float(max_speed_ms * 3.6)  # Convert to km/h
+    
+    return {
+        'height_m': height_m,
+        'speed_kmh': speed_kmh,
+        'track_length_m': track_length_m
+    }
+
+
+def score_track(x, y, z=None,
+                physics: Optional[Dict[str, float]] = None,
+                predictor: Optional[Callable[[np.ndarray], float]] = None,
+                compact: bool = False) -> Dict:
+    """
+    Full evaluation of a designed track: physics -> safety/airtime -> fun rating.
+    
+    Same pipeline as the builder page (advanced physics mode), returning only
+    JSON-friendly values.
+    
+    Args:
+        x, y, z: Track coordinates (y vertical); z defaults to a flat track
+        physics: Overrides for DEFAULT_PHYSICS (mass, rho, Cd, A, mu)
+        predictor: Maps one LightGBM feature vector to a rating; defaults to a
+                   direct booster call (the scoring service passes a micro-batcher)
+        compact: Use the float32 compact physics mode (batch sweeps)
+    
+    Returns:
+        dict with gforce, airtime, safety, fun_rating, metadata and n_points,
+        or raises ValueError if the track is too short to simulate or has
+        non-finite coordinates or physics parameters
+    """
+    from utils.accelerometer_transform import track_to_accelerometer_data
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    z = np.zeros_like(x) if z is None else np.asarray(z, dtype=float)
+    if len(x) < 10 or len(y) != len(x) or len(z) != len(x):
+        raise ValueError("track needs at least 10 points with matching x/y/z lengths")
+    # NaN/inf would run through the physics and come back as NaN ratings and a perfect safety score
+    if not (np.isfinite(x).all() and np.isfinite(y).all() and np.isfinite(z).all()):
+        raise ValueError("track coordinates must be finite (no NaN or inf)")
+    
+    params = dict(DEFAULT_PHYSICS)
+    params.update(physics or {})
+    if not all(np.isfinite(float(v)) for v in params.values()):
+        raise ValueError("physics parameters must be finite numbers")
+    accel_df = track_to_accelerometer_data(pd.DataFrame({'x': x, 'y': y, 'z': z}), compact=compact, **params)
+    if accel_df is None or len(accel_df) <= 10:
+        raise ValueError("physics simulation produced no usable samples")
+    
+    safety = check_gforce_safety(accel_df)
+    airtime = compute_airtime_metrics(accel_df)
+    metadata = estimate_track_metadata(x, y, z)
+    features = compute_lightgbm_features(accel_df, metadata=metadata)
+    if predictor is None:
+        fun_rating = float(predict_scores_from_features(features)[0])
+    else:
+        fun_rating = float(predictor(features))
+    
+    return {
+        'gforce': {
+            'max_vertical': float(safety['max_vertical']),
+            'min_vertical': float(safety['min_vertical']),
+            'max_lateral': float(safety['max_lateral']),
+            'max_longitudinal': float(safety['max_longitudinal']),
+        },
+        'airtime': {k: float(v) for k, v in airtime.items()},
+        'safety': {
+            'score': float(safety['safety_score']),
+            'level': safety['level'],
+            'warnings': safety['warnings'],
+            'dangers': safety['dangers'],
+        },
+        'fun_rating': fun_rating,
+        'metadata': metadata,
+        'n_points': int(len(x)),
+    }
@@ -0,0 +1,215 @@
+"""
+Headless scoring service: JSON over HTTP, standard library only.
+
+Scores coaster designs without the Streamlit builder so load tests and
+external optimizers can drive the geometry -> physics -> LightGBM pipeline.
+
+Endpoints:
+    POST /score   body: {"geometry": {"x": [...], "y": [...], "z": [...]}}
+                     or {"blocks": [{"type": "loop", "params": {"diameter": 30}}, ...],
+                         "force_end_level": false, "start_level": 0.0}
+                  optional: "physics": {"mass": 500, "rho": 1.2, "Cd": 0.1, "A": 2.0, "mu": 0.001}
+                  returns:  g-force summary, airtime, safety, fun_rating, metadata
+    GET  /health  liveness plus request counters
+    GET  /metrics micro-batcher queue depth and batch statistics, plus load
+                  counts of the cached files (booster, ...)
+
+The LightGBM booster and the Numba speed integrators are loaded/compiled once
+at startup (warm-up request) and stay resident; all HTTP handler threads share
+one worker pool, so concurrency is bounded by --workers. Rating predictions
+from concurrent requests are coalesced by a MicroBatcher (--max-batch,
+--max-latency-ms) into single booster calls.
+
+Usage:
+    python -m utils.scoring_service --port 8600 --workers 4
+"""
+
+import argparse
+import functools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from utils.micro_batcher import MicroBatcher
+from utils.resource_cache import cache_stats
+from utils.scoring import DEFAULT_PHYSICS, score_track
+from utils.track_assembly import DEFAULT_TRACK_SEQUENCE, assemble_track
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+
+class ScoringService:
+    """Evaluates score requests on a shared thread pool with warm model/kernels."""
+
+    def __init__(self, workers: int = 4, request_timeout: float = 120.0,
+                 max_batch_size: int = 32, max_latency_ms: float = 5.0):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='score')
+        self.batcher = MicroBatcher(max_batch_size=max_batch_size, max_latency_ms=max_latency_ms)
+        self.workers = workers
+        self.request_timeout = request_timeout
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'in_flight': 0, 'total_ms': 0.0}
+        self.started_at = time.time()
+
+    def warm_up(self):
+        """Load the booster and JIT-compile physics kernels with the starter track."""
+        t0 = time.perf_counter()
+        self.evaluate({'blocks': DEFAULT_TRACK_SEQUENCE})
+        return (time.perf_counter() - t0) * 1000.0
+
+    def evaluate(self, payload: Dict) -> Dict:
+        """Score one request payload (see module docstring for the schema)."""
+        if not isinstance(payload, dict):
+            raise ValueError("request body must be a JSON object")
+
+        physics = payload.get('physics') or {}
+        unknown = set(physics) - set(DEFAULT_PHYSICS)
+        if unknown:
+            raise ValueError(f"unknown physics parameters: {sorted(unknown)}")
+        physics = {k: float(v) for k, v in physics.items()}
+
+        if 'blocks' in payload:
+            blocks = payload['blocks']
+            if not isinstance(blocks, list) or not blocks:
+                raise ValueError("'blocks' must be a non-empty list")
+            sequence = [{'type': b['type'], 'params': dict(b.get('params') or {})} for b in blocks]
+            x, y, z = assemble_track(
+                sequence,
+                force_end_level=bool(payload.get('force_end_level', False)),
+                start_level=float(payload.get('start_level', 0.0)),
+            )
+        elif 'geometry' in payload:
+            geometry = payload['geometry']
+            x, y, z = geometry['x'], geometry['y'], geometry.get('z')
+        else:
+            raise ValueError("request needs either 'geometry' or 'blocks'")
+
+        # Bounded wait: a stuck batcher must not block this worker thread forever
+        predictor = functools.partial(self.batcher.predict, timeout=self.request_timeout)
+        return score_track(x, y, z, physics=physics, predictor=predictor)
+
+    def score(self, payload: Dict) -> Dict:
+        """Run a request on the worker pool and wait for the result."""
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['in_flight'] += 1
+        t0 = time.perf_counter()
+        try:
+            result = self.executor.submit(self.evaluate, payload).result(timeout=self.request_timeout)
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            with self._lock:
+                self.stats['in_flight'] -= 1
+                self.stats['total_ms'] += elapsed_ms
+        result['elapsed_ms'] = elapsed_ms
+        return result
+
+    def health(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        completed = max(stats['requests'] - stats['in_flight'], 1)
+        stats['mean_ms'] = stats.pop('total_ms') / completed
+        return {'status': 'ok', 'workers': self.workers, 'uptime_s': time.time() - self.started_at, **stats}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        self.batcher.close()
+
+
+class ScoringHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default listen backlog (5) resets connections under concurrent load tests
+    request_queue_size = 128
+
+
+def make_handler(service: ScoringService):
+    """Build a request handler class bound to one ScoringService."""
+
+    class ScoreHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status: int, body: Dict):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, service.health())
+            elif self.path == '/metrics':
+                self._send_json(200, {**service.batcher.metrics(), 'file_loads': cache_stats()})
+            else:
+                self._send_json(404, {'error': f'unknown endpoint {self.path}'})
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._send_json(404, {'error': f'unknown endpoint {self.path}'})
+                return
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0 or length > MAX_BODY_BYTES:
+                self._send_json(400, {'error': 'missing or oversized request body'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length))
+                self._send_json(200, service.score(payload))
+            except (ValueError, KeyError, TypeError) as e:
+                self._send_json(400, {'error': f'{type(e).__name__}: {e}'})
+            except Exception as e:
+                self._send_json(500, {'error': f'{type(e).__name__}: {e}'})
+
+        def log_message(self, format, *args):
+            # Keep load tests quiet; errors are reported in the response body
+            pass
+
+    return ScoreHandler
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8600, workers: int = 4,
+                warm: bool = True, service: Optional[ScoringService] = None,
+                max_batch_size: int = 32, max_latency_ms: float = 5.0) -> ScoringHTTPServer:
+    """Create (but do not start) the HTTP server; `server.service` is the ScoringService."""
+    service = service or ScoringService(workers=workers, max_batch_size=max_batch_size,
+                                        max_latency_ms=max_latency_ms)
+    if warm:
+        warm_ms = service.warm_up()
+        print(f"Warm-up done in {warm_ms:.0f} ms (model loaded, kernels compiled)")
+    server = ScoringHTTPServer((host, port), make_handler(service))
+    server.service = service
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless coaster scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--workers', type=int, default=4, help="Size of the shared scoring pool")
+    parser.add_argument('--max-batch', type=int, default=32, help="Max feature vectors per booster call")
+    parser.add_argument('--max-latency-ms', type=float, default=5.0,
+                        help="Max time a prediction waits for its batch to fill")
+    parser.add_argument('--no-warm', action='store_true', help="Skip the warm-up evaluation")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, workers=args.workers, warm=not args.no_warm,
+                         max_batch_size=args.max_batch, max_latency_ms=args.max_latency_ms)
+    print(f"Scoring service listening on http://{args.host}:{args.port} (POST /score, GET /health, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
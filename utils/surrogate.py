@@ -0,0 +1,278 @@
+"""
+Cheap surrogate pre-filter for design search.
+
+A k-nearest-neighbour regressor over a fixed-length encoding of the block
+parameters predicts (fun rating, safety score) from previously evaluated
+designs. Sweeps over random sequences use a per-type summary (count, sum and
+max of every parameter); when the block sequence is fixed, as in the CMA-ES
+optimizer, every block's parameters are encoded in order instead, since the
+summary maps different parameter vectors of repeated block types onto the
+same features. Sweeps use it to discard most random candidates before running the
+physics + LightGBM pipeline; every full evaluation is fed back so the model
+improves as the search runs.
+
+Trust is tracked, not assumed:
+- prediction error (MAE of fun rating and safety score) on every evaluated candidate
+- hit rate: share of kept candidates that really land above the objective
+  threshold the filter was aiming for (a random pick scores ~keep_fraction)
+- audit miss rate: a small random share of *rejected* candidates is evaluated
+  anyway; the share of those that were actually good estimates false rejections
+
+Designs the optimizer rejects before the LightGBM stage are trained on with a
+floor rating but are "unrated": they never count as good, stay out of the
+threshold quantile and out of the fun-rating error.
+"""
+
+import math
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.design_sweep import OBJECTIVES, PARAM_RANGES
+
+# Encoding: block count plus sum and max of every parameter, per block type
+ENCODED_BLOCK_TYPES = tuple(PARAM_RANGES)
+
+
+def encoding_names() -> List[str]:
+    """Names of the encode_sequence() features, in order."""
+    names = ['n_blocks']
+    for block_type in ENCODED_BLOCK_TYPES:
+        names.append(f'{block_type}.count')
+        for param in PARAM_RANGES[block_type]:
+            names.extend([f'{block_type}.{param}.sum', f'{block_type}.{param}.max'])
+    return names
+
+
+def encode_sequence(sequence: Sequence[Dict]) -> np.ndarray:
+    """Fixed-length vector of a block sequence, independent of its number of blocks."""
+    values = [float(len(sequence))]
+    for block_type in ENCODED_BLOCK_TYPES:
+        blocks = [b for b in sequence if b['type'] == block_type]
+        values.append(float(len(blocks)))
+        for param in PARAM_RANGES[block_type]:
+            params = [float(b['params'][param]) for b in blocks if param in b['params']]
+            values.extend([sum(params), max(params, default=0.0)])
+    return np.array(values, dtype=np.float64)
+
+
+def block_param_names(block_types: Sequence[str]) -> List[str]:
+    """Names of the encode_block_params() features for a fixed sequence of block types."""
+    return [f'{i}.{block_type}.{param}'
+            for i, block_type in enumerate(block_types) for param in PARAM_RANGES.get(block_type, {})]
+
+
+def encode_block_params(sequence: Sequence[Dict]) -> np.ndarray:
+    """Parameters of every block in order (missing ones as 0), for sequences of one fixed block layout."""
+    return np.array([float(b['params'].get(param, 0.0))
+                     for b in sequence for param in PARAM_RANGES.get(b['type'], {})], dtype=np.float64)
+
+
+class SurrogateFilter:
+    """
+    kNN surrogate of the design pipeline that screens candidates before evaluation.
+
+    Args:
+        objective: 'fun', 'safety', 'combined' or a callable on
+                   {'fun_rating': f, 'safety': {'score': s}} (maximized)
+        k: Neighbours per prediction (inverse-distance weighted)
+        keep_fraction: Share of each screened batch kept for full evaluation
+        min_samples: Keep everything until this many designs have been evaluated
+        audit_fraction: Share of rejected candidates evaluated anyway to measure misses
+        path: Optional .npz cache of (encoding, fun, safety) pairs, loaded if present
+        seed: RNG seed for the audit sample
+        sequence: Block sequence whose parameters are being tuned (fixed block types
+                  and order, as in optimize_block_params); candidates are then
+                  encoded by encode_block_params instead of encode_sequence
+    """
+
+    def __init__(self, objective: Union[str, Callable[[Dict], float]] = 'combined', k: int = 8,
+                 keep_fraction: float = 0.25, min_samples: int = 64, audit_fraction: float = 0.05,
+                 path: Optional[str] = None, seed: Optional[int] = None,
+                 sequence: Optional[Sequence[Dict]] = None):
+        if isinstance(objective, str):
+            if objective not in OBJECTIVES:
+                raise ValueError(f"Unknown objective '{objective}'. Available: {sorted(OBJECTIVES)}")
+            objective = OBJECTIVES[objective]
+        if not 0.0 < keep_fraction <= 1.0:
+            raise ValueError("keep_fraction must be in (0, 1]")
+        self.objective_fn = objective
+        self.k = int(k)
+        self.keep_fraction = float(keep_fraction)
+        self.min_samples = int(min_samples)
+        self.audit_fraction = float(audit_fraction)
+        self.path = path
+        self.rng = np.random.default_rng(seed)
+        self.block_types = None if sequence is None else tuple(b['type'] for b in sequence)
+        self.feature_names = encoding_names() if sequence is None else block_param_names(self.block_types)
+
+        self._X: List[np.ndarray] = []
+        self._y: List[Tuple[float, float]] = []
+        self._objective: List[float] = []
+        self._rated: List[bool] = []
+        self._model = None  # (X_scaled, mean, scale, y, objective, rated) rebuilt lazily
+        self._threshold = None
+
+        self.stats = {
+            'screened': 0,
+            'warmup': 0,
+            'kept': 0,
+            'audited': 0,
+            'predicted': 0,
+            'predicted_fun': 0,
+            'abs_err_fun': 0.0,
+            'abs_err_safety': 0.0,
+            'hits': 0,
+            'checked': 0,
+            'audit_checked': 0,
+            'audit_misses': 0,
+        }
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._y)
+
+    def encode(self, sequence: Sequence[Dict]) -> np.ndarray:
+        """Feature vector of one candidate (see the `sequence` argument)."""
+        if self.block_types is None:
+            return encode_sequence(sequence)
+        if tuple(b['type'] for b in sequence) != self.block_types:
+            raise ValueError("candidate does not have the surrogate's fixed block layout")
+        return encode_block_params(sequence)
+
+    def _objective_of(self, fun_rating: float, safety_score: float) -> float:
+        return float(self.objective_fn({'fun_rating': fun_rating, 'safety': {'score': safety_score}}))
+
+    def add(self, sequence: Sequence[Dict], fun_rating: float, safety_score: float, rated: bool = True):
+        """Store one evaluated design as a training pair (rated=False: floor rating of a rejected design)."""
+        self._X.append(self.encode(sequence))
+        self._y.append((float(fun_rating), float(safety_score)))
+        self._objective.append(self._objective_of(fun_rating, safety_score))
+        self._rated.append(bool(rated))
+        self._model = None
+
+    def _fit(self):
+        if self._model is None:
+            X = np.vstack(self._X)
+            mean = X.mean(axis=0)
+            scale = X.std(axis=0)
+            scale[scale == 0] = 1.0
+            self._model = ((X - mean) / scale, mean, scale, np.array(self._y), np.array(self._objective),
+                           np.array(self._rated, dtype=bool))
+        return self._model
+
+    def predict(self, sequences: Sequence[Sequence[Dict]]) -> np.ndarray:
+        """Predicted (fun_rating, safety_score) per sequence, shape (n, 2)."""
+        if not self._y:
+            raise ValueError("surrogate has no training data")
+        X_train, mean, scale, y, _, _ = self._fit()
+        Q = (np.vstack([self.encode(s) for s in sequences]) - mean) / scale
+
+        # Squared distances via |q|^2 + |x|^2 - 2 q.x, shape (n_query, n_train)
+        d2 = (Q ** 2).sum(axis=1)[:, None] + (X_train ** 2).sum(axis=1)[None, :] - 2.0 * Q @ X_train.T
+        d = np.sqrt(np.maximum(d2, 0.0))
+        k = min(self.k, len(y))
+        nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+        w = 1.0 / (np.take_along_axis(d, nearest, axis=1) + 1e-6)
+        return np.einsum('qk,qkc->qc', w, y[nearest]) / w.sum(axis=1, keepdims=True)
+
+    def screen(self, sequences: Sequence[Sequence[Dict]]) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+        """
+        Choose which candidates to evaluate for real.
+
+        Returns:
+            (keep, predictions, audit): indices to evaluate, predicted
+            (fun, safety) per candidate (None while warming up) and a boolean
+            mask of candidates kept only as an audit sample
+        """
+        n = len(sequences)
+        self.stats['screened'] += n
+        audit = np.zeros(n, dtype=bool)
+        if len(self) < self.min_samples:
+            self.stats['warmup'] += n
+            return np.arange(n), None, audit
+
+        predictions = self.predict(sequences)
+        predicted_objective = np.array([self._objective_of(f, s) for f, s in predictions])
+        n_keep = max(1, math.ceil(self.keep_fraction * n))
+        order = np.argsort(-predicted_objective)
+        kept, rejected = order[:n_keep], order[n_keep:]
+
+        n_audit = min(len(rejected), int(round(self.audit_fraction * len(rejected))))
+        if n_audit:
+            audit[self.rng.choice(rejected, n_audit, replace=False)] = True
+        # "Good" = in the top keep_fraction of the rated designs evaluated so far
+        objective, rated = self._fit()[4:]
+        self._threshold = float(np.quantile(objective[rated], 1.0 - self.keep_fraction)) if rated.any() else None
+
+        self.stats['kept'] += len(kept)
+        self.stats['audited'] += n_audit
+        return np.sort(np.concatenate([kept, np.flatnonzero(audit)])), predictions, audit
+
+    def update(self, sequence: Sequence[Dict], fun_rating: float, safety_score: float,
+               prediction: Optional[Sequence[float]] = None, audit: bool = False, rated: bool = True):
+        """
+        Feed back a full evaluation; scores the prediction made for it (if any).
+
+        Errored evaluations are never fed back, so they count neither as hits nor as audits.
+        rated=False marks a design rejected before rating (`fun_rating` is then a floor value).
+        """
+        if prediction is not None:
+            self.stats['predicted'] += 1
+            self.stats['abs_err_safety'] += abs(float(prediction[1]) - safety_score)
+            if rated:
+                self.stats['predicted_fun'] += 1
+                self.stats['abs_err_fun'] += abs(float(prediction[0]) - fun_rating)
+            if self._threshold is not None:
+                good = rated and self._objective_of(fun_rating, safety_score) >= self._threshold
+                if audit:
+                    self.stats['audit_checked'] += 1
+                    self.stats['audit_misses'] += int(good)
+                else:
+                    self.stats['checked'] += 1
+                    self.stats['hits'] += int(good)
+        self.add(sequence, fun_rating, safety_score, rated=rated)
+
+    def metrics(self) -> Dict[str, float]:
+        """Hit rate, prediction error and screening counts."""
+        s = self.stats
+        return {
+            'training_pairs': len(self),
+            'screened': s['screened'],
+            'warmup': s['warmup'],
+            'kept': s['kept'],
+            'audited': s['audited'],
+            'discarded': s['screened'] - s['warmup'] - s['kept'] - s['audited'],
+            'mae_fun': s['abs_err_fun'] / s['predicted_fun'] if s['predicted_fun'] else float('nan'),
+            'mae_safety': s['abs_err_safety'] / s['predicted'] if s['predicted'] else float('nan'),
+            'hit_rate': s['hits'] / s['checked'] if s['checked'] else float('nan'),
+            'baseline_hit_rate': self.keep_fraction,
+            'audit_miss_rate': s['audit_misses'] / s['audit_checked'] if s['audit_checked'] else float('nan'),
+        }
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Write the training pairs to a compressed .npz cache."""
+        path = path or self.path
+        if not path:
+            raise ValueError("no cache path given")
+        y = np.array(self._y, dtype=np.float64).reshape(-1, 2)
+        X = np.vstack(self._X) if self._X else np.zeros((0, len(self.feature_names)))
+        np.savez_compressed(path, X=X, fun_rating=y[:, 0], safety_score=y[:, 1],
+                            rated=np.array(self._rated, dtype=bool), feature_names=np.array(self.feature_names))
+        return path
+
+    def load(self, path: str):
+        """Append the training pairs from a cache written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            if list(data['feature_names']) != self.feature_names:
+                raise ValueError(f"surrogate cache {path} uses a different encoding")
+            # Caches written before rejected designs were tracked hold rated designs only
+            rated = data['rated'] if 'rated' in data.files else np.ones(len(data['X']), dtype=bool)
+            for x, f, s, r in zip(data['X'], data['fun_rating'], data['safety_score'], rated):
+                self._X.append(np.asarray(x, dtype=np.float64))
+                self._y.append((float(f), float(s)))
+                self._objective.append(self._objective_of(f, s))
+                self._rated.append(bool(r))
+        self._model = None
@@ -0,0 +1,303 @@
+"""
+Headless track assembly from block sequences.
+
+Turns a sequence of building blocks (`{'type': ..., 'params': {...}}`) into one
+continuous track, inserting C1 Hermite blends at every joint. This is the
+geometry step of the builder (`app_builder.generate_track_from_blocks`),
+usable without Streamlit by the scoring service, sweeps and optimizers.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.profiling import StageTimer
+from utils.track_blocks import (
+    lift_hill_profile,
+    vertical_drop_profile,
+    loop_profile,
+    airtime_hill_profile,
+    spiral_profile,
+    banked_turn_profile,
+    bunny_hop_profile,
+    launch_profile,
+    flat_section_profile,
+    brake_run_profile,
+)
+
+# Block type -> profile generator (same keys as app_builder.BLOCK_LIBRARY)
+BLOCK_PROFILES = {
+    "lift_hill": lift_hill_profile,
+    "drop": vertical_drop_profile,
+    "loop": loop_profile,
+    "airtime_hill": airtime_hill_profile,
+    "spiral": spiral_profile,
+    "bunny_hop": bunny_hop_profile,
+    "banked_turn": banked_turn_profile,
+    "launch": launch_profile,
+    "brake_run": brake_run_profile,
+    "flat_section": flat_section_profile,
+}
+
+# Starter coaster shown when the builder first loads
+DEFAULT_TRACK_SEQUENCE: List[Dict] = [
+    {'type': 'launch', 'params': {'length': 60, 'speed_boost': 30}},  # Longer launch, higher speed for more energy
+    {'type': 'lift_hill', 'params': {'length': 120, 'height': 120}},  # Much higher lift hill for more potential energy
+    {'type': 'drop', 'params': {'height': 120, 'steepness': 1.0}},  # Higher drop = more speed = higher G-forces
+    {'type': 'loop', 'params': {'diameter': 35}},  # Larger loop for higher G-forces
+    {'type': 'flat_section', 'params': {'length': 40}},  # Flat section between loop and airtime hill
+    {'type': 'airtime_hill', 'params': {'length': 80, 'height': 25}},  # Larger airtime hill
+    {'type': 'flat_section', 'params': {'length': 60}},  # Flat section (replaced second drop)
+    {'type': 'loop', 'params': {'diameter': 30}},  # Second loop
+    {'type': 'flat_section', 'params': {'length': 40}},  # Flat section between loop and airtime hill
+    {'type': 'airtime_hill', 'params': {'length': 70, 'height': 20}},  # Second airtime hill
+    {'type': 'flat_section', 'params': {'length': 50}},  # Transition section
+    {'type': 'flat_section', 'params': {'length': 50}},  # Flat section (replaced third drop)
+    {'type': 'airtime_hill', 'params': {'length': 60, 'height': 18}},  # Third airtime hill
+    {'type': 'flat_section', 'params': {'length': 40}},  # Transition
+    {'type': 'brake_run', 'params': {'length': 50}},  # Longer brake run
+]
+
+
+def block_profile(block_type: str, **params) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Generate the relative (x, y, z) profile of one block."""
+    if block_type not in BLOCK_PROFILES:
+        raise ValueError(f"Unknown block type '{block_type}'. Available: {sorted(BLOCK_PROFILES)}")
+    return BLOCK_PROFILES[block_type](**params)
+
+
+def _endpoint_tangent(x_arr, y_arr, at_start=False):
+    # Compute tangent vector using local finite difference
+    if at_start:
+        i0, i1 = 0, min(1, len(x_arr)-1)
+    else:
+        i1 = len(x_arr)-1
+        i0 = max(0, i1-1)
+    tx = x_arr[i1] - x_arr[i0]
+    ty = y_arr[i1] - y_arr[i0]
+    return tx, ty
+
+
+def _hermite_blend(P0, P1, T0, T1, steps=24):
+    """Hermite blend supporting 2D or 3D points."""
+    t = np.linspace(0.0, 1.0, steps)
+    h00 = 2*t**3 - 3*t**2 + 1
+    h10 = t**3 - 2*t**2 + t
+    h01 = -2*t**3 + 3*t**2
+    h11 = t**3 - t**2
+
+    # Support 2D or 3D
+    if len(P0) == 2:
+        dx = h00*P0[0] + h10*T0[0] + h01*P1[0] + h11*T1[0]
+        dy = h00*P0[1] + h10*T0[1] + h01*P1[1] + h11*T1[1]
+        return dx, dy
+    else:  # 3D
+        dx = h00*P0[0] + h10*T0[0] + h01*P1[0] + h11*T1[0]
+        dy = h00*P0[1] + h10*T0[1] + h01*P1[1] + h11*T1[1]
+        dz = h00*P0[2] + h10*T0[2] + h01*P1[2] + h11*T1[2]
+        return dx, dy, dz
+
+
+def _max_curv(xa, ya):
+    dx = np.gradient(xa)
+    dy = np.gradient(ya)
+    ddx = np.gradient(dx)
+    ddy = np.gradient(dy)
+    ds = np.sqrt(dx**2 + dy**2) + 1e-9
+    k = np.abs(ddx * dy - dx * ddy) / (ds**3)
+    return float(np.nanmax(k))
+
+
+def _blend_joint(prev_x, prev_y, next_x_rel, next_y_rel, steps=24):
+    """2D blend for x,y coordinates (preserves original logic)."""
+    # Absolute endpoints
+    x0, y0 = prev_x[-1], prev_y[-1]
+    x1, y1 = x0 + next_x_rel[0], y0 + next_y_rel[0]
+    # Tangents at endpoints (absolute for prev, relative mapped for next)
+    t0x, t0y = _endpoint_tangent(prev_x, prev_y, at_start=False)
+    n_tx, n_ty = _endpoint_tangent(next_x_rel, next_y_rel, at_start=True)
+    # Normalize and scale tangents to local segment length for stability
+    seg_len = max(np.hypot(x1 - x0, y1 - y0), 1e-6)
+    def scaled(tvx, tvy):
+        n = max(np.hypot(tvx, tvy), 1e-6)
+        s = seg_len * 0.5  # scale factor controls elbow size
+        return (tvx / n * s, tvy / n * s)
+    T0 = scaled(t0x, t0y)
+    T1 = scaled(n_tx, n_ty)
+
+    # Heuristic: try flipping the vertical orientation of the next tangent
+    # and pick the blend with lower max curvature to avoid downward elbows.
+    bx1, by1 = _hermite_blend((x0, y0), (x1, y1), T0, T1, steps=steps)
+    T1_flip = (T1[0], -T1[1])
+    bx2, by2 = _hermite_blend((x0, y0), (x1, y1), T0, T1_flip, steps=steps)
+
+    if _max_curv(bx2, by2) < _max_curv(bx1, by1):
+        return bx2, by2
+    return bx1, by1
+
+
+def _blend_z_coordinate(prev_z, next_z_rel, blend_length, z_tangent_prev=None, z_tangent_next=None):
+    """Smooth z-coordinate blending using Hermite interpolation.
+
+    Args:
+        prev_z: Previous z-coordinates array
+        next_z_rel: Next z-coordinates (relative)
+        blend_length: Number of points in blend segment
+        z_tangent_prev: Optional tangent at end of previous segment
+        z_tangent_next: Optional tangent at start of next segment
+    """
+    z0 = prev_z[-1] if len(prev_z) > 0 else 0.0
+    z1 = z0 + next_z_rel[0]
+
+    # Compute tangents if not provided
+    if z_tangent_prev is None:
+        if len(prev_z) >= 2:
+            z_tangent_prev = prev_z[-1] - prev_z[-2]
+        else:
+            z_tangent_prev = 0.0
+
+    if z_tangent_next is None:
+        if len(next_z_rel) >= 2:
+            z_tangent_next = next_z_rel[1] - next_z_rel[0]
+        else:
+            z_tangent_next = 0.0
+
+    # Use 1D Hermite interpolation for z
+    t = np.linspace(0.0, 1.0, blend_length)
+    h00 = 2*t**3 - 3*t**2 + 1
+    h10 = t**3 - 2*t**2 + t
+    h01 = -2*t**3 + 3*t**2
+    h11 = t**3 - t**2
+
+    z_blend = h00*z0 + h10*z_tangent_prev + h01*z1 + h11*z_tangent_next
+    return z_blend
+
+
+def assemble_track(sequence: Sequence[Dict],
+                   force_end_level: bool = False,
+                   start_level: float = 0.0,
+                   return_block_index: bool = False,
+                   timer: Optional[StageTimer] = None):
+    """Generate complete track from block sequence with improved C1 joint blending.
+    Ensures continuity of position and first derivative in both x and y.
+
+    Args:
+        sequence: Blocks as dicts with 'type' and 'params' (builder entries with
+                  an extra 'block' key are accepted as-is)
+        force_end_level: Append a leveling segment so the track ends at start_level
+        start_level: Target end height when force_end_level is set
+        return_block_index: Also return the block index of every point
+        timer: Optional StageTimer; block generation and joint blending are
+               recorded as the stages 'block profiles' and 'joint blending'
+
+    Returns:
+        (x, y, z) arrays of the assembled track (y vertical), plus an int array
+        `block_index` if requested. Joint blends belong to the block they lead
+        into; the leveling segment belongs to the last block.
+    """
+    if timer is None:
+        timer = StageTimer(enabled=False)
+    all_x = []
+    all_y = []
+    all_z = []
+    block_index = []
+
+    for idx, block_info in enumerate(sequence):
+        with timer.stage('block profiles'):
+            x_rel, y_rel, z_rel = block_profile(block_info['type'], **block_info['params'])
+
+        timer.start('joint blending')
+        if idx == 0:
+            # First block: add a short introductory blend from origin to avoid downward elbow
+            x0, y0 = 0.0, 0.0
+            x1, y1 = x_rel[0], y_rel[0]
+            # Tangent at start and a gentle initial horizontal tangent
+            n_tx, n_ty = _endpoint_tangent(x_rel, y_rel, at_start=True)
+            seg_len = max(np.hypot(x1 - x0, y1 - y0), 1e-6)
+            init_scale = seg_len * 0.5
+            T0 = (init_scale, 0.0)
+            def scaled(vx, vy):
+                n = max(np.hypot(vx, vy), 1e-6)
+                return (vx / n * init_scale, vy / n * init_scale)
+            T1 = scaled(n_tx, n_ty)
+            bx1, by1 = _hermite_blend((x0, y0), (x1, y1), T0, T1, steps=24)
+            T1_flip = (T1[0], -T1[1])
+            bx2, by2 = _hermite_blend((x0, y0), (x1, y1), T0, T1_flip, steps=24)
+            bx, by = (bx2, by2) if _max_curv(bx2, by2) < _max_curv(bx1, by1) else (bx1, by1)
+            # Append blend (skip origin to avoid duplicate)
+            all_x.extend(bx[1:].tolist())
+            all_y.extend(by[1:].tolist())
+            # Add z-coordinates for the initial blend (start at 0, end at first block's z[0])
+            z_blend_init = np.linspace(0.0, z_rel[0], len(bx))
+            all_z.extend(z_blend_init[1:].tolist())
+            timer.stop('joint blending')
+            # Append rest of first block relative to last blend point
+            x_abs = x_rel + all_x[-1]
+            y_abs = y_rel + all_y[-1]
+            z_abs = z_rel + all_z[-1]
+            all_x.extend(x_abs.tolist())
+            all_y.extend(y_abs.tolist())
+            all_z.extend(z_abs.tolist())
+            block_index.extend([idx] * (len(bx) - 1 + len(x_abs)))
+            continue
+
+        # Before appending next block, insert a blend segment to match slopes
+        x_blend, y_blend = _blend_joint(np.array(all_x), np.array(all_y), np.array(x_rel), np.array(y_rel), steps=32)
+
+        # Append blend (avoid duplicating endpoint)
+        all_x.extend(x_blend[1:].tolist())
+        all_y.extend(y_blend[1:].tolist())
+
+        # For z, use smooth Hermite interpolation instead of linear
+        z_blend = _blend_z_coordinate(np.array(all_z), z_rel, blend_length=len(x_blend))
+        all_z.extend(z_blend[1:].tolist())
+        timer.stop('joint blending')
+
+        # Now append the next block offset from last absolute point
+        x_abs = x_rel + all_x[-1]
+        y_abs = y_rel + all_y[-1]
+        z_abs = z_rel + all_z[-1]
+        all_x.extend(x_abs.tolist())
+        all_y.extend(y_abs.tolist())
+        all_z.extend(z_abs.tolist())
+        block_index.extend([idx] * (len(x_blend) - 1 + len(x_abs)))
+
+    all_x = np.array(all_x)
+    all_y = np.array(all_y)
+    all_z = np.array(all_z)
+
+    # If requested, enforce ending level equals starting level (y-coordinate)
+    if force_end_level and len(all_x) > 1:
+        y_target = float(start_level)
+        y_end = float(all_y[-1])
+        if abs(y_end - y_target) > 1e-3:
+            timer.start('joint blending')
+            # Create a gentle leveling segment
+            x0, y0, z0 = all_x[-1], all_y[-1], all_z[-1]
+            x1 = x0 + 40.0
+            y1 = y_target
+            z1 = 0.0  # Return to center laterally
+
+            # Tangents: continue current direction, land horizontally
+            t0x, t0y = _endpoint_tangent(all_x, all_y, at_start=False)
+            seg_len = max(np.hypot(x1 - x0, y1 - y0), 1e-6)
+            scale = seg_len * 0.5
+            def sc(vx, vy):
+                n = max(np.hypot(vx, vy), 1e-6)
+                return (vx / n * scale, vy / n * scale)
+            T0 = sc(t0x, t0y)
+            T1 = (scale, 0.0)
+            bx, by = _hermite_blend((x0, y0), (x1, y1), T0, T1, steps=48)
+
+            # Smoothly blend z back to center using Hermite interpolation
+            bz = _blend_z_coordinate(all_z, [z1 - z0], blend_length=len(bx), z_tangent_next=0.0)
+
+            all_x = np.concatenate([all_x, bx[1:]])
+            all_y = np.concatenate([all_y, by[1:]])
+            all_z = np.concatenate([all_z, bz[1:]])
+            block_index.extend([len(sequence) - 1] * (len(bx) - 1))
+            timer.stop('joint blending')
+    timer.set_points('block profiles', len(all_x))
+    if return_block_index:
+        return all_x, all_y, all_z, np.array(block_index, dtype=np.int32)
+    return all_x, all_y, all_z
@@ -1,6 +1,66 @@
+"""
+Parametric profiles of the track building blocks.
+
+Every profile function returns relative (x, y, z) arrays (y vertical). Results
+are memoized per normalized parameter set (ints and floats with the same value
+share an entry), so reruns with unchanged blocks reuse the arrays. Cached
+arrays are read-only; copy them before modifying in place.
+"""
+
+import inspect
+from functools import lru_cache, wraps
+from numbers import Real
+
 import numpy as np
 
+# Distinct parameter sets kept per profile function
+PROFILE_CACHE_SIZE = 256
+
+
+def _normalize_param(value):
+    """Cache-key form of a parameter: numbers as float, everything else unchanged."""
+    if isinstance(value, Real) and not isinstance(value, bool):
+        return float(value)
+    return value
 
+
+def cached_profile(func):
+    """
+    LRU-cache a profile function on its normalized parameters.
+
+    Defaults are applied before building the key, so `loop_profile()` and
+    `loop_profile(diameter=30.0)` share one entry. Calls with unhashable
+    parameters bypass the cache.
+    """
+    signature = inspect.signature(func)
+
+    @lru_cache(maxsize=PROFILE_CACHE_SIZE)
+    def _cached(key):
+        arrays = func(**dict(key))
+        for arr in arrays:
+            arr.flags.writeable = False
+        return arrays
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+        params.update(params.pop('kwargs', {}))
+        key = tuple(sorted((name, _normalize_param(value)) for name, value in params.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+        return _cached(key)
+
+    wrapper.cache_info = _cached.cache_info
+    wrapper.cache_clear = _cached.cache_clear
+    return wrapper
+
+
+
+@cached_profile
 def lift_hill_profile(length=100, height=80, **kwargs):
     max_realistic_height = max(height, length * 0.8)  # allow up to 80m
     actual_height = min(height, max_realistic_height)
@@ -26,6 +86,7 @@ def lift_hill_profile(length=100, height=80, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def vertical_drop_profile(height=40, steepness=0.9, **kwargs):
     current_height = kwargs.get('current_height', height)
     drop_height = min(height, current_height)
@@ -52,6 +113,7 @@ def vertical_drop_profile(height=40, steepness=0.9, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def loop_profile(diameter=30, **kwargs):
     r = diameter / 2
     transition_length = r * 1.6
@@ -62,12 +124,10 @@ def loop_profile(diameter=30, **kwargs):
     s_entry = np.linspace(0, transition_length, n_trans)
     theta_entry = s_entry**2 / (2 * a_squared)
 
-    x_entry = np.zeros(n_trans)
-    y_entry = np.zeros(n_trans)
-    for i in range(1, n_trans):
-        avg_theta = (theta_entry[i] + theta_entry[i-1]) / 2
-        x_entry[i] = x_entry[i-1] + np.cos(avg_theta) * ds
-        y_entry[i] = y_entry[i-1] + np.sin(avg_theta) * ds
+    # Midpoint-angle integration of the clothoid: running sums of the step vectors
+    avg_theta = (theta_entry[1:] + theta_entry[:-1]) / 2
+    x_entry = np.cumsum(np.concatenate(([0.0], np.cos(avg_theta) * ds)))
+    y_entry = np.cumsum(np.concatenate(([0.0], np.sin(avg_theta) * ds)))
 
     final_entry_angle = theta_entry[-1]
     final_entry_x = x_entry[-1]
@@ -85,18 +145,12 @@ def loop_profile(diameter=30, **kwargs):
     x_loop = center_x + r * np.cos(theta_circle)
     y_loop = center_y + r * np.sin(theta_circle)
 
-    x_exit = np.zeros(n_trans)
-    y_exit = np.zeros(n_trans)
-    x_exit[0] = x_loop[-1]
-    y_exit[0] = y_loop[-1]
-    for i in range(1, n_trans):
-        s_curr = transition_length - i * ds
-        s_prev = transition_length - (i-1) * ds
-        theta_curr = s_curr**2 / (2 * a_squared)
-        theta_prev = s_prev**2 / (2 * a_squared)
-        avg_theta = (theta_curr + theta_prev) / 2
-        x_exit[i] = x_exit[i-1] + np.cos(-avg_theta) * ds
-        y_exit[i] = y_exit[i-1] + np.sin(-avg_theta) * ds
+    # Exit clothoid: entry curve mirrored, unwinding from the loop's last point
+    s_exit = transition_length - np.arange(n_trans) * ds
+    theta_exit = s_exit**2 / (2 * a_squared)
+    avg_theta = (theta_exit[1:] + theta_exit[:-1]) / 2
+    x_exit = np.cumsum(np.concatenate(([x_loop[-1]], np.cos(-avg_theta) * ds)))
+    y_exit = np.cumsum(np.concatenate(([y_loop[-1]], np.sin(-avg_theta) * ds)))
 
     x = np.concatenate([x_entry, x_loop, x_exit])
     y = np.concatenate([y_entry, y_loop, y_exit])
@@ -105,6 +159,7 @@ def loop_profile(diameter=30, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def airtime_hill_profile(length=40, height=15, **kwargs):
     """Smooth airtime hill using a single continuous function to avoid curvature spikes."""
     max_safe_height = length * 0.5
@@ -129,6 +184,7 @@ def airtime_hill_profile(length=40, height=15, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def spiral_profile(diameter=25, turns=1.5, **kwargs):
     """Horizontal spiral/helix profile that starts and ends at y=0 (relative)."""
     # Gentle spiral with smooth undulation
@@ -156,6 +212,7 @@ def spiral_profile(diameter=25, turns=1.5, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def banked_turn_profile(radius=30, angle=90, **kwargs):
     """Banked horizontal turn that starts and ends at y=0 (relative)."""
     theta = np.linspace(0, np.radians(angle), 60)
@@ -193,6 +250,7 @@ def banked_turn_profile(radius=30, angle=90, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def bunny_hop_profile(length=20, height=8, **kwargs):
     max_safe_height = length * 0.3
     actual_height = min(height, max_safe_height)
@@ -213,6 +271,7 @@ def bunny_hop_profile(length=20, height=8, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def flat_section_profile(length=30, slope=-0.02, **kwargs):
     x = np.linspace(0, length, 20)
     y = slope * x
@@ -220,6 +279,7 @@ def flat_section_profile(length=30, slope=-0.02, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def launch_profile(length=40, speed_boost=20.0, **kwargs):
     """Magnetic launch section (LSM/LIM) that adds speed to the train.
     
@@ -239,6 +299,7 @@ def launch_profile(length=40, speed_boost=20.0, **kwargs):
     return x, y, z
 
 
+@cached_profile
 def brake_run_profile(length=30, **kwargs):
     """Brake run section that slows the train to a stop.
     
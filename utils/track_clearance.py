@@ -0,0 +1,254 @@
+"""
+Track clearance and self-intersection checks.
+
+Assembled tracks (random 3D lateral profiles, spirals, loops next to their
+entry) can pass through themselves or closer than a train's clearance
+envelope. Checking every pair of segments is O(N^2); `SegmentIndex` puts the
+segment midpoints in a KD-tree instead. Two segments closer than r have
+midpoints closer than r + the longest segment, so a fixed-radius pair query
+returns every candidate. Only those candidates get the exact segment-to-segment
+distance, which is near-linear for tracks of bounded point density.
+
+Two segments only count as different sections of track if the track between
+them is more than `min_detour` times longer than their distance. Neighbours
+along a curve are always close in space, so this gap test is what separates
+a loop crossing its own entry from a tight crest. It does not depend on the
+sampling density. The number of candidate pairs grows with points per meter,
+so `check_track_clearance` first drops points closer than `min_spacing`.
+
+The builder draws every loop in the same vertical plane, so a loop's exit
+passes through its entry, and consecutive loops overlap. Given the block of
+every point, `check_track_clearance` skips segment pairs that both lie in
+such blocks (PLANAR_CROSSING_BLOCKS) and only reports clearance between
+sections a real layout would keep apart.
+
+Coordinates can be in either convention (builder y-up or physics z-up):
+distances do not depend on which axis is vertical.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+DEFAULT_ENVELOPE = 3.0  # m; closest centerline distance between two sections of track
+DEFAULT_MAX_RANGE = 10.0  # m; the clearance profile reports distances up to this
+DEFAULT_MIN_DETOUR = 2.0  # track length between two sections / their distance
+DEFAULT_MIN_SPACING = 0.5  # m; denser points are dropped before the clearance check
+INTERSECTION_DISTANCE = 0.1  # m; closer than this counts as the track passing through itself
+# Block types whose geometry crosses itself by construction (planar loops)
+PLANAR_CROSSING_BLOCKS = ('loop',)
+
+
+def segment_distances(p0: np.ndarray, p1: np.ndarray, q0: np.ndarray, q1: np.ndarray) -> np.ndarray:
+    """
+    Closest distance between segments p0-p1 and q0-q1 (row-wise, Mx3 inputs).
+
+    Vectorized form of the clamped closest-points computation (Ericson,
+    Real-Time Collision Detection, 5.1.9); zero-length segments are points.
+    """
+    eps = 1e-12
+    d1 = p1 - p0
+    d2 = q1 - q0
+    r = p0 - q0
+    a = np.einsum('ij,ij->i', d1, d1)
+    e = np.einsum('ij,ij->i', d2, d2)
+    b = np.einsum('ij,ij->i', d1, d2)
+    c = np.einsum('ij,ij->i', d1, r)
+    f = np.einsum('ij,ij->i', d2, r)
+    a_ok, e_ok = a > eps, e > eps
+    a_safe = np.where(a_ok, a, 1.0)
+    e_safe = np.where(e_ok, e, 1.0)
+
+    # General case: closest points of the infinite lines, clamped to the segments
+    denom = a * e - b * b
+    parallel = denom <= eps * a_safe * e_safe
+    s = np.where(parallel, 0.0, np.clip((b * f - c * e) / np.where(parallel, 1.0, denom), 0.0, 1.0))
+    t = (b * s + f) / e_safe
+    s = np.where(t < 0.0, np.clip(-c / a_safe, 0.0, 1.0), np.where(t > 1.0, np.clip((b - c) / a_safe, 0.0, 1.0), s))
+    t = np.clip(t, 0.0, 1.0)
+
+    # Degenerate segments
+    s = np.where(e_ok, s, np.clip(-c / a_safe, 0.0, 1.0))
+    t = np.where(e_ok, t, 0.0)
+    s = np.where(a_ok, s, 0.0)
+    t = np.where(a_ok, t, np.where(e_ok, np.clip(f / e_safe, 0.0, 1.0), 0.0))
+    return np.linalg.norm(r + s[:, None] * d1 - t[:, None] * d2, axis=1)
+
+
+def point_segment_distances(point: np.ndarray, p0: np.ndarray, p1: np.ndarray) -> np.ndarray:
+    """Distance from one point to every segment p0-p1 (Mx3)."""
+    d = p1 - p0
+    dd = np.einsum('ij,ij->i', d, d)
+    t = np.clip(np.einsum('ij,ij->i', point - p0, d) / np.where(dd > 1e-12, dd, 1.0), 0.0, 1.0)
+    return np.linalg.norm(point - (p0 + t[:, None] * d), axis=1)
+
+
+class SegmentIndex:
+    """
+    Spatial index over the segments of a track polyline.
+
+    Args:
+        points: Nx3 track points (m), ordered along the track
+        min_detour: Segments count as different sections where the track between
+                    them is more than this many times longer than their distance
+        exempt: Optional boolean per segment; pairs of two exempt segments are
+                never reported (loops drawn in one plane)
+
+    Attributes:
+        arc_length: Cumulative arc length of the points (m, starts at 0)
+    """
+
+    def __init__(self, points: np.ndarray, min_detour: float = DEFAULT_MIN_DETOUR,
+                 exempt: Optional[np.ndarray] = None):
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != 3 or points.shape[0] < 2:
+            raise ValueError("points must be an Nx3 array with N>=2")
+        if exempt is not None and len(exempt) != len(points) - 1:
+            raise ValueError("exempt must have one entry per segment")
+        self.points = points
+        self.min_detour = float(min_detour)
+        self._exempt = None if exempt is None or not np.any(exempt) else np.asarray(exempt, dtype=bool)
+        self._start, self._end = points[:-1], points[1:]
+        lengths = np.linalg.norm(self._end - self._start, axis=1)
+        self.arc_length = np.concatenate(([0.0], np.cumsum(lengths)))
+        # Any point of a segment is within this distance of its midpoint (plus the other one's)
+        self._reach = float(lengths.max())
+        self._tree = cKDTree(0.5 * (self._start + self._end))
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def segments_within(self, point, r: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Segments within r meters of a point: (segment indices, distances), nearest first."""
+        point = np.asarray(point, dtype=float)
+        idx = np.asarray(self._tree.query_ball_point(point, r + 0.5 * self._reach), dtype=int)
+        dist = point_segment_distances(point, self._start[idx], self._end[idx])
+        keep = dist <= r
+        order = np.argsort(dist[keep])
+        return idx[keep][order], dist[keep][order]
+
+    def pairs_within(self, r: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Non-adjacent segment pairs closer than r meters: (i, j, distance) with i < j."""
+        pairs = self._tree.query_pairs(r + self._reach, output_type='ndarray')
+        i, j = np.minimum(pairs[:, 0], pairs[:, 1]), np.maximum(pairs[:, 0], pairs[:, 1])
+        # Track between the two segments (0 for neighbours sharing a point; runs of
+        # coincident points, e.g. at the station, leave round-off gaps)
+        gap = self.arc_length[j] - self.arc_length[i + 1]
+        far = gap > INTERSECTION_DISTANCE
+        i, j, gap = i[far], j[far], gap[far]
+        if self._exempt is not None:
+            checked = ~(self._exempt[i] & self._exempt[j])
+            i, j, gap = i[checked], j[checked], gap[checked]
+        dist = segment_distances(self._start[i], self._end[i], self._start[j], self._end[j])
+        keep = (dist <= r) & (gap > self.min_detour * dist)
+        return i[keep], j[keep], dist[keep]
+
+    def min_clearance(self, r: float = DEFAULT_ENVELOPE) -> Tuple[float, int, int]:
+        """
+        Smallest distance between non-adjacent segments: (distance, i, j).
+
+        Searches pairs within r and doubles r until a pair is found; (inf, -1, -1)
+        if the track never comes back towards itself.
+        """
+        extent = float(np.linalg.norm(np.ptp(self.points, axis=0)))
+        r = max(float(r), 1e-3)
+        while True:
+            i, j, dist = self.pairs_within(r)
+            if len(dist):
+                k = int(np.argmin(dist))
+                return float(dist[k]), int(i[k]), int(j[k])
+            if r > extent:
+                return float('inf'), -1, -1
+            r *= 2.0
+
+    def clearance_profile(self, max_range: float = DEFAULT_MAX_RANGE) -> np.ndarray:
+        """Per point, the distance to the nearest non-adjacent segment (inf beyond max_range)."""
+        i, j, dist = self.pairs_within(max_range)
+        per_segment = np.full(len(self), np.inf)
+        np.minimum.at(per_segment, i, dist)
+        np.minimum.at(per_segment, j, dist)
+        profile = np.empty(len(self.points))
+        profile[0], profile[-1] = per_segment[0], per_segment[-1]
+        profile[1:-1] = np.minimum(per_segment[:-1], per_segment[1:])
+        return profile
+
+
+def decimate(points: np.ndarray, min_spacing: float = DEFAULT_MIN_SPACING) -> np.ndarray:
+    """Indices of points kept so consecutive ones are about min_spacing apart (first and last kept)."""
+    s = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))))
+    keep = np.concatenate(([True], np.diff(np.floor(s / min_spacing)) > 0))
+    keep[-1] = True
+    return np.flatnonzero(keep)
+
+
+def check_track_clearance(x, y, z=None,
+                          envelope: float = DEFAULT_ENVELOPE,
+                          max_range: float = DEFAULT_MAX_RANGE,
+                          min_detour: float = DEFAULT_MIN_DETOUR,
+                          min_spacing: float = DEFAULT_MIN_SPACING,
+                          block_index=None, block_types=None) -> Dict:
+    """
+    Check that no two sections of a track come closer than the clearance envelope.
+
+    Args:
+        x, y, z: Track coordinates; z defaults to a flat track
+        envelope: Smallest allowed centerline distance between sections (m)
+        max_range: Clearances are reported up to this distance (m)
+        min_detour: See SegmentIndex
+        min_spacing: Points closer than this are merged before indexing (m); the
+                     chord of a dropped point deviates from the track by
+                     min_spacing^2 / (8 R), 6 mm at 0.5 m on a 5 m radius
+        block_index: Block of every point (see assemble_track(return_block_index=True))
+        block_types: Type of every block; with block_index, blocks of the types in
+                     PLANAR_CROSSING_BLOCKS are not checked against each other
+
+    Returns:
+        dict with 'clearance' (per input point, m, inf beyond max_range),
+        'arc_length' (per input point, m), 'min_clearance' (m, inf if nothing
+        within max_range), 'closest' (arc lengths of the two closest sections,
+        or None), 'intersects', 'warnings' and 'dangers' (messages in the
+        style of check_gforce_safety)
+    """
+    x = np.asarray(x, dtype=float)
+    z = np.zeros_like(x) if z is None else np.asarray(z, dtype=float)
+    points = np.column_stack([x, np.asarray(y, dtype=float), z])
+    kept = decimate(points, min_spacing)
+    exempt = None
+    if block_index is not None and block_types is not None:
+        block_index = np.asarray(block_index)
+        if len(block_index) != len(points):
+            raise ValueError("block_index must have one entry per track point")
+        planar = np.array([block_type in PLANAR_CROSSING_BLOCKS for block_type in block_types], dtype=bool)
+        # A segment belongs to the block of its first point
+        exempt = planar[block_index[kept[:-1]]]
+    index = SegmentIndex(points[kept], min_detour=min_detour, exempt=exempt)
+    # Per kept point, then per input point from the kept points on either side
+    per_kept = index.clearance_profile(max_range)
+    right = np.searchsorted(kept, np.arange(len(points)))
+    left = np.where(kept[right] == np.arange(len(points)), right, right - 1)
+    clearance = np.minimum(per_kept[left], per_kept[right])
+
+    closest: Optional[Tuple[float, float]] = None
+    min_clearance = float(per_kept.min())
+    if np.isfinite(min_clearance):
+        min_clearance, i, j = index.min_clearance(min_clearance)
+        closest = (float(index.arc_length[i]), float(index.arc_length[j]))
+
+    warnings, dangers = [], []
+    intersects = min_clearance < INTERSECTION_DISTANCE
+    if intersects:
+        dangers.append(f"🚨 INTERSECTION: track passes through itself at {closest[0]:.0f} m / {closest[1]:.0f} m")
+    elif min_clearance < envelope:
+        warnings.append(f"⚠️ Clearance: {min_clearance:.1f} m between the track at {closest[0]:.0f} m "
+                        f"and {closest[1]:.0f} m (< {envelope:.1f} m envelope)")
+
+    return {
+        'clearance': clearance,
+        'arc_length': np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1)))),
+        'min_clearance': min_clearance,
+        'closest': closest,
+        'intersects': bool(intersects),
+        'warnings': warnings,
+        'dangers': dangers,
+    }
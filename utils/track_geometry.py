@@ -0,0 +1,175 @@
+"""
+Shared differential geometry of a track polyline.
+
+Both physics engines (`compute_acc_profile` and the simple geometric model in
+`accelerometer_transform`) and the builder's smoothness check start from the
+same quantities: Gaussian-smoothed points, arc length, unit tangents and the
+circumcircle curvature/normal of the smoothed curve. `TrackGeometry` computes
+each of them on first access and keeps it, so one instance per track can be
+handed to every consumer instead of each one redoing the work.
+
+All vectors use the physics convention (Z-up: x=forward, y=lateral,
+z=vertical). Builder coordinates (y vertical) go through `from_track`.
+"""
+
+from functools import cached_property
+from typing import Tuple
+
+import numpy as np
+from scipy.ndimage import gaussian_filter1d
+
+from utils.acceleration import _tangents
+
+DEFAULT_SIGMA = 2.0  # Gaussian smoothing of the points (samples)
+DEFAULT_RADIUS = 1000.0  # Radius reported where three points are colinear (m)
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    # Cached arrays are shared by every consumer; make accidental in-place edits fail loudly
+    array.flags.writeable = False
+    return array
+
+
+def circumcircles(points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Radius and center of the circle through every three consecutive points.
+
+    Vectorized form of acceleration._curvature_radius_circumcenter.
+
+    Returns:
+        R: radius per point (DEFAULT_RADIUS where colinear), endpoints copy their neighbour
+        centers: Nx3 circle centers, inf where colinear
+    """
+    n = points.shape[0]
+    R = np.full(n, DEFAULT_RADIUS, dtype=float)
+    centers = np.full((n, 3), np.inf, dtype=float)
+    if n < 3:
+        return R, centers
+
+    a, b, c = points[:-2], points[1:-1], points[2:]
+    ab = b - a
+    ac = c - a
+    cross = np.cross(ab, ac)
+    cross_norm2 = np.einsum('ij,ij->i', cross, cross)
+    ok = cross_norm2 >= 1e-12
+    ab_len2 = np.einsum('ij,ij->i', ab, ab)
+    ac_len2 = np.einsum('ij,ij->i', ac, ac)
+    num = np.cross(cross, ab) * ac_len2[:, None] + np.cross(ac, cross) * ab_len2[:, None]
+    center = a + num / (2 * np.where(ok, cross_norm2, 1.0))[:, None]
+    radius = np.linalg.norm(a - center, axis=1)
+    ok &= np.isfinite(radius) & (radius > 1e-6)
+    R[1:-1][ok] = radius[ok]
+    centers[1:-1][ok] = center[ok]
+
+    R[0], R[-1] = R[1], R[-2]
+    centers[0], centers[-1] = centers[1], centers[-2]
+    return R, centers
+
+
+class TrackGeometry:
+    """
+    Lazily computed, memoized geometry of one track.
+
+    Args:
+        points: Nx3 track points in Z-up coordinates (x=forward, y=lateral, z=vertical)
+        sigma: Gaussian smoothing applied before differentiating (samples)
+
+    Attributes (computed on first access):
+        smoothed: Smoothed points (Nx3)
+        arc_length: Cumulative arc length of the smoothed points (m, starts at 0)
+        raw_arc_length: Cumulative arc length of the unsmoothed points (m, starts at 0)
+        tangents: Unit tangents of the smoothed points (Nx3)
+        radius, centers: Circumcircle radius (m) and center per smoothed point
+        curvature: 1/radius (1/m)
+        normals: Unit principal normals pointing to the circle center, 0 where colinear
+
+    The arrays are shared between consumers and therefore read-only.
+    """
+
+    def __init__(self, points: np.ndarray, sigma: float = DEFAULT_SIGMA):
+        points = np.asarray(points, dtype=float)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError("points must be an Nx3 array")
+        self.points = points
+        self.sigma = float(sigma)
+
+    @classmethod
+    def from_track(cls, x, y, z=None, sigma: float = DEFAULT_SIGMA) -> 'TrackGeometry':
+        """Build from builder coordinates (x=forward, y=vertical, z=lateral)."""
+        x = np.asarray(x, dtype=float)
+        z = np.zeros_like(x) if z is None else np.asarray(z, dtype=float)
+        return cls(np.column_stack([x, z, np.asarray(y, dtype=float)]), sigma=sigma)
+
+    def __len__(self) -> int:
+        return self.points.shape[0]
+
+    @property
+    def halo(self) -> int:
+        """Samples on either side that a tangent, radius or normal depends on (smoothing radius + 1)."""
+        return int(4.0 * self.sigma + 0.5) + 1
+
+    def tail(self, start: int) -> 'TrackGeometry':
+        """
+        Geometry of points[start:] with the values of this (whole) track.
+
+        A fresh TrackGeometry of points[start:] would see the cut as a track end
+        and smooth it differently. Here the smoothing runs on a window that
+        starts `halo` samples earlier, so smoothed points, tangents and
+        circumcircles of the tail equal the corresponding samples of the whole
+        track. arc_length and raw_arc_length are measured from the cut.
+        """
+        if not 0 <= start < len(self):
+            raise IndexError(f"start {start} outside a track of {len(self)} points")
+        offset = min(start, self.halo)
+        window = TrackGeometry(self.points[start - offset:], sigma=self.sigma)
+        tail = TrackGeometry(self.points[start:], sigma=self.sigma)
+        tail.__dict__['smoothed'] = _frozen(window.smoothed[offset:])
+        tail.__dict__['tangents'] = _frozen(window.tangents[offset:])
+        tail.__dict__['_circumcircles'] = tuple(_frozen(a[offset:]) for a in window._circumcircles)
+        return tail
+
+    @cached_property
+    def smoothed(self) -> np.ndarray:
+        smoothed = self.points.copy()
+        for i in range(3):
+            smoothed[:, i] = gaussian_filter1d(self.points[:, i], sigma=self.sigma, mode='nearest')
+        return _frozen(smoothed)
+
+    @cached_property
+    def arc_length(self) -> np.ndarray:
+        return _frozen(np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(self.smoothed, axis=0), axis=1)))))
+
+    @cached_property
+    def raw_arc_length(self) -> np.ndarray:
+        return _frozen(np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(self.points, axis=0), axis=1)))))
+
+    @cached_property
+    def tangents(self) -> np.ndarray:
+        return _frozen(_tangents(self.smoothed))
+
+    @cached_property
+    def _circumcircles(self) -> Tuple[np.ndarray, np.ndarray]:
+        R, centers = circumcircles(self.smoothed)
+        return _frozen(R), _frozen(centers)
+
+    @property
+    def radius(self) -> np.ndarray:
+        return self._circumcircles[0]
+
+    @property
+    def centers(self) -> np.ndarray:
+        return self._circumcircles[1]
+
+    @cached_property
+    def curvature(self) -> np.ndarray:
+        R = self.radius
+        return _frozen(np.where(np.isfinite(R) & (R > 0), 1.0 / np.where(R > 0, R, 1.0), 0.0))
+
+    @cached_property
+    def normals(self) -> np.ndarray:
+        to_center = self.centers - self.smoothed
+        finite = np.all(np.isfinite(to_center), axis=1)
+        normals = np.zeros_like(to_center)
+        norms = np.linalg.norm(to_center[finite], axis=1, keepdims=True)
+        normals[finite] = to_center[finite] / np.where(norms > 1e-9, norms, 1.0)
+        return _frozen(normals)
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Dict, List, Optional
 
 from .acceleration import compute_acc_profile
+from .resource_cache import file_cached
 from .track import build_modular_track
 
 LIB_DIR = Path('data') / 'tracks'
@@ -184,26 +185,35 @@ def _default_library_specs() -> List[Dict]:
         },
     ]
 
+@file_cached('track library index', kind='data', watch=lambda: (META_FILE, LIB_DIR))
+def _read_library_index() -> List[Dict]:
+    """Entries of library.json whose geometry and physics files exist ([] if missing or unreadable).
+    Re-read only when library.json or the library directory (files added/removed) changes.
+    """
+    if not META_FILE.exists():
+        return []
+    try:
+        with open(META_FILE, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        # validate files exist
+        valid = []
+        for m in meta:
+            geo = Path(m['geometry_npz'])
+            phys = Path(m['physics_npz'])
+            if geo.exists() and phys.exists():
+                valid.append(m)
+        return valid
+    except Exception:
+        return []
+
 def ensure_library(dt: float = 0.02) -> List[Dict]:
     """Create the precomputed track library if missing and return metadata entries.
     Each entry contains name and file paths to geometry and physics arrays.
     """
     LIB_DIR.mkdir(parents=True, exist_ok=True)
-    if META_FILE.exists():
-        try:
-            with open(META_FILE, 'r', encoding='utf-8') as f:
-                meta = json.load(f)
-                # validate files exist
-                valid = []
-                for m in meta:
-                    geo = Path(m['geometry_npz'])
-                    phys = Path(m['physics_npz'])
-                    if geo.exists() and phys.exists():
-                        valid.append(m)
-                if valid:
-                    return valid
-        except Exception:
-            pass
+    valid = _read_library_index()
+    if valid:
+        return valid
 
     specs = _default_library_specs()
     entries: List[Dict] = []
@@ -0,0 +1,148 @@
+"""
+Adaptive arc-length resampling of assembled tracks.
+
+Block profiles and joint blends sample the curve at arbitrary densities (a
+loop has ~180 points, a 120 m lift a few dozen). This module reparameterizes
+the track by arc length and places samples by curvature: a chord of length h
+on a curve of curvature k deviates from it by about h^2 k / 8 (the sagitta),
+so the spacing is h = sqrt(8 * tolerance / k), clipped to
+[min_spacing, max_spacing]. Straights get few points, loops and tight blends
+keep many. Block boundaries are always kept as samples and every new sample
+records the block it belongs to.
+
+Note: `track_to_accelerometer_data` treats samples as 50 Hz time steps, so the
+sample count changes the ride duration the LightGBM model sees. Resampled
+tracks are for plotting and geometric analysis only; the builder rates the
+full-resolution track whether or not its drawing is resampled.
+"""
+
+from typing import Dict
+
+import numpy as np
+from scipy.ndimage import maximum_filter1d
+
+DEFAULT_TOLERANCE = 0.05  # Max chord deviation (m)
+DEFAULT_MIN_SPACING = 0.25  # m
+DEFAULT_MAX_SPACING = 8.0  # m
+# Points closer than this to their predecessor are treated as duplicates
+# (block starts repeat the end point of the preceding joint blend)
+DUPLICATE_DISTANCE = 1e-3  # m
+# Refinement passes that insert input vertices still farther than `tolerance`
+MAX_REFINE_PASSES = 8
+
+
+def arc_length(x, y, z=None) -> np.ndarray:
+    """Cumulative arc length of a polyline (starts at 0)."""
+    pts = np.column_stack([x, y, np.zeros(len(x)) if z is None else z]).astype(float)
+    return np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(pts, axis=0), axis=1))))
+
+
+def polyline_curvature(pts: np.ndarray) -> np.ndarray:
+    """Curvature of the circle through every three consecutive points (endpoints copy their neighbour)."""
+    ab = pts[1:-1] - pts[:-2]
+    bc = pts[2:] - pts[1:-1]
+    ac = pts[2:] - pts[:-2]
+    denom = np.linalg.norm(ab, axis=1) * np.linalg.norm(bc, axis=1) * np.linalg.norm(ac, axis=1)
+    k = 2.0 * np.linalg.norm(np.cross(ab, bc), axis=1) / np.maximum(denom, 1e-12)
+    return np.concatenate(([k[0]], k, [k[-1]]))
+
+
+def chord_deviation(pts: np.ndarray, s: np.ndarray, new_pts: np.ndarray, new_s: np.ndarray) -> np.ndarray:
+    """Distance of every original point to the resampled polyline segment spanning it."""
+    seg = np.clip(np.searchsorted(new_s, s, side='right') - 1, 0, len(new_s) - 2)
+    a, b = new_pts[seg], new_pts[seg + 1]
+    ab = b - a
+    t = np.clip(np.einsum('ij,ij->i', pts - a, ab) / np.maximum(np.einsum('ij,ij->i', ab, ab), 1e-12), 0.0, 1.0)
+    return np.linalg.norm(pts - (a + t[:, None] * ab), axis=1)
+
+
+def resample_track(x, y, z=None, block_index=None,
+                   tolerance: float = DEFAULT_TOLERANCE,
+                   min_spacing: float = DEFAULT_MIN_SPACING,
+                   max_spacing: float = DEFAULT_MAX_SPACING) -> Dict[str, np.ndarray]:
+    """
+    Resample a track by arc length with curvature-adaptive spacing.
+
+    Args:
+        x, y, z: Track coordinates (y vertical); z defaults to a flat track
+        block_index: Block of every input point (see assemble_track(return_block_index=True))
+        tolerance: Max sagitta (chord-to-curve deviation) in meters
+        min_spacing: Smallest allowed sample spacing (m)
+        max_spacing: Largest allowed sample spacing (m)
+
+    Returns:
+        dict with the resampled 'x', 'y', 'z', their arc length 's', 'block_index'
+        (None if not given), 'source_index' (input point at or before each
+        sample), 'n_original' and 'max_deviation' (largest measured distance
+        of an input point from the resampled polyline, in m)
+    """
+    if tolerance <= 0 or min_spacing <= 0 or max_spacing < min_spacing:
+        raise ValueError("need tolerance > 0 and 0 < min_spacing <= max_spacing")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    z = np.zeros_like(x) if z is None else np.asarray(z, dtype=float)
+    pts = np.column_stack([x, y, z])
+    s = arc_length(x, y, z)
+
+    # Drop coincident points (near-zero segments make curvature estimates blow up)
+    keep = np.concatenate(([True], np.diff(s) >= DUPLICATE_DISTANCE))
+    pts_u, s_u = pts[keep], s[keep]
+    if len(s_u) < 3:
+        raise ValueError("track needs at least 3 distinct points")
+    src_u = np.flatnonzero(keep)
+
+    # Spacing from the sagitta bound; widen curvature peaks so the spacing tightens before a curve starts
+    curvature = maximum_filter1d(polyline_curvature(pts_u), size=5, mode='nearest')
+    spacing = np.clip(np.sqrt(8.0 * tolerance / np.maximum(curvature, 1e-12)), min_spacing, max_spacing)
+
+    # Sample count per unit length is 1/spacing: integrate it and invert at integer steps
+    density = 1.0 / spacing
+    cum = np.concatenate(([0.0], np.cumsum(0.5 * (density[1:] + density[:-1]) * np.diff(s_u))))
+    n_samples = max(int(np.ceil(cum[-1])), 1)
+    new_s = np.interp(np.linspace(0.0, cum[-1], n_samples + 1), cum, s_u)
+
+    if block_index is not None:
+        block_index = np.asarray(block_index)
+        if len(block_index) != len(x):
+            raise ValueError("block_index must have one entry per track point")
+        # Keep every block boundary as a sample
+        change = np.flatnonzero(np.diff(block_index[keep]) != 0) + 1
+        new_s = np.union1d(new_s, s_u[change])
+
+    def interpolate(knots):
+        return np.column_stack([np.interp(knots, s_u, pts_u[:, k]) for k in range(3)])
+
+    # The sagitta estimate is local; where the input polyline has corners between
+    # samples, insert the offending input vertices until the deviation is bounded
+    new_pts = interpolate(new_s)
+    deviation = chord_deviation(pts_u, s_u, new_pts, new_s)
+    for _ in range(MAX_REFINE_PASSES):
+        bad = deviation > tolerance
+        if not bad.any():
+            break
+        new_s = np.union1d(new_s, s_u[bad])
+        new_pts = interpolate(new_s)
+        deviation = chord_deviation(pts_u, s_u, new_pts, new_s)
+    pos = np.clip(np.searchsorted(s_u, new_s, side='right') - 1, 0, len(s_u) - 1)
+    source_index = src_u[pos]
+
+    return {
+        'x': new_pts[:, 0],
+        'y': new_pts[:, 1],
+        'z': new_pts[:, 2],
+        's': new_s,
+        'block_index': None if block_index is None else block_index[source_index],
+        'source_index': source_index,
+        'n_original': len(x),
+        'max_deviation': float(deviation.max()),
+    }
+
+
+def resample_sequence(sequence, force_end_level: bool = False, start_level: float = 0.0,
+                      tolerance: float = DEFAULT_TOLERANCE, **kwargs) -> Dict[str, np.ndarray]:
+    """Assemble a block sequence and resample it (see resample_track)."""
+    from utils.track_assembly import assemble_track
+
+    x, y, z, block_index = assemble_track(sequence, force_end_level=force_end_level,
+                                          start_level=start_level, return_block_index=True)
+    return resample_track(x, y, z, block_index=block_index, tolerance=tolerance, **kwargs)
@@ -0,0 +1,155 @@
+"""
+Per-seat g-forces of a multi-car train.
+
+`track_to_accelerometer_data` simulates a single point mass. Here that one
+solution is read as the train's center of mass: a rigid train of equal cars
+shares one speed and one tangential acceleration, so its speed follows the
+height of the center of mass, and each seat differs only in where it is on the
+track. A seat `offset` meters ahead of the center sees the track direction and
+curvature at arc length s + offset. On a crest the back row is pulled over at
+the speed the whole train has when the center is already past the top. That
+gives it more airtime than the front row, which crests while the train is
+still slow.
+
+All seats are evaluated at once by interpolating the shared solution at the
+offset arc lengths (no per-seat simulation); results are seats x samples.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.acceleration import G_NORM, G_VEC, compute_acc_profile
+from utils.accelerometer_transform import SAMPLE_DT, STATION_SPEED, _track_geometry, accelerometer_frame
+from utils.scoring import compute_airtime_metrics
+from utils.track_geometry import TrackGeometry
+
+DEFAULT_CARS = 6
+DEFAULT_CAR_SPACING = 2.0  # m between the seats of consecutive cars
+
+
+def seat_offsets(n_cars: int = DEFAULT_CARS, car_spacing: float = DEFAULT_CAR_SPACING) -> np.ndarray:
+    """Arc-length offset of every seat from the train's center (m), front seat first."""
+    if n_cars < 1 or car_spacing <= 0:
+        raise ValueError("need n_cars >= 1 and car_spacing > 0")
+    return ((n_cars - 1) / 2.0 - np.arange(n_cars)) * float(car_spacing)
+
+
+def _interpolate(values: np.ndarray, s: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Linear interpolation of per-sample values (N or Nx3) at arc lengths `positions` (any shape)."""
+    idx = np.clip(np.searchsorted(s, positions, side='right') - 1, 0, len(s) - 2)
+    ds = s[idx + 1] - s[idx]
+    w = np.where(ds > 0, (positions - s[idx]) / np.where(ds > 0, ds, 1.0), 0.0)
+    if values.ndim == 2:
+        w = w[..., None]
+    return (1.0 - w) * values[idx] + w * values[idx + 1]
+
+
+def train_profile(points: np.ndarray,
+                  n_cars: int = DEFAULT_CARS,
+                  car_spacing: float = DEFAULT_CAR_SPACING,
+                  mass: float = 1200.0,
+                  rho: float = 1.0,
+                  Cd: float = 0.08,
+                  A: float = 2.5,
+                  mu: float = 0.001,
+                  geometry: Optional[TrackGeometry] = None) -> Dict[str, np.ndarray]:
+    """
+    Specific force at every seat of a train, from one point-mass solution.
+
+    Physics settings match track_to_accelerometer_data (station speed, 50 Hz
+    samples, energy-conservation blend). Seats past either end of the track
+    stay at the end (train still in the station / on the brake run).
+
+    Args:
+        points: Nx3 track points in meters, Z-up (x=forward, y=lateral, z=vertical)
+        n_cars: Number of cars (one seat row each)
+        car_spacing: Distance between consecutive seats (m)
+        mass, rho, Cd, A, mu: Physics parameters of the train
+        geometry: Optional TrackGeometry of `points`
+
+    Returns:
+        dict with 'offsets' (seats,), 'position' (seats x N arc length of each
+        seat, m), 'curvature' (seats x N, 1/m) and 'f_long_g', 'f_lat_g',
+        'f_vert_g' (seats x N). With an odd car count the middle seat
+        reproduces compute_acc_profile's f_*_g.
+    """
+    if geometry is None:
+        geometry = TrackGeometry(points)
+    profile = compute_acc_profile(
+        points, dt=SAMPLE_DT, mass=mass, rho=rho, Cd=Cd, A=A, mu=mu, v0=STATION_SPEED,
+        use_energy_conservation=True, geometry=geometry, channels=('v_est', 'a_tan'),
+    )
+    v, a_tan = profile['v_est'], profile['a_tan']
+
+    # Curvature vector (toward the circle center, 1/R) where compute_acc_profile applies centripetal force
+    R = geometry.radius
+    normals = geometry.normals
+    valid = (np.isfinite(R) & (R >= 5.0) & np.all(np.isfinite(geometry.centers), axis=1)
+             & (np.linalg.norm(normals, axis=1) > 1e-9))
+    k_vec = np.zeros_like(normals)
+    k_vec[valid] = normals[valid] / R[valid, None]
+
+    offsets = seat_offsets(n_cars, car_spacing)
+    s = geometry.arc_length
+    position = np.clip(s[None, :] + offsets[:, None], 0.0, s[-1])
+    e_tan = _interpolate(geometry.tangents, s, position)
+    # Renormalize between samples; degenerate (near-zero) tangents at stations stay as they are
+    e_norm = np.linalg.norm(e_tan, axis=2, keepdims=True)
+    e_tan /= np.where(e_norm > 1e-9, e_norm, 1.0)
+    k_seat = _interpolate(k_vec, s, position)
+
+    # Train speed and tangential acceleration, seat direction and curvature
+    # (centripetal magnitude clamped to 6 g as in compute_acc_profile)
+    k_mag = np.linalg.norm(k_seat, axis=2)
+    a_cent = np.clip(v[None, :] ** 2 * k_mag, 0.0, 60.0)
+    a_eq = k_seat * (a_cent / np.where(k_mag > 0, k_mag, 1.0))[..., None]
+    f_spec = a_tan[None, :, None] * e_tan + a_eq - G_VEC
+
+    lat_vec = np.cross(np.array([0.0, 0.0, 1.0]), e_tan)
+    lat_n = np.linalg.norm(lat_vec, axis=2, keepdims=True)
+    lat_vec /= np.where(lat_n < 1e-9, 1.0, lat_n)
+    return {
+        'offsets': offsets,
+        'position': position,
+        'curvature': _interpolate(geometry.curvature, s, position),
+        'f_long_g': np.einsum('ijk,ijk->ij', f_spec, e_tan) / G_NORM,
+        'f_lat_g': np.einsum('ijk,ijk->ij', f_spec, lat_vec) / G_NORM,
+        'f_vert_g': f_spec[..., 2] / G_NORM,
+    }
+
+
+def train_accelerometer_data(track_df, n_cars: int = DEFAULT_CARS, car_spacing: float = DEFAULT_CAR_SPACING,
+                             mass=1200.0, rho=1.0, Cd=0.08, A=2.5, mu=0.001,
+                             geometry=None) -> List[pd.DataFrame]:
+    """
+    Accelerometer data of every seat (front first), in the format of track_to_accelerometer_data.
+
+    Args:
+        track_df: DataFrame with columns ['x', 'y'] (and optionally 'z')
+        n_cars, car_spacing: Train layout (see train_profile)
+        mass, rho, Cd, A, mu: Physics parameters
+        geometry: Optional TrackGeometry of the track
+
+    Returns:
+        One DataFrame with columns ['Time', 'Lateral', 'Vertical', 'Longitudinal'] per seat
+    """
+    geometry = _track_geometry(track_df, geometry)
+    seats = train_profile(geometry.points, n_cars=n_cars, car_spacing=car_spacing,
+                          mass=mass, rho=rho, Cd=Cd, A=A, mu=mu, geometry=geometry)
+    channels = ('f_lat_g', 'f_vert_g', 'f_long_g', 'curvature')
+    return [accelerometer_frame({name: seats[name][i] for name in channels})
+            for i in range(len(seats['offsets']))]
+
+
+def best_and_worst_seat(seat_dfs: List[pd.DataFrame]) -> Tuple[int, int]:
+    """Indices of the seats with the most and the least airtime (ejector airtime breaks ties)."""
+    if not seat_dfs:
+        raise ValueError("no seats")
+    keys = []
+    for accel_df in seat_dfs:
+        airtime = compute_airtime_metrics(accel_df)
+        keys.append((airtime['total_airtime'], airtime['ejector']))
+    order = sorted(range(len(keys)), key=lambda i: keys[i])
+    return order[-1], order[0]